@@ -1,3 +1,37 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import CoverageProfile, SolverRun
+
+
+@admin.register(SolverRun)
+class SolverRunAdmin(admin.ModelAdmin):
+    """
+    Lists the solver runs in the admin site, filterable by kind, engine, backend, status and
+    date, to spot regressions of the solver performance.
+    """
+
+    list_display = ('created_at', 'kind', 'week_number', 'engine', 'backend', 'status',
+                    'objective', 'gap', 'build_time', 'solve_time', 'write_back_time',
+                    'num_variables', 'num_constraints', 'num_workers', 'multiplier')
+    list_filter = ('kind', 'engine', 'backend', 'status', 'created_at')
+    date_hierarchy = 'created_at'
+
+
+@admin.register(CoverageProfile)
+class CoverageProfileAdmin(admin.ModelAdmin):
+    """
+    Lists the coverage profile versions in the admin site. Saving a profile adds a new version,
+    the solvers pick it up from the weeks it is valid in.
+    """
+
+    list_display = ('name', 'version', 'valid_from', 'created_at')
+    list_filter = ('name',)
+    readonly_fields = ('version', 'created_at')
+
+    def save_model(self, request, obj: CoverageProfile, form, change: bool) -> None:
+        """
+        Saves an edited profile as a new version, keeping the old one.
+        """
+        obj.pk = None
+        obj.version = None
+        super().save_model(request, obj, form, change)
@@ -9,10 +9,8 @@ from langchain.memory import ConversationBufferMemory
 from langchain.tools import StructuredTool
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
-from ortools.linear_solver import pywraplp
 
 from .models import Message
-from .solver import optimize_schedule
 from .utils.common_fn import (
     complement_roster,
     convert_json_to_roster_string,
@@ -33,11 +31,7 @@ from .utils.constants import (
     GET_SAVE_APPLICATION_MODIFICATION_DESCRIPTION,
     GET_SCHEDULE_OPTIMIZER_DESCRIPTION,
     NO_ONGOINT_MODIFICATIONS,
-    SOLVER_STATUS_FEASIBLE,
-    SOLVER_STATUS_INFEASIBLE,
-    SOLVER_STATUS_NOT_SOLVED,
-    SOLVER_STATUS_OPTIMAL,
-    SOLVER_STATUS_UNBOUNDED,
+    SOLVER_JOB_QUEUED_MSG,
     SUCCESSFUL_DROP_MSG,
     SUCCESSFUL_SAVE_MSG,
     SUMMARIZATION_DESC,
@@ -56,7 +50,6 @@ from .utils.message_fn import (
 from .utils.model_fn import (
     get_past_messages_by_user,
     get_roster_by_user_and_week_number,
-    get_users_without_application,
     is_user_in_group,
 )
 from .utils.schemas import (
@@ -71,6 +64,7 @@ from .utils.schemas import (
     VacationRejectionOutputSchema,
     VacationSicknessClaimOutputSchema,
 )
+from .utils.solver_job_fn import enqueue_solver_job
 from .utils.vacation_sick_fn import (
     get_vacation_and_sick_data,
     sickness_claim,
@@ -350,54 +344,25 @@ def vacation_sickness_claim(user_request: str) -> VacationSicknessClaimOutputSch
 
 def schedule_optimizer() -> ScheduleOptimizationOutputSchema:
     """
-    Optimizes the work schedule based on certain constraints and conditions.
+    Queues the optimization of the work schedule for the solver worker.
 
-    This function retrieves users without shift applications, runs a schedule optimization 
-    process, and returns a status message indicating whether the optimization was successful, 
-    feasible, infeasible, or unresolved.
+    The solve can take minutes, so it doesn't run inside the HTTP request of the agent: a
+    `SolverJob` is queued and picked up by `python manage.py run_solver_worker`, its state,
+    progress and final status message are reported by the `solver-jobs/<id>` endpoint.
 
     Returns:
-        ScheduleOptimizationOutputSchema: A schema object containing the optimization status
-        message.
+        ScheduleOptimizationOutputSchema: A schema object containing the message with the id of
+        the queued job.
 
     Process:
-        1. Retrieves a list of users who have not submitted shift applications.
-        2. If there are exactly two users without applications, a warning message is generated.
-        3. The `optimize_schedule` function is called to optimize the schedule.
-        4. Based on the optimization status, the appropriate message is returned:
-            - "OPTIMAL": Indicates the optimization was successful.
-            - "FEASIBLE": The solution is feasible but may not be optimal.
-            - "INFEASIBLE": No feasible solution was found.
-            - "UNBOUNDED": The solution is unbounded (i.e., there is no upper bound to the
-               solution).
-            - "NOT_SOLVED": The solver was not able to solve the optimization problem.
-
-    Returns:
-        ScheduleOptimizationOutputSchema: Contains the message indicating the status of the
-        optimization.
+        1. A job optimizing the schedule of every worker is queued, with the engine and crew
+           sharding configured in the settings.
+        2. The worker checks the users without shift applications when it runs the job and adds
+           the warning to the final status message (see `get_solver_status_msg`).
     """
-    ret_val = get_users_without_application()
-    warning_msg = ""
-
-    if len(ret_val) == 2:
-        warning_msg = ret_val[1]
-    status, _, _ = optimize_schedule(15, 1)
-
-    if status == pywraplp.Solver.OPTIMAL:
-        msg = SOLVER_STATUS_OPTIMAL + " " + warning_msg
-        return ScheduleOptimizationOutputSchema(agent_output=msg)
-
-    if status == pywraplp.Solver.FEASIBLE:
-        return ScheduleOptimizationOutputSchema(agent_output=SOLVER_STATUS_FEASIBLE)
-
-    if status == pywraplp.Solver.INFEASIBLE:
-        return ScheduleOptimizationOutputSchema(agent_output=SOLVER_STATUS_INFEASIBLE)
-
-    if status == pywraplp.Solver.UNBOUNDED:
-        return ScheduleOptimizationOutputSchema(agent_output=SOLVER_STATUS_UNBOUNDED)
-
-    if status == pywraplp.Solver.NOT_SOLVED:
-        return ScheduleOptimizationOutputSchema(agent_output=SOLVER_STATUS_NOT_SOLVED)
+    job = enqueue_solver_job(USER, multiplier=1)
+    return ScheduleOptimizationOutputSchema(
+        agent_output=SOLVER_JOB_QUEUED_MSG.format(job_id=job.id))
 
 
 def reject_vacation(user_request: str) -> VacationRejectionOutputSchema:
@@ -0,0 +1,169 @@
+import math
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from .model_builder import get_weekly_quotas
+from .utils.constants import DAYS_IN_WEEK
+from .utils.solver_constants import (
+    CAPACITY_DAY,
+    CAPACITY_NIGHT_SHIFTS,
+    CAPACITY_RESERVE_DAYS,
+    CAPACITY_SHIFT,
+    CAPACITY_WORK_DAYS,
+    DAY_NAMES,
+    MAX_NIGHT_SHIFTS,
+    SHIFT_NAMES,
+    SHIFTS_PER_DAY,
+)
+
+
+class CapacityShortage(NamedTuple):
+    """
+    A requirement of the application week that the available workers can't meet.
+
+    Attributes:
+        requirement (str): The requirement: a shift, the shifts and reserves of a day, or the work
+                           days, reserve days or night shifts of the week.
+        day (Optional[int]): The 0-based day of the week, None for weekly requirements.
+        shift (Optional[int]): The 0-based shift of the day, None if not a shift requirement.
+        required (int): The number of workers (or days) required.
+        available (int): The number of workers (or days) available.
+        blocking_vacations (Dict[str, List[int]]): The 1-based vacation days that take workers
+                                                   (or days) away from the requirement, per
+                                                   username.
+    """
+    requirement: str
+    day: Optional[int]
+    shift: Optional[int]
+    required: int
+    available: int
+    blocking_vacations: Dict[str, List[int]]
+
+    def __str__(self) -> str:
+        if self.shift is not None:
+            where = f"{DAY_NAMES[self.day]} {SHIFT_NAMES[self.shift]} shift"
+        elif self.day is not None:
+            where = f"{DAY_NAMES[self.day]} shifts and reserves"
+        else:
+            where = f"weekly {self.requirement.replace('_', ' ')}"
+        vacations = ', '.join(
+            f"{username} ({', '.join(map(str, days))})"
+            for username, days in self.blocking_vacations.items()
+        )
+        return (f"{where}: {self.required} required, {self.available} available"
+                + (f", blocked by the vacations of {vacations}" if vacations else ""))
+
+
+class CapacityShortageError(ValueError):
+    """
+    Raised when the application week can't be covered, before the solver is started.
+
+    Attributes:
+        shortages (List[CapacityShortage]): The requirements that can't be met.
+    """
+
+    def __init__(self, shortages: List[CapacityShortage]) -> None:
+        self.shortages = shortages
+        super().__init__("Not enough workers for the " +
+                         "; ".join(str(shortage) for shortage in shortages))
+
+
+def get_blocking_vacations(
+    workers: List[str],
+    vacation: np.ndarray,
+    workers_mask: np.ndarray,
+    days: slice = slice(None)
+) -> Dict[str, List[int]]:
+    """
+    Lists the vacation days of the selected workers on the selected days.
+
+    Args:
+        workers (List[str]): The usernames of the workers.
+        vacation (np.ndarray): A (workers, 7) matrix of vacation days.
+        workers_mask (np.ndarray): A boolean mask of the selected workers.
+        days (slice, optional): The selected days. Defaults to every day.
+
+    Returns:
+        Dict[str, List[int]]: The 1-based vacation days per username, workers without vacation on
+        the selected days are left out.
+    """
+    day_numbers = np.arange(1, DAYS_IN_WEEK + 1)[days]
+    selected = vacation[:, days].astype(bool) & workers_mask[:, None]
+    return {
+        workers[row]: day_numbers[selected[row]].tolist()
+        for row in np.flatnonzero(selected.any(axis=1))
+    }
+
+
+def check_schedule_capacity(
+    workers: List[str],
+    vacation: np.ndarray,
+    sickness: np.ndarray,
+    min_workers: np.ndarray,
+    multiplier: float
+) -> List[CapacityShortage]:
+    """
+    Checks in linear time whether the workers left after vacation and sickness can cover the
+    application week, so an impossible week is reported without a solver search.
+
+    The checks are necessary conditions of the `optimize_schedule` model: every shift needs its
+    minimum number of present workers, the shifts and the reserves of a day need distinct present
+    workers, and the week's shifts, reserves and night shifts must fit into the weekly work and
+    reserve day quotas and the night shift limit. A week passing every check can still be
+    infeasible because of the rules between days, e.g. the rest after night shifts.
+
+    Args:
+        workers (List[str]): The usernames of the workers.
+        vacation (np.ndarray): A (workers, 7) matrix of the application week's vacation.
+        sickness (np.ndarray): A (workers, 7) matrix of the application week's sickness.
+        min_workers (np.ndarray): The minimum number of workers for each shift (21 values).
+        multiplier (float): A scaling factor of the number of reserve workers per day.
+
+    Returns:
+        List[CapacityShortage]: The requirements that can't be met, empty if none was found.
+    """
+    shortages = []
+    vacation = np.asarray(vacation, dtype=bool)
+    present = ~(vacation | np.asarray(sickness, dtype=bool))
+    present_per_day = present.sum(axis=0)
+    demand = np.asarray(min_workers, dtype=int).reshape(DAYS_IN_WEEK, SHIFTS_PER_DAY)
+    reserves_per_day = math.ceil(2 * multiplier)
+    everyone = np.ones(len(workers), dtype=bool)
+
+    # Each present worker takes at most one shift or a reserve day
+    for day in range(DAYS_IN_WEEK):
+        day_shortages = [
+            CapacityShortage(CAPACITY_SHIFT, day, shift, int(demand[day, shift]),
+                             int(present_per_day[day]), {})
+            for shift in np.flatnonzero(demand[day] > present_per_day[day]).tolist()
+        ]
+        if not day_shortages and demand[day].sum() + reserves_per_day > present_per_day[day]:
+            day_shortages.append(CapacityShortage(
+                CAPACITY_DAY, day, None, int(demand[day].sum()) + reserves_per_day,
+                int(present_per_day[day]), {}))
+        if day_shortages:
+            blocking = get_blocking_vacations(workers, vacation, everyone, slice(day, day + 1))
+            shortages.extend(shortage._replace(blocking_vacations=blocking)
+                             for shortage in day_shortages)
+
+    # Long absences lower the weekly quotas, their vacations block the weekly requirements
+    number_of_work_days, _, number_of_reserve_days, _ = get_weekly_quotas(
+        vacation.astype(int), np.asarray(sickness, dtype=int))
+    night_shifts = np.minimum(number_of_work_days, MAX_NIGHT_SHIFTS)
+    no_absence = np.zeros((1, DAYS_IN_WEEK), dtype=int)
+    full_quotas = get_weekly_quotas(no_absence, no_absence)
+    weekly = [
+        (CAPACITY_WORK_DAYS, int(demand.sum()), number_of_work_days, full_quotas[0]),
+        (CAPACITY_RESERVE_DAYS, DAYS_IN_WEEK * reserves_per_day, number_of_reserve_days,
+         full_quotas[2]),
+        (CAPACITY_NIGHT_SHIFTS, int(demand[:, -1].sum()), night_shifts,
+         np.minimum(full_quotas[0], MAX_NIGHT_SHIFTS)),
+    ]
+    for requirement, required, quotas, full_quota in weekly:
+        if quotas.sum() < required:
+            shortages.append(CapacityShortage(
+                requirement, None, None, required, int(quotas.sum()),
+                get_blocking_vacations(workers, vacation, quotas < full_quota)))
+
+    return shortages
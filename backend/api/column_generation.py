@@ -0,0 +1,428 @@
+import time
+from functools import lru_cache
+from itertools import combinations, product
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+
+from .model_builder import get_weekly_quotas
+from .symmetry import disaggregate_counts, get_worker_classes
+from .utils.constants import DAYS_IN_WEEK, NUMBER_OF_SHIFTS
+from .utils.solver_constants import MAX_NIGHT_SHIFTS, NIGHT_SHIFT, SHIFTS_PER_DAY
+from .warm_start import follows_reserve_rules
+
+REDUCED_COST_TOLERANCE = 1e-6
+
+
+class WeeklyPatterns(NamedTuple):
+    """
+    Every feasible week of a worker profile, one pattern per row.
+
+    Attributes:
+        shifts (np.ndarray): A (patterns, 21) matrix of the shifts.
+        work_days (np.ndarray): A (patterns, 7) matrix of the work days.
+        off_days (np.ndarray): A (patterns, 7) matrix of the off days.
+        reserve_days (np.ndarray): A (patterns, 7) matrix of the reserve days.
+    """
+    shifts: np.ndarray
+    work_days: np.ndarray
+    off_days: np.ndarray
+    reserve_days: np.ndarray
+
+
+class ColumnGenerationResult(NamedTuple):
+    """
+    The result of `solve_column_generation`.
+
+    Attributes:
+        status (int): The `pywraplp.Solver` status code.
+        schedules (Optional[np.ndarray]): The (workers, 21) schedule, None if not solved.
+        work_days (Optional[np.ndarray]): The (workers, 7) work days, None if not solved.
+        off_days (Optional[np.ndarray]): The (workers, 7) off days, None if not solved.
+        reserve_days (Optional[np.ndarray]): The (workers, 7) reserve days, None if not solved.
+        objective (Optional[float]): The number of granted applications, None if not solved.
+        bound (Optional[float]): The LP bound of the master problem, None if column generation
+                                 did not converge.
+        iterations (int): The number of pricing rounds.
+        num_columns (int): The number of generated columns.
+        num_constraints (int): The number of rows of the master problem.
+        num_classes (int): The number of classes of interchangeable workers.
+        wall_time (int): The runtime in milliseconds.
+    """
+    status: int
+    schedules: Optional[np.ndarray]
+    work_days: Optional[np.ndarray]
+    off_days: Optional[np.ndarray]
+    reserve_days: Optional[np.ndarray]
+    objective: Optional[float]
+    bound: Optional[float]
+    iterations: int
+    num_columns: int
+    num_constraints: int
+    num_classes: int
+    wall_time: int
+
+
+def get_shift_choices(number_of_work_days: int) -> np.ndarray:
+    """
+    Lists every assignment of shifts to consecutive work days that respects the night shift limit.
+
+    Args:
+        number_of_work_days (int): The number of work days.
+
+    Returns:
+        np.ndarray: A (choices, number_of_work_days) matrix of 0-based shift indices.
+    """
+    choices = np.array(
+        list(product(range(SHIFTS_PER_DAY), repeat=number_of_work_days)), dtype=int
+    ).reshape(-1, number_of_work_days)
+    return choices[(choices == NIGHT_SHIFT).sum(axis=1) <= MAX_NIGHT_SHIFTS]
+
+
+@lru_cache(maxsize=None)
+def get_weekly_patterns(
+    absent: Tuple[bool, ...],
+    number_of_work_days: int,
+    number_of_reserve_days: int,
+    reserve_rule: bool
+) -> WeeklyPatterns:
+    """
+    Enumerates every feasible week of a worker profile: the split into work, off and reserve days
+    (respecting the reserve-after-off rules if they apply) and one shift on each work day with at
+    most two night shifts and no morning or afternoon shift after a night shift.
+
+    Args:
+        absent (Tuple[bool, ...]): The vacation or sick days of the worker.
+        number_of_work_days (int): The number of work days of the week.
+        number_of_reserve_days (int): The number of reserve days of the week.
+        reserve_rule (bool): Whether the reserve-after-off rules apply to the worker.
+
+    Returns:
+        WeeklyPatterns: The patterns of the profile.
+    """
+    absent = np.array(absent, dtype=bool)
+    present_days = np.flatnonzero(~absent)
+    day_range = np.arange(DAYS_IN_WEEK)
+    shift_choices = get_shift_choices(number_of_work_days)
+
+    shifts, work_days, off_days, reserve_days = [], [], [], []
+    for work_set in combinations(present_days, number_of_work_days):
+        work = np.isin(day_range, work_set)
+        for reserve_set in combinations(np.setdiff1d(present_days, work_set),
+                                        number_of_reserve_days):
+            reserve = np.isin(day_range, reserve_set)
+            off = ~work & ~reserve & ~absent
+            if reserve_rule and not follows_reserve_rules(off, reserve):
+                continue
+
+            day_shifts = np.full((len(shift_choices), DAYS_IN_WEEK), -1)
+            day_shifts[:, list(work_set)] = shift_choices
+
+            # No morning or afternoon shift after a night shift
+            rest = (
+                (day_shifts[:, :-1] == NIGHT_SHIFT) &
+                (day_shifts[:, 1:] >= 0) & (day_shifts[:, 1:] != NIGHT_SHIFT)
+            ).any(axis=1)
+            day_shifts = day_shifts[~rest]
+
+            one_hot = day_shifts[:, :, None] == np.arange(SHIFTS_PER_DAY)
+            shifts.append(one_hot.reshape(-1, NUMBER_OF_SHIFTS))
+            for collected, days in ((work_days, work), (off_days, off),
+                                    (reserve_days, reserve)):
+                collected.append(np.broadcast_to(days, (len(day_shifts), DAYS_IN_WEEK)))
+
+    if not shifts:
+        empty = np.zeros((0, DAYS_IN_WEEK), dtype=np.uint8)
+        return WeeklyPatterns(np.zeros((0, NUMBER_OF_SHIFTS), dtype=np.uint8), empty, empty, empty)
+
+    return WeeklyPatterns(*(
+        np.concatenate(collected).astype(np.uint8)
+        for collected in (shifts, work_days, off_days, reserve_days)
+    ))
+
+
+def solve_column_generation(
+    applications: np.ndarray,
+    vacation: np.ndarray,
+    sickness: np.ndarray,
+    min_workers: np.ndarray,
+    multiplier: float,
+    time_limit: Optional[float] = None,
+    aggregate: bool = True
+) -> ColumnGenerationResult:
+    """
+    Optimizes the application week with column generation over weekly patterns.
+
+    The master problem selects exactly one pattern per worker (set partitioning) subject to the
+    shift and reserve coverage. Its LP relaxation is solved with GLOP; each round prices every
+    pattern of every worker against the duals and adds the best one with a positive reduced cost.
+    When no column improves the LP, the restricted master is solved as a MIP with SCIP. Coverage
+    shortages are allowed at a penalty higher than any objective, so the master is always
+    feasible.
+
+    Workers with identical applications and absences are interchangeable, so the master works on
+    classes of such workers: a column counts how many workers of a class take a pattern and the
+    convexity row of a class equals its size. The chosen patterns are handed out to the workers
+    of each class in worker order.
+
+    Args:
+        applications (np.ndarray): A (workers, 21) matrix of the application week's applications.
+        vacation (np.ndarray): A (workers, 7) matrix of the application week's vacation.
+        sickness (np.ndarray): A (workers, 7) matrix of the application week's sickness.
+        min_workers (np.ndarray): The minimum number of workers for each shift (21 values).
+        multiplier (float): A scaling factor of the number of reserve workers per day.
+        time_limit (Optional[float], optional): The time limit in seconds, shared by the pricing
+                                                rounds and the final MIP. Defaults to None.
+        aggregate (bool, optional): Whether to group interchangeable workers into classes.
+                                    Defaults to True.
+
+    Returns:
+        ColumnGenerationResult: The selected week of each worker and the solve statistics. The
+        status is OPTIMAL if the MIP reaches the LP bound, FEASIBLE otherwise.
+    """
+    start = time.perf_counter()
+    deadline = start + time_limit if time_limit is not None else None
+    classes = get_worker_classes(applications, vacation, sickness, aggregate)
+    number_of_classes = len(classes.sizes)
+    applications = applications[classes.representatives].astype(float)
+    vacation = vacation[classes.representatives]
+    sickness = sickness[classes.representatives]
+    reserve_demand = np.full(DAYS_IN_WEEK, 2 * multiplier, dtype=float)
+    penalty = applications.sum() + 1
+
+    number_of_work_days, _, number_of_reserve_days, reserve_rule = \
+        get_weekly_quotas(vacation, sickness)
+    absent = (vacation == 1) | (sickness == 1)
+
+    # Classes with the same absences and quotas share their pattern set
+    profiles: Dict[Tuple, List[int]] = {}
+    for worker_class in range(number_of_classes):
+        key = (tuple(absent[worker_class].tolist()), int(number_of_work_days[worker_class]),
+               int(number_of_reserve_days[worker_class]), bool(reserve_rule[worker_class]))
+        profiles.setdefault(key, []).append(worker_class)
+    patterns = {key: get_weekly_patterns(*key) for key in profiles}
+
+    if any(len(patterns[key].shifts) == 0 for key in profiles):
+        return ColumnGenerationResult(pywraplp.Solver.INFEASIBLE, None, None, None, None, None,
+                                      None, 0, 0, 0, number_of_classes, elapsed_ms(start))
+
+    # Columns are (class, profile key, pattern index) triplets
+    columns: List[Tuple[int, Tuple, int]] = []
+    generated = [set() for _ in range(number_of_classes)]
+
+    master = pywraplp.Solver.CreateSolver('GLOP')
+    convexity = [master.Constraint(float(size), float(size)) for size in classes.sizes]
+    coverage = [master.Constraint(float(demand), master.infinity()) for demand in min_workers]
+    reserve_coverage = [
+        master.Constraint(float(demand), master.infinity()) for demand in reserve_demand]
+    objective = master.Objective()
+    objective.SetMaximization()
+    shortages = []
+    for constraint in coverage + reserve_coverage:
+        shortage = master.NumVar(0, master.infinity(), '')
+        constraint.SetCoefficient(shortage, 1)
+        objective.SetCoefficient(shortage, -penalty)
+        shortages.append(shortage)
+
+    def add_column(worker_class: int, key: Tuple, pattern: int) -> None:
+        variable = master.NumVar(0, float(classes.sizes[worker_class]), '')
+        shifts = patterns[key].shifts[pattern]
+        reserve = patterns[key].reserve_days[pattern]
+        convexity[worker_class].SetCoefficient(variable, 1)
+        for shift in np.flatnonzero(shifts).tolist():
+            coverage[shift].SetCoefficient(variable, 1)
+        for day in np.flatnonzero(reserve).tolist():
+            reserve_coverage[day].SetCoefficient(variable, 1)
+        objective.SetCoefficient(variable, float(applications[worker_class] @ shifts))
+        columns.append((worker_class, key, pattern))
+        generated[worker_class].add(pattern)
+
+    # Start with the best pattern of each class for its own applications
+    duals = (np.zeros(NUMBER_OF_SHIFTS), np.zeros(DAYS_IN_WEEK), np.full(number_of_classes, -1.0))
+    new_columns = price_columns(applications, patterns, profiles, generated, duals)
+    iterations = 0
+    converged = False
+    bound = None
+    lp_shortage = 0.0
+
+    while True:
+        for worker_class, key, pattern in new_columns:
+            add_column(worker_class, key, pattern)
+
+        if deadline is not None:
+            master.SetTimeLimit(max(int((deadline - time.perf_counter()) * 1000), 1))
+        if master.Solve() != pywraplp.Solver.OPTIMAL:
+            break
+        iterations += 1
+
+        duals = (
+            np.array([constraint.dual_value() for constraint in coverage]),
+            np.array([constraint.dual_value() for constraint in reserve_coverage]),
+            np.array([constraint.dual_value() for constraint in convexity])
+        )
+        new_columns = price_columns(applications, patterns, profiles, generated, duals)
+        if not new_columns:
+            converged = True
+            bound = objective.Value()
+            lp_shortage = sum(shortage.solution_value() for shortage in shortages)
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+    status, selected, value = solve_restricted_master(
+        columns, patterns, applications, min_workers, reserve_demand, penalty, classes.sizes,
+        None if deadline is None else max(deadline - time.perf_counter(), 1.0)
+    )
+    num_constraints = number_of_classes + NUMBER_OF_SHIFTS + DAYS_IN_WEEK
+
+    if selected is None:
+        return ColumnGenerationResult(status, None, None, None, None, None, bound, iterations,
+                                      len(columns), num_constraints, number_of_classes,
+                                      elapsed_ms(start))
+
+    counts: List[List[Tuple[Tuple[Tuple, int], int]]] = [[] for _ in range(number_of_classes)]
+    for index, count in selected:
+        worker_class, key, pattern = columns[index]
+        counts[worker_class].append(((key, pattern), count))
+    chosen = disaggregate_counts(classes, counts)
+    schedules, work_days, off_days, reserve_days = (
+        np.stack([getattr(patterns[key], field)[pattern] for key, pattern in chosen])
+        for field in WeeklyPatterns._fields
+    )
+
+    covered = (
+        (schedules.sum(axis=0) >= min_workers).all() and
+        (reserve_days.sum(axis=0) >= reserve_demand).all()
+    )
+    if not covered:
+        # A shortage in the LP optimum means the full problem is infeasible as well
+        status = pywraplp.Solver.INFEASIBLE if converged and lp_shortage > \
+            REDUCED_COST_TOLERANCE else pywraplp.Solver.NOT_SOLVED
+        return ColumnGenerationResult(status, None, None, None, None, None, bound, iterations,
+                                      len(columns), num_constraints, number_of_classes,
+                                      elapsed_ms(start))
+
+    if converged and value >= np.floor(bound + REDUCED_COST_TOLERANCE):
+        status = pywraplp.Solver.OPTIMAL
+    else:
+        status = pywraplp.Solver.FEASIBLE
+
+    return ColumnGenerationResult(status, schedules, work_days, off_days, reserve_days, value,
+                                  bound, iterations, len(columns), num_constraints,
+                                  number_of_classes, elapsed_ms(start))
+
+
+def price_columns(
+    applications: np.ndarray,
+    patterns: Dict[Tuple, WeeklyPatterns],
+    profiles: Dict[Tuple, List[int]],
+    generated: List[set],
+    duals: Tuple[np.ndarray, np.ndarray, np.ndarray]
+) -> List[Tuple[int, Tuple, int]]:
+    """
+    Finds, for every worker class, the pattern with the highest reduced cost, if it is positive.
+
+    Args:
+        applications (np.ndarray): A (classes, 21) matrix of the applications.
+        patterns (Dict[Tuple, WeeklyPatterns]): The patterns of each profile.
+        profiles (Dict[Tuple, List[int]]): The worker classes of each profile.
+        generated (List[set]): The patterns already in the master problem, per class.
+        duals (Tuple[np.ndarray, np.ndarray, np.ndarray]): The duals of the shift coverage, the
+                                                           reserve coverage and the convexity
+                                                           rows.
+
+    Returns:
+        List[Tuple[int, Tuple, int]]: The new (class, profile key, pattern index) columns.
+    """
+    coverage_duals, reserve_duals, convexity_duals = duals
+    new_columns = []
+
+    for key, worker_classes in profiles.items():
+        shifts = patterns[key].shifts.astype(float)
+        pattern_duals = shifts @ coverage_duals + patterns[key].reserve_days @ reserve_duals
+        reduced_costs = (applications[worker_classes] @ shifts.T - pattern_duals -
+                         convexity_duals[worker_classes, None])
+        best = reduced_costs.argmax(axis=1)
+        for worker_class, pattern, reduced_cost in zip(
+            worker_classes, best.tolist(),
+            reduced_costs[np.arange(len(worker_classes)), best].tolist()
+        ):
+            if reduced_cost > REDUCED_COST_TOLERANCE and pattern not in generated[worker_class]:
+                new_columns.append((worker_class, key, pattern))
+
+    return new_columns
+
+
+def solve_restricted_master(
+    columns: List[Tuple[int, Tuple, int]],
+    patterns: Dict[Tuple, WeeklyPatterns],
+    applications: np.ndarray,
+    min_workers: np.ndarray,
+    reserve_demand: np.ndarray,
+    penalty: float,
+    class_sizes: np.ndarray,
+    time_limit: Optional[float]
+) -> Tuple[int, Optional[List[Tuple[int, int]]], Optional[float]]:
+    """
+    Solves the master problem over the generated columns with integer pattern counts.
+
+    Args:
+        columns (List[Tuple[int, Tuple, int]]): The generated (class, profile key, pattern index)
+                                                columns.
+        patterns (Dict[Tuple, WeeklyPatterns]): The patterns of each profile.
+        applications (np.ndarray): A (classes, 21) matrix of the applications.
+        min_workers (np.ndarray): The minimum number of workers for each shift.
+        reserve_demand (np.ndarray): The minimum number of reserve workers for each day.
+        penalty (float): The objective penalty of a unit of coverage shortage.
+        class_sizes (np.ndarray): The number of workers of each class.
+        time_limit (Optional[float]): The time limit in seconds.
+
+    Returns:
+        Tuple[int, Optional[List[Tuple[int, int]]], Optional[float]]: The solver status, the
+        (column index, number of workers) pairs of the selected columns and the number of granted
+        applications, the latter two are None if no solution was found.
+    """
+    solver = pywraplp.Solver.CreateSolver('SCIP')
+    if time_limit is not None:
+        solver.SetTimeLimit(int(time_limit * 1000))
+
+    variables = [solver.IntVar(0, float(class_sizes[worker_class]), '')
+                 for worker_class, _, _ in columns]
+    objective = solver.Objective()
+    objective.SetMaximization()
+    convexity = [solver.Constraint(float(size), float(size)) for size in class_sizes]
+    coverage = [solver.Constraint(float(demand), solver.infinity()) for demand in min_workers]
+    reserve_coverage = [
+        solver.Constraint(float(demand), solver.infinity()) for demand in reserve_demand]
+    for constraint in coverage + reserve_coverage:
+        slack = solver.NumVar(0, solver.infinity(), '')
+        constraint.SetCoefficient(slack, 1)
+        objective.SetCoefficient(slack, -penalty)
+
+    for variable, (worker_class, key, pattern) in zip(variables, columns):
+        shifts = patterns[key].shifts[pattern]
+        convexity[worker_class].SetCoefficient(variable, 1)
+        for shift in np.flatnonzero(shifts).tolist():
+            coverage[shift].SetCoefficient(variable, 1)
+        for day in np.flatnonzero(patterns[key].reserve_days[pattern]).tolist():
+            reserve_coverage[day].SetCoefficient(variable, 1)
+        objective.SetCoefficient(variable, float(applications[worker_class] @ shifts))
+
+    status = solver.Solve()
+    if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        return status, None, None
+
+    counts = np.rint([variable.solution_value() for variable in variables]).astype(int)
+    indices = np.flatnonzero(counts)
+    selected = list(zip(indices.tolist(), counts[indices].tolist()))
+    value = sum(count * float(applications[columns[index][0]] @ patterns[columns[index][1]].shifts[
+        columns[index][2]]) for index, count in selected)
+    return status, selected, value
+
+
+def elapsed_ms(start: float) -> int:
+    """
+    Returns the milliseconds elapsed since `start` (a `time.perf_counter` value).
+    """
+    return round((time.perf_counter() - start) * 1000)
@@ -0,0 +1,130 @@
+import time
+from datetime import date, timedelta
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CoverageProfile
+from .utils.constants import DAYS_IN_WEEK
+from .utils.date_time_fn import current_year, get_first_and_last_day_of_week
+from .utils.solver_constants import COVERAGE_DEFAULT_PROFILE, DEFAULT_COVERAGE
+
+
+class CoverageDemand(NamedTuple):
+    """
+    A version of a `CoverageProfile` as arrays, as kept in the cache.
+
+    Attributes:
+        version (int): The version of the profile.
+        valid_from (Optional[date]): The first day the version applies from, None if always.
+        weekdays (np.ndarray): A (7, 3) matrix of the demand of each weekday's shifts.
+        dates (Dict[date, np.ndarray]): The demand of the shifts of single dates.
+    """
+    version: int
+    valid_from: Optional[date]
+    weekdays: np.ndarray
+    dates: Dict[date, np.ndarray]
+
+
+_profiles: Optional[Dict[str, List[CoverageDemand]]] = None
+_loaded_at = 0.0
+_lock = Lock()
+
+
+def get_coverage_profiles() -> Dict[str, List[CoverageDemand]]:
+    """
+    Returns the coverage profiles by name, the latest version first. They are read from the
+    database once and kept in the process until a profile is saved or deleted, or for at most
+    `settings.SOLVER_COVERAGE_CACHE_TTL` seconds so saves in other processes (e.g. the solver
+    worker) are picked up.
+
+    Returns:
+        Dict[str, List[CoverageDemand]]: The versions of each profile.
+    """
+    global _profiles, _loaded_at
+    with _lock:
+        if _profiles is None or time.monotonic() - _loaded_at > settings.SOLVER_COVERAGE_CACHE_TTL:
+            profiles: Dict[str, List[CoverageDemand]] = {}
+            for profile in CoverageProfile.objects.order_by('name', '-version'):
+                profiles.setdefault(profile.name, []).append(CoverageDemand(
+                    profile.version,
+                    profile.valid_from,
+                    np.array(profile.weekday_demand, dtype=int),
+                    {date.fromisoformat(day): np.array(shifts, dtype=int)
+                     for day, shifts in profile.date_demand.items()}
+                ))
+            _profiles = profiles
+            _loaded_at = time.monotonic()
+        return _profiles
+
+
+@receiver([post_save, post_delete], sender=CoverageProfile)
+def clear_coverage_profiles(**kwargs) -> None:
+    """
+    Empties the coverage profile cache, connected to the saves and deletes of the profiles.
+    """
+    global _profiles
+    with _lock:
+        _profiles = None
+
+
+def get_coverage_demand(
+    week_number: int,
+    group_name: Optional[str] = None,
+    year: Optional[int] = None
+) -> np.ndarray:
+    """
+    Looks up the unscaled minimum number of workers of each shift of a week in the cached
+    coverage profiles: the profile of the crew group if it has one, else the default profile,
+    else `DEFAULT_COVERAGE`. The latest version valid on the week's Monday is used, with the
+    demand of single dates replacing their weekday's.
+
+    Args:
+        week_number (int): The week number.
+        group_name (Optional[str], optional): The crew group of the workers. Defaults to None,
+                                              meaning the default profile.
+        year (Optional[int], optional): The year of the week. Defaults to the current year.
+
+    Returns:
+        np.ndarray: The demand of the 21 shifts of the week, Monday morning first.
+    """
+    monday, _ = get_first_and_last_day_of_week(year or current_year(), week_number)
+    profiles = get_coverage_profiles()
+    versions = profiles.get(group_name) or profiles.get(COVERAGE_DEFAULT_PROFILE, [])
+    demand = next((version for version in versions
+                   if version.valid_from is None or version.valid_from <= monday), None)
+    if demand is None:
+        return np.array(DEFAULT_COVERAGE, dtype=int).ravel()
+
+    weekdays = demand.weekdays.copy()
+    for day in range(DAYS_IN_WEEK):
+        shifts = demand.dates.get(monday + timedelta(days=day))
+        if shifts is not None:
+            weekdays[day] = shifts
+    return weekdays.ravel()
+
+
+def get_min_workers(
+    week_number: int,
+    multiplier: float,
+    group_name: Optional[str] = None,
+    year: Optional[int] = None
+) -> np.ndarray:
+    """
+    Calculates the minimum number of workers of each shift of a week, scaled by a multiplier.
+
+    Args:
+        week_number (int): The week number.
+        multiplier (float): A factor by which the demand of the coverage profile is multiplied.
+        group_name (Optional[str], optional): The crew group of the workers. Defaults to None,
+                                              meaning the default profile.
+        year (Optional[int], optional): The year of the week. Defaults to the current year.
+
+    Returns:
+        np.ndarray: The minimum number of workers of the 21 shifts of the week.
+    """
+    return get_coverage_demand(week_number, group_name, year) * multiplier
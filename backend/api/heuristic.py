@@ -0,0 +1,278 @@
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .model_builder import ScheduleModel
+from .utils.constants import DAYS_IN_WEEK
+from .utils.solver_constants import SHIFTS_PER_DAY
+
+VIOLATION_TOLERANCE = 1e-9
+# The number of rejected moves per free worker day after which the search stops
+MAX_IDLE_MOVES_PER_DAY = 20
+DAY_KIND_BLOCKS = ('var_work_days', 'var_off_days', 'var_reserve_days')
+WORK, OFF, RESERVE = range(3)
+
+
+class LocalSearchResult(NamedTuple):
+    """
+    The schedule found by `improve_schedule`.
+
+    Attributes:
+        values (np.ndarray): The value of every variable of the model.
+        objective (float): The objective value of the schedule.
+        violation (float): The summed violation of the rows, 0 if the schedule is feasible.
+        iterations (int): The number of evaluated moves.
+        accepted (int): The number of applied moves.
+        wall_time (int): The runtime of the search in milliseconds.
+    """
+    values: np.ndarray
+    objective: float
+    violation: float
+    iterations: int
+    accepted: int
+    wall_time: int
+
+
+class RowActivity:
+    """
+    The rows of a `ScheduleModel` indexed by variable, with the activity of every row under the
+    current values, so the effect of changing a few variables is evaluated on the rows they
+    appear in only.
+
+    Attributes:
+        rows (np.ndarray): The row of each term, ordered by variable.
+        coefficients (np.ndarray): The coefficient of each term, ordered by variable.
+        pointers (np.ndarray): The terms of variable `j` are `pointers[j]:pointers[j + 1]`.
+        lower (np.ndarray): The lower bound of every row.
+        upper (np.ndarray): The upper bound of every row.
+        activity (np.ndarray): The left-hand side of every row under the current values.
+        violation (float): The summed violation of every row under the current values.
+        row_variables (np.ndarray): The variable of each term, ordered by row.
+        row_pointers (np.ndarray): The terms of row `i` are `row_pointers[i]:row_pointers[i + 1]`.
+
+    Methods:
+        get_violation(rows, activity) -> np.ndarray:
+            Returns how far the given activities are outside the bounds of the rows.
+        get_violated_rows() -> np.ndarray:
+            Returns the rows violated under the current values.
+        evaluate(variables, deltas) -> Tuple[float, np.ndarray, np.ndarray]:
+            Returns the change of the violation if the variables change by the deltas.
+        apply(rows, activity, violation_delta) -> None:
+            Stores the activities of an applied change.
+    """
+
+    def __init__(self, model: ScheduleModel, values: np.ndarray) -> None:
+        variables, rows, coefficients, lower, upper = [], [], [], [], []
+        number_of_rows = 0
+        for group in model.row_groups:
+            group_rows, terms = group.indices.shape
+            variables.append(group.indices.ravel())
+            rows.append(np.repeat(np.arange(number_of_rows, number_of_rows + group_rows), terms))
+            coefficients.append(group.coefficients.ravel())
+            lower.append(group.lower)
+            upper.append(group.upper)
+            number_of_rows += group_rows
+
+        variables = np.concatenate(variables)
+        rows = np.concatenate(rows)
+        coefficients = np.concatenate(coefficients)
+        self.row_variables = variables
+        self.row_pointers = np.searchsorted(rows, np.arange(number_of_rows + 1))
+        order = np.argsort(variables, kind='stable')
+        self.rows = rows[order]
+        self.coefficients = coefficients[order]
+        self.pointers = np.searchsorted(variables[order], np.arange(model.num_variables + 1))
+        self.lower = np.concatenate(lower)
+        self.upper = np.concatenate(upper)
+        self.activity = np.bincount(rows, weights=coefficients * values[variables],
+                                    minlength=number_of_rows)
+        self.violation = float(self.get_violation(slice(None), self.activity).sum())
+
+    def get_violation(self, rows: np.ndarray, activity: np.ndarray) -> np.ndarray:
+        """
+        Returns how far the given activities are outside the bounds of the rows.
+        """
+        return np.maximum(self.lower[rows] - activity, 0) + np.maximum(activity - self.upper[rows],
+                                                                        0)
+
+    def get_violated_rows(self) -> np.ndarray:
+        """
+        Returns the rows violated under the current values.
+        """
+        return np.flatnonzero(self.get_violation(slice(None), self.activity) >
+                              VIOLATION_TOLERANCE)
+
+    def evaluate(
+        self,
+        variables: List[int],
+        deltas: List[int]
+    ) -> Tuple[float, np.ndarray, np.ndarray]:
+        """
+        Returns the change of the violation if the variables change by the deltas, the affected
+        rows and their new activities.
+        """
+        terms = [slice(self.pointers[variable], self.pointers[variable + 1])
+                 for variable in variables]
+        rows = np.concatenate([self.rows[term] for term in terms])
+        changes = np.concatenate([self.coefficients[term] * delta
+                                  for term, delta in zip(terms, deltas)])
+        rows, positions = np.unique(rows, return_inverse=True)
+        activity = self.activity[rows] + np.bincount(positions, weights=changes)
+        violation_delta = (self.get_violation(rows, activity).sum() -
+                           self.get_violation(rows, self.activity[rows]).sum())
+        return float(violation_delta), rows, activity
+
+    def apply(self, rows: np.ndarray, activity: np.ndarray, violation_delta: float) -> None:
+        """
+        Stores the activities of an applied change.
+        """
+        self.activity[rows] = activity
+        self.violation += violation_delta
+
+
+def improve_schedule(
+    model: ScheduleModel,
+    values: np.ndarray,
+    time_limit: Optional[float] = None,
+    seed: int = 0
+) -> LocalSearchResult:
+    """
+    Improves a schedule of a `build_schedule_model_template` model by local search: the row
+    violations are reduced first, the objective second. The moves keep every worker's number of
+    work, off and reserve days:
+
+        - a worker changes the shift of a work day,
+        - two workers exchange their shifts on the same day,
+        - a worker exchanges the kinds (work, off, reserve) of two days, taking the best shift
+          on a new work day.
+
+    While rows are violated, half of the moves are made by a worker of a violated row. A move is
+    applied if it doesn't make the schedule worse, so the search can walk across plateaus. It
+    stops at the time limit or after `MAX_IDLE_MOVES_PER_DAY` moves per free worker day without
+    an improvement. Fixed variables, e.g. absences or frozen weeks, are never changed.
+
+    Args:
+        model (ScheduleModel): The model, with its data filled in by `update_schedule_model`.
+        values (np.ndarray): The starting value of every variable, e.g. a repaired greedy
+                             schedule mapped by `get_application_week_hint_values`.
+        time_limit (Optional[float], optional): The time limit of the search in seconds. Defaults
+                                                to None, meaning no limit.
+        seed (int, optional): The seed of the random moves. Defaults to 0.
+
+    Returns:
+        LocalSearchResult: The improved schedule.
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    values = np.asarray(values, dtype=float).copy()
+    sign = 1 if model.maximize else -1
+    activity = RowActivity(model, values)
+
+    number_of_workers = len(model.workers)
+    optimized_days = slice(DAYS_IN_WEEK, None)
+    kinds = np.stack([model.blocks[name][:, optimized_days] for name in DAY_KIND_BLOCKS])
+    schedule = model.blocks['var_schedule'][:, DAYS_IN_WEEK * SHIFTS_PER_DAY:].reshape(
+        number_of_workers, -1, SHIFTS_PER_DAY)
+    free = model.upper_bounds[kinds[WORK]] > model.lower_bounds[kinds[WORK]]
+    free_days = [np.flatnonzero(row) for row in free]
+    workers = np.flatnonzero(free.sum(axis=1) > 1)
+    # The worker of each day and shift variable, -1 for the other variables
+    variable_workers = np.full(model.num_variables, -1)
+    variable_workers[kinds] = np.arange(number_of_workers)[None, :, None]
+    variable_workers[schedule] = np.arange(number_of_workers)[:, None, None]
+    movable = np.zeros(number_of_workers, dtype=bool)
+    movable[workers] = True
+    max_idle = MAX_IDLE_MOVES_PER_DAY * max(int(free.sum()), 1)
+
+    def get_kind(worker: int, day: int) -> int:
+        return int(np.argmax(values[kinds[:, worker, day]]))
+
+    def get_shift(worker: int, day: int) -> int:
+        return int(np.argmax(values[schedule[worker, day]]))
+
+    def day_moves(worker: int) -> List[Tuple[List[int], List[int]]]:
+        first, second = rng.choice(free_days[worker], 2, replace=False)
+        first_kind, second_kind = get_kind(worker, first), get_kind(worker, second)
+        if first_kind == second_kind:
+            return []
+        variables = [kinds[first_kind, worker, first], kinds[first_kind, worker, second],
+                     kinds[second_kind, worker, second], kinds[second_kind, worker, first]]
+        deltas = [-1, 1, -1, 1]
+        if second_kind == WORK:
+            first, second = second, first
+        if WORK in (first_kind, second_kind):
+            if values[schedule[worker, first]].any():
+                variables.append(schedule[worker, first, get_shift(worker, first)])
+                deltas.append(-1)
+            return [(variables + [schedule[worker, second, shift]], deltas + [1])
+                    for shift in range(SHIFTS_PER_DAY)]
+        return [(variables, deltas)]
+
+    def shift_moves(worker: int) -> List[Tuple[List[int], List[int]]]:
+        work_days = [day for day in free_days[worker] if values[kinds[WORK, worker, day]] > 0.5]
+        if not work_days:
+            return []
+        day = work_days[rng.integers(len(work_days))]
+        if not values[schedule[worker, day]].any():
+            return [([schedule[worker, day, shift]], [1]) for shift in range(SHIFTS_PER_DAY)]
+        shift = get_shift(worker, day)
+        other = rng.integers(number_of_workers)
+        if (other != worker and free[other, day] and values[kinds[WORK, other, day]] > 0.5 and
+                values[schedule[other, day]].any()):
+            other_shift = get_shift(other, day)
+            if other_shift != shift:
+                return [([schedule[worker, day, shift], schedule[worker, day, other_shift],
+                          schedule[other, day, other_shift], schedule[other, day, shift]],
+                         [-1, 1, -1, 1])]
+        return [([schedule[worker, day, shift], schedule[worker, day, new_shift]], [-1, 1])
+                for new_shift in range(SHIFTS_PER_DAY) if new_shift != shift]
+
+    iterations = accepted = idle = 0
+    while workers.size and idle < max_idle:
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            break
+        worker = workers[rng.integers(workers.size)]
+        if activity.violation > VIOLATION_TOLERANCE and rng.random() < 0.5:
+            violated = activity.get_violated_rows()
+            row = violated[rng.integers(violated.size)]
+            row_workers = variable_workers[activity.row_variables[
+                activity.row_pointers[row]:activity.row_pointers[row + 1]]]
+            row_workers = row_workers[row_workers >= 0]
+            row_workers = row_workers[movable[row_workers]]
+            if row_workers.size:
+                worker = row_workers[rng.integers(row_workers.size)]
+        moves = day_moves(worker) if rng.random() < 0.5 else shift_moves(worker)
+
+        best = None
+        for variables, deltas in moves:
+            iterations += 1
+            new_values = values[variables] + deltas
+            if ((new_values < model.lower_bounds[variables]).any() or
+                    (new_values > model.upper_bounds[variables]).any()):
+                continue
+            violation_delta, rows, row_activity = activity.evaluate(variables, deltas)
+            if abs(violation_delta) <= VIOLATION_TOLERANCE:
+                violation_delta = 0.0
+            gain = sign * float(model.objective[variables] @ deltas)
+            if best is None or (-violation_delta, gain) > best[0]:
+                best = ((-violation_delta, gain), variables, deltas, rows, row_activity)
+
+        if best is None or best[0] < (0.0, 0.0):
+            idle += 1
+            continue
+        (violation_decrease, gain), variables, deltas, rows, row_activity = best
+        values[variables] += deltas
+        activity.apply(rows, row_activity, -violation_decrease)
+        accepted += 1
+        idle = 0 if violation_decrease > 0 or gain > 0 else idle + 1
+
+    violation = activity.violation if activity.violation > VIOLATION_TOLERANCE else 0.0
+    return LocalSearchResult(
+        values,
+        float(model.objective @ values + model.objective_offset),
+        violation,
+        iterations,
+        accepted,
+        round((time.perf_counter() - start) * 1000)
+    )
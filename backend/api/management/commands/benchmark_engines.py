@@ -0,0 +1,118 @@
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from ortools.linear_solver import pywraplp
+
+from ...column_generation import solve_column_generation
+from ...model_builder import build_schedule_model
+from ...presolve import presolve_model
+from ...solver_backends import FEASIBLE_STATUSES, get_relative_gap, get_solver_backend
+from ...utils.benchmark_fn import generate_synthetic_week
+from ...utils.constants import DAYS_IN_WEEK, NUMBER_OF_SHIFTS
+
+STATUS_NAMES = {
+    pywraplp.Solver.OPTIMAL: 'OPTIMAL',
+    pywraplp.Solver.FEASIBLE: 'FEASIBLE',
+    pywraplp.Solver.INFEASIBLE: 'INFEASIBLE',
+    pywraplp.Solver.UNBOUNDED: 'UNBOUNDED',
+    pywraplp.Solver.ABNORMAL: 'ABNORMAL',
+    pywraplp.Solver.NOT_SOLVED: 'NOT_SOLVED',
+}
+
+
+class Command(BaseCommand):
+    """
+    Compares the compact `optimize_schedule` model with the column generation engine on synthetic
+    application weeks, without touching the database.
+
+    Usage:
+        python manage.py benchmark_engines --workers 50 200 1000 --time-limit 60
+    """
+    help = "Benchmarks the compact model against column generation on synthetic crews."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--workers', type=int, nargs='+', default=[50, 200, 1000])
+        parser.add_argument('--time-limit', type=float, default=60.0)
+        parser.add_argument('--backend', default=settings.SOLVER_BACKEND)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options) -> None:
+        self.stdout.write(
+            f"{'workers':>8} {'engine':>18} {'status':>10} {'objective':>10} {'bound':>10} "
+            f"{'gap':>8} {'build ms':>9} {'solve ms':>9} {'rows':>8}"
+        )
+
+        for number_of_workers in options['workers']:
+            week = generate_synthetic_week(number_of_workers, options['seed'])
+
+            build_start = time.perf_counter()
+            zeros = np.zeros((number_of_workers, DAYS_IN_WEEK), dtype=np.uint8)
+            model = build_schedule_model(
+                week.workers,
+                np.zeros((number_of_workers, NUMBER_OF_SHIFTS), dtype=np.uint8),
+                zeros,
+                zeros,
+                zeros,
+                week.applications,
+                week.vacation,
+                week.sickness,
+                week.min_workers,
+                week.multiplier
+            )
+            solver_backend = get_solver_backend(
+                options['backend'], settings.SOLVER_NUM_SEARCH_WORKERS, options['time_limit'])
+            presolved = presolve_model(model)
+            solver_backend.load(presolved.model)
+            build_time = (time.perf_counter() - build_start) * 1000
+
+            status = solver_backend.solve()
+            objective = bound = gap = None
+            if status in FEASIBLE_STATUSES:
+                values = presolved.restore(solver_backend.values())
+                objective = float(week.applications.ravel() @ values[
+                    model.blocks['var_schedule'][:, NUMBER_OF_SHIFTS:]].ravel())
+                gap = solver_backend.relative_gap()
+            self.write_row(number_of_workers, f"compact/{options['backend']}", status, objective,
+                           bound, gap, build_time, solver_backend.wall_time(),
+                           solver_backend.num_constraints())
+
+            result = solve_column_generation(
+                week.applications,
+                week.vacation,
+                week.sickness,
+                week.min_workers,
+                week.multiplier,
+                options['time_limit']
+            )
+            gap = None
+            if result.status in FEASIBLE_STATUSES and result.bound is not None:
+                gap = get_relative_gap(result.objective, result.bound)
+            self.write_row(number_of_workers, 'column-generation', result.status,
+                           result.objective, result.bound, gap, 0, result.wall_time,
+                           result.num_constraints)
+
+    def write_row(
+        self,
+        number_of_workers: int,
+        engine: str,
+        status: int,
+        objective: float,
+        bound: float,
+        gap: float,
+        build_time: float,
+        solve_time: float,
+        rows: int
+    ) -> None:
+        """
+        Writes one line of the benchmark table.
+        """
+        def fmt(value, spec):
+            return '-' if value is None else format(value, spec)
+
+        self.stdout.write(
+            f"{number_of_workers:>8} {engine:>18} {STATUS_NAMES.get(status, status):>10} "
+            f"{fmt(objective, '.0f'):>10} {fmt(bound, '.1f'):>10} {fmt(gap, '.2%'):>8} "
+            f"{build_time:>9.0f} {solve_time:>9.0f} {rows:>8}"
+        )
@@ -0,0 +1,237 @@
+import contextlib
+import csv
+import io
+import json
+import resource
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection
+
+from ...capacity_check import CapacityShortageError
+from ...model_cache import clear_model_templates
+from ...models import Roster, SolverRun
+from ...solver import optimize_schedule, reoptimize_schedule_after_sickness
+from ...solver_backends import FEASIBLE_STATUSES
+from ...utils.benchmark_fn import (
+    WORKERS_PER_MULTIPLIER,
+    apply_synthetic_sickness,
+    create_synthetic_crew,
+)
+from ...utils.date_time_fn import get_current_week_number
+from .benchmark_engines import STATUS_NAMES
+
+ENTRY_POINTS = ('optimize', 'reoptimize')
+REPORT_FIELDS = [
+    'entry_point', 'workers', 'vacation_rate', 'repeat', 'status', 'objective', 'gap',
+    'build_time', 'solve_time', 'write_back_time', 'total_time', 'num_variables',
+    'num_constraints', 'sick_workers', 'peak_python_mb', 'max_rss_mb'
+]
+ROSTER_FIELDS = [
+    'schedule', 'work_days', 'off_days', 'reserve_days', 'reserve_call_in_days',
+    'day_off_call_in_days', 'sickness', 'published', 'suboptimal'
+]
+
+
+class Command(BaseCommand):
+    """
+    Measures how `optimize_schedule` and `reoptimize_schedule_after_sickness` scale on synthetic
+    crews. Each crew is generated into a throwaway test database (the configured database is not
+    touched), the current and the next week are published by the solver, then every entry point
+    is run repeatedly. The runs are timed without memory tracing, the peak memory is measured with
+    `tracemalloc` (Python allocations, including NumPy) in a second, untimed run of the same
+    inputs, and `ru_maxrss` (the whole process, including the solver, never decreases).
+
+    Usage:
+        python manage.py benchmark_solver --workers 15 60 240 --vacation-rates 0.05 0.2
+        python manage.py benchmark_solver --workers 60 --repeat 5 --output report.csv
+    """
+    help = "Benchmarks the solver entry points on synthetic crews of several sizes."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--workers', type=int, nargs='+', default=[15, 60, 240])
+        parser.add_argument('--vacation-rates', type=float, nargs='+', default=[0.1])
+        parser.add_argument('--application-rate', type=float, default=0.3)
+        parser.add_argument('--sickness-rate', type=float, default=0.05)
+        parser.add_argument('--day-index', type=int, default=2,
+                            help="The day of the current week the sick leaves start on.")
+        parser.add_argument('--entry-points', nargs='+', choices=ENTRY_POINTS,
+                            default=list(ENTRY_POINTS))
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--time-limit', type=float, default=settings.SOLVER_TIME_LIMIT)
+        parser.add_argument('--backend', default=settings.SOLVER_BACKEND)
+        parser.add_argument('--engine', default=settings.SOLVER_ENGINE)
+        parser.add_argument('--keep-model-cache', action='store_true',
+                            help="Reuse the loaded model between optimize runs.")
+        parser.add_argument('--skip-memory', action='store_true',
+                            help="Skip the second run of each measurement that traces memory.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Write the report to a .json or .csv file.")
+        parser.add_argument('--verbose', action='store_true',
+                            help="Show the output of the solver functions.")
+
+    def handle(self, *args, **options) -> None:
+        output = options['output']
+        if output is not None and not output.endswith(('.json', '.csv')):
+            raise CommandError("The report must be a .json or .csv file.")
+
+        self.options = options
+        self.report: List[Dict] = []
+        self.stdout.write(
+            f"{'entry':>10} {'workers':>8} {'vacation':>8} {'run':>4} {'status':>10} "
+            f"{'build ms':>9} {'solve ms':>9} {'write ms':>9} {'total ms':>9} "
+            f"{'peak MB':>8} {'rss MB':>8}"
+        )
+
+        old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True,
+                                                               serialize=False)
+        try:
+            for number_of_workers in options['workers']:
+                for vacation_rate in options['vacation_rates']:
+                    self.benchmark_crew(number_of_workers, vacation_rate)
+        finally:
+            connection.creation.destroy_test_db(old_database_name, verbosity=0)
+
+        if output is not None:
+            with open(output, 'w', newline='') as file:
+                if output.endswith('.json'):
+                    json.dump(self.report, file, indent=2)
+                else:
+                    writer = csv.DictWriter(file, fieldnames=REPORT_FIELDS)
+                    writer.writeheader()
+                    writer.writerows(self.report)
+            self.stdout.write(f"Report written to {output}")
+
+    def benchmark_crew(self, number_of_workers: int, vacation_rate: float) -> None:
+        """
+        Generates a crew, publishes its current and next week and runs the entry points on it.
+        """
+        options = self.options
+        multiplier = max(1, number_of_workers // WORKERS_PER_MULTIPLIER)
+        solver_options = {'backend': options['backend'], 'time_limit': options['time_limit']}
+
+        Roster.objects.all().delete()
+        User.objects.all().delete()
+        create_synthetic_crew(number_of_workers, options['seed'], options['application_rate'],
+                              vacation_rate)
+
+        # Publish the current week, then the next week, on top of the rotating previous week
+        for offset in (2, 1):
+            try:
+                with self.quiet():
+                    status = optimize_schedule(multiplier=multiplier, a=offset, b=offset,
+                                               **solver_options)[0]
+            except CapacityShortageError as error:
+                raise CommandError(f"No schedule for the synthetic crew of {number_of_workers} "
+                                   f"workers: {error}") from error
+            if status not in FEASIBLE_STATUSES:
+                raise CommandError(
+                    f"No schedule for the synthetic crew of {number_of_workers} workers "
+                    f"({STATUS_NAMES.get(status, status)}), try a lower vacation rate.")
+
+        current_week_number = get_current_week_number(0)
+        published = {
+            roster.pk: roster for roster in Roster.objects.filter(
+                week_number__in=(current_week_number, get_current_week_number(1)))
+        }
+
+        row = {'workers': number_of_workers, 'vacation_rate': vacation_rate}
+        for repeat in range(options['repeat']):
+            if 'optimize' in options['entry_points']:
+                def prepare_optimize() -> None:
+                    if not options['keep_model_cache']:
+                        clear_model_templates()
+
+                self.measure(
+                    {**row, 'entry_point': 'optimize', 'repeat': repeat},
+                    lambda: optimize_schedule(multiplier=multiplier, engine=options['engine'],
+                                              use_result_cache=False, **solver_options),
+                    prepare_optimize)
+
+            if 'reoptimize' in options['entry_points']:
+                reoptimize_row = {**row, 'entry_point': 'reoptimize', 'repeat': repeat}
+
+                def prepare_reoptimize() -> None:
+                    # Every run starts from the published weeks with new sick leaves
+                    Roster.objects.bulk_update(published.values(), ROSTER_FIELDS)
+                    reoptimize_row['sick_workers'] = apply_synthetic_sickness(
+                        current_week_number, options['day_index'], options['sickness_rate'],
+                        options['seed'] + repeat)
+
+                self.measure(
+                    reoptimize_row,
+                    lambda: reoptimize_schedule_after_sickness(
+                        None, multiplier, options['day_index'], **solver_options),
+                    prepare_reoptimize)
+
+    def measure(
+        self,
+        row: Dict,
+        run: Callable[[], tuple],
+        prepare: Callable[[], None]
+    ) -> None:
+        """
+        Runs an entry point, then adds the statistics of the `SolverRun` it created and its peak
+        memory to the report. `prepare` sets up the inputs before the timed run and again before
+        the run tracing the memory, which is left out of the timing as tracing slows down every
+        allocation.
+        """
+        prepare()
+        last_id = SolverRun.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        start = time.perf_counter()
+        with self.quiet():
+            run()
+        total_time = (time.perf_counter() - start) * 1000
+
+        solver_runs = list(SolverRun.objects.filter(id__gt=last_id))
+        if len(solver_runs) != 1:
+            raise CommandError(f"Expected one solver run of {row['entry_point']}, found "
+                               f"{len(solver_runs)}.")
+        solver_run = solver_runs[0]
+
+        peak_python_mb = None
+        if not self.options['skip_memory']:
+            prepare()
+            tracemalloc.start()
+            try:
+                with self.quiet():
+                    run()
+                peak_python_mb = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+            finally:
+                tracemalloc.stop()
+
+        row.update({
+            'status': STATUS_NAMES.get(solver_run.status, solver_run.status),
+            'objective': solver_run.objective,
+            'gap': solver_run.gap,
+            'build_time': solver_run.build_time,
+            'solve_time': solver_run.solve_time,
+            'write_back_time': solver_run.write_back_time,
+            'total_time': round(total_time),
+            'num_variables': solver_run.num_variables,
+            'num_constraints': solver_run.num_constraints,
+            'peak_python_mb': peak_python_mb,
+            # Kilobytes on Linux
+            'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10, 1),
+        })
+        row.setdefault('sick_workers', None)
+        self.report.append(row)
+
+        self.stdout.write(
+            f"{row['entry_point']:>10} {row['workers']:>8} {row['vacation_rate']:>8.2f} "
+            f"{row['repeat']:>4} {row['status']:>10} {row['build_time']:>9} "
+            f"{row['solve_time']:>9} {row['write_back_time']:>9} {row['total_time']:>9} "
+            f"{str(row['peak_python_mb']):>8} {row['max_rss_mb']:>8}"
+        )
+
+    def quiet(self) -> contextlib.AbstractContextManager:
+        """
+        Hides the statistics printed by the solver functions unless `--verbose` is given.
+        """
+        if self.options['verbose']:
+            return contextlib.nullcontext()
+        return contextlib.redirect_stdout(io.StringIO())
@@ -0,0 +1,259 @@
+import contextlib
+import csv
+import io
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from ...solver import (
+    ReoptimizationInputs,
+    ScheduleInputs,
+    solve_reoptimization,
+    solve_schedule_shard,
+)
+from ...solver_backends import FEASIBLE_STATUSES
+from ...solver_instances import SolverInstance, find_solver_instances, load_solver_instance
+from ...utils.solver_constants import SOLVER_RUN_OPTIMIZE, SOLVER_RUN_REOPTIMIZE
+from .benchmark_engines import STATUS_NAMES
+
+REPORT_FIELDS = [
+    'instance', 'kind', 'workers', 'repeat', 'backend', 'engine', 'recorded_status', 'status',
+    'recorded_objective', 'objective', 'recorded_solve_time', 'build_time', 'solve_time',
+    'total_time'
+]
+
+
+class Command(BaseCommand):
+    """
+    Replays recorded solver instances (see `SOLVER_RECORD_INSTANCES`) without the database: the
+    model of each instance is rebuilt from its stored inputs and solved again, with the recorded
+    parameters unless others are given. Comparing the replayed objective and solve time to the
+    recorded ones over a corpus of instances catches regressions of the model builder and the
+    solver settings. The `.mps` files of an instance can be solved by other tools directly.
+
+    Usage:
+        python manage.py replay_solver_instance solver_instances/
+        python manage.py replay_solver_instance solver_instances/ --backend cp-sat --repeat 3
+        python manage.py replay_solver_instance <instance> --time-limit 10 --output replay.csv
+    """
+    help = "Solves recorded solver instances again and compares them to the recorded solve."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('paths', nargs='+',
+                            help="Instance directories or directories of instances.")
+        parser.add_argument('--backend', help="Defaults to the recorded backend.")
+        parser.add_argument('--engine', help="Defaults to the recorded engine (optimize only).")
+        parser.add_argument('--num-search-workers', type=int)
+        parser.add_argument('--time-limit', type=float)
+        parser.add_argument('--relative-gap-limit', type=float)
+        parser.add_argument('--neighborhood-size', type=int,
+                            help="Defaults to the recorded size (reoptimize only).")
+        parser.add_argument('--repeat', type=int, default=1)
+        parser.add_argument('--output', help="Write the report to a .json or .csv file.")
+        parser.add_argument('--verbose', action='store_true',
+                            help="Show the output of the solver functions.")
+
+    def handle(self, *args, **options) -> None:
+        output = options['output']
+        if output is not None and not output.endswith(('.json', '.csv')):
+            raise CommandError("The report must be a .json or .csv file.")
+
+        paths = find_solver_instances(options['paths'])
+        if not paths:
+            raise CommandError("No recorded solver instance found.")
+
+        self.options = options
+        report: List[Dict] = []
+        self.stdout.write(
+            f"{'instance':<48} {'run':>3} {'backend':>7} {'status':>21} {'objective':>23} "
+            f"{'build ms':>8} {'solve ms':>17}"
+        )
+        for path in paths:
+            instance = load_solver_instance(path)
+            for repeat in range(options['repeat']):
+                row = self.replay(instance)
+                row['repeat'] = repeat
+                report.append(row)
+                self.stdout.write(
+                    f"{row['instance'][-48:]:<48} {repeat:>3} {row['backend']:>7} "
+                    f"{row['recorded_status']:>10} {row['status']:>10} "
+                    f"{self.format(row['recorded_objective']):>11} "
+                    f"{self.format(row['objective']):>11} {row['build_time']:>8} "
+                    f"{self.format(row['recorded_solve_time']):>8} "
+                    f"{self.format(row['solve_time']):>8}"
+                )
+
+        if output is not None:
+            with open(output, 'w', newline='') as file:
+                if output.endswith('.json'):
+                    json.dump(report, file, indent=2)
+                else:
+                    writer = csv.DictWriter(file, fieldnames=REPORT_FIELDS)
+                    writer.writeheader()
+                    writer.writerows(report)
+            self.stdout.write(f"Report written to {output}")
+
+    def replay(self, instance: SolverInstance) -> Dict:
+        """
+        Solves an instance again and returns its report row.
+        """
+        metadata = instance.metadata
+        parameters = {
+            name: self.options[name] if self.options[name] is not None else metadata[name]
+            for name in ('backend', 'num_search_workers', 'time_limit', 'relative_gap_limit')
+        }
+
+        start = time.perf_counter()
+        with self.quiet():
+            if instance.kind == SOLVER_RUN_OPTIMIZE:
+                engine = self.options['engine'] or metadata['engine']
+                status, objective, build_time, solve_time = self.replay_optimize(
+                    instance, engine, parameters)
+                recorded = self.get_recorded_optimize(metadata)
+            elif instance.kind == SOLVER_RUN_REOPTIMIZE:
+                engine = None
+                status, objective, build_time, solve_time = self.replay_reoptimize(
+                    instance, parameters)
+                recorded = metadata['status'], metadata['objective'], metadata['solve_time']
+            else:
+                raise CommandError(f"Unknown instance kind: {instance.kind}")
+        total_time = (time.perf_counter() - start) * 1000
+
+        recorded_status, recorded_objective, recorded_solve_time = recorded
+        return {
+            'instance': instance.path,
+            'kind': instance.kind,
+            'workers': len(instance.arrays['workers']),
+            'backend': parameters['backend'],
+            'engine': engine,
+            'recorded_status': STATUS_NAMES.get(recorded_status, recorded_status),
+            'status': STATUS_NAMES.get(status, status),
+            'recorded_objective': recorded_objective,
+            'objective': objective,
+            'recorded_solve_time': recorded_solve_time,
+            'build_time': round(build_time),
+            'solve_time': solve_time,
+            'total_time': round(total_time),
+        }
+
+    def replay_optimize(
+        self,
+        instance: SolverInstance,
+        engine: str,
+        parameters: Dict
+    ) -> Tuple[int, Optional[float], float, int]:
+        """
+        Solves every shard of an `optimize_schedule` instance, like `optimize_schedule` does but in
+        this process. Returns the worst status, the summed objective, the largest build time and
+        the largest solve time of the shards.
+        """
+        arrays = instance.arrays
+        workers = arrays['workers'].tolist()
+        statuses, objectives, build_times, solve_times = [], [], [], []
+        for index, shard in enumerate(instance.metadata['shards']):
+            rows = np.flatnonzero(arrays['shard_index'] == index)
+            inputs = ScheduleInputs(
+                instance.metadata['week_number'],
+                [workers[row] for row in rows],
+                *(arrays[field][rows] for field in ScheduleInputs._fields[2:])
+            )
+            result = solve_schedule_shard(
+                inputs,
+                shard['multiplier'],
+                engine,
+                parameters['backend'],
+                parameters['num_search_workers'],
+                parameters['time_limit'],
+                parameters['relative_gap_limit'],
+                instance.metadata['use_hints'],
+                instance.metadata['aggregate_workers'],
+                min_workers=arrays['min_workers'][index]
+            )
+            statuses.append(result.status)
+            objectives.append(result.objective)
+            build_times.append(result.build_time)
+            solve_times.append(result.wall_time)
+
+        return (self.get_worst_status(statuses), self.sum_objectives(statuses, objectives),
+                max(build_times), max(solve_times))
+
+    def replay_reoptimize(
+        self,
+        instance: SolverInstance,
+        parameters: Dict
+    ) -> Tuple[int, Optional[float], float, Optional[int]]:
+        """
+        Solves a `reoptimize_schedule_after_sickness` instance. Returns the status, the objective,
+        the build time and the solve time, None if presolve proved the instance infeasible.
+        """
+        metadata = instance.metadata
+        arrays = instance.arrays
+        inputs = ReoptimizationInputs(
+            metadata['week_number'],
+            metadata['next_week_number'],
+            arrays['workers'].tolist(),
+            *(arrays[field] for field in ReoptimizationInputs._fields[3:])
+        )
+        neighborhood_size = self.options['neighborhood_size']
+        result = solve_reoptimization(
+            inputs,
+            metadata['multiplier'],
+            metadata['day_index'],
+            **parameters,
+            neighborhood_size=neighborhood_size if neighborhood_size is not None
+            else metadata['neighborhood_size'],
+            min_workers=arrays['min_workers']
+        )
+
+        objective = solve_time = None
+        if result.status in FEASIBLE_STATUSES:
+            objective = result.solver_backend.objective_value()
+        if not result.presolved.infeasible:
+            solve_time = result.solver_backend.wall_time()
+        return result.status, objective, result.build_time, solve_time
+
+    def get_recorded_optimize(self, metadata: Dict) -> Tuple[int, Optional[float], int]:
+        """
+        Returns the recorded status, objective and solve time of an `optimize_schedule` instance,
+        aggregated over its shards.
+        """
+        shards = metadata['shards']
+        statuses = [shard['status'] for shard in shards]
+        return (self.get_worst_status(statuses),
+                self.sum_objectives(statuses, [shard['objective'] for shard in shards]),
+                max(shard['solve_time'] for shard in shards))
+
+    @staticmethod
+    def get_worst_status(statuses: List[int]) -> int:
+        """
+        Returns the first failed status, else FEASIBLE if a shard is not optimal, else OPTIMAL.
+        """
+        failed = [status for status in statuses if status not in FEASIBLE_STATUSES]
+        return failed[0] if failed else max(statuses)
+
+    @staticmethod
+    def sum_objectives(statuses: List[int], objectives: List[Optional[float]]) -> Optional[float]:
+        """
+        Returns the summed objective of the shards, None if a shard has no schedule.
+        """
+        if any(status not in FEASIBLE_STATUSES for status in statuses):
+            return None
+        return sum(objectives)
+
+    @staticmethod
+    def format(value: Optional[float]) -> str:
+        """
+        Formats an optional report value.
+        """
+        return '-' if value is None else f'{value:g}'
+
+    def quiet(self) -> contextlib.AbstractContextManager:
+        """
+        Hides the statistics printed by the solver functions unless `--verbose` is given.
+        """
+        if self.options['verbose']:
+            return contextlib.nullcontext()
+        return contextlib.redirect_stdout(io.StringIO())
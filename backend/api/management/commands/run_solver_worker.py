@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from ...utils.solver_job_fn import claim_next_solver_job, run_solver_job
+
+
+class Command(BaseCommand):
+    """
+    Runs the queued schedule optimizations (`SolverJob`) outside of the web workers. Several
+    workers can poll the same queue, each job is claimed by exactly one of them.
+
+    Usage:
+        python manage.py run_solver_worker
+        python manage.py run_solver_worker --once
+    """
+    help = "Runs queued schedule optimization jobs."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--once', action='store_true',
+                            help="Exit when the queue is empty instead of polling.")
+        parser.add_argument('--poll-interval', type=float,
+                            default=settings.SOLVER_WORKER_POLL_INTERVAL)
+
+    def handle(self, *args, **options) -> None:
+        while True:
+            job = claim_next_solver_job()
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(f"Running {job}")
+            run_solver_job(job)
+            self.stdout.write(f"{job}: {job.message}")
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_roster_day_off_call_in_roster_day_off_call_in_days'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roster',
+            name='suboptimal',
+            field=models.BooleanField(default=False),
+        ),
+    ]
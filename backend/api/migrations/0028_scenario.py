@@ -0,0 +1,34 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_solverjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Scenario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sweep', models.UUIDField(db_index=True)),
+                ('name', models.CharField(max_length=1024)),
+                ('parameters', models.JSONField(default=dict)),
+                ('week_number', models.IntegerField()),
+                ('status', models.IntegerField()),
+                ('objective', models.FloatField(blank=True, null=True)),
+                ('gap', models.FloatField(blank=True, null=True)),
+                ('wall_time', models.IntegerField(default=0)),
+                ('rosters', models.JSONField(blank=True, null=True)),
+                ('committed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('owner', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='scenarios', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.4 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_scenario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolverRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=16)),
+                ('week_number', models.IntegerField()),
+                ('engine', models.CharField(max_length=32)),
+                ('backend', models.CharField(max_length=16)),
+                ('status', models.IntegerField()),
+                ('objective', models.FloatField(blank=True, null=True)),
+                ('best_bound', models.FloatField(blank=True, null=True)),
+                ('gap', models.FloatField(blank=True, null=True)),
+                ('build_time', models.IntegerField(default=0)),
+                ('solve_time', models.IntegerField(default=0)),
+                ('write_back_time', models.IntegerField(default=0)),
+                ('num_variables', models.IntegerField(default=0)),
+                ('num_constraints', models.IntegerField(default=0)),
+                ('num_workers', models.IntegerField(default=0)),
+                ('multiplier', models.FloatField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.4 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+# The coverage hard-coded in the solver before the profiles, saved as the first default version
+INITIAL_COVERAGE = [
+    [2, 4, 2], [2, 4, 2], [2, 4, 2], [2, 4, 2], [2, 4, 2], [1, 2, 1], [1, 2, 1]
+]
+
+
+def create_default_profile(apps, schema_editor):
+    CoverageProfile = apps.get_model('api', 'CoverageProfile')
+    CoverageProfile.objects.create(name='default', version=1, weekday_demand=INITIAL_COVERAGE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_solverrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoverageProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(default='default', max_length=150)),
+                ('version', models.PositiveIntegerField(blank=True)),
+                ('valid_from', models.DateField(blank=True, null=True)),
+                ('weekday_demand', models.JSONField()),
+                ('date_demand', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('name', 'version')},
+            },
+        ),
+        migrations.RunPython(create_default_profile, migrations.RunPython.noop),
+    ]
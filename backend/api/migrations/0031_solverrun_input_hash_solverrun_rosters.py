@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_coverageprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solverrun',
+            name='input_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='solverrun',
+            name='rosters',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_solverrun_input_hash_solverrun_rosters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solverjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='solverjob',
+            name='attempts',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_solverjob_heartbeat_at_solverjob_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solverjob',
+            name='kind',
+            field=models.CharField(default='optimize', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='scenario',
+            name='input_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='scenario',
+            name='superseded',
+            field=models.BooleanField(default=False),
+        ),
+    ]
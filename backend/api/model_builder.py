@@ -0,0 +1,907 @@
+import copy
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+
+from .utils.common_fn import get_max_consecutive_runs
+from .utils.constants import DAYS_IN_WEEK, NUMBER_OF_SHIFTS
+from .utils.solver_constants import (
+    DAYS_IN_TWO_WEEKS,
+    MAX_NIGHT_SHIFTS,
+    SHIFTS_IN_TWO_WEEKS,
+    SHIFTS_PER_DAY,
+)
+
+
+# The constraint families of `build_schedule_model_template` with their number of rows per
+# (worker, optimized week), in worker and week order
+WEEKLY_ROW_FAMILIES = {
+    'work_days': 1,
+    'off_days': 1,
+    'reserve_days': 1,
+    'day_kind': DAYS_IN_WEEK,
+    'shift_on_work_day': DAYS_IN_WEEK,
+    'one_shift_per_day': DAYS_IN_WEEK,
+    'night_shifts': 1,
+    'reserve_after_off': DAYS_IN_WEEK - 1,
+    'no_off_before_reserve': DAYS_IN_WEEK - 1,
+}
+
+
+class RowGroup(NamedTuple):
+    """
+    A block of linear constraints sharing the same number of terms.
+
+    Every row `r` of the group reads `lower[r] <= sum(coefficients[r] * x[indices[r]]) <= upper[r]`.
+
+    Attributes:
+        name (str): The name of the constraint family, used for debug names.
+        indices (np.ndarray): A (rows, terms) matrix of variable indices.
+        coefficients (np.ndarray): A (rows, terms) matrix of coefficients.
+        lower (np.ndarray): The lower bound of each row.
+        upper (np.ndarray): The upper bound of each row.
+    """
+    name: str
+    indices: np.ndarray
+    coefficients: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+
+
+class ScheduleModel:
+    """
+    Solver independent, index-addressed representation of a scheduling model.
+
+    Variables are allocated in blocks (e.g. worker x shift, worker x day) and addressed by their
+    position in the block, so constraints can be created for every worker at once with NumPy
+    indexing instead of one Python expression per row.
+
+    Attributes:
+        workers (List[str]): The usernames of the workers, in block row order.
+        blocks (Dict[str, np.ndarray]): Variable index matrices keyed by block name.
+        lower_bounds (np.ndarray): The lower bound of every variable.
+        upper_bounds (np.ndarray): The upper bound of every variable.
+        objective (np.ndarray): The objective coefficient of every variable.
+        objective_offset (float): The constant term of the objective.
+        row_groups (List[RowGroup]): The constraints of the model.
+        maximize (bool): Whether the objective is maximized.
+
+    Methods:
+        add_block(name, rows, columns) -> np.ndarray:
+            Allocates a block of boolean variables and returns its index matrix.
+        fix(indices, values) -> None:
+            Fixes the given variables to the given values.
+        set_objective(indices, coefficients) -> None:
+            Sets the objective coefficients of the given variables.
+        add_rows(name, indices, coefficients, lower, upper) -> None:
+            Adds a block of linear constraints.
+        set_row_bounds(name, lower, upper) -> None:
+            Replaces the bounds of a block of linear constraints.
+        relax_rows(name, rows) -> None:
+            Removes the bounds of the selected rows of a block of linear constraints.
+        reset() -> None:
+            Frees every variable and clears the objective.
+        variable_names() -> List[str]:
+            Builds readable names for every variable.
+    """
+
+    def __init__(self, workers: List[str], maximize: bool = True) -> None:
+        self.workers = workers
+        self.blocks: Dict[str, np.ndarray] = {}
+        self.lower_bounds = np.zeros(0)
+        self.upper_bounds = np.zeros(0)
+        self.objective = np.zeros(0)
+        self.objective_offset = 0.0
+        self.row_groups: List[RowGroup] = []
+        self.maximize = maximize
+
+    @property
+    def num_variables(self) -> int:
+        """
+        Returns the number of variables in the model.
+        """
+        return self.lower_bounds.size
+
+    @property
+    def num_constraints(self) -> int:
+        """
+        Returns the number of constraints in the model.
+        """
+        return sum(group.indices.shape[0] for group in self.row_groups)
+
+    def add_block(self, name: str, rows: int, columns: int) -> np.ndarray:
+        """
+        Allocates a (rows, columns) block of boolean variables.
+
+        Args:
+            name (str): The name of the block.
+            rows (int): The number of rows, usually the number of workers.
+            columns (int): The number of columns, e.g. shifts or days.
+
+        Returns:
+            np.ndarray: The matrix of the variable indices of the block.
+        """
+        size = rows * columns
+        start = self.num_variables
+        indices = np.arange(start, start + size, dtype=np.int64).reshape(rows, columns)
+
+        self.lower_bounds = np.concatenate([self.lower_bounds, np.zeros(size)])
+        self.upper_bounds = np.concatenate([self.upper_bounds, np.ones(size)])
+        self.objective = np.concatenate([self.objective, np.zeros(size)])
+        self.blocks[name] = indices
+
+        return indices
+
+    def fix(self, indices: np.ndarray, values: Union[np.ndarray, float]) -> None:
+        """
+        Fixes variables to the given values by setting both of their bounds.
+
+        Args:
+            indices (np.ndarray): The indices of the variables to fix.
+            values (Union[np.ndarray, float]): The values to fix the variables to.
+        """
+        self.lower_bounds[indices] = values
+        self.upper_bounds[indices] = values
+
+    def set_objective(self, indices: np.ndarray, coefficients: Union[np.ndarray, float]) -> None:
+        """
+        Sets the objective coefficients of the given variables.
+
+        Args:
+            indices (np.ndarray): The indices of the variables.
+            coefficients (Union[np.ndarray, float]): The objective coefficients.
+        """
+        self.objective[indices] = coefficients
+
+    def add_rows(
+        self,
+        name: str,
+        indices: np.ndarray,
+        coefficients: Union[np.ndarray, Sequence[float], float],
+        lower: Union[np.ndarray, float],
+        upper: Union[np.ndarray, float]
+    ) -> None:
+        """
+        Adds a block of linear constraints, one per row of `indices`.
+
+        Args:
+            name (str): The name of the constraint family.
+            indices (np.ndarray): A (rows, terms) matrix of variable indices.
+            coefficients (Union[np.ndarray, Sequence[float], float]): The coefficients, broadcast
+                                                                      to the shape of `indices`.
+            lower (Union[np.ndarray, float]): The lower bounds, broadcast to the number of rows.
+            upper (Union[np.ndarray, float]): The upper bounds, broadcast to the number of rows.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.ndim == 1:
+            indices = indices.reshape(1, -1)
+        if indices.shape[0] == 0:
+            return
+
+        number_of_rows = indices.shape[0]
+        coefficients = np.broadcast_to(np.asarray(coefficients, dtype=float), indices.shape)
+        lower = np.broadcast_to(np.asarray(lower, dtype=float), (number_of_rows,))
+        upper = np.broadcast_to(np.asarray(upper, dtype=float), (number_of_rows,))
+
+        self.row_groups.append(RowGroup(name, indices, coefficients, lower, upper))
+
+    def set_row_bounds(
+        self,
+        name: str,
+        lower: Union[np.ndarray, float],
+        upper: Union[np.ndarray, float]
+    ) -> None:
+        """
+        Replaces the bounds of the constraint family with the given name.
+
+        Args:
+            name (str): The name of the constraint family.
+            lower (Union[np.ndarray, float]): The lower bounds, broadcast to the number of rows.
+            upper (Union[np.ndarray, float]): The upper bounds, broadcast to the number of rows.
+        """
+        for position, group in enumerate(self.row_groups):
+            if group.name == name:
+                number_of_rows = group.indices.shape[0]
+                self.row_groups[position] = group._replace(
+                    lower=np.broadcast_to(np.asarray(lower, dtype=float), (number_of_rows,)),
+                    upper=np.broadcast_to(np.asarray(upper, dtype=float), (number_of_rows,))
+                )
+
+    def relax_rows(self, name: str, rows: np.ndarray) -> None:
+        """
+        Removes the bounds of the selected rows of the constraint family with the given name, the
+        rows are kept so the structure of the model doesn't change.
+
+        Args:
+            name (str): The name of the constraint family.
+            rows (np.ndarray): A boolean mask of the relaxed rows of each group of the family.
+        """
+        for position, group in enumerate(self.row_groups):
+            if group.name == name:
+                self.row_groups[position] = group._replace(
+                    lower=np.where(rows, -np.inf, group.lower),
+                    upper=np.where(rows, np.inf, group.upper)
+                )
+
+    def reset(self) -> None:
+        """
+        Turns every variable back into a free boolean and clears the objective, so the model can
+        be filled with the data of another run.
+        """
+        self.lower_bounds[:] = 0
+        self.upper_bounds[:] = 1
+        self.objective[:] = 0
+        self.objective_offset = 0.0
+
+    def variable_names(self) -> List[str]:
+        """
+        Builds readable names for every variable, e.g. 'var_schedule[john,22]'.
+
+        Only needed for debugging, as building the strings is expensive for large crews.
+
+        Returns:
+            List[str]: The names of the variables, ordered by variable index.
+        """
+        names = [''] * self.num_variables
+        for name, indices in self.blocks.items():
+            for (worker, column), index in np.ndenumerate(indices):
+                # Presolved models mark the removed variables with -1
+                if index >= 0:
+                    names[index] = f'{name}[{self.workers[worker]},{column + 1}]'
+        return names
+
+
+def get_day_shift_indices(schedule: np.ndarray, days: range) -> np.ndarray:
+    """
+    Selects the shift variables of the given days from a worker x shift block.
+
+    Args:
+        schedule (np.ndarray): A (workers, shifts) index matrix.
+        days (range): The 0-based day indices.
+
+    Returns:
+        np.ndarray: A (workers, len(days), 3) index matrix of morning, afternoon and night shifts.
+    """
+    day_array = np.asarray(days)
+    shifts = day_array[:, None] * SHIFTS_PER_DAY + np.arange(SHIFTS_PER_DAY)
+    return schedule[:, shifts]
+
+
+def get_max_consecutive_free_days(vacation: np.ndarray, sickness: np.ndarray) -> np.ndarray:
+    """
+    Calculates, for each worker, the longest run of days without vacation or without sickness.
+
+    Args:
+        vacation (np.ndarray): A (workers, days) matrix of vacation days.
+        sickness (np.ndarray): A (workers, days) matrix of sick days.
+
+    Returns:
+        np.ndarray: The larger of the two run lengths for each worker.
+    """
+    return np.maximum(get_max_consecutive_runs(vacation, 0), get_max_consecutive_runs(sickness, 0))
+
+
+def get_weekly_quotas(
+    vacation: np.ndarray,
+    sickness: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculates the number of work, off and reserve days of each worker for a week, and whether the
+    reserve-after-off rules apply to them.
+
+    Args:
+        vacation (np.ndarray): A (workers, 7) matrix of vacation days.
+        sickness (np.ndarray): A (workers, 7) matrix of sick days.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+            - The number of work days of each worker.
+            - The number of off days of each worker.
+            - The number of reserve days of each worker.
+            - A boolean mask of the workers the reserve-after-off rules apply to.
+    """
+    # Signed sums, unsigned roster matrices would wrap around in `2 - vac_sick_sum`
+    vac_sick_sum = vacation.sum(axis=1, dtype=int) + sickness.sum(axis=1, dtype=int)
+    number_of_work_days = np.minimum(4, DAYS_IN_WEEK - vac_sick_sum)
+    number_of_off_days = np.maximum(2 - vac_sick_sum, 0)
+    number_of_reserve_days = (vac_sick_sum < 3).astype(int)
+
+    max_cnsc_num_vac_sick_days = get_max_consecutive_free_days(vacation, sickness)
+    reserve_rule = (number_of_off_days > 0) & (max_cnsc_num_vac_sick_days > 1)
+
+    return number_of_work_days, number_of_off_days, number_of_reserve_days, reserve_rule
+
+
+def add_reserve_after_off_rows(
+    model: ScheduleModel,
+    var_off_days: np.ndarray,
+    var_reserve_days: np.ndarray,
+    workers_mask: np.ndarray,
+    days: range
+) -> None:
+    """
+    Adds the reserve-after-off rules of a week for the selected workers.
+
+    Args:
+        model (ScheduleModel): The model to add the rows to.
+        var_off_days (np.ndarray): The (workers, days) index matrix of the off days.
+        var_reserve_days (np.ndarray): The (workers, days) index matrix of the reserve days.
+        workers_mask (np.ndarray): A boolean mask of the workers the rules apply to.
+        days (range): The 0-based day indices of the week.
+    """
+    rule_off = var_off_days[workers_mask]
+    rule_reserve = var_reserve_days[workers_mask]
+    current_days = slice(days.start, days.stop - 1)
+    following_days = slice(days.start + 1, days.stop)
+
+    # Ensure a reserve day follows a day off
+    model.add_rows(
+        'reserve_after_off',
+        np.stack([rule_off[:, following_days], rule_reserve[:, current_days]],
+                 axis=-1).reshape(-1, 2),
+        [1, -1], 0, np.inf
+    )
+
+    # Ensure a reserve day cannot be preceded by an off day
+    model.add_rows(
+        'no_off_before_reserve',
+        np.stack([rule_off[:, current_days], rule_reserve[:, following_days]],
+                 axis=-1).reshape(-1, 2),
+        1, -np.inf, 1
+    )
+
+
+def build_schedule_model_template(
+    workers: List[str],
+    multiplier: float,
+    number_of_weeks: int = 1
+) -> ScheduleModel:
+    """
+    Builds the data independent structure of the `optimize_schedule` model.
+
+    The rows only depend on the workers, the multiplier and the number of weeks, the weekly data
+    (fixed first week, vacation, sickness, applications) is filled in by `update_schedule_model`.
+    This allows the model to be kept and reused between runs, see `api.model_cache`.
+
+    The first week is the fixed week, the following `number_of_weeks` weeks are optimized. Every
+    optimized week gets the rows of the application week, the rest after night shifts also spans
+    the boundaries between optimized weeks.
+
+    Args:
+        workers (List[str]): The usernames of the workers.
+        multiplier (float): A scaling factor of the number of reserve workers per day.
+        number_of_weeks (int, optional): The number of optimized weeks. Defaults to 1.
+
+    Returns:
+        ScheduleModel: The model template, every variable is free and the objective is empty.
+    """
+    number_of_workers = len(workers)
+    model = ScheduleModel(workers)
+    number_of_days = DAYS_IN_WEEK * (number_of_weeks + 1)
+    number_of_shifts = NUMBER_OF_SHIFTS * (number_of_weeks + 1)
+    # The optimized weeks of each worker, one (worker, week) per row
+    worker_weeks = number_of_workers * number_of_weeks
+
+    var_schedule = model.add_block('var_schedule', number_of_workers, number_of_shifts)
+    var_work_days = model.add_block('var_work_days', number_of_workers, number_of_days)
+    var_off_days = model.add_block('var_off_days', number_of_workers, number_of_days)
+    var_reserve_days = model.add_block('var_reserve_days', number_of_workers, number_of_days)
+    var_vacation = model.add_block('var_vacation', number_of_workers, number_of_days)
+    var_sickness = model.add_block('var_sickness', number_of_workers, number_of_days)
+
+    optimized_days = slice(DAYS_IN_WEEK, number_of_days)
+    optimized_shifts = slice(NUMBER_OF_SHIFTS, number_of_shifts)
+    weekly_work_days = var_work_days[:, optimized_days].reshape(worker_weeks, DAYS_IN_WEEK)
+    weekly_off_days = var_off_days[:, optimized_days].reshape(worker_weeks, DAYS_IN_WEEK)
+    weekly_reserve_days = var_reserve_days[:, optimized_days].reshape(worker_weeks, DAYS_IN_WEEK)
+
+    # Define work, off and reserve days, the quotas are set by `update_schedule_model`
+    model.add_rows('work_days', weekly_work_days, 1, 0, 0)
+    model.add_rows('off_days', weekly_off_days, 1, 0, 0)
+    model.add_rows('reserve_days', weekly_reserve_days, 1, 0, 0)
+
+    # Each day will be a working, off, reserve or a vacation day
+    day_kinds = np.stack([
+        block[:, optimized_days]
+        for block in (var_work_days, var_off_days, var_reserve_days, var_vacation, var_sickness)
+    ], axis=-1)
+    model.add_rows('day_kind', day_kinds.reshape(-1, 5), 1, 1, 1)
+
+    # Each worker can only have shifts on workdays in the optimized weeks
+    optimized_day_shifts = get_day_shift_indices(
+        var_schedule, range(DAYS_IN_WEEK, number_of_days))
+    shifts_and_work_day = np.concatenate(
+        [optimized_day_shifts, var_work_days[:, optimized_days, None]], axis=-1)
+    model.add_rows('shift_on_work_day', shifts_and_work_day.reshape(-1, SHIFTS_PER_DAY + 1),
+                   [1, 1, 1, -1], 0, 0)
+
+    # Each worker can work at most one shift per day in the optimized weeks
+    model.add_rows('one_shift_per_day', optimized_day_shifts.reshape(-1, SHIFTS_PER_DAY),
+                   1, -np.inf, 1)
+
+    # Each worker can work at most 2 night shifts per optimized week
+    model.add_rows('night_shifts', optimized_day_shifts[:, :, 2].reshape(worker_weeks, -1), 1,
+                   -np.inf, MAX_NIGHT_SHIFTS)
+
+    # The reserve-after-off rules are added for everyone and relaxed by `update_schedule_model`
+    # for the workers they don't apply to, each (worker, week) is ruled like a worker
+    add_reserve_after_off_rows(model, weekly_off_days, weekly_reserve_days,
+                               np.ones(worker_weeks, dtype=bool), range(DAYS_IN_WEEK))
+
+    # After night shifts, workers can't have morning or afternoon shift the next day
+    rest = np.stack([
+        var_schedule[:, 23:number_of_shifts - 1:SHIFTS_PER_DAY],
+        var_schedule[:, 24:number_of_shifts:SHIFTS_PER_DAY],
+        var_schedule[:, 25:number_of_shifts + 1:SHIFTS_PER_DAY],
+    ], axis=-1)
+    model.add_rows('night_rest', rest.reshape(-1, SHIFTS_PER_DAY), 1, -np.inf, 1)
+
+    # Minimum required workers for each shift in the optimized weeks
+    model.add_rows('coverage', var_schedule[:, optimized_shifts].T, 1, 0, np.inf)
+
+    # Each day must have at least 2 reserve workers in the optimized weeks
+    model.add_rows('reserve_coverage', var_reserve_days[:, optimized_days].T, 1,
+                   2 * multiplier, np.inf)
+
+    return model
+
+
+def update_schedule_model(
+    model: ScheduleModel,
+    next_week_schedules: np.ndarray,
+    next_week_work_days: np.ndarray,
+    next_week_off_days: np.ndarray,
+    next_week_reserve_days: np.ndarray,
+    applications: np.ndarray,
+    vacation: np.ndarray,
+    sickness: np.ndarray,
+    min_workers: np.ndarray
+) -> None:
+    """
+    Fills a model built by `build_schedule_model_template` with the data of a week. Only the
+    variable bounds, the objective and the bounds of the data dependent rows are changed.
+
+    With several optimized weeks, the matrices of the application week hold the weeks side by
+    side, e.g. (workers, 7 * weeks) vacation days.
+
+    Args:
+        model (ScheduleModel): The model template.
+        next_week_schedules (np.ndarray): A (workers, 21) matrix of the next week's schedule.
+        next_week_work_days (np.ndarray): A (workers, 7) matrix of the next week's work days.
+        next_week_off_days (np.ndarray): A (workers, 7) matrix of the next week's off days.
+        next_week_reserve_days (np.ndarray): A (workers, 7) matrix of the next week's reserve days.
+        applications (np.ndarray): A (workers, 21) matrix of the application week's applications.
+        vacation (np.ndarray): A (workers, 7) matrix of the application week's vacation.
+        sickness (np.ndarray): A (workers, 7) matrix of the application week's sickness.
+        min_workers (np.ndarray): The minimum number of workers for each shift of the application
+                                  week (21 values).
+    """
+    var_schedule = model.blocks['var_schedule']
+    var_work_days = model.blocks['var_work_days']
+    var_off_days = model.blocks['var_off_days']
+    var_reserve_days = model.blocks['var_reserve_days']
+    var_vacation = model.blocks['var_vacation']
+    var_sickness = model.blocks['var_sickness']
+
+    first_week_days = slice(0, DAYS_IN_WEEK)
+    second_week_days = slice(DAYS_IN_WEEK, None)
+    first_week_shifts = slice(0, NUMBER_OF_SHIFTS)
+    second_week_shifts = slice(NUMBER_OF_SHIFTS, None)
+
+    model.reset()
+
+    # Fix variables for the first week
+    model.fix(var_schedule[:, first_week_shifts], next_week_schedules)
+    model.fix(var_work_days[:, first_week_days], next_week_work_days)
+    model.fix(var_off_days[:, first_week_days], next_week_off_days)
+    model.fix(var_reserve_days[:, first_week_days], next_week_reserve_days)
+    model.fix(var_vacation[:, first_week_days], 0)
+    model.fix(var_sickness[:, first_week_days], 0)
+
+    # Fix variables for the second week
+    absent = (vacation == 1) | (sickness == 1)
+    for block in (var_work_days, var_off_days, var_reserve_days):
+        model.fix(block[:, second_week_days][absent], 0)
+    model.fix(var_vacation[:, second_week_days], vacation)
+    model.fix(var_sickness[:, second_week_days], sickness & (1 - vacation))
+
+    # Objective function: maximize the applications for the second week
+    model.set_objective(var_schedule[:, second_week_shifts], applications)
+
+    # One row per (worker, week)
+    number_of_work_days, number_of_off_days, number_of_reserve_days, reserve_rule = \
+        get_weekly_quotas(vacation.reshape(-1, DAYS_IN_WEEK), sickness.reshape(-1, DAYS_IN_WEEK))
+    model.set_row_bounds('work_days', number_of_work_days, number_of_work_days)
+    model.set_row_bounds('off_days', number_of_off_days, number_of_off_days)
+    model.set_row_bounds('reserve_days', number_of_reserve_days, number_of_reserve_days)
+
+    # Relax the reserve-after-off rules of the workers they don't apply to
+    reserve_rule = np.repeat(reserve_rule, DAYS_IN_WEEK - 1)
+    model.set_row_bounds('reserve_after_off', np.where(reserve_rule, 0, -np.inf), np.inf)
+    model.set_row_bounds('no_off_before_reserve', -np.inf, np.where(reserve_rule, 1, np.inf))
+
+    model.set_row_bounds('coverage', min_workers, np.inf)
+
+
+def get_optimized_week_variables(model: ScheduleModel) -> np.ndarray:
+    """
+    Returns the schedule, work, off and reserve day variables of the optimized weeks of a model
+    built by `build_schedule_model_template`. Absences and frozen weeks fix some of them depending
+    on the data of the run, so `presolve_model` keeps them in the loaded model.
+
+    Args:
+        model (ScheduleModel): The model template.
+
+    Returns:
+        np.ndarray: The indices of the variables.
+    """
+    return np.concatenate([
+        model.blocks['var_schedule'][:, NUMBER_OF_SHIFTS:].ravel(),
+        *(model.blocks[name][:, DAYS_IN_WEEK:].ravel()
+          for name in ('var_work_days', 'var_off_days', 'var_reserve_days'))
+    ])
+
+
+def freeze_schedule_weeks(
+    model: ScheduleModel,
+    frozen: np.ndarray,
+    schedules: np.ndarray,
+    work_days: np.ndarray,
+    off_days: np.ndarray,
+    reserve_days: np.ndarray
+) -> ScheduleModel:
+    """
+    Fixes optimized weeks of a `build_schedule_model_template` model to their published schedule,
+    e.g. the weeks of a rolling horizon that are already published.
+
+    The rules within a frozen week are relaxed, so a published week whose vacations changed since
+    doesn't make the model infeasible. The coverage and the rest after night shifts into a free
+    week still take the frozen weeks into account.
+
+    Args:
+        model (ScheduleModel): The model filled by `update_schedule_model`, it is not changed.
+        frozen (np.ndarray): A (workers, weeks) boolean matrix of the frozen weeks.
+        schedules (np.ndarray): A (workers, 21 * weeks) matrix of the published schedules.
+        work_days (np.ndarray): A (workers, 7 * weeks) matrix of the published work days.
+        off_days (np.ndarray): A (workers, 7 * weeks) matrix of the published off days.
+        reserve_days (np.ndarray): A (workers, 7 * weeks) matrix of the published reserve days.
+
+    Returns:
+        ScheduleModel: A copy of the model with the frozen weeks fixed, sharing its blocks.
+    """
+    frozen_model = copy.copy(model)
+    frozen_model.lower_bounds = model.lower_bounds.copy()
+    frozen_model.upper_bounds = model.upper_bounds.copy()
+    frozen_model.row_groups = list(model.row_groups)
+
+    frozen = np.asarray(frozen, dtype=bool)
+    frozen_days = np.repeat(frozen, DAYS_IN_WEEK, axis=1)
+    frozen_shifts = np.repeat(frozen, NUMBER_OF_SHIFTS, axis=1)
+    for name, columns, values, mask in (
+        ('var_schedule', slice(NUMBER_OF_SHIFTS, None), schedules, frozen_shifts),
+        ('var_work_days', slice(DAYS_IN_WEEK, None), work_days, frozen_days),
+        ('var_off_days', slice(DAYS_IN_WEEK, None), off_days, frozen_days),
+        ('var_reserve_days', slice(DAYS_IN_WEEK, None), reserve_days, frozen_days),
+    ):
+        frozen_model.fix(model.blocks[name][:, columns][mask], np.asarray(values)[mask])
+
+    for name, rows_per_week in WEEKLY_ROW_FAMILIES.items():
+        frozen_model.relax_rows(name, np.repeat(frozen.ravel(), rows_per_week))
+    # The rest rows start on every optimized day but the last one
+    frozen_model.relax_rows('night_rest', (frozen_days[:, :-1] & frozen_days[:, 1:]).ravel())
+
+    return frozen_model
+
+
+def build_schedule_model(
+    workers: List[str],
+    next_week_schedules: np.ndarray,
+    next_week_work_days: np.ndarray,
+    next_week_off_days: np.ndarray,
+    next_week_reserve_days: np.ndarray,
+    applications: np.ndarray,
+    vacation: np.ndarray,
+    sickness: np.ndarray,
+    min_workers: np.ndarray,
+    multiplier: float
+) -> ScheduleModel:
+    """
+    Builds the model of `optimize_schedule` for the application week.
+
+    The first week (days 1-7, shifts 1-21) is fixed to the already published schedule, the second
+    week (days 8-14, shifts 22-42) is optimized to maximize the granted applications.
+
+    Args:
+        workers (List[str]): The usernames of the workers.
+        next_week_schedules (np.ndarray): A (workers, 21) matrix of the next week's schedule.
+        next_week_work_days (np.ndarray): A (workers, 7) matrix of the next week's work days.
+        next_week_off_days (np.ndarray): A (workers, 7) matrix of the next week's off days.
+        next_week_reserve_days (np.ndarray): A (workers, 7) matrix of the next week's reserve days.
+        applications (np.ndarray): A (workers, 21) matrix of the application week's applications.
+        vacation (np.ndarray): A (workers, 7) matrix of the application week's vacation.
+        sickness (np.ndarray): A (workers, 7) matrix of the application week's sickness.
+        min_workers (np.ndarray): The minimum number of workers for each shift of the application
+                                  week (21 values).
+        multiplier (float): A scaling factor of the number of reserve workers per day.
+
+    Returns:
+        ScheduleModel: The built model.
+    """
+    model = build_schedule_model_template(workers, multiplier)
+    update_schedule_model(
+        model,
+        next_week_schedules,
+        next_week_work_days,
+        next_week_off_days,
+        next_week_reserve_days,
+        applications,
+        vacation,
+        sickness,
+        min_workers
+    )
+    return model
+
+
+def build_reoptimization_model(
+    workers: List[str],
+    schedules: np.ndarray,
+    work_days: np.ndarray,
+    off_days: np.ndarray,
+    reserve_days: np.ndarray,
+    vacation: np.ndarray,
+    sickness: np.ndarray,
+    reserve_call_in: np.ndarray,
+    day_off_call_in: np.ndarray,
+    min_workers: np.ndarray,
+    multiplier: float,
+    day_index: int
+) -> ScheduleModel:
+    """
+    Builds the model of `reoptimize_schedule_after_sickness` for the current and the next week.
+
+    Days before `day_index` are fixed to the published schedule, the rest of the two weeks is
+    reoptimized to stay as close to the published schedule as possible.
+
+    Args:
+        workers (List[str]): The usernames of the workers.
+        schedules (np.ndarray): A (workers, 42) matrix of the published schedules.
+        work_days (np.ndarray): A (workers, 14) matrix of the work days, including call-ins.
+        off_days (np.ndarray): A (workers, 14) matrix of the off days.
+        reserve_days (np.ndarray): A (workers, 14) matrix of the reserve days.
+        vacation (np.ndarray): A (workers, 14) matrix of the vacation days.
+        sickness (np.ndarray): A (workers, 14) matrix of the sick days.
+        reserve_call_in (np.ndarray): A (workers, 2) boolean matrix, True if the worker was called
+                                      in from reserve in the given week.
+        day_off_call_in (np.ndarray): A (workers, 2) boolean matrix, True if the worker was called
+                                      in on a day off in the given week.
+        min_workers (np.ndarray): The minimum number of workers for each shift (42 values).
+        multiplier (float): A scaling factor of the number of reserve workers per day.
+        day_index (int): The 1-based day index from which the schedule is reoptimized.
+
+    Returns:
+        ScheduleModel: The built model.
+    """
+    number_of_workers = len(workers)
+    model = ScheduleModel(workers)
+
+    var_schedule = model.add_block('var_schedule', number_of_workers, SHIFTS_IN_TWO_WEEKS)
+    var_work_days = model.add_block('var_work_days', number_of_workers, DAYS_IN_TWO_WEEKS)
+    var_off_days = model.add_block('var_off_days', number_of_workers, DAYS_IN_TWO_WEEKS)
+    var_reserve_days = model.add_block('var_reserve_days', number_of_workers, DAYS_IN_TWO_WEEKS)
+    var_vacation = model.add_block('var_vacation', number_of_workers, DAYS_IN_TWO_WEEKS)
+    var_sickness = model.add_block('var_sickness', number_of_workers, DAYS_IN_TWO_WEEKS)
+
+    p_work_days = model.add_block('p_work_days', number_of_workers, DAYS_IN_TWO_WEEKS)
+    p_off_days = model.add_block('p_off_days', number_of_workers, DAYS_IN_TWO_WEEKS)
+    p_reserve = model.add_block('p_reserve', number_of_workers, DAYS_IN_TWO_WEEKS)
+    p_res_day = model.add_block('p_res_day', number_of_workers, DAYS_IN_TWO_WEEKS)
+
+    first_week_days = slice(0, DAYS_IN_WEEK)
+    second_week_days = slice(DAYS_IN_WEEK, DAYS_IN_TWO_WEEKS)
+    fixed_shifts = slice(0, (day_index - 1) * SHIFTS_PER_DAY)
+    fixed_days = slice(0, day_index - 1)
+    absent = (vacation == 1) | (sickness == 1)
+
+    # Fix variables until the day index
+    model.fix(var_schedule[:, fixed_shifts], schedules[:, fixed_shifts])
+    present_fixed_days = ~absent[:, fixed_days]
+    for block, values in (
+        (var_work_days, work_days),
+        (var_off_days, off_days),
+        (var_reserve_days, reserve_days)
+    ):
+        model.fix(block[:, fixed_days][present_fixed_days],
+                  values[:, fixed_days][present_fixed_days])
+
+    for block in (var_work_days, var_off_days, var_reserve_days):
+        model.fix(block[absent], 0)
+    model.fix(var_vacation, vacation)
+    model.fix(var_sickness[absent], sickness[absent] & (1 - vacation[absent]))
+    model.fix(var_sickness[~absent], 0)
+
+    e, f, g = 10, 50, 20
+
+    model.set_objective(var_schedule, schedules)
+    model.set_objective(var_work_days, work_days)
+    model.set_objective(var_off_days, off_days)
+    model.set_objective(var_reserve_days, reserve_days)
+    model.set_objective(p_work_days, -e)
+    model.set_objective(p_off_days, -f)
+    model.set_objective(p_reserve, -g)
+    model.set_objective(p_res_day, 1)
+
+    for block in (p_work_days, p_off_days, p_reserve, p_res_day):
+        model.add_rows('non_negative', block.reshape(-1, 1), 1, 0, np.inf)
+
+    fw_number_of_work_days = work_days[:, first_week_days].sum(axis=1)
+    sw_number_of_work_days = work_days[:, second_week_days].sum(axis=1)
+    fw_number_of_off_days = off_days[:, first_week_days].sum(axis=1)
+    sw_number_of_off_days = off_days[:, second_week_days].sum(axis=1)
+    fw_number_of_reserve_days = reserve_days[:, first_week_days].sum(axis=1)
+    sw_number_of_reserve_days = reserve_days[:, second_week_days].sum(axis=1)
+
+    def paired(block: np.ndarray, slack: np.ndarray, days: slice) -> np.ndarray:
+        return np.concatenate([block[:, days], slack[:, days]], axis=1)
+
+    # Cut on second week
+    if day_index > 7:
+        # Define work, off and reserve days
+        model.add_rows('work_days', paired(var_work_days, p_work_days, second_week_days),
+                       [1] * DAYS_IN_WEEK + [-1] * DAYS_IN_WEEK,
+                       sw_number_of_work_days, sw_number_of_work_days)
+        model.add_rows('off_days', paired(var_off_days, p_off_days, second_week_days), 1,
+                       sw_number_of_off_days, sw_number_of_off_days)
+        model.add_rows('reserve_days', paired(var_reserve_days, p_reserve, second_week_days), 1,
+                       sw_number_of_reserve_days, sw_number_of_reserve_days)
+
+        # Each day must have at least 2 reserve workers
+        model.add_rows('reserve_coverage', var_reserve_days[:, day_index - 1:].T, 1,
+                       2 * multiplier, np.inf)
+
+    # Cut on first week
+    else:
+        # Define work days
+        model.add_rows('work_days', paired(var_work_days, p_work_days, first_week_days),
+                       [1] * DAYS_IN_WEEK + [-1] * DAYS_IN_WEEK,
+                       fw_number_of_work_days, fw_number_of_work_days)
+        model.add_rows('work_days', var_work_days[:, second_week_days], 1,
+                       sw_number_of_work_days, sw_number_of_work_days)
+
+        # Define off days
+        model.add_rows('off_days', paired(var_off_days, p_off_days, first_week_days), 1,
+                       fw_number_of_off_days, fw_number_of_off_days)
+        model.add_rows('off_days', var_off_days[:, second_week_days], 1,
+                       sw_number_of_off_days, sw_number_of_off_days)
+
+        # Define reserve days
+        model.add_rows('reserve_days', paired(var_reserve_days, p_reserve, first_week_days), 1,
+                       fw_number_of_reserve_days, fw_number_of_reserve_days)
+        model.add_rows('reserve_days', var_reserve_days[:, second_week_days], 1,
+                       sw_number_of_reserve_days, sw_number_of_reserve_days)
+
+        # Each day must have at least 2 reserve workers
+        reserve_days_from_index = slice(day_index - 1, DAYS_IN_TWO_WEEKS)
+        model.add_rows('reserve_coverage',
+                       np.concatenate([var_reserve_days[:, reserve_days_from_index].T,
+                                       p_res_day[:, reserve_days_from_index].T], axis=1),
+                       1, 2 * multiplier, np.inf)
+
+    # Each day will be a working, off, reserve or a vacation day
+    day_kinds = np.stack(
+        [var_work_days, var_off_days, var_reserve_days, var_vacation, var_sickness], axis=-1)
+    model.add_rows('day_kind', day_kinds.reshape(-1, 5), 1, 1, 1)
+
+    # Each worker can only have shifts on workdays
+    day_shifts = get_day_shift_indices(var_schedule, range(DAYS_IN_TWO_WEEKS))
+    shifts_and_work_day = np.concatenate([day_shifts, var_work_days[:, :, None]], axis=-1)
+    model.add_rows('shift_on_work_day', shifts_and_work_day.reshape(-1, SHIFTS_PER_DAY + 1),
+                   [1, 1, 1, -1], 0, 0)
+
+    # Each worker can work at most one shift per day
+    model.add_rows('one_shift_per_day', day_shifts.reshape(-1, SHIFTS_PER_DAY), 1, -np.inf, 1)
+
+    max_cnsc_num_vac_sick_days = np.stack([
+        get_max_consecutive_free_days(vacation[:, first_week_days], sickness[:, first_week_days]),
+        get_max_consecutive_free_days(vacation[:, second_week_days], sickness[:, second_week_days])
+    ], axis=1)
+    number_of_off_days = np.stack([fw_number_of_off_days, sw_number_of_off_days], axis=1)
+    reserve_rule = (
+        (number_of_off_days > 0) &
+        (max_cnsc_num_vac_sick_days > 1) &
+        ~reserve_call_in &
+        ~day_off_call_in
+    )
+
+    for week, days in enumerate((range(0, DAYS_IN_WEEK), range(DAYS_IN_WEEK, DAYS_IN_TWO_WEEKS))):
+        add_reserve_after_off_rows(model, var_off_days, var_reserve_days, reserve_rule[:, week],
+                                   days)
+
+        # Each worker can work at most 2 night shifts
+        model.add_rows('night_shifts', day_shifts[reserve_rule[:, week]][:, days, 2], 1,
+                       -np.inf, MAX_NIGHT_SHIFTS)
+
+    # Minimum required workers for each shift
+    model.add_rows('coverage', var_schedule.T, 1, min_workers, np.inf)
+
+    return model
+
+
+def get_reoptimization_neighborhood(
+    work_days: np.ndarray,
+    off_days: np.ndarray,
+    reserve_days: np.ndarray,
+    vacation: np.ndarray,
+    sickness: np.ndarray,
+    day_index: int,
+    size: int
+) -> np.ndarray:
+    """
+    Selects the workers whose schedule may change when reoptimizing from `day_index`: the sick
+    workers of the reoptimized days and up to `size` candidates to cover for them. Reserves are
+    preferred, as calling them in is the usual fix, then workers with days off, then workers
+    with the most work days, who can move to another shift.
+
+    Args:
+        work_days (np.ndarray): A (workers, 14) matrix of the work days, including call-ins.
+        off_days (np.ndarray): A (workers, 14) matrix of the off days.
+        reserve_days (np.ndarray): A (workers, 14) matrix of the reserve days.
+        vacation (np.ndarray): A (workers, 14) matrix of the vacation days.
+        sickness (np.ndarray): A (workers, 14) matrix of the sick days.
+        day_index (int): The 1-based day index from which the schedule is reoptimized.
+        size (int): The maximum number of candidates besides the sick workers.
+
+    Returns:
+        np.ndarray: A boolean mask of the selected workers.
+    """
+    free_days = slice(day_index - 1, DAYS_IN_TWO_WEEKS)
+    sick = ((sickness[:, free_days] == 1) & (vacation[:, free_days] == 0)).any(axis=1)
+
+    score = (
+        4 * reserve_days[:, free_days].sum(axis=1, dtype=int) +
+        2 * off_days[:, free_days].sum(axis=1, dtype=int) +
+        work_days[:, free_days].sum(axis=1, dtype=int)
+    )
+    # Stable sort keeps the worker order among equal scores, so the selection is deterministic
+    candidates = [worker for worker in np.argsort(-score, kind='stable').tolist()
+                  if not sick[worker] and score[worker] > 0][:size]
+
+    neighborhood = sick.copy()
+    neighborhood[candidates] = True
+    return neighborhood
+
+
+def fix_reoptimization_workers(
+    model: ScheduleModel,
+    fixed_workers: np.ndarray,
+    schedules: np.ndarray,
+    work_days: np.ndarray,
+    off_days: np.ndarray,
+    reserve_days: np.ndarray
+) -> None:
+    """
+    Fixes the schedule of the given workers in a model built by `build_reoptimization_model` to
+    their published schedule, so only the remaining workers are reoptimized. The slack variables
+    are fixed to their best value for an unchanged schedule.
+
+    Args:
+        model (ScheduleModel): The reoptimization model.
+        fixed_workers (np.ndarray): A boolean mask of the workers to fix.
+        schedules (np.ndarray): A (workers, 42) matrix of the published schedules.
+        work_days (np.ndarray): A (workers, 14) matrix of the work days, including call-ins.
+        off_days (np.ndarray): A (workers, 14) matrix of the off days.
+        reserve_days (np.ndarray): A (workers, 14) matrix of the reserve days.
+    """
+    for name, values in (
+        ('var_schedule', schedules),
+        ('var_work_days', work_days),
+        ('var_off_days', off_days),
+        ('var_reserve_days', reserve_days),
+    ):
+        block = model.blocks[name][fixed_workers]
+        # Absent days are already fixed to 0
+        free = model.lower_bounds[block] != model.upper_bounds[block]
+        model.fix(block[free], values[fixed_workers][free])
+
+    for name in ('p_work_days', 'p_off_days', 'p_reserve'):
+        model.fix(model.blocks[name][fixed_workers], 0)
+    model.fix(model.blocks['p_res_day'][fixed_workers], 1)
@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
+from django.conf import settings
+
+from .model_builder import ScheduleModel
+from .presolve import PresolvedModel
+from .solver_backends import CpSatBackend, LinearSolverBackend
+
+ModelTemplate = Tuple[ScheduleModel, PresolvedModel, Union[LinearSolverBackend, CpSatBackend]]
+# The schedule, work, off and reserve days of a rolling horizon solution, by week number
+HorizonIncumbent = Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]
+
+_templates: 'OrderedDict[Hashable, ModelTemplate]' = OrderedDict()
+_incumbents: 'OrderedDict[Hashable, HorizonIncumbent]' = OrderedDict()
+_lock = Lock()
+
+
+def get_template_key(
+    backend: str,
+    num_search_workers: int,
+    time_limit: Optional[float],
+    relative_gap_limit: Optional[float],
+    workers: List[str],
+    multiplier: float
+) -> Hashable:
+    """
+    Builds the cache key of a model template. The structure of the `optimize_schedule` model only
+    depends on the workers and the multiplier, the solver settings are part of the key as they
+    are set when the backend is created.
+
+    Args:
+        backend (str): The solver backend name.
+        num_search_workers (int): The number of parallel CP-SAT search workers.
+        time_limit (Optional[float]): The time limit of the solve in seconds.
+        relative_gap_limit (Optional[float]): The relative gap at which the search stops early.
+        workers (List[str]): The usernames of the workers, in model order.
+        multiplier (float): A scaling factor of the number of reserve workers per day.
+
+    Returns:
+        Hashable: The cache key.
+    """
+    return (
+        backend, num_search_workers, time_limit, relative_gap_limit, tuple(workers), multiplier)
+
+
+def checkout_model_template(key: Hashable) -> Optional[ModelTemplate]:
+    """
+    Takes a model template, its last presolved model and the solver backend the latter is
+    loaded into out of the cache.
+
+    The template is removed while in use, so concurrent runs never share a solver; it is put back
+    by `checkin_model_template` after the solve.
+
+    Args:
+        key (Hashable): The key built by `get_template_key`.
+
+    Returns:
+        Optional[ModelTemplate]: The model, the presolved model and the backend, or None if not
+        cached.
+    """
+    with _lock:
+        return _templates.pop(key, None)
+
+
+def checkin_model_template(key: Hashable, template: ModelTemplate) -> None:
+    """
+    Puts a model template, its presolved model and the loaded solver backend into the cache,
+    evicting the least recently used templates above `settings.SOLVER_MODEL_CACHE_SIZE`.
+
+    Args:
+        key (Hashable): The key built by `get_template_key`.
+        template (ModelTemplate): The model, the presolved model and the backend the presolved
+                                  model is loaded into.
+    """
+    with _lock:
+        _templates[key] = template
+        _templates.move_to_end(key)
+        while len(_templates) > settings.SOLVER_MODEL_CACHE_SIZE:
+            _templates.popitem(last=False)
+
+
+def get_horizon_incumbent(key: Hashable) -> HorizonIncumbent:
+    """
+    Returns the weeks of the last rolling horizon solution of a crew, the weeks overlapping the
+    next run warm-start its solve.
+
+    Args:
+        key (Hashable): The key of the crew, e.g. the workers and the multiplier.
+
+    Returns:
+        HorizonIncumbent: The solution by week number, empty if the crew wasn't solved yet.
+    """
+    with _lock:
+        return dict(_incumbents.get(key, {}))
+
+
+def set_horizon_incumbent(key: Hashable, incumbent: HorizonIncumbent) -> None:
+    """
+    Keeps the weeks of a rolling horizon solution of a crew, evicting the least recently solved
+    crews above `settings.SOLVER_MODEL_CACHE_SIZE`.
+
+    Args:
+        key (Hashable): The key of the crew, e.g. the workers and the multiplier.
+        incumbent (HorizonIncumbent): The solution by week number.
+    """
+    with _lock:
+        _incumbents[key] = incumbent
+        _incumbents.move_to_end(key)
+        while len(_incumbents) > settings.SOLVER_MODEL_CACHE_SIZE:
+            _incumbents.popitem(last=False)
+
+
+def clear_model_templates() -> None:
+    """
+    Removes every cached model template and rolling horizon incumbent.
+    """
+    with _lock:
+        _templates.clear()
+        _incumbents.clear()
@@ -1,6 +1,15 @@
+from datetime import date
+
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import User
 from .utils.constants import DAYS_IN_WEEK, NUMBER_OF_SHIFTS, MESSAGE_MAX_LENGTH
+from .utils.solver_constants import (
+    COVERAGE_DEFAULT_PROFILE,
+    SHIFTS_PER_DAY,
+    SOLVER_JOB_OPTIMIZE,
+    SOLVER_JOB_QUEUED,
+)
 
 
 class Roster(models.Model):
@@ -25,6 +34,8 @@ class Roster(models.Model):
         vacation (str): A string indicating which days the user is on vacation.
         sickness (str): A string indicating which days the user is on sick leave.
         published (bool): A boolean indicating if the roster has been published.
+        suboptimal (bool): A boolean indicating if the schedule is the best one the solver found
+                           within its time or gap limit, but is not proven optimal.
         reserve_call_in (bool): A boolean indicating if the user is on call for reserve shifts.
         day_off_call_in (bool): A boolean indicating if the user is on call for reserve shifts.
         owner (User): The user associated with the roster (foreign key to the User model).
@@ -48,6 +59,7 @@ class Roster(models.Model):
     vacation: str
     sickness: str
     published: bool
+    suboptimal: bool
     reserve_call_in: bool
     day_off_call_in: bool
     owner: models.ForeignKey
@@ -65,6 +77,7 @@ class Roster(models.Model):
     vacation = models.CharField(max_length=DAYS_IN_WEEK)
     sickness = models.CharField(max_length=DAYS_IN_WEEK)
     published = models.BooleanField(default=False)
+    suboptimal = models.BooleanField(default=False)
     reserve_call_in = models.BooleanField(default=False)
     day_off_call_in = models.BooleanField(default=False)
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="shifts")
@@ -110,3 +123,291 @@ class Message(models.Model):
         The string will contain the first 50 characters of the message text.
         """
         return self.text[:50]
+
+
+class SolverJob(models.Model):
+    """
+    Represents a schedule optimization queued for the solver worker
+    (`python manage.py run_solver_worker`), so the solve doesn't run inside an HTTP request.
+
+    Attributes:
+        kind (str): What the job runs: 'optimize' (`optimize_schedule`), 'scenario-sweep'
+                    (`run_scenario_sweep`) or 'solution-pool' (`run_solution_pool`).
+        state (str): The state of the job: 'queued', 'running', 'finished' or 'failed'.
+        progress (int): The progress of the job in percent.
+        parameters (dict): The keyword arguments of the function the job runs.
+        status (int): The `pywraplp.Solver` status code of the solve, None until finished.
+        message (str): The final status message, or the error if the job failed.
+        created_at (datetime): The date and time when the job was queued.
+        started_at (datetime): The date and time when the worker picked the job up.
+        heartbeat_at (datetime): The last time the worker running the job reported in, a running
+                                 job without a recent heartbeat is requeued.
+        attempts (int): The number of times a worker claimed the job.
+        finished_at (datetime): The date and time when the job finished or failed.
+        owner (User): The user who queued the job.
+
+    Methods:
+        __str__() -> str:
+            Returns a string representation of the job, including its id and state.
+    """
+
+    kind: str
+    state: str
+    progress: int
+    parameters: dict
+    status: int
+    message: str
+    created_at: models.DateTimeField
+    started_at: models.DateTimeField
+    heartbeat_at: models.DateTimeField
+    attempts: int
+    finished_at: models.DateTimeField
+    owner: models.ForeignKey
+
+    kind = models.CharField(max_length=32, default=SOLVER_JOB_OPTIMIZE)
+    state = models.CharField(max_length=16, default=SOLVER_JOB_QUEUED)
+    progress = models.IntegerField(default=0)
+    parameters = models.JSONField(default=dict)
+    status = models.IntegerField(null=True, blank=True)
+    message = models.CharField(max_length=MESSAGE_MAX_LENGTH, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True,
+                              related_name="solver_jobs")
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the job, e.g., 'Solver job 3 (queued)'.
+        """
+        return f"Solver job {self.id} ({self.state})"
+
+
+class Scenario(models.Model):
+    """
+    Represents one variant of an application week solved in a scenario sweep. The schedule is
+    kept here and only written to the rosters when the scenario is committed.
+
+    Attributes:
+        sweep (UUID): The id of the sweep the scenario was solved in.
+        name (str): The name of the scenario.
+        parameters (dict): The variant: the multiplier, the rejected vacation days and the
+                           coverage table.
+        week_number (int): The application week the scenario was solved for.
+        status (int): The `pywraplp.Solver` status code of the solve.
+        objective (float): The number of granted applications, None if no schedule was found.
+        gap (float): The relative gap of the schedule, None if no schedule was found.
+        wall_time (int): The solver runtime in milliseconds.
+        rosters (dict): The workers and their schedule, work, off and reserve days as roster
+                        strings, None if no schedule was found.
+        input_hash (str): The hash of the rosters the scenario was solved from and of the
+                          application week rosters it overwrites (see `get_scenario_input_hash`),
+                          the scenario can only be committed while they are unchanged.
+        committed (bool): Whether the scenario was written to the rosters.
+        superseded (bool): Whether another scenario of the sweep was committed.
+        created_at (datetime): The date and time when the scenario was solved.
+        owner (User): The user who ran the sweep.
+
+    Methods:
+        __str__() -> str:
+            Returns a string representation of the scenario, including its name.
+    """
+
+    sweep: models.UUIDField
+    name: str
+    parameters: dict
+    week_number: int
+    status: int
+    objective: float
+    gap: float
+    wall_time: int
+    rosters: dict
+    input_hash: str
+    committed: bool
+    superseded: bool
+    created_at: models.DateTimeField
+    owner: models.ForeignKey
+
+    sweep = models.UUIDField(db_index=True)
+    name = models.CharField(max_length=MESSAGE_MAX_LENGTH)
+    parameters = models.JSONField(default=dict)
+    week_number = models.IntegerField()
+    status = models.IntegerField()
+    objective = models.FloatField(null=True, blank=True)
+    gap = models.FloatField(null=True, blank=True)
+    wall_time = models.IntegerField(default=0)
+    rosters = models.JSONField(null=True, blank=True)
+    input_hash = models.CharField(max_length=64, blank=True, default='')
+    committed = models.BooleanField(default=False)
+    superseded = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True,
+                              related_name="scenarios")
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the scenario, e.g., 'Scenario multiplier 2'.
+        """
+        return f"Scenario {self.name}"
+
+
+class SolverRun(models.Model):
+    """
+    Represents the statistics of one schedule optimization or reoptimization, kept to track the
+    solver performance over the weeks.
+
+    Attributes:
+        kind (str): The solved problem: 'optimize', 'horizon' or 'reoptimize'.
+        week_number (int): The application week, or the current week of a reoptimization.
+        engine (str): The solver engine: 'compact', 'column-generation' or 'heuristic',
+                      'result-cache' if the result of an earlier run with the same inputs was
+                      reused.
+        backend (str): The solver backend: 'scip' or 'cp-sat'.
+        status (int): The `pywraplp.Solver` status code of the solve.
+        objective (float): The objective value of the solution, None if no solution was found.
+        best_bound (float): The best proven bound of the objective, None if unknown.
+        gap (float): The relative gap of the solution, None if no solution was found.
+        build_time (int): The time to build and load the model in milliseconds.
+        solve_time (int): The solver runtime in milliseconds.
+        write_back_time (int): The time to save the rosters in milliseconds.
+        num_variables (int): The number of variables loaded into the solver.
+        num_constraints (int): The number of constraints loaded into the solver.
+        num_workers (int): The number of workers in the model.
+        multiplier (float): The scaling factor of the coverage.
+        input_hash (str): The hash of the solver inputs of an optimize run, empty if not hashed.
+        rosters (dict): The workers and their schedule, work, off and reserve days as roster
+                        strings, kept for optimal optimize runs to be reused by the result cache.
+        created_at (datetime): The date and time when the run finished.
+
+    Methods:
+        __str__() -> str:
+            Returns a string representation of the run, including its kind and week number.
+    """
+
+    kind: str
+    week_number: int
+    engine: str
+    backend: str
+    status: int
+    objective: float
+    best_bound: float
+    gap: float
+    build_time: int
+    solve_time: int
+    write_back_time: int
+    num_variables: int
+    num_constraints: int
+    num_workers: int
+    multiplier: float
+    input_hash: str
+    rosters: dict
+    created_at: models.DateTimeField
+
+    kind = models.CharField(max_length=16)
+    week_number = models.IntegerField()
+    engine = models.CharField(max_length=32)
+    backend = models.CharField(max_length=16)
+    status = models.IntegerField()
+    objective = models.FloatField(null=True, blank=True)
+    best_bound = models.FloatField(null=True, blank=True)
+    gap = models.FloatField(null=True, blank=True)
+    build_time = models.IntegerField(default=0)
+    solve_time = models.IntegerField(default=0)
+    write_back_time = models.IntegerField(default=0)
+    num_variables = models.IntegerField(default=0)
+    num_constraints = models.IntegerField(default=0)
+    num_workers = models.IntegerField(default=0)
+    multiplier = models.FloatField(default=1)
+    input_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    rosters = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the run, e.g., 'SolverRun optimize week 42'.
+        """
+        return f"SolverRun {self.kind} week {self.week_number}"
+
+
+
+class CoverageProfile(models.Model):
+    """
+    Represents one version of the shift coverage demand of a crew: the minimum number of workers
+    of each shift, per weekday and optionally per date, before scaling by the multiplier. The
+    solvers use the latest version valid in the solved week (see `api.coverage`), older versions
+    are kept as history.
+
+    Attributes:
+        name (str): The crew group the demand applies to, or 'default' for every other worker.
+        version (int): The version of the demand, numbered per name from 1 on save.
+        valid_from (date): The first day the version applies from, None if it always applies.
+        weekday_demand (list): The minimum number of workers of the morning, afternoon and night
+                               shifts for each weekday, Monday first (7 lists of 3 values).
+        date_demand (dict): The demand of single dates overriding their weekday, e.g. holidays,
+                            as lists of 3 values by ISO date ('YYYY-MM-DD').
+        created_at (datetime): The date and time when the version was saved.
+
+    Methods:
+        clean() -> None:
+            Checks the shape of the demand and the dates.
+        save(*args, **kwargs) -> None:
+            Numbers a new version after the latest version of its name.
+        __str__() -> str:
+            Returns a string representation of the profile, including its name and version.
+    """
+
+    name: str
+    version: int
+    valid_from: models.DateField
+    weekday_demand: list
+    date_demand: dict
+    created_at: models.DateTimeField
+
+    name = models.CharField(max_length=150, default=COVERAGE_DEFAULT_PROFILE)
+    version = models.PositiveIntegerField(blank=True)
+    valid_from = models.DateField(null=True, blank=True)
+    weekday_demand = models.JSONField()
+    date_demand = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('name', 'version')
+
+    def clean(self) -> None:
+        """
+        Checks that every weekday and date has a non-negative demand for each shift.
+        """
+        def is_demand(shifts) -> bool:
+            return (isinstance(shifts, list) and len(shifts) == SHIFTS_PER_DAY and
+                    all(isinstance(workers, int) and workers >= 0 for workers in shifts))
+
+        if (not isinstance(self.weekday_demand, list) or len(self.weekday_demand) != DAYS_IN_WEEK
+                or not all(map(is_demand, self.weekday_demand))):
+            raise ValidationError({'weekday_demand': "Expected 7 lists of 3 worker counts."})
+        if not isinstance(self.date_demand, dict):
+            raise ValidationError({'date_demand': "Expected lists of 3 worker counts by date."})
+        for day, shifts in self.date_demand.items():
+            try:
+                date.fromisoformat(day)
+            except ValueError:
+                raise ValidationError({'date_demand': f"Not an ISO date: {day}"})
+            if not is_demand(shifts):
+                raise ValidationError({'date_demand': f"Expected 3 worker counts on {day}."})
+
+    def save(self, *args, **kwargs) -> None:
+        """
+        Numbers a new version after the latest version of its name, e.g. 'default' version 2.
+        """
+        if self.version is None:
+            latest = CoverageProfile.objects.filter(name=self.name).aggregate(
+                models.Max('version'))['version__max']
+            self.version = (latest or 0) + 1
+        super().save(*args, **kwargs)
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the profile, e.g., 'CoverageProfile default v2'.
+        """
+        return f"CoverageProfile {self.name} v{self.version}"
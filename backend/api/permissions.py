@@ -0,0 +1,52 @@
+from rest_framework.permissions import BasePermission
+
+from .utils.model_fn import is_user_in_group
+
+
+class IsSupervisor(BasePermission):
+    """
+    Allows access only to authenticated users of the 'Supervisor' group, like the supervisor-only
+    tools of the agent.
+
+    Methods:
+        has_permission(request, view) -> bool:
+            Returns whether the user of the request is a supervisor.
+    """
+
+    def has_permission(self, request, view) -> bool:
+        """
+        Checks whether the user of the request is an authenticated supervisor.
+
+        Args:
+            request (HttpRequest): The request.
+            view (APIView): The view being accessed.
+
+        Returns:
+            bool: True if the user is a supervisor.
+        """
+        user = request.user
+        return bool(user and user.is_authenticated and is_user_in_group(user, 'Supervisor'))
+
+
+class IsOwnerOrSupervisor(BasePermission):
+    """
+    Allows access to an object only to its owner and to supervisors.
+
+    Methods:
+        has_object_permission(request, view, obj) -> bool:
+            Returns whether the user of the request owns the object or is a supervisor.
+    """
+
+    def has_object_permission(self, request, view, obj) -> bool:
+        """
+        Checks whether the user of the request owns the object or is a supervisor.
+
+        Args:
+            request (HttpRequest): The request.
+            view (APIView): The view being accessed.
+            obj (Model): The object, with an `owner`.
+
+        Returns:
+            bool: True if the user owns the object or is a supervisor.
+        """
+        return obj.owner_id == request.user.id or is_user_in_group(request.user, 'Supervisor')
@@ -0,0 +1,146 @@
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .model_builder import RowGroup, ScheduleModel
+
+PRESOLVE_TOLERANCE = 1e-9
+
+
+class PresolvedModel(NamedTuple):
+    """
+    A `ScheduleModel` without its fixed variables and redundant rows, and the data needed to map
+    solutions back to the original model.
+
+    Attributes:
+        model (ScheduleModel): The reduced model.
+        variables (np.ndarray): The original index of each variable of the reduced model.
+        values (np.ndarray): The value of every fixed variable of the original model, 0 for the
+                             variables kept in the reduced model.
+        structure (Tuple[bytes, ...]): The kept variables and rows, two presolved models with the
+                                       same structure only differ in their bounds and objective.
+        infeasible (bool): True if a row of fixed variables is violated.
+    """
+    model: ScheduleModel
+    variables: np.ndarray
+    values: np.ndarray
+    structure: Tuple[bytes, ...]
+    infeasible: bool
+
+    def restore(self, values: np.ndarray) -> np.ndarray:
+        """
+        Maps a solution of the reduced model to the variables of the original model.
+
+        Args:
+            values (np.ndarray): The solution values of the reduced model.
+
+        Returns:
+            np.ndarray: The solution values, ordered by original variable index.
+        """
+        restored = self.values.astype(np.asarray(values).dtype)
+        restored[self.variables] = values
+        return restored
+
+    def reduce_hint(
+        self,
+        indices: np.ndarray,
+        values: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Maps a hint on the original model to the variables of the reduced model, the hinted values
+        of fixed variables are dropped.
+
+        Args:
+            indices (np.ndarray): The original indices of the hinted variables.
+            values (np.ndarray): The hinted values.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The indices in the reduced model and the hinted values.
+        """
+        mapping = np.full(self.values.size, -1, dtype=np.int64)
+        mapping[self.variables] = np.arange(self.variables.size)
+        indices = mapping[np.ravel(indices)]
+        kept = indices >= 0
+        return indices[kept], np.ravel(values)[kept]
+
+
+def presolve_model(model: ScheduleModel, kept: Optional[np.ndarray] = None) -> PresolvedModel:
+    """
+    Removes the fixed variables and the redundant rows of a model before it is loaded into a
+    solver.
+
+    Fixed variables (equal lower and upper bounds) are replaced by their values: their terms are
+    moved into the row bounds and their objective terms into the objective offset. A row that
+    mixes fixed and free variables (e.g. a rule across the boundary of the fixed week) keeps its
+    free terms with the shifted bounds, rows are regrouped by their number of remaining terms.
+    Rows are dropped if they have no free term left, or if the bounds of their variables already
+    imply them (e.g. `x >= 0` for a boolean `x`, or a rule relaxed to infinite bounds).
+
+    The `kept` variables stay in the reduced model as bound-fixed columns even if they are fixed,
+    and rows are then only dropped if none of their variables is left. The structure then only
+    depends on the other fixed variables, e.g. the fixed first week, so a loaded model can be
+    updated across weeks whose absences fix different variables.
+
+    Args:
+        model (ScheduleModel): The model to presolve, it is not changed.
+        kept (Optional[np.ndarray], optional): The indices of the variables that are not removed
+                                               if fixed. Defaults to None, meaning every fixed
+                                               variable is removed.
+
+    Returns:
+        PresolvedModel: The reduced model and the mapping back to the original variables.
+    """
+    fixed = model.lower_bounds == model.upper_bounds
+    if kept is not None:
+        fixed[kept] = False
+    variables = np.flatnonzero(~fixed)
+    mapping = np.full(model.num_variables, -1, dtype=np.int64)
+    mapping[variables] = np.arange(variables.size)
+    values = np.where(fixed, model.lower_bounds, 0.0)
+
+    reduced = ScheduleModel(model.workers, model.maximize)
+    reduced.lower_bounds = model.lower_bounds[variables].copy()
+    reduced.upper_bounds = model.upper_bounds[variables].copy()
+    reduced.objective = model.objective[variables].copy()
+    reduced.objective_offset = model.objective_offset + float(model.objective @ values)
+    reduced.blocks = {name: mapping[indices] for name, indices in model.blocks.items()}
+
+    structure: List[bytes] = [fixed.tobytes()]
+    infeasible = False
+    for group in model.row_groups:
+        free = ~fixed[group.indices] & (group.coefficients != 0)
+        constant = (group.coefficients * values[group.indices]).sum(axis=1)
+        lower = group.lower - constant
+        upper = group.upper - constant
+
+        terms = np.where(free, group.coefficients, 0.0)
+        lower_terms = terms * model.lower_bounds[group.indices]
+        upper_terms = terms * model.upper_bounds[group.indices]
+        min_activity = np.minimum(lower_terms, upper_terms).sum(axis=1)
+        max_activity = np.maximum(lower_terms, upper_terms).sum(axis=1)
+        infeasible |= bool(((min_activity > upper + PRESOLVE_TOLERANCE) |
+                            (max_activity < lower - PRESOLVE_TOLERANCE)).any())
+
+        number_of_terms = free.sum(axis=1)
+        if kept is None:
+            # Rows implied by the variable bounds, including the rows without free terms
+            redundant = ((min_activity >= lower - PRESOLVE_TOLERANCE) &
+                         (max_activity <= upper + PRESOLVE_TOLERANCE))
+        else:
+            redundant = number_of_terms == 0
+        structure.append(np.packbits(~redundant).tobytes())
+
+        for count in np.unique(number_of_terms[~redundant]).tolist():
+            rows = np.flatnonzero(~redundant & (number_of_terms == count))
+            # Stable sort keeps the free terms of each row in their original order
+            order = np.argsort(~free[rows], axis=1, kind='stable')[:, :count]
+            indices = np.take_along_axis(group.indices[rows], order, axis=1)
+            reduced.row_groups.append(RowGroup(
+                group.name,
+                mapping[indices],
+                np.take_along_axis(np.asarray(group.coefficients)[rows], order, axis=1),
+                lower[rows],
+                upper[rows]
+            ))
+
+    return PresolvedModel(reduced, variables, values, tuple(structure), infeasible)
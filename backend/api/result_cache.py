@@ -0,0 +1,113 @@
+import hashlib
+import json
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from django.db.models import Q
+from ortools.linear_solver import pywraplp
+
+from .models import SolverRun
+from .utils.common_fn import array_to_roster_strings, roster_strings_to_array
+from .utils.constants import DAYS_IN_WEEK, NUMBER_OF_SHIFTS
+from .utils.model_fn import get_rosters_by_owner
+from .utils.solver_constants import (
+    OPTIMALITY_GAP_TOLERANCE,
+    RESULT_CACHE_VERSION,
+    SOLVER_RUN_OPTIMIZE,
+)
+
+ROSTER_FIELDS = {
+    'schedules': ('schedule', NUMBER_OF_SHIFTS),
+    'work_days': ('work_days', DAYS_IN_WEEK),
+    'off_days': ('off_days', DAYS_IN_WEEK),
+    'reserve_days': ('reserve_days', DAYS_IN_WEEK),
+}
+
+
+def get_input_hash(*parts) -> str:
+    """
+    Hashes solver inputs canonically: arrays by their dtype, shape and contents, everything else
+    by its JSON form, so equal inputs loaded at different times get the same hash.
+
+    Args:
+        *parts: The inputs, arrays or JSON serializable values.
+
+    Returns:
+        str: The SHA-256 hex digest of the inputs and `RESULT_CACHE_VERSION`.
+    """
+    digest = hashlib.sha256(str(RESULT_CACHE_VERSION).encode())
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(f'{part.dtype.str}{part.shape}'.encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def get_result_rosters(workers: List[str], **matrices: np.ndarray) -> Dict:
+    """
+    Converts a schedule to the roster strings stored with its `SolverRun`.
+
+    Args:
+        workers (List[str]): The usernames of the workers.
+        **matrices (np.ndarray): The schedules, work_days, off_days and reserve_days matrices.
+
+    Returns:
+        Dict: The workers and their schedule, work, off and reserve days as roster strings.
+    """
+    return {
+        'workers': workers,
+        **{field: array_to_roster_strings(matrices[field]) for field in ROSTER_FIELDS}
+    }
+
+
+def find_cached_result(input_hash: str) -> Optional[SolverRun]:
+    """
+    Looks up the latest optimal `optimize_schedule` run of the same inputs. Runs that stopped at
+    the relative gap limit are reported as OPTIMAL by the solvers, they are not reused.
+
+    Args:
+        input_hash (str): The hash of the inputs, see `get_input_hash`.
+
+    Returns:
+        Optional[SolverRun]: The run with its rosters, None if the inputs were not solved to
+        optimality yet.
+    """
+    return (
+        SolverRun.objects
+        .filter(Q(gap__isnull=True) | Q(gap__lte=OPTIMALITY_GAP_TOLERANCE),
+                kind=SOLVER_RUN_OPTIMIZE, input_hash=input_hash,
+                status=pywraplp.Solver.OPTIMAL, rosters__isnull=False)
+        .order_by('-id')
+        .first()
+    )
+
+
+def get_changed_rosters(solver_run: SolverRun) -> Dict[str, Union[List[str], np.ndarray]]:
+    """
+    Compares the rosters of a cached result to the application week's rosters, which may have
+    been edited or unpublished since.
+
+    Args:
+        solver_run (SolverRun): The cached result.
+
+    Returns:
+        Dict[str, Union[List[str], np.ndarray]]: The workers, schedules, work_days, off_days and
+        reserve_days of the rosters that differ from the result, a matrix row per worker.
+    """
+    rosters = solver_run.rosters
+    current = get_rosters_by_owner([solver_run.week_number], rosters['workers'])
+    changed = []
+    for row, worker in enumerate(rosters['workers']):
+        roster = current[solver_run.week_number, worker]
+        if (not roster.published or roster.suboptimal or
+                any(getattr(roster, name) != rosters[field][row]
+                    for field, (name, _) in ROSTER_FIELDS.items())):
+            changed.append(row)
+
+    return {
+        'workers': [rosters['workers'][row] for row in changed],
+        **{field: roster_strings_to_array([rosters[field][row] for row in changed], length)
+           for field, (_, length) in ROSTER_FIELDS.items()}
+    }
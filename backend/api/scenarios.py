@@ -0,0 +1,400 @@
+import uuid
+from concurrent.futures import as_completed
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from ortools.linear_solver import pywraplp
+
+from .capacity_check import CapacityShortageError, check_schedule_capacity
+from .coverage import get_min_workers
+from .models import Roster, Scenario
+from .result_cache import get_input_hash
+from .solver import (
+    PoolSolution,
+    ScheduleInputs,
+    ShardResult,
+    create_solver_pool,
+    get_schedule_inputs,
+    save_application_week_rosters,
+    solve_schedule_shard,
+)
+from .solver_backends import FEASIBLE_STATUSES, get_relative_gap, is_proven_optimal
+from .utils.common_fn import (
+    array_to_roster_strings,
+    replace_string_from_to_with_char,
+    roster_strings_to_array,
+)
+from .utils.constants import CHAR_ZERO, DAYS_IN_WEEK, NUMBER_OF_SHIFTS
+from .utils.date_time_fn import get_current_week_number
+from .utils.solver_constants import PUBLISHED_ROSTER_FIELDS, SOLVER_ENGINE_COMPACT
+
+
+def apply_scenario_variant(
+    inputs: ScheduleInputs,
+    variant: Dict
+) -> Tuple[ScheduleInputs, np.ndarray]:
+    """
+    Applies a scenario variant to the inputs of the application week.
+
+    Args:
+        inputs (ScheduleInputs): The inputs loaded from the rosters.
+        variant (Dict): The variant, with the keys:
+            - `multiplier` (float): The scaling factor of the coverage.
+            - `rejected_vacations` (Dict[str, List[int]], optional): The 1-based vacation days of
+              the application week to reject, per username.
+            - `min_workers` (List[int], optional): The minimum number of workers for each shift
+              (21 values), replacing the coverage profile scaled by the multiplier.
+
+    Returns:
+        Tuple[ScheduleInputs, np.ndarray]: The inputs of the variant and the minimum number of
+        workers for each shift.
+
+    Raises:
+        ValueError: If a rejected vacation belongs to a worker who is not part of the inputs.
+    """
+    vacation = inputs.vacation.copy()
+    for username, days in variant.get('rejected_vacations', {}).items():
+        if username not in inputs.workers:
+            raise ValueError(f"Unknown worker in the rejected vacations: {username}")
+        vacation[inputs.workers.index(username), np.asarray(days, dtype=int) - 1] = 0
+
+    min_workers = variant.get('min_workers')
+    if min_workers is None:
+        min_workers = get_min_workers(inputs.application_week_number, variant['multiplier'])
+
+    return inputs._replace(vacation=vacation), np.array(min_workers)
+
+
+def get_scenario_input_hash(inputs: ScheduleInputs) -> str:
+    """
+    Hashes the rosters a sweep is solved from and the application week rosters its scenarios
+    overwrite when committed (see `get_input_hash`). A scenario can only be committed while the
+    hash is unchanged, so a stale sweep can't overwrite later changes.
+
+    Args:
+        inputs (ScheduleInputs): The inputs loaded from the rosters, before any variant.
+
+    Returns:
+        str: The hash of the rosters.
+    """
+    published = list(
+        Roster.objects
+        .filter(week_number=inputs.application_week_number, owner__username__in=inputs.workers)
+        .order_by('owner_id')
+        .values_list('owner__username', *PUBLISHED_ROSTER_FIELDS)
+    )
+    return get_input_hash(inputs.application_week_number, inputs.workers, *inputs[2:],
+                          [list(roster) for roster in published])
+
+
+def check_scenario_variants(
+    variants: List[Dict],
+    number_of_users_to_solve: Optional[int] = None
+) -> None:
+    """
+    Checks that the variants of a sweep can be applied to the current rosters before the sweep
+    is queued.
+
+    Args:
+        variants (List[Dict]): The variants, see `apply_scenario_variant`.
+        number_of_users_to_solve (Optional[int], optional): The maximum number of users to include
+                                                            in the optimization. Defaults to None,
+                                                            meaning every worker.
+
+    Raises:
+        ValueError: If a variant can't be applied.
+    """
+    inputs = get_schedule_inputs(number_of_users_to_solve)
+    for variant in variants:
+        apply_scenario_variant(inputs, variant)
+
+
+def check_solution_pool(
+    multiplier: float,
+    number_of_users_to_solve: Optional[int] = None,
+    inputs: Optional[ScheduleInputs] = None
+) -> None:
+    """
+    Checks that the present workers can cover the application week (see
+    `check_schedule_capacity`), before a solution pool is queued and again before it is solved.
+    Skipped if `settings.SOLVER_CAPACITY_CHECK` is False.
+
+    Args:
+        multiplier (float): The scaling factor of the coverage.
+        number_of_users_to_solve (Optional[int], optional): The maximum number of users to include
+                                                            in the optimization. Defaults to None,
+                                                            meaning every worker.
+        inputs (Optional[ScheduleInputs], optional): The inputs of the application week. Defaults
+                                                     to None, meaning they are loaded.
+
+    Raises:
+        CapacityShortageError: If a requirement of the application week can't be met.
+    """
+    if not settings.SOLVER_CAPACITY_CHECK:
+        return
+
+    inputs = inputs or get_schedule_inputs(number_of_users_to_solve)
+    shortages = check_schedule_capacity(
+        inputs.workers,
+        inputs.vacation,
+        inputs.sickness,
+        get_min_workers(inputs.application_week_number, multiplier),
+        multiplier
+    )
+    if shortages:
+        raise CapacityShortageError(shortages)
+
+
+def get_scenario_rosters(workers: List[str], solution: Union[ShardResult, PoolSolution]) -> Dict:
+    """
+    Converts a schedule to the roster strings stored in a scenario.
+
+    Args:
+        workers (List[str]): The usernames of the workers.
+        solution (Union[ShardResult, PoolSolution]): The schedule, work, off and reserve days.
+
+    Returns:
+        Dict: The workers and their schedule, work, off and reserve days as roster strings.
+    """
+    return {
+        'workers': workers,
+        **{field: array_to_roster_strings(getattr(solution, field))
+           for field in ('schedules', 'work_days', 'off_days', 'reserve_days')}
+    }
+
+
+def run_scenario_sweep(
+    variants: List[Dict],
+    owner: Optional[User] = None,
+    number_of_users_to_solve: Optional[int] = None,
+    processes: Optional[int] = None,
+    sweep: Optional[str] = None,
+    progress: Optional[Callable[[int], None]] = None
+) -> List[Scenario]:
+    """
+    Solves variants of the application week in parallel processes and stores them as scenarios
+    of one sweep. No roster is changed, a scenario is written to the rosters by
+    `commit_scenario`. Sweeps run in the solver worker, queued as a 'scenario-sweep'
+    `SolverJob`.
+
+    Args:
+        variants (List[Dict]): The variants to solve, each with a `name` and the keys described in
+                               `apply_scenario_variant`.
+        owner (Optional[User], optional): The user running the sweep. Defaults to None.
+        number_of_users_to_solve (Optional[int], optional): The maximum number of users to include
+                                                            in the optimization. Defaults to None,
+                                                            meaning every worker.
+        processes (Optional[int], optional): The number of processes solving variants in
+                                             parallel. Defaults to `settings.SOLVER_PROCESSES`.
+        sweep (Optional[str], optional): The id of the sweep, e.g. handed out when the sweep was
+                                         queued. Defaults to None, meaning a new id.
+        progress (Optional[Callable[[int], None]], optional): Called with the progress in percent
+                                                              as the variants are solved.
+                                                              Defaults to None.
+
+    Returns:
+        List[Scenario]: The solved scenarios, in the order of the variants.
+    """
+    progress = progress or (lambda _: None)
+    inputs = get_schedule_inputs(number_of_users_to_solve)
+    input_hash = get_scenario_input_hash(inputs)
+    variant_inputs = [apply_scenario_variant(inputs, variant) for variant in variants]
+
+    with create_solver_pool(
+        max(1, min(processes or settings.SOLVER_PROCESSES, len(variants)))
+    ) as executor:
+        futures = [
+            executor.submit(
+                solve_schedule_shard,
+                scenario_inputs,
+                variant['multiplier'],
+                settings.SOLVER_ENGINE,
+                settings.SOLVER_BACKEND,
+                settings.SOLVER_NUM_SEARCH_WORKERS,
+                settings.SOLVER_TIME_LIMIT,
+                settings.SOLVER_RELATIVE_GAP_LIMIT,
+                settings.SOLVER_USE_HINTS,
+                settings.SOLVER_AGGREGATE_WORKERS,
+                min_workers=min_workers
+            )
+            for variant, (scenario_inputs, min_workers) in zip(variants, variant_inputs)
+        ]
+        for solved, _ in enumerate(as_completed(futures), 1):
+            progress(100 * solved // len(futures))
+        results = [future.result() for future in futures]
+
+    sweep = uuid.UUID(sweep) if sweep is not None else uuid.uuid4()
+    scenarios = []
+    for variant, (scenario_inputs, _), result in zip(variants, variant_inputs, results):
+        objective = rosters = None
+        if result.status in FEASIBLE_STATUSES:
+            objective = float((scenario_inputs.applications * result.schedules).sum())
+            rosters = get_scenario_rosters(scenario_inputs.workers, result)
+        scenarios.append(Scenario(
+            sweep=sweep,
+            name=variant['name'],
+            parameters={key: value for key, value in variant.items() if key != 'name'},
+            week_number=inputs.application_week_number,
+            status=result.status,
+            objective=objective,
+            gap=result.gap,
+            wall_time=result.wall_time,
+            rosters=rosters,
+            input_hash=input_hash,
+            owner=owner
+        ))
+
+    return Scenario.objects.bulk_create(scenarios)
+
+
+def run_solution_pool(
+    multiplier: float,
+    owner: Optional[User] = None,
+    number_of_users_to_solve: Optional[int] = None,
+    size: Optional[int] = None,
+    sweep: Optional[str] = None
+) -> List[Scenario]:
+    """
+    Solves the application week and stores up to `size` distinct schedules as draft scenarios of
+    one sweep, best first (see `solve_schedule_shard`). Drafts whose objective is further than
+    `settings.SOLVER_SOLUTION_POOL_GAP` from the best draft are dropped. No roster is changed,
+    the chosen draft is written to the rosters by `commit_scenario`. Solution pools run in the
+    solver worker, queued as a 'solution-pool' `SolverJob`. The alternatives to the best draft
+    share `settings.SOLVER_SOLUTION_POOL_TIME_LIMIT`, so a pool takes at most that long on top of
+    a single solve.
+
+    Args:
+        multiplier (float): The scaling factor of the coverage.
+        owner (Optional[User], optional): The user running the solve. Defaults to None.
+        number_of_users_to_solve (Optional[int], optional): The maximum number of users to include
+                                                            in the optimization. Defaults to None,
+                                                            meaning every worker.
+        size (Optional[int], optional): The maximum number of drafts. Defaults to
+                                        `settings.SOLVER_SOLUTION_POOL_SIZE`.
+        sweep (Optional[str], optional): The id of the sweep, e.g. handed out when the solution
+                                         pool was queued. Defaults to None, meaning a new id.
+
+    Returns:
+        List[Scenario]: The drafts, a single scenario without schedule if none was found.
+
+    Raises:
+        CapacityShortageError: If the present workers can't cover the application week.
+    """
+    inputs = get_schedule_inputs(number_of_users_to_solve)
+    check_solution_pool(multiplier, inputs=inputs)
+    input_hash = get_scenario_input_hash(inputs)
+    result = solve_schedule_shard(
+        inputs,
+        multiplier,
+        SOLVER_ENGINE_COMPACT,
+        settings.SOLVER_BACKEND,
+        settings.SOLVER_NUM_SEARCH_WORKERS,
+        settings.SOLVER_TIME_LIMIT,
+        settings.SOLVER_RELATIVE_GAP_LIMIT,
+        settings.SOLVER_USE_HINTS,
+        False,
+        solution_pool_size=size or settings.SOLVER_SOLUTION_POOL_SIZE,
+        solution_pool_time_limit=settings.SOLVER_SOLUTION_POOL_TIME_LIMIT
+    )
+
+    sweep = uuid.UUID(sweep) if sweep is not None else uuid.uuid4()
+    if result.status not in FEASIBLE_STATUSES:
+        return [Scenario.objects.create(
+            sweep=sweep,
+            name='Solution 1',
+            parameters={'multiplier': multiplier},
+            week_number=inputs.application_week_number,
+            status=result.status,
+            wall_time=result.wall_time,
+            owner=owner
+        )]
+
+    best = result.pool[0].objective
+    scenarios = []
+    for rank, solution in enumerate(result.pool, 1):
+        if get_relative_gap(solution.objective, best) > settings.SOLVER_SOLUTION_POOL_GAP:
+            continue
+        scenarios.append(Scenario(
+            sweep=sweep,
+            name=f'Solution {rank}',
+            parameters={'multiplier': multiplier, 'solution_pool_rank': rank},
+            week_number=inputs.application_week_number,
+            # Only the best draft can be the proven optimum
+            status=result.status if rank == 1 else pywraplp.Solver.FEASIBLE,
+            objective=float((inputs.applications * solution.schedules).sum()),
+            gap=result.gap if rank == 1 else get_relative_gap(solution.objective, result.bound),
+            wall_time=result.wall_time,
+            rosters=get_scenario_rosters(inputs.workers, solution),
+            input_hash=input_hash,
+            owner=owner
+        ))
+
+    return Scenario.objects.bulk_create(scenarios)
+
+
+def commit_scenario(scenario: Scenario) -> Scenario:
+    """
+    Writes the schedule of a scenario to the rosters and publishes them. The vacation days
+    rejected by the scenario are removed from the rosters as well, and the other scenarios of the
+    sweep are marked as superseded.
+
+    The scenarios of the sweep are locked while the scenario is committed, so two scenarios of a
+    sweep can't be committed at the same time.
+
+    Args:
+        scenario (Scenario): The scenario to commit.
+
+    Returns:
+        Scenario: The committed scenario.
+
+    Raises:
+        ValueError: If the scenario has no schedule, was already committed or superseded, belongs
+                    to another application week or the rosters changed since it was solved.
+    """
+    with transaction.atomic():
+        sweep = Scenario.objects.filter(sweep=scenario.sweep)
+        scenario = {
+            locked.id: locked for locked in sweep.select_for_update().order_by('id')
+        }[scenario.id]
+
+        if scenario.rosters is None:
+            raise ValueError("The scenario has no schedule to commit.")
+        if scenario.committed:
+            raise ValueError("The scenario is already committed.")
+        if scenario.superseded:
+            raise ValueError("Another scenario of the sweep is already committed.")
+        if scenario.week_number != get_current_week_number(2):
+            raise ValueError("The scenario belongs to another application week.")
+
+        rosters = scenario.rosters
+        inputs = get_schedule_inputs(usernames=rosters['workers'])
+        if scenario.input_hash != get_scenario_input_hash(inputs):
+            raise ValueError("The rosters changed since the scenario was solved, "
+                             "run the sweep again.")
+
+        for username, days in scenario.parameters.get('rejected_vacations', {}).items():
+            roster = Roster.objects.get(week_number=scenario.week_number,
+                                        owner__username=username)
+            for day in days:
+                roster.vacation = replace_string_from_to_with_char(
+                    roster.vacation, day - 1, day, CHAR_ZERO)
+            roster.save()
+
+        save_application_week_rosters(
+            scenario.week_number,
+            rosters['workers'],
+            roster_strings_to_array(rosters['schedules'], NUMBER_OF_SHIFTS),
+            roster_strings_to_array(rosters['work_days'], DAYS_IN_WEEK),
+            roster_strings_to_array(rosters['off_days'], DAYS_IN_WEEK),
+            roster_strings_to_array(rosters['reserve_days'], DAYS_IN_WEEK),
+            np.full(len(rosters['workers']), not is_proven_optimal(scenario.status, scenario.gap))
+        )
+
+        scenario.committed = True
+        scenario.save(update_fields=['committed'])
+        sweep.exclude(id=scenario.id).update(superseded=True)
+
+    return scenario
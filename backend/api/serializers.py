@@ -1,6 +1,8 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
-from .models import Roster, Message
+from .models import Roster, Message, Scenario, SolverJob, SolverRun
+from .utils.constants import DAYS_IN_WEEK, NUMBER_OF_SHIFTS
+from .utils.solver_constants import MAX_SOLUTION_POOL_SIZE
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -76,6 +78,7 @@ class RosterSerializer(serializers.ModelSerializer):
         vacation (str): A string representing the vacation days for the roster.
         sickness (str): A string representing the sickness days for the roster.
         published (bool): A flag indicating whether the roster is published.
+        suboptimal (bool): A flag indicating whether the schedule is not proven optimal, read-only.
         reserve_call_in (bool): A flag indicating if a call-in is needed for reserve days.
         day_off_call_in (bool): A flag indicating if a call-in is needed for day off days.
         owner (User): The user who owns the roster, read-only.
@@ -104,9 +107,9 @@ class RosterSerializer(serializers.ModelSerializer):
         fields = [
             "id", "week_number", "year", "application", "schedule", "work_days", 
             "off_days", "reserve_days", "reserve_call_in_days", "day_off_call_in_days", "vacation", 
-            "sickness", "published", "reserve_call_in", "day_off_call_in", "owner"
+            "sickness", "published", "suboptimal", "reserve_call_in", "day_off_call_in", "owner"
         ]
-        extra_kwargs = {"owner": {"read_only": True}}
+        extra_kwargs = {"owner": {"read_only": True}, "suboptimal": {"read_only": True}}
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -145,3 +148,188 @@ class MessageSerializer(serializers.ModelSerializer):
         model = Message
         fields = ["id", "text", "date", "sent_by_user", "owner"]
         extra_kwargs = {"owner": {"read_only": True}}
+
+
+class SolverJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the SolverJob model.
+
+    This serializer reports the state of a queued schedule optimization, every field is
+    read-only as jobs are only changed by the solver worker.
+
+    Fields:
+        id (int): The unique identifier of the job.
+        kind (str): What the job runs: 'optimize', 'scenario-sweep' or 'solution-pool'.
+        state (str): The state of the job: 'queued', 'running', 'finished' or 'failed'.
+        progress (int): The progress of the job in percent.
+        parameters (dict): The parameters of the optimization.
+        status (int): The solver status code, None until the job is finished.
+        message (str): The final status message, or the error if the job failed.
+        created_at (datetime): The date when the job was queued.
+        started_at (datetime): The date when the worker picked the job up.
+        heartbeat_at (datetime): The last time the worker running the job reported in.
+        attempts (int): The number of times a worker claimed the job.
+        finished_at (datetime): The date when the job finished.
+        owner (User): The user who queued the job.
+    """
+
+    class Meta:
+        """
+        Meta class for SolverJobSerializer.
+
+        Attributes:
+            model (Model): The Django model that this serializer is associated with. 
+                            In this case, it is the `SolverJob` model.
+            fields (list): A list of field names to include in the serialized data.
+            read_only_fields (list): Every field, jobs are not editable through the API.
+        """
+        model = SolverJob
+        fields = [
+            "id", "kind", "state", "progress", "parameters", "status", "message", "created_at",
+            "started_at", "heartbeat_at", "attempts", "finished_at", "owner"
+        ]
+        read_only_fields = fields
+
+
+class ScenarioVariantSerializer(serializers.Serializer):
+    """
+    Serializer validating one variant of a scenario sweep.
+
+    Fields:
+        name (str): The name of the scenario.
+        multiplier (float): The scaling factor of the coverage, defaults to 1.
+        rejected_vacations (dict): The 1-based vacation days of the application week to reject,
+                                   per username.
+        min_workers (list): The minimum number of workers for each shift (21 values), replacing
+                            the coverage table scaled by the multiplier.
+    """
+    name = serializers.CharField()
+    multiplier = serializers.FloatField(default=1, min_value=0)
+    rejected_vacations = serializers.DictField(
+        child=serializers.ListField(
+            child=serializers.IntegerField(min_value=1, max_value=DAYS_IN_WEEK)),
+        required=False
+    )
+    min_workers = serializers.ListField(
+        child=serializers.IntegerField(min_value=0),
+        min_length=NUMBER_OF_SHIFTS,
+        max_length=NUMBER_OF_SHIFTS,
+        required=False
+    )
+
+
+class SolutionPoolSerializer(serializers.Serializer):
+    """
+    Serializer validating a solution pool request.
+
+    Fields:
+        multiplier (float): The scaling factor of the coverage, defaults to 1.
+        size (int): The maximum number of draft schedules, defaults to
+                    `settings.SOLVER_SOLUTION_POOL_SIZE`.
+    """
+    multiplier = serializers.FloatField(default=1, min_value=0)
+    size = serializers.IntegerField(min_value=1, max_value=MAX_SOLUTION_POOL_SIZE, required=False)
+
+
+class ScenarioSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the Scenario model, one row of the comparison table of a sweep.
+
+    The schedule itself is left out, it is only needed when the scenario is committed.
+
+    Fields:
+        id (int): The unique identifier of the scenario.
+        sweep (UUID): The id of the sweep.
+        name (str): The name of the scenario.
+        parameters (dict): The variant of the scenario.
+        week_number (int): The application week.
+        status (int): The solver status code.
+        objective (float): The number of granted applications.
+        gap (float): The relative gap of the schedule.
+        wall_time (int): The solver runtime in milliseconds.
+        committed (bool): Whether the scenario was written to the rosters.
+        superseded (bool): Whether another scenario of the sweep was committed.
+    """
+
+    class Meta:
+        """
+        Meta class for ScenarioSerializer.
+
+        Attributes:
+            model (Model): The Django model that this serializer is associated with. 
+                            In this case, it is the `Scenario` model.
+            fields (list): A list of field names to include in the serialized data.
+            read_only_fields (list): Every field, scenarios are created by the sweep.
+        """
+        model = Scenario
+        fields = [
+            "id", "sweep", "name", "parameters", "week_number", "status", "objective", "gap",
+            "wall_time", "committed", "superseded"
+        ]
+        read_only_fields = fields
+
+
+class SolverRunSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the SolverRun model, the statistics of one solve.
+
+    Fields:
+        id (int): The unique identifier of the run.
+        kind (str): The solved problem: 'optimize', 'horizon' or 'reoptimize'.
+        week_number (int): The week the run was solved for.
+        engine (str): The solver engine.
+        backend (str): The solver backend.
+        status (int): The solver status code.
+        objective (float): The objective value of the solution.
+        best_bound (float): The best proven bound of the objective.
+        gap (float): The relative gap of the solution.
+        build_time (int): The time to build and load the model in milliseconds.
+        solve_time (int): The solver runtime in milliseconds.
+        write_back_time (int): The time to save the rosters in milliseconds.
+        num_variables (int): The number of variables loaded into the solver.
+        num_constraints (int): The number of constraints loaded into the solver.
+        num_workers (int): The number of workers in the model.
+        multiplier (float): The scaling factor of the coverage.
+        created_at (datetime): The date when the run finished.
+    """
+
+    class Meta:
+        """
+        Meta class for SolverRunSerializer.
+
+        Attributes:
+            model (Model): The Django model that this serializer is associated with. 
+                            In this case, it is the `SolverRun` model.
+            fields (list): A list of field names to include in the serialized data.
+            read_only_fields (list): Every field, runs are only recorded by the solver.
+        """
+        model = SolverRun
+        fields = [
+            "id", "kind", "week_number", "engine", "backend", "status", "objective",
+            "best_bound", "gap", "build_time", "solve_time", "write_back_time", "num_variables",
+            "num_constraints", "num_workers", "multiplier", "created_at"
+        ]
+        read_only_fields = fields
+
+
+
+class SolverRunFilterSerializer(serializers.Serializer):
+    """
+    Serializer validating the query parameters filtering the solver runs.
+
+    Fields:
+        kind (str): The solved problem: 'optimize', 'horizon' or 'reoptimize'.
+        engine (str): The solver engine.
+        backend (str): The solver backend.
+        status (int): The solver status code.
+        week_number (int): The week the runs were solved for.
+        created_after (date): The first day the runs finished on.
+        created_before (date): The last day the runs finished on.
+    """
+    kind = serializers.CharField(required=False)
+    engine = serializers.CharField(required=False)
+    backend = serializers.CharField(required=False)
+    status = serializers.IntegerField(required=False)
+    week_number = serializers.IntegerField(required=False)
+    created_after = serializers.DateField(required=False)
+    created_before = serializers.DateField(required=False)
@@ -1,840 +1,1855 @@
-from typing import Dict, Tuple
-from itertools import islice
-from django.contrib.auth.models import User
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import django
+import numpy as np
+from django.conf import settings
+from django.db import transaction
 from ortools.linear_solver import pywraplp
 
-from .models import Roster
+from .capacity_check import CapacityShortageError, check_schedule_capacity
+from .column_generation import solve_column_generation
+from .coverage import get_min_workers
+from .heuristic import VIOLATION_TOLERANCE, LocalSearchResult, RowActivity, improve_schedule
+from .model_builder import (
+    build_reoptimization_model,
+    build_schedule_model_template,
+    fix_reoptimization_workers,
+    freeze_schedule_weeks,
+    get_optimized_week_variables,
+    get_reoptimization_neighborhood,
+    ScheduleModel,
+    update_schedule_model
+)
+from .model_cache import (
+    HorizonIncumbent,
+    checkin_model_template,
+    checkout_model_template,
+    get_horizon_incumbent,
+    get_template_key,
+    set_horizon_incumbent,
+)
+from .models import Roster, SolverRun
+from .presolve import PresolvedModel, presolve_model
+from .result_cache import (
+    find_cached_result,
+    get_changed_rosters,
+    get_input_hash,
+    get_result_rosters,
+)
+from .solver_backends import (
+    FEASIBLE_STATUSES,
+    CpSatBackend,
+    LinearSolverBackend,
+    get_relative_gap,
+    get_solver_backend,
+    is_proven_optimal,
+)
+from .solver_instances import record_solver_instance
 from .utils.common_fn import (
-    get_day_mapping,
-    get_roster_mapping,
-    max_consecutive_days_in_roster,
-    merge_roster_strings
+    array_to_roster_strings,
+    compare_roster_matrices,
+    merge_roster_matrices
 )
-from .utils.constants import CHAR_ZERO
+from .utils.constants import DAYS_IN_WEEK, NUMBER_OF_SHIFTS
 from .utils.date_time_fn import get_current_week_number
-from .utils.model_fn import get_rosters_by_week
+from .utils.model_fn import get_crew_group_names, get_rosters_by_owner, get_week_matrices
 from .utils.solver_constants import (
-    DAYS_INDEX_1_14,
-    DAYS_INDEX_1_6,
-    DAYS_INDEX_1_7,
-    DAYS_INDEX_2_7,
-    DAYS_INDEX_8_13,
-    DAYS_INDEX_8_14,
-    DAYS_INDEX_9_14,
-    FIRST_WEEK_DAY_INDEX_END,
-    FIRST_WEEK_DAY_INDEX_START,
-    SECOND_WEEK_DAY_INDEX_START,
-    SECOND_WEEK_DAY_INDEX_END,
-    ROSTER_INDEX_1_21,
-    ROSTER_INDEX_1_42,
-    ROSTER_INDEX_22_42,
-    ROSTER_INDEX_START,
-    ROSTER_INDEX_END,
+    DAYS_IN_TWO_WEEKS,
+    PUBLISHED_ROSTER_FIELDS,
+    SHIFTS_IN_TWO_WEEKS,
+    SHIFTS_PER_DAY,
+    SOLVER_ENGINE_COLUMN_GENERATION,
+    SOLVER_ENGINE_COMPACT,
+    SOLVER_ENGINE_HEURISTIC,
+    SOLVER_ENGINE_RESULT_CACHE,
+    SOLVER_RUN_HORIZON,
+    SOLVER_RUN_OPTIMIZE,
+    SOLVER_RUN_REOPTIMIZE,
 )
+from .warm_start import get_application_week_hint_values, get_schedule_hint
 
 
-def get_min_workers_both_weeks(multiplier: int) -> Dict[int, int]:
+class ScheduleInputs(NamedTuple):
+    """
+    The rosters `optimize_schedule` works on, converted to matrices with one row per worker.
+
+    Attributes:
+        application_week_number (int): The week number of the application week.
+        workers (List[str]): The usernames of the workers.
+        next_week_schedules (np.ndarray): A (workers, 21) matrix of the next week's schedule.
+        next_week_work_days (np.ndarray): A (workers, 7) matrix of the next week's work days.
+        next_week_off_days (np.ndarray): A (workers, 7) matrix of the next week's off days.
+        next_week_reserve_days (np.ndarray): A (workers, 7) matrix of the next week's reserve days.
+        next_week_published (np.ndarray): Whether the next week's roster of a worker is published.
+        applications (np.ndarray): A (workers, 21) matrix of the application week's applications.
+        vacation (np.ndarray): A (workers, 7) matrix of the application week's vacation.
+        sickness (np.ndarray): A (workers, 7) matrix of the application week's sickness.
+    """
+    application_week_number: int
+    workers: List[str]
+    next_week_schedules: np.ndarray
+    next_week_work_days: np.ndarray
+    next_week_off_days: np.ndarray
+    next_week_reserve_days: np.ndarray
+    next_week_published: np.ndarray
+    applications: np.ndarray
+    vacation: np.ndarray
+    sickness: np.ndarray
+
+
+def get_schedule_inputs(
+    number_of_users_to_solve: Optional[int] = None,
+    a: int = 0,
+    b: int = 0,
+    usernames: Optional[List[str]] = None
+) -> ScheduleInputs:
     """
-    Calculates the minimum number of workers required for both weeks, scaled by a multiplier.
+    Loads the rosters of the fixed week and the application week. Workers without a roster in
+    both weeks are left out.
 
     Args:
-        multiplier (int): A factor by which the base worker counts are multiplied.
+        number_of_users_to_solve (Optional[int], optional): The maximum number of users to include
+                                                            in the optimization. Defaults to None,
+                                                            meaning every worker.
+        a (int, optional): Week offset of the fixed week. Defaults to 0.
+        b (int, optional): Week offset of the application week. Defaults to 0.
+        usernames (Optional[List[str]], optional): The workers to load. Defaults to None, meaning
+                                                   every worker.
 
     Returns:
-        Dict[int, int]: A dictionary mapping day indices (1-42) to the minimum number of workers
-        required.
-
-    Notes:
-        - Days 1 to 21 correspond to the first week, while days 22 to 42 correspond to the second
-        week.
-        - The input multiplier scales the base worker counts proportionally.
-    """
-    min_workers = {
-        1: 2, 2: 4, 3: 2, 4: 2, 5: 4, 6: 2, 7: 2, 8: 4, 9: 2, 10: 2,
-        11: 4, 12: 2, 13: 2, 14: 4, 15: 2, 16: 1, 17: 2, 18: 1, 19: 1, 20: 2,
-        21: 1, 22: 2, 23: 4, 24: 2, 25: 2, 26: 4, 27: 2, 28: 2, 29: 4, 30: 2,
-        31: 2, 32: 4, 33: 2, 34: 2, 35: 4, 36: 2, 37: 1, 38: 2, 39: 1, 40: 1,
-        41: 2, 42: 1
-    }
+        ScheduleInputs: The rosters as matrices.
+    """
+    next_week_number = get_current_week_number(1 - a)
+    application_week_number = get_current_week_number(2 - b)
+    week = get_week_matrices([next_week_number, application_week_number],
+                             number_of_users_to_solve, usernames)
+    if week.missing:
+        print('Workers missing a week:', week.missing)
+
+    return ScheduleInputs(
+        application_week_number,
+        week.workers,
+        week.schedule[:, 0],
+        week.work_days[:, 0],
+        week.off_days[:, 0],
+        week.reserve_days[:, 0],
+        week.published[:, 0],
+        week.application[:, 1],
+        week.vacation[:, 1],
+        week.sickness[:, 1]
+    )
+
+
+def save_application_week_rosters(
+    week_number: int,
+    workers: List[str],
+    schedules: np.ndarray,
+    work_days: np.ndarray,
+    off_days: np.ndarray,
+    reserve_days: np.ndarray,
+    suboptimal: np.ndarray
+) -> None:
+    """
+    Writes an optimized application week back to the rosters and publishes them. The rosters are
+    fetched in one query and updated in one transaction, so a week is never half published.
 
-    return {key: value * multiplier for key, value in min_workers.items()}
+    Args:
+        week_number (int): The week number of the application week.
+        workers (List[str]): The usernames of the workers, in matrix row order.
+        schedules (np.ndarray): A (workers, 21) matrix of the schedule.
+        work_days (np.ndarray): A (workers, 7) matrix of the work days.
+        off_days (np.ndarray): A (workers, 7) matrix of the off days.
+        reserve_days (np.ndarray): A (workers, 7) matrix of the reserve days.
+        suboptimal (np.ndarray): Whether the schedule of each worker is not proven optimal.
+
+    Raises:
+        Roster.DoesNotExist: If a worker has no roster for the week, nothing is written then.
+    """
+    schedules = array_to_roster_strings(schedules)
+    work_days = array_to_roster_strings(work_days)
+    off_days = array_to_roster_strings(off_days)
+    reserve_days = array_to_roster_strings(reserve_days)
+
+    rosters = get_rosters_by_owner([week_number], workers)
+    missing = [worker for worker in workers if (week_number, worker) not in rosters]
+    if missing:
+        raise Roster.DoesNotExist(f"No roster in week {week_number} for: {', '.join(missing)}")
+
+    updated_rosters = []
+    for worker_index, worker in enumerate(workers):
+        roster = rosters[week_number, worker]
+        roster.schedule = schedules[worker_index]
+        roster.work_days = work_days[worker_index]
+        roster.off_days = off_days[worker_index]
+        roster.reserve_days = reserve_days[worker_index]
+        roster.published = True
+        roster.suboptimal = bool(suboptimal[worker_index])
+        updated_rosters.append(roster)
+
+    with transaction.atomic():
+        Roster.objects.bulk_update(updated_rosters, PUBLISHED_ROSTER_FIELDS)
+
+
+class ReoptimizationInputs(NamedTuple):
+    """
+    The rosters `reoptimize_schedule_after_sickness` works on, the current and the next week
+    side by side in matrices with one row per worker.
+
+    Attributes:
+        current_week_number (int): The week number of the current week.
+        next_week_number (int): The week number of the next week.
+        workers (List[str]): The usernames of the workers.
+        schedules (np.ndarray): A (workers, 42) matrix of the published schedules.
+        published_work_days (np.ndarray): A (workers, 14) matrix of the published work days.
+        work_days (np.ndarray): A (workers, 14) matrix of the work days, including call-ins.
+        off_days (np.ndarray): A (workers, 14) matrix of the off days.
+        reserve_days (np.ndarray): A (workers, 14) matrix of the reserve days.
+        vacation (np.ndarray): A (workers, 14) matrix of the vacation days.
+        sickness (np.ndarray): A (workers, 14) matrix of the sick days.
+        reserve_call_in (np.ndarray): A (workers, 2) boolean matrix, True if the worker was called
+                                      in from reserve in the given week.
+        day_off_call_in (np.ndarray): A (workers, 2) boolean matrix, True if the worker was called
+                                      in on a day off in the given week.
+    """
+    current_week_number: int
+    next_week_number: int
+    workers: List[str]
+    schedules: np.ndarray
+    published_work_days: np.ndarray
+    work_days: np.ndarray
+    off_days: np.ndarray
+    reserve_days: np.ndarray
+    vacation: np.ndarray
+    sickness: np.ndarray
+    reserve_call_in: np.ndarray
+    day_off_call_in: np.ndarray
+
+
+class ReoptimizationResult(NamedTuple):
+    """
+    The solved reoptimization model of `solve_reoptimization`.
+
+    Attributes:
+        status (int): The `pywraplp.Solver` status code.
+        model (ScheduleModel): The model, with the workers outside the neighborhood fixed.
+        presolved (PresolvedModel): The presolved model loaded into the solver.
+        solver_backend (Union[LinearSolverBackend, CpSatBackend]): The backend holding the
+                                                                   solution.
+        neighborhood (np.ndarray): A boolean mask of the reoptimized workers.
+        build_time (float): The time to build and load the model in milliseconds.
+    """
+    status: int
+    model: ScheduleModel
+    presolved: PresolvedModel
+    solver_backend: Union[LinearSolverBackend, CpSatBackend]
+    neighborhood: np.ndarray
+    build_time: float
 
 
-def get_min_workers_second_week(multiplier: int) -> Dict[int, int]:
+def get_reoptimization_inputs(
+    number_of_users_to_solve: Optional[int] = None
+) -> ReoptimizationInputs:
     """
-    Calculates the minimum number of workers required for the second week, scaled by a multiplier.
+    Loads the rosters of the current and the next week. Workers without a roster in both weeks
+    are left out.
 
     Args:
-        multiplier (int): A factor by which the base worker counts are multiplied.
+        number_of_users_to_solve (Optional[int], optional): The maximum number of users to include
+                                                            in the optimization. Defaults to None,
+                                                            meaning every worker.
 
     Returns:
-        Dict[int, int]: A dictionary mapping day indices (22-42) to the minimum number of workers
-        required.
-
-    Notes:
-        - The second week consists of days 22 to 42.
-        - The input multiplier scales the base worker counts proportionally.
+        ReoptimizationInputs: The rosters as matrices.
     """
-    min_workers = {
-        22: 2, 23: 4, 24: 2, 25: 2, 26: 4, 27: 2, 28: 2, 29: 4, 30: 2,
-        31: 2, 32: 4, 33: 2, 34: 2, 35: 4, 36: 2, 37: 1, 38: 2, 39: 1, 40: 1,
-        41: 2, 42: 1
-    }
+    current_week_number = get_current_week_number(0)
+    next_week_number = get_current_week_number(1)
+    week = get_week_matrices([current_week_number, next_week_number], number_of_users_to_solve)
+    if week.missing:
+        print('Workers missing a week:', week.missing)
+
+    return ReoptimizationInputs(
+        current_week_number,
+        next_week_number,
+        week.workers,
+        week.join('schedule'),
+        week.join('work_days'),
+        merge_roster_matrices(week.join('work_days'), week.join('reserve_call_in_days'),
+                              week.join('day_off_call_in_days')),
+        week.join('off_days'),
+        week.join('reserve_days'),
+        week.join('vacation'),
+        week.join('sickness'),
+        week.reserve_call_in,
+        week.day_off_call_in
+    )
+
+
+def solve_reoptimization(
+    inputs: ReoptimizationInputs,
+    multiplier: float,
+    day_index: int,
+    backend: str,
+    num_search_workers: int,
+    time_limit: Optional[float],
+    relative_gap_limit: Optional[float],
+    neighborhood_size: int,
+    min_workers: np.ndarray,
+    debug_names: bool = False
+) -> ReoptimizationResult:
+    """
+    Builds and solves the reoptimization model of `reoptimize_schedule_after_sickness`. Doesn't
+    touch the database, so recorded instances can be replayed.
+
+    Only the sick workers and a neighborhood of candidates (see
+    `get_reoptimization_neighborhood`) are reoptimized. If they cannot cover the schedule, every
+    worker is reoptimized.
 
-    return {key: value * multiplier for key, value in min_workers.items()}
+    Args:
+        inputs (ReoptimizationInputs): The rosters of the current and the next week.
+        multiplier (float): Factor for determining the number of reserve workers per day.
+        day_index (int): The 1-based day index from which the schedule is reoptimized.
+        backend (str): The solver backend, 'scip' or 'cp-sat'.
+        num_search_workers (int): The number of parallel CP-SAT search workers.
+        time_limit (Optional[float]): The time limit of the solve in seconds.
+        relative_gap_limit (Optional[float]): The relative gap at which the search stops early.
+        neighborhood_size (int): The number of candidate workers reoptimized besides the sick
+                                 workers, 0 reoptimizes every worker.
+        min_workers (np.ndarray): The minimum number of workers for each shift of both weeks (42
+                                  values).
+        debug_names (bool, optional): If True, variables and constraints get readable names.
+                                      Defaults to False.
+
+    Returns:
+        ReoptimizationResult: The solved model and the solve statistics.
+    """
+    build_start = time.perf_counter()
+
+    model = build_reoptimization_model(
+        inputs.workers,
+        inputs.schedules,
+        inputs.work_days,
+        inputs.off_days,
+        inputs.reserve_days,
+        inputs.vacation,
+        inputs.sickness,
+        inputs.reserve_call_in,
+        inputs.day_off_call_in,
+        min_workers,
+        multiplier,
+        day_index
+    )
+
+    neighborhood = np.ones(len(inputs.workers), dtype=bool)
+    if neighborhood_size > 0:
+        neighborhood = get_reoptimization_neighborhood(
+            inputs.work_days, inputs.off_days, inputs.reserve_days, inputs.vacation,
+            inputs.sickness, day_index, neighborhood_size)
+    print('Neighborhood workers:', int(neighborhood.sum()), '/', len(inputs.workers))
+
+    solver_backend = get_solver_backend(
+        backend, num_search_workers, time_limit, relative_gap_limit)
+
+    build_time = (time.perf_counter() - build_start) * 1000
+    full_bounds = (model.lower_bounds.copy(), model.upper_bounds.copy())
+    while True:
+        build_start = time.perf_counter()
+        restricted = not neighborhood.all()
+        if restricted:
+            fix_reoptimization_workers(model, ~neighborhood, inputs.schedules, inputs.work_days,
+                                       inputs.off_days, inputs.reserve_days)
+
+        presolved = presolve_model(model)
+        print('Variables (presolved):', model.num_variables, '->',
+              presolved.model.num_variables)
+        print('Constraints (presolved):', model.num_constraints, '->',
+              presolved.model.num_constraints)
+
+        status = pywraplp.Solver.INFEASIBLE
+        if not presolved.infeasible:
+            solver_backend.load(presolved.model, debug_names)
+            build_time += (time.perf_counter() - build_start) * 1000
+            status = solver_backend.solve()
+
+        if status in FEASIBLE_STATUSES or not restricted:
+            break
+
+        # The neighborhood cannot cover the sickness, fall back to every worker
+        print('Neighborhood infeasible, reoptimizing every worker')
+        model.lower_bounds, model.upper_bounds = (bounds.copy() for bounds in full_bounds)
+        neighborhood[:] = True
+
+    return ReoptimizationResult(status, model, presolved, solver_backend, neighborhood,
+                                build_time)
 
 
 def reoptimize_schedule_after_sickness(
-    number_of_users_to_solve: int,
+    number_of_users_to_solve: Optional[int],
     multiplier: int,
-    day_index: int
-) -> Tuple[int, int, int]:
+    day_index: int,
+    backend: Optional[str] = None,
+    num_search_workers: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    relative_gap_limit: Optional[float] = None,
+    debug_names: bool = False,
+    neighborhood_size: Optional[int] = None
+) -> Tuple[int, int, int, Optional[float]]:
     """
     Reoptimizes worker shift schedules for two weeks, adjusting for sickness, vacation,
     and other constraints while ensuring proper staffing and fairness.
 
     Args:
-        number_of_users_to_solve (int): Number of workers to include in the optimization.
+        number_of_users_to_solve (Optional[int]): Maximum number of workers to include in the
+                                                  optimization, None for every worker.
         multiplier (int): Factor for determining the number of reserve workers per day.
         day_index (int): The specific day (1-based index) up to which the schedule should be
         optimized.
+        backend (Optional[str], optional): The solver backend, 'scip' or 'cp-sat'. Defaults to
+                                           `settings.SOLVER_BACKEND`.
+        num_search_workers (Optional[int], optional): The number of parallel CP-SAT search
+                                                      workers. Defaults to
+                                                      `settings.SOLVER_NUM_SEARCH_WORKERS`.
+        time_limit (Optional[float], optional): The time limit of the solve in seconds. Defaults
+                                                to `settings.SOLVER_TIME_LIMIT`.
+        relative_gap_limit (Optional[float], optional): The relative gap at which the search
+                                                        stops early. Defaults to
+                                                        `settings.SOLVER_RELATIVE_GAP_LIMIT`.
+        debug_names (bool, optional): If True, variables and constraints get readable names.
+                                      Defaults to False.
+        neighborhood_size (Optional[int], optional): The number of candidate workers reoptimized
+                                                     besides the sick workers, the schedule of
+                                                     everyone else is kept, 0 reoptimizes every
+                                                     worker. Defaults to
+                                                     `settings.SOLVER_REOPTIMIZATION_NEIGHBORHOOD`.
 
     Returns:
-        Tuple[int, int, int]: 
+        Tuple[int, int, int, Optional[float]]:
             - Solver status (int): Indicates whether an optimal solution was found.
             - Solver runtime (int): Time taken by the solver to run (in milliseconds).
             - Number of constraints (int): The total number of constraints in the model.
+            - Relative gap (Optional[float]): The gap of the saved solution, None if no solution
+              was found.
 
     Notes:
-        - This function uses Google OR-Tools' SCIP solver for optimization.
+        - The model is built by `build_reoptimization_model` and solved by the selected backend.
         - Adjusts both current and next week's rosters, depending on `day_index`.
-        - Outputs updated schedules to the database.
+        - Only the sick workers and a neighborhood of candidates (see
+          `get_reoptimization_neighborhood`) are reoptimized. If they cannot cover the schedule,
+          every worker is reoptimized.
+        - Outputs updated schedules to the database, rosters that did not change are not written.
+          If the solver stops at the time limit or the gap limit, the best solution found is
+          saved and the changed rosters are flagged as `suboptimal`.
+        - The statistics of the run are saved as a `SolverRun`.
     """
 
-    solver = pywraplp.Solver.CreateSolver('SCIP')
-    solver.SetSolverSpecificParametersAsString("display/verblevel = 4")
-    solver.EnableOutput()
+    inputs = get_reoptimization_inputs(number_of_users_to_solve)
+    current_week_number = inputs.current_week_number
+    next_week_number = inputs.next_week_number
+    workers = inputs.workers
+    parameters = {
+        'backend': backend or settings.SOLVER_BACKEND,
+        'num_search_workers': num_search_workers or settings.SOLVER_NUM_SEARCH_WORKERS,
+        'time_limit': time_limit if time_limit is not None else settings.SOLVER_TIME_LIMIT,
+        'relative_gap_limit': relative_gap_limit if relative_gap_limit is not None
+        else settings.SOLVER_RELATIVE_GAP_LIMIT,
+        'neighborhood_size': neighborhood_size if neighborhood_size is not None
+        else settings.SOLVER_REOPTIMIZATION_NEIGHBORHOOD,
+    }
+    backend = parameters['backend']
+    min_workers = np.concatenate([get_min_workers(current_week_number, multiplier),
+                                  get_min_workers(next_week_number, multiplier)])
+
+    result = solve_reoptimization(inputs, multiplier, day_index, **parameters,
+                                  min_workers=min_workers, debug_names=debug_names)
+    status, model, presolved, solver_backend, _, build_time = result
+
+    if settings.SOLVER_RECORD_INSTANCES:
+        solved = status in FEASIBLE_STATUSES
+        record_solver_instance(
+            SOLVER_RUN_REOPTIMIZE,
+            current_week_number,
+            {**{field: value for field, value in inputs._asdict().items()
+                if isinstance(value, np.ndarray)},
+             'workers': np.array(workers), 'min_workers': min_workers},
+            {
+                'next_week_number': next_week_number,
+                'multiplier': multiplier,
+                'day_index': day_index,
+                **parameters,
+                'status': status,
+                'objective': solver_backend.objective_value() if solved else None,
+                'solve_time': solver_backend.wall_time() if not presolved.infeasible else None,
+            },
+            {'model': presolved.model}
+        )
 
-    var_schedule = {}
-    var_work_days = {}
-    var_off_days = {}
-    var_reserve_days = {}
-    var_vacation = {}
-    var_sickness = {}
+    solver_run = SolverRun(
+        kind=SOLVER_RUN_REOPTIMIZE,
+        week_number=current_week_number,
+        engine=SOLVER_ENGINE_COMPACT,
+        backend=backend,
+        status=status,
+        build_time=round(build_time),
+        num_variables=presolved.model.num_variables,
+        num_constraints=presolved.model.num_constraints,
+        num_workers=len(workers),
+        multiplier=multiplier
+    )
+    gap = None
+
+    if presolved.infeasible:
+        solver_run.save()
+        return status, 0, presolved.model.num_constraints, None
+
+    solver_run.solve_time = solver_backend.wall_time()
+
+    if status in FEASIBLE_STATUSES:
+        write_back_start = time.perf_counter()
+        gap = solver_backend.relative_gap()
+        suboptimal = not is_proven_optimal(status, gap)
+        solver_run.objective = solver_backend.objective_value()
+        solver_run.best_bound = solver_backend.best_bound()
+        solver_run.gap = gap
+        values = presolved.restore(solver_backend.values())
+        results = [values[model.blocks[name]] for name in
+                   ('var_schedule', 'var_work_days', 'var_off_days', 'var_reserve_days')]
+        published = [inputs.schedules, inputs.published_work_days, inputs.off_days,
+                     inputs.reserve_days]
 
-    p_work_days = {}
-    p_off_days = {}
-    p_reserve = {}
-    p_res_day = {}
+        if day_index > 7:
+            weeks = ((next_week_number, slice(NUMBER_OF_SHIFTS, SHIFTS_IN_TWO_WEEKS),
+                      slice(DAYS_IN_WEEK, DAYS_IN_TWO_WEEKS)),)
+        else:
+            weeks = ((current_week_number, slice(0, NUMBER_OF_SHIFTS), slice(0, DAYS_IN_WEEK)),
+                     (next_week_number, slice(NUMBER_OF_SHIFTS, SHIFTS_IN_TWO_WEEKS),
+                      slice(DAYS_IN_WEEK, DAYS_IN_TWO_WEEKS)))
+
+        # Rows of the changed rosters of each week and their new roster strings
+        week_changes = []
+        for week_number, shifts, days in weeks:
+            columns = (shifts, days, days, days)
+            changed, _ = compare_roster_matrices(
+                [matrix[:, column] for matrix, column in zip(published, columns)],
+                [matrix[:, column] for matrix, column in zip(results, columns)])
+            rows = np.flatnonzero(changed)
+            week_changes.append((week_number, rows, [
+                array_to_roster_strings(matrix[rows][:, column])
+                for matrix, column in zip(results, columns)
+            ]))
+
+        # Share of the reoptimized slots that kept their published value
+        columns = ((slice((day_index - 1) * SHIFTS_PER_DAY, SHIFTS_IN_TWO_WEEKS),) +
+                   (slice(day_index - 1, DAYS_IN_TWO_WEEKS),) * 3)
+        _, agreement = compare_roster_matrices(
+            [matrix[:, column] for matrix, column in zip(published, columns)],
+            [matrix[:, column] for matrix, column in zip(results, columns)])
+
+        changed_workers = sorted({workers[row] for _, rows, _ in week_changes
+                                  for row in rows.tolist()})
+        rosters = get_rosters_by_owner([week[0] for week in weeks], changed_workers)
+
+        changed_rosters = []
+        for week_number, rows, strings in week_changes:
+            for position, row in enumerate(rows.tolist()):
+                roster = rosters[week_number, workers[row]]
+                roster.schedule, roster.work_days, roster.off_days, roster.reserve_days = (
+                    matrix_strings[position] for matrix_strings in strings)
+                roster.published = True
+                roster.suboptimal = suboptimal
+                changed_rosters.append(roster)
 
-    current_week_number = get_current_week_number(0)
-    next_week_number = get_current_week_number(1)
-    current_week_rosters = get_rosters_by_week(
-        current_week_number, number_of_users_to_solve)
-    next_week_rosters = get_rosters_by_week(
-        next_week_number, number_of_users_to_solve)
-
-    schedules = {}
-    work_days = {}
-    off_days = {}
-    reserve_days = {}
-    vacation = {}
-    sickness = {}
-
-    fw_reserve_call_in = {}
-    sw_reserve_call_in = {}
-    fw_day_off_call_in = {}
-    sw_day_off_call_in = {}
-
-    workers = []
-
-    for current_week_roster, next_week_roster in zip(current_week_rosters, next_week_rosters):
-        username = current_week_roster.owner.username
-        workers.append(username)
-
-        schedules[username] = get_roster_mapping(
-            current_week_roster.schedule + next_week_roster.schedule,
-            1,
-            ROSTER_INDEX_END
-        )
-        work_days_roster_current_week = merge_roster_strings(
-            current_week_roster.work_days,
-            current_week_roster.reserve_call_in_days,
-            current_week_roster.day_off_call_in_days
-        )
-        work_days_roster_next_week = merge_roster_strings(
-            next_week_roster.work_days,
-            next_week_roster.reserve_call_in_days,
-            next_week_roster.day_off_call_in_days
-        )
-        work_days[username] = get_day_mapping(
-            work_days_roster_current_week + work_days_roster_next_week,
-            FIRST_WEEK_DAY_INDEX_START,
-            SECOND_WEEK_DAY_INDEX_END
-        )
-        off_days[username] = get_day_mapping(
-            current_week_roster.off_days + next_week_roster.off_days,
-            FIRST_WEEK_DAY_INDEX_START, SECOND_WEEK_DAY_INDEX_END
-        )
-        reserve_days[username] = get_day_mapping(
-            current_week_roster.reserve_days + next_week_roster.reserve_days,
-            FIRST_WEEK_DAY_INDEX_START,
-            SECOND_WEEK_DAY_INDEX_END
-        )
-        vacation[username] = get_day_mapping(
-            current_week_roster.vacation + next_week_roster.vacation,
-            FIRST_WEEK_DAY_INDEX_START,
-            SECOND_WEEK_DAY_INDEX_END
-        )
-        sickness[username] = get_day_mapping(
-            current_week_roster.sickness + next_week_roster.sickness,
-            FIRST_WEEK_DAY_INDEX_START,
-            SECOND_WEEK_DAY_INDEX_END
+        with transaction.atomic():
+            Roster.objects.bulk_update(changed_rosters, PUBLISHED_ROSTER_FIELDS)
+
+        # Retrieve and print statistics
+        print('Model build time (ms):', round(build_time))
+        print('Solver runtime (ms):', solver_backend.wall_time())
+        print('Number of constraints:', solver_backend.num_constraints())
+        print('Relative gap:', gap)
+        print('Rosters changed:', len(changed_rosters))
+        print('Agreement with the published schedule (shifts, work, off, reserve days):',
+              np.round(agreement, 3).tolist())
+
+        solver_run.write_back_time = round((time.perf_counter() - write_back_start) * 1000)
+
+    solver_run.save()
+
+    return status, solver_backend.wall_time(), solver_backend.num_constraints(), gap
+
+
+class PoolSolution(NamedTuple):
+    """
+    One of the distinct solutions of a solution pool solve.
+
+    Attributes:
+        objective (float): The objective value of the solution.
+        schedules (np.ndarray): The (workers, 21) schedule.
+        work_days (np.ndarray): The (workers, 7) work days.
+        off_days (np.ndarray): The (workers, 7) off days.
+        reserve_days (np.ndarray): The (workers, 7) reserve days.
+    """
+    objective: float
+    schedules: np.ndarray
+    work_days: np.ndarray
+    off_days: np.ndarray
+    reserve_days: np.ndarray
+
+
+class ShardResult(NamedTuple):
+    """
+    The optimized application week of one crew shard.
+
+    Attributes:
+        status (int): The `pywraplp.Solver` status code.
+        schedules (Optional[np.ndarray]): The (workers, 21) schedule, None if not solved.
+        work_days (Optional[np.ndarray]): The (workers, 7) work days, None if not solved.
+        off_days (Optional[np.ndarray]): The (workers, 7) off days, None if not solved.
+        reserve_days (Optional[np.ndarray]): The (workers, 7) reserve days, None if not solved.
+        wall_time (int): The solver runtime in milliseconds.
+        num_constraints (int): The number of constraints of the model.
+        gap (Optional[float]): The relative gap of the schedule, None if not solved.
+        num_classes (int): The number of classes of interchangeable workers the model was solved
+                           with, the number of workers if they were not aggregated.
+        objective (Optional[float]): The objective value of the schedule, None if not solved.
+        bound (Optional[float]): The best proven bound of the objective, None if unknown.
+        build_time (int): The time to build and load the model in milliseconds.
+        num_variables (int): The number of variables of the model, the number of generated
+                             columns in the column generation engine.
+        pool (Optional[List[PoolSolution]]): The distinct solutions, best first, if a solution
+                                             pool was requested and a schedule was found.
+    """
+    status: int
+    schedules: Optional[np.ndarray]
+    work_days: Optional[np.ndarray]
+    off_days: Optional[np.ndarray]
+    reserve_days: Optional[np.ndarray]
+    wall_time: int
+    num_constraints: int
+    gap: Optional[float]
+    num_classes: int
+    objective: Optional[float]
+    bound: Optional[float]
+    build_time: int
+    num_variables: int
+    pool: Optional[List[PoolSolution]] = None
+
+
+def create_solver_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Creates the process pool solving independent models in parallel.
+
+    Spawned processes don't inherit open database connections or solver threads, each of them
+    sets up Django on start.
+
+    Args:
+        max_workers (int): The number of processes.
+
+    Returns:
+        ProcessPoolExecutor: The process pool.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup
+    )
+
+
+def split_schedule_inputs(
+    inputs: ScheduleInputs,
+    shard_keys: List[Optional[str]]
+) -> Dict[Optional[str], ScheduleInputs]:
+    """
+    Splits the inputs into independent shards, one per distinct key.
+
+    Args:
+        inputs (ScheduleInputs): The inputs of every worker.
+        shard_keys (List[Optional[str]]): The shard of each worker, e.g. their crew group.
+
+    Returns:
+        Dict[Optional[str], ScheduleInputs]: The inputs of each shard, in order of appearance.
+    """
+    shard_keys = np.array(shard_keys, dtype=object)
+    shards = {}
+    for key in dict.fromkeys(shard_keys.tolist()):
+        mask = shard_keys == key
+        shards[key] = ScheduleInputs(
+            inputs.application_week_number,
+            [worker for worker, selected in zip(inputs.workers, mask) if selected],
+            *(matrix[mask] for matrix in inputs[2:])
         )
+    return shards
 
-        fw_reserve_call_in[username] = current_week_roster.reserve_call_in
-        sw_reserve_call_in[username] = next_week_roster.reserve_call_in
-        fw_day_off_call_in[username] = current_week_roster.day_off_call_in
-        sw_day_off_call_in[username] = next_week_roster.day_off_call_in
-
-    min_workers = get_min_workers_both_weeks(multiplier)
-
-    # Init variables
-    for worker in workers:
-        for shift in ROSTER_INDEX_1_42:
-            var_schedule[worker, shift] = solver.BoolVar(
-                f'var_schedule[{worker},{shift}]')
-
-        for day in DAYS_INDEX_1_14:
-            var_work_days[worker, day] = solver.BoolVar(
-                f'var_work_days[{worker},{day}]')
-            var_off_days[worker, day] = solver.BoolVar(
-                f'var_off_days[{worker},{day}]')
-            var_reserve_days[worker, day] = solver.BoolVar(
-                f'var_reserve_days[{worker},{day}]')
-            var_vacation[worker, day] = solver.BoolVar(
-                f'var_vacation[{worker},{day}]')
-            var_sickness[worker, day] = solver.BoolVar(
-                f'var_sickness[{worker},{day}]')
-
-            p_work_days[worker, day] = solver.BoolVar(
-                f'p_work_days[{worker},{day}]')
-            p_off_days[worker, day] = solver.BoolVar(
-                f'p_off_days[{worker},{day}]')
-            p_reserve[worker, day] = solver.BoolVar(
-                f'p_reserve[{worker},{day}]')
-            p_res_day[worker, day] = solver.BoolVar(
-                f'p_res_day[{worker},{day}]')
-
-    shift_range = (day_index - 1) * 3 + 1
-    day_range = day_index
-
-    for worker in workers:
-        # Fix variables until the day index
-        for shift in range(1, shift_range):
-            var_schedule[worker, shift].SetBounds(
-                int(schedules[worker][shift]), int(schedules[worker][shift]))
-
-        for day in range(1, day_range):
-            if int(vacation[worker][day]) != 1 and int(sickness[worker][day]) != 1:
-                var_work_days[worker, day].SetBounds(
-                    int(work_days[worker][day]), int(work_days[worker][day]))
-                var_off_days[worker, day].SetBounds(
-                    int(off_days[worker][day]), int(off_days[worker][day]))
-                var_reserve_days[worker, day].SetBounds(
-                    int(reserve_days[worker][day]), int(reserve_days[worker][day]))
-
-        for day in DAYS_INDEX_1_14:
-            if int(vacation[worker][day]) == 1 or int(sickness[worker][day]) == 1:
-                var_work_days[worker, day].SetBounds(0, 0)
-                var_off_days[worker, day].SetBounds(0, 0)
-                var_reserve_days[worker, day].SetBounds(0, 0)
-                if int(vacation[worker][day]) == 1:
-                    var_vacation[worker, day].SetBounds(1, 1)
-                else:
-                    var_sickness[worker, day].SetBounds(1, 1)
-            else:
-                var_vacation[worker, day].SetBounds(0, 0)
-                var_sickness[worker, day].SetBounds(0, 0)
-
-    e, f, g = 10, 50, 20
-
-    objective = solver.Objective()
-    for worker in workers:
-        for shift in ROSTER_INDEX_1_42:
-            coefficient = float(schedules[worker][shift])
-            objective.SetCoefficient(var_schedule[worker, shift], coefficient)
-
-        for day in DAYS_INDEX_1_14:
-            coefficient = float(work_days[worker][day])
-            objective.SetCoefficient(var_work_days[worker, day], coefficient)
-
-            coefficient = float(off_days[worker][day])
-            objective.SetCoefficient(var_off_days[worker, day], coefficient)
-
-            coefficient = float(reserve_days[worker][day])
-            objective.SetCoefficient(
-                var_reserve_days[worker, day], coefficient)
-
-            objective.SetCoefficient(p_work_days[worker, day], -e)
-            objective.SetCoefficient(p_off_days[worker, day], -f)
-            objective.SetCoefficient(p_reserve[worker, day], -g)
-            objective.SetCoefficient(p_res_day[worker, day], 1)
-
-    objective.SetMaximization()
-
-    for worker in workers:
-        fw_vacation_binary = ''.join(list(vacation[worker].values())[:7])
-        sw_vacation_binary = ''.join(list(vacation[worker].values())[-7:])
-        fw_sickness_binary = ''.join(list(sickness[worker].values())[:7])
-        sw_sickness_binary = ''.join(list(sickness[worker].values())[-7:])
-        fw_max_consecutive_number_of_vac_days = max_consecutive_days_in_roster(
-            fw_vacation_binary, CHAR_ZERO)
-        sw_max_consecutive_number_of_vac_days = max_consecutive_days_in_roster(
-            sw_vacation_binary, CHAR_ZERO)
-        fw_max_consecutive_number_of_sick_days = max_consecutive_days_in_roster(
-            fw_sickness_binary, CHAR_ZERO)
-        sw_max_consecutive_number_of_sick_days = max_consecutive_days_in_roster(
-            sw_sickness_binary, CHAR_ZERO)
-        fw_max_cnsc_num_vac_sick_days = max(
-            fw_max_consecutive_number_of_vac_days, fw_max_consecutive_number_of_sick_days)
-        sw_max_cnsc_num_vac_sick_days = max(
-            sw_max_consecutive_number_of_vac_days, sw_max_consecutive_number_of_sick_days)
-
-        fw_work_days = sum(int(wd)
-                           for wd in list(work_days[worker].values())[:7])
-        sw_work_days = sum(int(wd)
-                           for wd in list(work_days[worker].values())[-7:])
-        fw_off_days = sum(int(od)
-                          for od in list(off_days[worker].values())[:7])
-        sw_off_days = sum(int(od)
-                          for od in list(off_days[worker].values())[-7:])
-        fw_reserve_days = sum(int(rd)
-                              for rd in list(reserve_days[worker].values())[:7])
-        sw_reserve_days = sum(int(rd)
-                              for rd in list(reserve_days[worker].values())[-7:])
-
-        fw_number_of_work_days = fw_work_days
-        fw_number_of_off_days = fw_off_days
-        fw_number_of_reserve_days = fw_reserve_days
-        sw_number_of_work_days = sw_work_days
-        sw_number_of_off_days = sw_off_days
-        sw_number_of_reserve_days = sw_reserve_days
-
-        for day in DAYS_INDEX_1_14:
-            solver.Add(p_work_days[worker, day] >= 0)
-            solver.Add(p_off_days[worker, day] >= 0)
-            solver.Add(p_reserve[worker, day] >= 0)
-            solver.Add(p_res_day[worker, day] >= 0)
-
-        # Cut on second week
-        if day_index > 7:
-            # Define work days
-            solver.Add(sum((var_work_days[worker, day] - p_work_days[worker, day])
-                       for day in DAYS_INDEX_8_14) == sw_number_of_work_days)
 
-            # Define off days
-            solver.Add(sum((var_off_days[worker, day] + p_off_days[worker, day])
-                       for day in DAYS_INDEX_8_14) == sw_number_of_off_days)
+def get_application_week_solution(
+    model: ScheduleModel,
+    values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extracts the application week from a solution of the `optimize_schedule` model.
 
-            # Define reserve days
-            solver.Add(sum((var_reserve_days[worker, day] + p_reserve[worker, day])
-                       for day in DAYS_INDEX_8_14) == sw_number_of_reserve_days)
+    Args:
+        model (ScheduleModel): The model of both weeks.
+        values (np.ndarray): The solution values, ordered by model variable index.
 
-            # Each day must have at least 2 reserve workers
-            for day in range(day_index, 15):
-                solver.Add(sum(var_reserve_days[worker, day]
-                           for worker in workers) >= 2 * multiplier)
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The (workers, 21) schedule and the
+        (workers, 7) work, off and reserve days.
+    """
+    return (
+        values[model.blocks['var_schedule'][:, NUMBER_OF_SHIFTS:]],
+        values[model.blocks['var_work_days'][:, DAYS_IN_WEEK:]],
+        values[model.blocks['var_off_days'][:, DAYS_IN_WEEK:]],
+        values[model.blocks['var_reserve_days'][:, DAYS_IN_WEEK:]]
+    )
+
+
+def get_local_search_schedule(
+    model: ScheduleModel,
+    inputs: ScheduleInputs,
+    min_workers: np.ndarray,
+    multiplier: float,
+    time_limit: Optional[float]
+) -> LocalSearchResult:
+    """
+    Builds the application week greedily from the applications and the last published week (see
+    `get_schedule_hint`), then improves it by local search on the model's rows (see
+    `improve_schedule`).
 
-        # Cut on first week
-        else:
-            # Define work days
-            solver.Add(sum((var_work_days[worker, day] - p_work_days[worker, day])
-                       for day in DAYS_INDEX_1_7) == fw_number_of_work_days)
-            solver.Add(sum(var_work_days[worker, day]
-                       for day in DAYS_INDEX_8_14) == sw_number_of_work_days)
-
-            # Define off days
-            solver.Add(sum((var_off_days[worker, day] + p_off_days[worker, day])
-                       for day in DAYS_INDEX_1_7) == fw_number_of_off_days)
-            solver.Add(sum(var_off_days[worker, day]
-                       for day in DAYS_INDEX_8_14) == sw_number_of_off_days)
-
-            # Define reserve days
-            solver.Add(sum((var_reserve_days[worker, day] + p_reserve[worker, day])
-                       for day in DAYS_INDEX_1_7) == fw_number_of_reserve_days)
-            solver.Add(sum(var_reserve_days[worker, day]
-                       for day in DAYS_INDEX_8_14) == sw_number_of_reserve_days)
-
-            # Each day must have at least 2 reserve workers
-            for day in range(day_range, 8):
-                solver.Add(sum(var_reserve_days[worker, day] + p_res_day[worker, day]
-                           for worker in workers) >= 2 * multiplier)
-            for day in DAYS_INDEX_8_14:
-                solver.Add(sum(var_reserve_days[worker, day] + p_res_day[worker, day]
-                           for worker in workers) >= 2 * multiplier)
-
-        # Each day will be a working, off, reserve or a vacation day
-        for day in DAYS_INDEX_1_14:
-            solver.Add(var_work_days[worker, day] +
-                       var_off_days[worker, day] +
-                       var_reserve_days[worker, day] +
-                       var_vacation[worker, day] +
-                       var_sickness[worker, day] == 1)
-
-        # # Each worker can only have shifts on workdays
-        for day in DAYS_INDEX_1_14:
-            solver.Add(sum(var_schedule[worker, (day - 1) * 3 + k]
-                       for k in range(1, 4)) == var_work_days[worker, day])
-
-        # # Each worker can work at most one shift per day
-        for day in DAYS_INDEX_1_14:
-            solver.Add(sum(var_schedule[worker, (day - 1) * 3 + k]
-                       for k in range(1, 4)) <= 1)
-
-        if (
-            fw_number_of_off_days > 0 and
-            fw_max_cnsc_num_vac_sick_days > 1 and
-            not fw_reserve_call_in[worker] and
-            not fw_day_off_call_in[worker]
-        ):
-            # Ensure a reserve day follows a day off
-            for day in DAYS_INDEX_1_6:
-                solver.Add(var_off_days[worker, day + 1]
-                           >= var_reserve_days[worker, day])
-
-            # Ensure a reserve day cannot be preceded by an off day
-            for day in DAYS_INDEX_2_7:
-                solver.Add(var_off_days[worker, day - 1]
-                           <= 1 - var_reserve_days[worker, day])
-
-            # Each worker can work at most 2 night shifts
-            solver.Add(sum(var_schedule[worker, (day - 1) * 3 + 3]
-                       for day in DAYS_INDEX_1_7) <= 2)
-
-        if (
-            sw_number_of_off_days > 0 and
-            sw_max_cnsc_num_vac_sick_days > 1 and
-            not sw_reserve_call_in[worker] and
-            not sw_day_off_call_in[worker]
-        ):
-            # Ensure a reserve day follows a day off
-            for day in DAYS_INDEX_8_13:
-                solver.Add(var_off_days[worker, day + 1]
-                           >= var_reserve_days[worker, day])
-
-            # Ensure a reserve day cannot be preceded by an off day
-            for day in DAYS_INDEX_9_14:
-                solver.Add(var_off_days[worker, day - 1]
-                           <= 1 - var_reserve_days[worker, day])
-
-            # Each worker can work at most 2 night shifts
-            solver.Add(sum(var_schedule[worker, (day - 1) * 3 + 3]
-                           for day in DAYS_INDEX_8_14) <= 2)
-
-        # After night shifts, workers can't have morning or afternoon shift in both weeks
-        # for day in DAYS_INDEX_8_13:  # 1..13
-        #     solver.Add(sum(var_schedule[worker, 3 + (day - 1) * 3 + k]
-        #                for k in range(3)) <= 1)
-
-    # Minimum required workers for each shift
-    for shift in ROSTER_INDEX_1_42:
-        solver.Add(sum(var_schedule[worker, shift]
-                   for worker in workers) >= min_workers[shift])
-
-    # Solve the model
-    status = solver.Solve()
-
-    if status == pywraplp.Solver.OPTIMAL:
-        schedule_count = 0
-        work_days_count = 0
-        off_days_count = 0
-        reserve_days_count = 0
-        schedule_add = 0
-        work_days_add = 0
-        off_days_add = 0
-        reserve_days_add = 0
-        for worker in workers:
-            res_schedule = ""
-            res_work_days = ""
-            res_off_days = ""
-            res_reserve_days = ""
-
-            user = User.objects.get(username=worker)
-
-            if day_index > 7:
-                roster = Roster.objects.get(
-                    week_number=next_week_number, owner=user)
-
-                for shift in ROSTER_INDEX_22_42:
-                    res_schedule += str(
-                        int(var_schedule[worker, shift].solution_value()))
-                roster.schedule = res_schedule
-
-                for day in DAYS_INDEX_8_14:
-                    res_work_days += str(
-                        int(var_work_days[worker, day].solution_value()))
-                    res_off_days += str(
-                        int(var_off_days[worker, day].solution_value()))
-                    res_reserve_days += str(
-                        int(var_reserve_days[worker, day].solution_value()))
-
-                roster.work_days = res_work_days
-                roster.off_days = res_off_days
-                roster.reserve_days = res_reserve_days
-                roster.published = True
-                roster.save()
-            else:
-                roster = Roster.objects.get(
-                    week_number=current_week_number, owner=user)
-
-                for shift in ROSTER_INDEX_1_21:
-                    res_schedule += str(
-                        int(var_schedule[worker, shift].solution_value()))
-
-                schedule_count += sum(1 for i in range(len(res_schedule)) if (
-                    res_schedule[i] == '1' and roster.schedule[i] == '1') or (res_schedule[i] == '0' and roster.schedule[i] == '0'))
-                schedule_add += 21
-                roster.schedule = res_schedule
-
-                for day in DAYS_INDEX_1_7:
-                    res_work_days += str(
-                        int(var_work_days[worker, day].solution_value()))
-                    res_off_days += str(
-                        int(var_off_days[worker, day].solution_value()))
-                    res_reserve_days += str(
-                        int(var_reserve_days[worker, day].solution_value()))
-
-                work_days_count += sum(1 for i in range(len(res_work_days)) if (
-                    res_work_days[i] == '1' and roster.work_days[i] == '1') or (res_work_days[i] == '0' and roster.work_days[i] == '0'))
-                work_days_add += 7
-                roster.work_days = res_work_days
-
-                off_days_count += sum(1 for i in range(len(res_off_days)) if (
-                    res_off_days[i] == '1' and roster.off_days[i] == '1') or (res_off_days[i] == '0' and roster.off_days[i] == '0'))
-                off_days_add += 7
-                roster.off_days = res_off_days
-
-                reserve_days_count += sum(1 for i in range(len(res_reserve_days)) if (
-                    res_reserve_days[i] == '1' and roster.reserve_days[i] == '1') or (res_reserve_days[i] == '0' and roster.reserve_days[i] == '0'))
-                reserve_days_add += 7
-                roster.reserve_days = res_reserve_days
-                roster.published = True
-                roster.save()
-
-                roster = Roster.objects.get(
-                    week_number=next_week_number, owner=user)
-
-                res_schedule = ""
-                res_work_days = ""
-                res_off_days = ""
-                res_reserve_days = ""
-
-                for shift in ROSTER_INDEX_22_42:
-                    res_schedule += str(
-                        int(var_schedule[worker, shift].solution_value()))
-
-                schedule_count += sum(1 for i in range(len(res_schedule)) if (
-                    res_schedule[i] == '1' and roster.schedule[i] == '1') or (res_schedule[i] == '0' and roster.schedule[i] == '0'))
-                schedule_add += 21
-                roster.schedule = res_schedule
-
-                for day in DAYS_INDEX_8_14:
-                    res_work_days += str(
-                        int(var_work_days[worker, day].solution_value()))
-                    res_off_days += str(
-                        int(var_off_days[worker, day].solution_value()))
-                    res_reserve_days += str(
-                        int(var_reserve_days[worker, day].solution_value()))
-
-                work_days_count += sum(1 for i in range(len(res_work_days)) if (
-                    res_work_days[i] == '1' and roster.work_days[i] == '1') or (res_work_days[i] == '0' and roster.work_days[i] == '0'))
-                work_days_add += 7
-                roster.work_days = res_work_days
-
-                off_days_count += sum(1 for i in range(len(res_off_days)) if (
-                    res_off_days[i] == '1' and roster.off_days[i] == '1') or (res_off_days[i] == '0' and roster.off_days[i] == '0'))
-                off_days_add += 7
-                roster.off_days = res_off_days
-
-                reserve_days_count += sum(1 for i in range(len(res_reserve_days)) if (
-                    res_reserve_days[i] == '1' and roster.reserve_days[i] == '1') or (res_reserve_days[i] == '0' and roster.reserve_days[i] == '0'))
-                reserve_days_add += 7
-                roster.reserve_days = res_reserve_days
-                roster.published = True
-                roster.save()
+    Args:
+        model (ScheduleModel): The model of the shard, with its data filled in by
+                               `update_schedule_model`.
+        inputs (ScheduleInputs): The inputs of the shard.
+        min_workers (np.ndarray): The minimum number of workers for each shift (21 values).
+        multiplier (float): A scaling factor of the shard's coverage.
+        time_limit (Optional[float]): The time limit of the local search in seconds.
 
-        # Retrieve and print statistics
-        print('Solver runtime (ms):', solver.WallTime())
-        print('Number of constraints:', solver.NumConstraints())
+    Returns:
+        LocalSearchResult: The schedule, feasible if its violation is 0.
+    """
+    hint = get_schedule_hint(
+        inputs.applications,
+        inputs.next_week_schedules,
+        inputs.next_week_work_days,
+        inputs.next_week_reserve_days,
+        inputs.next_week_published,
+        inputs.vacation,
+        inputs.sickness,
+        min_workers,
+        multiplier
+    )
+    indices, hint_values = get_application_week_hint_values(
+        model, *hint, inputs.vacation, inputs.sickness)
+    # The fixed week and absences are at their bounds
+    values = model.lower_bounds.astype(float)
+    values[indices] = hint_values
+    return improve_schedule(model, values, time_limit)
+
+
+def set_schedule_hint(
+    solver_backend: Union[LinearSolverBackend, CpSatBackend],
+    presolved: PresolvedModel,
+    model: ScheduleModel,
+    indices: np.ndarray,
+    values: np.ndarray
+) -> None:
+    """
+    Warm-starts the solver from a hint, unless the hint violates a row of the model: the solvers
+    reject an infeasible hint as a starting incumbent anyway.
 
-    return status, solver.WallTime(), solver.NumConstraints()
+    Args:
+        solver_backend (Union[LinearSolverBackend, CpSatBackend]): The backend the presolved
+                                                                   model is loaded into.
+        presolved (PresolvedModel): The presolved model.
+        model (ScheduleModel): The model before presolve.
+        indices (np.ndarray): The indices of the hinted variables of the model.
+        values (np.ndarray): The hinted values, the other variables are at their lower bounds.
+    """
+    full_values = model.lower_bounds.astype(float)
+    full_values[indices] = values
+    violation = RowActivity(model, full_values).violation
+    if violation > VIOLATION_TOLERANCE:
+        print('Hint skipped, violation:', violation)
+        return
+
+    solver_backend.set_hint(*presolved.reduce_hint(indices, values))
+
+
+def solve_schedule_shard(
+    inputs: ScheduleInputs,
+    multiplier: float,
+    engine: str,
+    backend: str,
+    num_search_workers: int,
+    time_limit: Optional[float],
+    relative_gap_limit: Optional[float],
+    use_hints: bool,
+    aggregate_workers: bool,
+    use_cache: bool = False,
+    debug_names: bool = False,
+    min_workers: Optional[np.ndarray] = None,
+    solution_pool_size: int = 1,
+    heuristic_time_limit: Optional[float] = None,
+    solution_pool_time_limit: Optional[float] = None
+) -> ShardResult:
+    """
+    Optimizes the application week of one shard. Doesn't touch the database, so shards can be
+    solved in separate processes.
 
+    Args:
+        inputs (ScheduleInputs): The inputs of the shard.
+        multiplier (float): A scaling factor of the shard's coverage.
+        engine (str): 'compact', 'column-generation' or 'heuristic' (greedy construction and
+                      local search, without a solver).
+        backend (str): The solver backend of the compact model, 'scip' or 'cp-sat'.
+        num_search_workers (int): The number of parallel CP-SAT search workers.
+        time_limit (Optional[float]): The time limit of the solve in seconds.
+        relative_gap_limit (Optional[float]): The relative gap at which the search stops early.
+        use_hints (bool): Whether to warm-start the compact model.
+        aggregate_workers (bool): Whether the column generation engine groups interchangeable
+                                  workers into classes (see `get_worker_classes`).
+        use_cache (bool, optional): Whether to reuse a loaded compact model of a previous run
+                                    (see `api.model_cache`). Defaults to False.
+        debug_names (bool, optional): If True, variables and constraints get readable names.
+                                      Defaults to False.
+        min_workers (Optional[np.ndarray], optional): The minimum number of workers for each
+                                                      shift (21 values). Defaults to None,
+                                                      meaning the default coverage profile of
+                                                      the week scaled by the multiplier.
+        solution_pool_size (int, optional): If above 1, up to this many distinct solutions of
+                                            the compact model are returned in `pool`. Defaults
+                                            to 1.
+        heuristic_time_limit (Optional[float], optional): If given, the hint of the compact model
+                                                          is improved by local search for at
+                                                          most this many seconds, and it is the
+                                                          time limit of the heuristic engine.
+                                                          Defaults to None, meaning the
+                                                          unimproved hint and `time_limit`.
+        solution_pool_time_limit (Optional[float], optional): The time limit shared by the
+                                                              re-solves finding the alternatives
+                                                              of the solution pool (see
+                                                              `solution_pool`). Defaults to None,
+                                                              meaning `time_limit` for each.
 
-def optimize_schedule(number_of_users_to_solve: int, multiplier: float, a, b) -> Tuple[int, int, int]:
+    Returns:
+        ShardResult: The schedule of the shard and the solve statistics.
+    """
+    if min_workers is None:
+        min_workers = get_min_workers(inputs.application_week_number, multiplier)
+
+    if engine == SOLVER_ENGINE_COLUMN_GENERATION:
+        result = solve_column_generation(
+            inputs.applications,
+            inputs.vacation,
+            inputs.sickness,
+            min_workers,
+            multiplier,
+            time_limit,
+            aggregate_workers
+        )
+        gap = None
+        if result.status in FEASIBLE_STATUSES and result.bound is not None:
+            gap = get_relative_gap(result.objective, result.bound)
+
+        print('Worker classes:', result.num_classes)
+        print('Pricing rounds:', result.iterations)
+        print('Generated columns:', result.num_columns)
+        print('Solver runtime (ms):', result.wall_time)
+
+        return ShardResult(result.status, result.schedules, result.work_days, result.off_days,
+                           result.reserve_days, result.wall_time, result.num_constraints, gap,
+                           result.num_classes, result.objective, result.bound, 0,
+                           result.num_columns)
+
+    build_start = time.perf_counter()
+
+    if engine == SOLVER_ENGINE_HEURISTIC:
+        model = build_schedule_model_template(inputs.workers, multiplier)
+        update_schedule_model(
+            model,
+            inputs.next_week_schedules,
+            inputs.next_week_work_days,
+            inputs.next_week_off_days,
+            inputs.next_week_reserve_days,
+            inputs.applications,
+            inputs.vacation,
+            inputs.sickness,
+            min_workers
+        )
+        build_time = round((time.perf_counter() - build_start) * 1000)
+
+        result = get_local_search_schedule(
+            model, inputs, min_workers, multiplier,
+            heuristic_time_limit if heuristic_time_limit is not None else time_limit)
+        schedules = work_days = off_days = reserve_days = objective = None
+        status = pywraplp.Solver.NOT_SOLVED
+        if not result.violation:
+            # Feasible, but without a bound
+            status = pywraplp.Solver.FEASIBLE
+            objective = result.objective
+            schedules, work_days, off_days, reserve_days = get_application_week_solution(
+                model, result.values)
+
+        print('Local search moves (accepted):', result.iterations, f'({result.accepted})')
+        print('Remaining violation:', result.violation)
+        print('Heuristic runtime (ms):', result.wall_time)
+
+        return ShardResult(status, schedules, work_days, off_days, reserve_days,
+                           result.wall_time, model.num_constraints, None, len(inputs.workers),
+                           objective, None, build_time, model.num_variables)
+
+    # Reuse the model of a previous run with the same workers and multiplier if possible
+    use_cache = use_cache and not debug_names and solution_pool_size == 1
+    template_key = get_template_key(
+        backend, num_search_workers, time_limit, relative_gap_limit, inputs.workers, multiplier)
+    template = checkout_model_template(template_key) if use_cache else None
+    if template is None:
+        model = build_schedule_model_template(inputs.workers, multiplier)
+    else:
+        model, cached_presolved, solver_backend = template
+
+    # The checked out template goes back to the cache on every exit path, with the presolved
+    # model that is loaded into its solver
+    try:
+        update_schedule_model(
+            model,
+            inputs.next_week_schedules,
+            inputs.next_week_work_days,
+            inputs.next_week_off_days,
+            inputs.next_week_reserve_days,
+            inputs.applications,
+            inputs.vacation,
+            inputs.sickness,
+            min_workers
+        )
+
+        # The solver doesn't see the fixed first week, absences only fix the bounds of the
+        # optimized week, so the loaded model is reused across weeks with the same workers
+        presolved = presolve_model(model, get_optimized_week_variables(model))
+        print('Variables (presolved):', model.num_variables, '->', presolved.model.num_variables)
+        print('Constraints (presolved):', model.num_constraints, '->',
+              presolved.model.num_constraints)
+        if presolved.infeasible:
+            return ShardResult(pywraplp.Solver.INFEASIBLE, None, None, None, None, 0,
+                               presolved.model.num_constraints, None, len(inputs.workers), None,
+                               None, round((time.perf_counter() - build_start) * 1000),
+                               presolved.model.num_variables)
+
+        if template is None or cached_presolved.structure != presolved.structure:
+            solver_backend = get_solver_backend(
+                backend, num_search_workers, time_limit, relative_gap_limit, solution_pool_size)
+            solver_backend.load(presolved.model, debug_names)
+        else:
+            solver_backend.update(presolved.model)
+        template = (model, presolved, solver_backend)
+
+        if use_hints and heuristic_time_limit is not None:
+            # A feasible improved hint is a starting incumbent of the solver
+            result = get_local_search_schedule(
+                model, inputs, min_workers, multiplier, heuristic_time_limit)
+            print('Hint objective (violation):', result.objective, f'({result.violation})')
+            set_schedule_hint(solver_backend, presolved, model, np.arange(model.num_variables),
+                              result.values)
+        elif use_hints:
+            hint = get_schedule_hint(
+                inputs.applications,
+                inputs.next_week_schedules,
+                inputs.next_week_work_days,
+                inputs.next_week_reserve_days,
+                inputs.next_week_published,
+                inputs.vacation,
+                inputs.sickness,
+                min_workers,
+                multiplier
+            )
+            set_schedule_hint(solver_backend, presolved, model, *get_application_week_hint_values(
+                model, *hint, inputs.vacation, inputs.sickness))
+
+        build_time = (time.perf_counter() - build_start) * 1000
+
+        # Solve the model
+        status = solver_backend.solve()
+        wall_time = solver_backend.wall_time()
+        num_constraints = solver_backend.num_constraints()
+        schedules = work_days = off_days = reserve_days = gap = objective = bound = pool = None
+
+        if status in FEASIBLE_STATUSES:
+            gap = solver_backend.relative_gap()
+            objective = solver_backend.objective_value()
+            bound = solver_backend.best_bound()
+            values = presolved.restore(solver_backend.values())
+            schedules, work_days, off_days, reserve_days = get_application_week_solution(
+                model, values)
+
+            # Retrieve and print statistics
+            print('Model build time (ms):', round(build_time))
+            print('Solver runtime (ms):', wall_time)
+            print('Number of constraints:', num_constraints)
+
+            if solution_pool_size > 1:
+                # The alternatives must differ in the schedule, not only in auxiliary variables
+                pool_start = time.perf_counter()
+                schedule_variables = np.flatnonzero(np.isin(
+                    presolved.variables,
+                    np.concatenate([
+                        indices.ravel() for indices in get_application_week_solution(
+                            model, np.arange(model.num_variables))
+                    ])
+                ))
+                pool = [
+                    PoolSolution(
+                        float(presolved.model.objective @ values +
+                              presolved.model.objective_offset),
+                        *get_application_week_solution(model, presolved.restore(values)))
+                    for values in solver_backend.solution_pool(schedule_variables,
+                                                               solution_pool_time_limit)
+                ]
+                print('Solution pool:', len(pool))
+                print('Solution pool runtime (ms):',
+                      round((time.perf_counter() - pool_start) * 1000))
+
+        return ShardResult(status, schedules, work_days, off_days, reserve_days, wall_time,
+                           num_constraints, gap, len(inputs.workers), objective, bound,
+                           round(build_time), presolved.model.num_variables, pool)
+    finally:
+        if use_cache and template is not None:
+            checkin_model_template(template_key, template)
+
+
+def record_schedule_instance(
+    inputs: ScheduleInputs,
+    shard_names: List[Optional[str]],
+    shard_args: List[tuple],
+    shard_min_workers: List[np.ndarray],
+    results: List[ShardResult]
+) -> Optional[str]:
+    """
+    Records an `optimize_schedule` solve with `record_solver_instance`: the inputs of every
+    worker, the shard of each worker, the coverage of each shard and the presolved compact model
+    of each shard (`shard<index>.mps`).
+
+    Args:
+        inputs (ScheduleInputs): The inputs of every worker, in shard order.
+        shard_names (List[Optional[str]]): The name of each shard, None without sharding.
+        shard_args (List[tuple]): The arguments `solve_schedule_shard` was called with for each
+                                  shard.
+        shard_min_workers (List[np.ndarray]): The coverage of each shard (21 values).
+        results (List[ShardResult]): The result of each shard.
+
+    Returns:
+        Optional[str]: The directory of the instance, None if it could not be written.
+    """
+    shard_index = []
+    models = {}
+    for index, ((shard_inputs, multiplier, *_), min_workers) in enumerate(
+            zip(shard_args, shard_min_workers)):
+        shard_index.extend([index] * len(shard_inputs.workers))
+        model = build_schedule_model_template(shard_inputs.workers, multiplier)
+        update_schedule_model(model, *shard_inputs[2:6], *shard_inputs[7:], min_workers)
+        models[f'shard{index}'] = presolve_model(model).model
+
+    # The rows are stored shard after shard
+    workers = [worker for shard_inputs, *_ in shard_args for worker in shard_inputs.workers]
+    rows = {worker: row for row, worker in enumerate(inputs.workers)}
+    order = [rows[worker] for worker in workers]
+    engine, backend, num_search_workers, time_limit, relative_gap_limit, use_hints, \
+        aggregate_workers = shard_args[0][2:]
+
+    return record_solver_instance(
+        SOLVER_RUN_OPTIMIZE,
+        inputs.application_week_number,
+        {
+            **{field: np.asarray(value)[order] for field, value in inputs._asdict().items()
+               if isinstance(value, np.ndarray)},
+            'workers': np.array(workers),
+            'shard_index': np.array(shard_index, dtype=int),
+            'min_workers': np.array(shard_min_workers),
+        },
+        {
+            'shards': [
+                {'name': name, 'multiplier': args[1], 'status': result.status,
+                 'objective': result.objective, 'solve_time': result.wall_time}
+                for name, args, result in zip(shard_names, shard_args, results)
+            ],
+            'engine': engine,
+            'backend': backend,
+            'num_search_workers': num_search_workers,
+            'time_limit': time_limit,
+            'relative_gap_limit': relative_gap_limit,
+            'use_hints': use_hints,
+            'aggregate_workers': aggregate_workers,
+        },
+        models
+    )
+
+
+def check_capacity(
+    inputs: ScheduleInputs,
+    shard_args: List[tuple],
+    shard_min_workers: List[np.ndarray],
+    multiplier: float
+) -> None:
+    """
+    Checks whether every shard of `optimize_schedule` can cover its coverage table with its
+    present workers (see `check_schedule_capacity`). A failed check is saved as an infeasible
+    `SolverRun` without solve.
+
+    Args:
+        inputs (ScheduleInputs): The inputs of every worker.
+        shard_args (List[tuple]): The arguments `solve_schedule_shard` is called with for each
+                                  shard.
+        shard_min_workers (List[np.ndarray]): The coverage of each shard (21 values).
+        multiplier (float): The multiplier of the run.
+
+    Raises:
+        CapacityShortageError: If a requirement of the application week can't be met.
+    """
+    shortages = []
+    for (shard_inputs, shard_multiplier, *_), min_workers in zip(shard_args, shard_min_workers):
+        shortages.extend(check_schedule_capacity(
+            shard_inputs.workers,
+            shard_inputs.vacation,
+            shard_inputs.sickness,
+            min_workers,
+            shard_multiplier
+        ))
+    if not shortages:
+        return
+
+    print('Capacity shortages:', len(shortages))
+    for shortage in shortages:
+        print(' ', shortage)
+    SolverRun.objects.create(
+        kind=SOLVER_RUN_OPTIMIZE,
+        week_number=inputs.application_week_number,
+        engine=shard_args[0][2],
+        backend=shard_args[0][3],
+        status=pywraplp.Solver.INFEASIBLE,
+        num_workers=len(inputs.workers),
+        multiplier=multiplier
+    )
+    raise CapacityShortageError(shortages)
+
+
+def optimize_schedule(
+    number_of_users_to_solve: Optional[int] = None,
+    multiplier: float = 1,
+    a: int = 0,
+    b: int = 0,
+    engine: Optional[str] = None,
+    backend: Optional[str] = None,
+    num_search_workers: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    relative_gap_limit: Optional[float] = None,
+    use_hints: Optional[bool] = None,
+    shard_by_group: Optional[bool] = None,
+    processes: Optional[int] = None,
+    aggregate_workers: Optional[bool] = None,
+    debug_names: bool = False,
+    progress: Optional[Callable[[int], None]] = None,
+    horizon_weeks: Optional[int] = None,
+    use_result_cache: Optional[bool] = None
+) -> Tuple[int, int, int, Optional[float]]:
     """
     Optimizes the worker schedule for the second week based on predefined rules, constraints, 
     and applications using a linear programming solver.
 
+    With the compact engine, the model is built by `build_schedule_model_template` in
+    index-addressed variable blocks and kept loaded in the solver between runs (see
+    `api.model_cache`), later runs with the same workers and multiplier only update the bounds
+    and objective coefficients. The fixed variables and redundant rows are removed before the
+    model reaches the solver (see `presolve_model`). Unless disabled, the solver is warm-started
+    with a repaired assignment built from the applications and the last published week (see
+    `get_schedule_hint`).
+
+    If sharding is enabled, the crew is split by crew group (the worker's non-supervisor `Group`)
+    into independent problems, each with its own coverage (see
+    `settings.SOLVER_GROUP_MULTIPLIERS`). The shards are solved in parallel processes and the
+    rosters are published together, only if every shard found a schedule.
+
+    With a horizon of several weeks, the application week is optimized together with the
+    following weeks by `optimize_rolling_horizon` (compact engine, without sharding or result
+    cache).
+
+    Unless disabled, the inputs (rosters, multipliers, shards and coverage) are hashed, and if an
+    earlier run of the same inputs was solved to optimality, its schedule is published again
+    where the rosters differ from it, without solving (see `api.result_cache`).
+
     Args:
-        number_of_users_to_solve (int): The number of users to include in the optimization.
-        multiplier (float): A scaling factor affecting certain constraints (e.g., reserve workers).
+        number_of_users_to_solve (Optional[int], optional): The maximum number of users to include
+                                                            in the optimization. Defaults to None,
+                                                            meaning every worker.
+        multiplier (float, optional): A scaling factor affecting certain constraints (e.g.,
+                                      reserve workers). Defaults to 1.
+        a (int, optional): Week offset of the fixed week. Defaults to 0.
+        b (int, optional): Week offset of the application week. Defaults to 0.
+        engine (Optional[str], optional): 'compact', 'column-generation' or 'heuristic'. Defaults
+                                          to `settings.SOLVER_ENGINE`.
+        backend (Optional[str], optional): The solver backend, 'scip' or 'cp-sat'. Defaults to
+                                           `settings.SOLVER_BACKEND`.
+        num_search_workers (Optional[int], optional): The number of parallel CP-SAT search
+                                                      workers. Defaults to
+                                                      `settings.SOLVER_NUM_SEARCH_WORKERS`.
+        time_limit (Optional[float], optional): The time limit of the solve in seconds. Defaults
+                                                to `settings.SOLVER_TIME_LIMIT`.
+        relative_gap_limit (Optional[float], optional): The relative gap at which the search
+                                                        stops early. Defaults to
+                                                        `settings.SOLVER_RELATIVE_GAP_LIMIT`.
+        use_hints (Optional[bool], optional): Whether to warm-start the solver, False allows A/B
+                                              timing without hints. Defaults to
+                                              `settings.SOLVER_USE_HINTS`.
+        shard_by_group (Optional[bool], optional): Whether to solve each crew group separately.
+                                                   Defaults to `settings.SOLVER_SHARD_BY_GROUP`.
+        processes (Optional[int], optional): The number of processes solving shards in parallel.
+                                             Defaults to `settings.SOLVER_PROCESSES`.
+        aggregate_workers (Optional[bool], optional): Whether the column generation engine
+                                                      solves for the number of interchangeable
+                                                      workers per week pattern instead of each
+                                                      worker. Defaults to
+                                                      `settings.SOLVER_AGGREGATE_WORKERS`.
+        debug_names (bool, optional): If True, variables and constraints get readable names.
+                                      Defaults to False.
+        progress (Optional[Callable[[int], None]], optional): Called with the progress in percent
+                                                              after the inputs are loaded and
+                                                              after each solved shard, used by
+                                                              the solver worker. Defaults to
+                                                              None.
+        horizon_weeks (Optional[int], optional): The number of weeks optimized together from the
+                                                 application week on. Defaults to
+                                                 `settings.SOLVER_HORIZON_WEEKS`.
+        use_result_cache (Optional[bool], optional): Whether to reuse the optimal result of the
+                                                     same inputs. Defaults to
+                                                     `settings.SOLVER_RESULT_CACHE`.
 
     Returns:
-        Tuple[int, int, int]: A tuple containing:
+        Tuple[int, int, int, Optional[float]]: A tuple containing:
             - `status` (int): The solver's status (e.g., `pywraplp.Solver.OPTIMAL` for a successful
-            solution).
-            - `solver.WallTime()` (int): The runtime of the solver in milliseconds.
-            - `solver.NumConstraints()` (int): The number of constraints applied to the solver.
+            solution), the worst status of the shards.
+            - `solver.WallTime()` (int): The runtime of the solver in milliseconds, the longest
+            of the shards.
+            - `solver.NumConstraints()` (int): The number of constraints applied to the solver,
+            summed over the shards.
+            - `gap` (Optional[float]): The relative gap of the saved schedule, the largest of the
+            shards, None if no schedule was found.
+
+    Raises:
+        CapacityShortageError: If the present workers can't cover the application week, checked
+                               before solving unless `settings.SOLVER_CAPACITY_CHECK` is False.
+        ValueError: If a horizon of several weeks is combined with another engine than 'compact',
+                    sharding or the result cache.
+
+    Notes:
+        If the solver stops at the time limit or the gap limit, the best schedule found is saved
+        and the rosters are flagged as `suboptimal`. The statistics of the run are saved as a
+        `SolverRun`.
+    """
+    horizon_weeks = horizon_weeks or settings.SOLVER_HORIZON_WEEKS
+    if horizon_weeks > 1:
+        unsupported = [
+            name for name, used in (
+                (f'the {engine} engine', engine not in (None, SOLVER_ENGINE_COMPACT)),
+                ('sharding', shard_by_group),
+                ('the result cache', use_result_cache),
+            )
+            if used
+        ]
+        if unsupported:
+            raise ValueError(f"A horizon of {horizon_weeks} weeks can't be combined with "
+                             f"{' or '.join(unsupported)}.")
+        return optimize_rolling_horizon(horizon_weeks, number_of_users_to_solve, multiplier, a, b,
+                                        backend, num_search_workers, time_limit,
+                                        relative_gap_limit, use_hints, progress)
+
+    inputs = get_schedule_inputs(number_of_users_to_solve, a, b)
+    progress = progress or (lambda _: None)
+
+    if shard_by_group if shard_by_group is not None else settings.SOLVER_SHARD_BY_GROUP:
+        shards = split_schedule_inputs(inputs, get_crew_group_names(inputs.workers))
+    else:
+        shards = {None: inputs}
+
+    shard_args = [
+        (
+            shard_inputs,
+            settings.SOLVER_GROUP_MULTIPLIERS.get(group_name, multiplier),
+            engine or settings.SOLVER_ENGINE,
+            backend or settings.SOLVER_BACKEND,
+            num_search_workers or settings.SOLVER_NUM_SEARCH_WORKERS,
+            time_limit if time_limit is not None else settings.SOLVER_TIME_LIMIT,
+            relative_gap_limit if relative_gap_limit is not None
+            else settings.SOLVER_RELATIVE_GAP_LIMIT,
+            use_hints if use_hints is not None else settings.SOLVER_USE_HINTS,
+            aggregate_workers if aggregate_workers is not None
+            else settings.SOLVER_AGGREGATE_WORKERS,
+        )
+        for group_name, shard_inputs in shards.items()
+    ]
+    # Looked up here, the shard processes don't read the coverage profiles
+    shard_min_workers = [
+        get_min_workers(inputs.application_week_number, args[1], group_name)
+        for group_name, args in zip(shards, shard_args)
+    ]
+
+    if use_result_cache is None:
+        use_result_cache = settings.SOLVER_RESULT_CACHE
+    input_hash = ''
+    if use_result_cache:
+        input_hash = get_schedule_input_hash(inputs, list(shards), shard_args, shard_min_workers)
+        cached = find_cached_result(input_hash)
+        if cached is not None:
+            return publish_cached_result(cached, input_hash)
+
+    if settings.SOLVER_CAPACITY_CHECK:
+        check_capacity(inputs, shard_args, shard_min_workers, multiplier)
+
+    heuristic_time_limit = None
+    if shard_args[0][2] == SOLVER_ENGINE_HEURISTIC or settings.SOLVER_HEURISTIC_HINT:
+        heuristic_time_limit = settings.SOLVER_HEURISTIC_TIME_LIMIT
+
+    progress(10)
+    if len(shard_args) == 1:
+        results = [solve_schedule_shard(*shard_args[0], use_cache=True, debug_names=debug_names,
+                                        min_workers=shard_min_workers[0],
+                                        heuristic_time_limit=heuristic_time_limit)]
+        progress(90)
+    else:
+        with create_solver_pool(
+            min(processes or settings.SOLVER_PROCESSES, len(shard_args))
+        ) as executor:
+            futures = [executor.submit(solve_schedule_shard, *args, min_workers=min_workers,
+                                       heuristic_time_limit=heuristic_time_limit)
+                       for args, min_workers in zip(shard_args, shard_min_workers)]
+            results = []
+            for future in futures:
+                results.append(future.result())
+                progress(10 + 80 * len(results) // len(shard_args))
+
+    statuses = [result.status for result in results]
+    wall_time = max(result.wall_time for result in results)
+    num_constraints = sum(result.num_constraints for result in results)
+    print('Worker classes (total):', sum(result.num_classes for result in results))
+
+    if settings.SOLVER_RECORD_INSTANCES:
+        record_schedule_instance(inputs, list(shards), shard_args, shard_min_workers, results)
+
+    solver_run = SolverRun(
+        kind=SOLVER_RUN_OPTIMIZE,
+        week_number=inputs.application_week_number,
+        engine=shard_args[0][2],
+        backend=shard_args[0][3],
+        build_time=max(result.build_time for result in results),
+        solve_time=wall_time,
+        num_variables=sum(result.num_variables for result in results),
+        num_constraints=num_constraints,
+        num_workers=len(inputs.workers),
+        multiplier=multiplier,
+        input_hash=input_hash
+    )
+
+    failed = [status for status in statuses if status not in FEASIBLE_STATUSES]
+    if failed:
+        solver_run.status = failed[0]
+        solver_run.save()
+        return failed[0], wall_time, num_constraints, None
+
+    status = pywraplp.Solver.OPTIMAL
+    if pywraplp.Solver.FEASIBLE in statuses:
+        status = pywraplp.Solver.FEASIBLE
+    gaps = [result.gap for result in results if result.gap is not None]
+    gap = max(gaps) if gaps else None
+
+    # Publish every shard at once
+    write_back_start = time.perf_counter()
+    shard_inputs = list(shards.values())
+    workers = [worker for shard in shard_inputs for worker in shard.workers]
+    matrices = {
+        field: np.concatenate([getattr(result, field) for result in results])
+        for field in ('schedules', 'work_days', 'off_days', 'reserve_days')
+    }
+    save_application_week_rosters(
+        inputs.application_week_number,
+        workers,
+        *matrices.values(),
+        np.concatenate([
+            np.full(len(shard.workers), not is_proven_optimal(result.status, result.gap))
+            for shard, result in zip(shard_inputs, results)
+        ])
+    )
+    print('Relative gap:', gap)
+
+    # The shards are independent, so their objectives and bounds add up
+    solver_run.status = status
+    solver_run.objective = sum(result.objective for result in results)
+    if all(result.bound is not None for result in results):
+        solver_run.best_bound = sum(result.bound for result in results)
+    solver_run.gap = gap
+    solver_run.write_back_time = round((time.perf_counter() - write_back_start) * 1000)
+    if use_result_cache and is_proven_optimal(status, gap):
+        solver_run.rosters = get_result_rosters(workers, **matrices)
+    solver_run.save()
+
+    return status, wall_time, num_constraints, gap
+
+
+def get_schedule_input_hash(
+    inputs: ScheduleInputs,
+    shard_names: List[Optional[str]],
+    shard_args: List[tuple],
+    shard_min_workers: List[np.ndarray]
+) -> str:
     """
+    Hashes every input of an `optimize_schedule` run that the optimal schedule depends on: the
+    rosters of the fixed and the application week, and the workers, multiplier and coverage of
+    each shard. The solver settings are left out, they don't change which schedules are optimal.
 
-    solver = pywraplp.Solver.CreateSolver('SCIP')
-    solver.SetSolverSpecificParametersAsString("display/verblevel = 4")
-    solver.EnableOutput()
+    Args:
+        inputs (ScheduleInputs): The inputs of every worker.
+        shard_names (List[Optional[str]]): The name of each shard, None without sharding.
+        shard_args (List[tuple]): The arguments `solve_schedule_shard` is called with for each
+                                  shard.
+        shard_min_workers (List[np.ndarray]): The coverage of each shard (21 values).
 
-    # Variables
-    var_schedule = {}
-    var_work_days = {}
-    var_off_days = {}
-    var_reserve_days = {}
-    var_vacation = {}
-    var_sickness = {}
+    Returns:
+        str: The hash of the inputs.
+    """
+    return get_input_hash(
+        inputs.application_week_number,
+        inputs.workers,
+        *inputs[2:],
+        [[name, float(args[1]), args[0].workers] for name, args in zip(shard_names, shard_args)],
+        *(np.asarray(min_workers, dtype=float) for min_workers in shard_min_workers)
+    )
+
+
+def publish_cached_result(
+    cached: SolverRun,
+    input_hash: str
+) -> Tuple[int, int, int, Optional[float]]:
+    """
+    Publishes the schedule of an earlier optimal run of the same inputs again, only the rosters
+    that were changed or unpublished since are written. The reuse is saved as a `SolverRun` of
+    the 'result-cache' engine.
 
-    next_week_number = get_current_week_number(1 - a)
-    application_week_number = get_current_week_number(2 - b)
-    next_week_rosters = get_rosters_by_week(
-        next_week_number, number_of_users_to_solve)
-    application_week_rosters = get_rosters_by_week(
-        application_week_number, number_of_users_to_solve)
-
-    next_week_schedules = {}
-    application_week_applications = {}
-    next_week_work_days = {}
-    next_week_off_days = {}
-    next_week_reserve_days = {}
-    application_week_vacation = {}
-    application_week_sickness = {}
-
-    workers = []
-
-    for next_week_roster, application_week_roster in zip(
-        next_week_rosters,
-        application_week_rosters
-    ):
-        username = application_week_roster.owner.username
-        workers.append(username)
-
-        application_week_applications[username] = get_roster_mapping(
-            application_week_roster.application,
-            ROSTER_INDEX_START,
-            ROSTER_INDEX_END
-        )
-        next_week_schedules[username] = get_roster_mapping(
-            next_week_roster.schedule,
-            ROSTER_INDEX_START,
-            ROSTER_INDEX_END,
-            ROSTER_INDEX_START - 1
-        )
-        next_week_work_days[username] = get_day_mapping(
-            next_week_roster.work_days,
-            FIRST_WEEK_DAY_INDEX_START,
-            FIRST_WEEK_DAY_INDEX_END
-        )
-        next_week_off_days[username] = get_day_mapping(
-            next_week_roster.off_days,
-            FIRST_WEEK_DAY_INDEX_START,
-            FIRST_WEEK_DAY_INDEX_END
+    Args:
+        cached (SolverRun): The earlier run, see `find_cached_result`.
+        input_hash (str): The hash of the inputs.
+
+    Returns:
+        Tuple[int, int, int, Optional[float]]: The status, runtime, number of constraints and gap
+        like `optimize_schedule`, with a runtime of 0.
+    """
+    write_back_start = time.perf_counter()
+    changed = get_changed_rosters(cached)
+    if changed['workers']:
+        save_application_week_rosters(
+            cached.week_number,
+            changed['workers'],
+            changed['schedules'],
+            changed['work_days'],
+            changed['off_days'],
+            changed['reserve_days'],
+            np.zeros(len(changed['workers']), dtype=bool)
         )
-        next_week_reserve_days[username] = get_day_mapping(
-            next_week_roster.reserve_days,
-            FIRST_WEEK_DAY_INDEX_START,
-            FIRST_WEEK_DAY_INDEX_END
+    print('Result cache hit, solver run:', cached.id)
+    print('Rosters published again:', len(changed['workers']))
+
+    SolverRun.objects.create(
+        kind=SOLVER_RUN_OPTIMIZE,
+        week_number=cached.week_number,
+        engine=SOLVER_ENGINE_RESULT_CACHE,
+        backend=cached.backend,
+        status=cached.status,
+        objective=cached.objective,
+        best_bound=cached.best_bound,
+        gap=cached.gap,
+        write_back_time=round((time.perf_counter() - write_back_start) * 1000),
+        num_workers=cached.num_workers,
+        multiplier=cached.multiplier,
+        input_hash=input_hash
+    )
+    return cached.status, 0, cached.num_constraints, cached.gap
+
+
+def optimize_schedule_column_generation(
+    number_of_users_to_solve: Optional[int] = None,
+    multiplier: float = 1,
+    a: int = 0,
+    b: int = 0,
+    time_limit: Optional[float] = None,
+    shard_by_group: Optional[bool] = None
+) -> Tuple[int, int, int, Optional[float]]:
+    """
+    Optimizes the worker schedule for the second week like `optimize_schedule`, but with the
+    column generation engine over weekly patterns (see `solve_column_generation`), which keeps a
+    tight LP bound for large crews.
+
+    Args:
+        number_of_users_to_solve (Optional[int], optional): The maximum number of users to include
+                                                            in the optimization. Defaults to None,
+                                                            meaning every worker.
+        multiplier (float, optional): A scaling factor affecting certain constraints (e.g.,
+                                      reserve workers). Defaults to 1.
+        a (int, optional): Week offset of the fixed week. Defaults to 0.
+        b (int, optional): Week offset of the application week. Defaults to 0.
+        time_limit (Optional[float], optional): The time limit of the solve in seconds. Defaults
+                                                to `settings.SOLVER_TIME_LIMIT`.
+        shard_by_group (Optional[bool], optional): Whether to solve each crew group separately.
+                                                   Defaults to `settings.SOLVER_SHARD_BY_GROUP`.
+
+    Returns:
+        Tuple[int, int, int, Optional[float]]: The solver status, the runtime in milliseconds, the
+        number of rows of the master problem and the relative gap of the saved schedule (None if
+        no schedule was found).
+    """
+    return optimize_schedule(
+        number_of_users_to_solve,
+        multiplier,
+        a,
+        b,
+        engine=SOLVER_ENGINE_COLUMN_GENERATION,
+        time_limit=time_limit,
+        shard_by_group=shard_by_group
+    )
+
+
+class HorizonInputs(NamedTuple):
+    """
+    The rosters `optimize_rolling_horizon` works on: the fixed next week and the optimized weeks
+    side by side, in matrices with one row per worker.
+
+    Attributes:
+        week_numbers (List[int]): The week numbers of the optimized weeks, the application week
+                                  first.
+        workers (List[str]): The usernames of the workers.
+        next_week_schedules (np.ndarray): A (workers, 21) matrix of the next week's schedule.
+        next_week_work_days (np.ndarray): A (workers, 7) matrix of the next week's work days.
+        next_week_off_days (np.ndarray): A (workers, 7) matrix of the next week's off days.
+        next_week_reserve_days (np.ndarray): A (workers, 7) matrix of the next week's reserve days.
+        next_week_published (np.ndarray): Whether the next week's roster of a worker is published.
+        applications (np.ndarray): A (workers, 21 * weeks) matrix of the applications.
+        vacation (np.ndarray): A (workers, 7 * weeks) matrix of the vacation.
+        sickness (np.ndarray): A (workers, 7 * weeks) matrix of the sickness.
+        published (np.ndarray): A (workers, weeks) boolean matrix, True if the roster of the week
+                                is published and is kept.
+        schedules (np.ndarray): A (workers, 21 * weeks) matrix of the rosters' schedules.
+        work_days (np.ndarray): A (workers, 7 * weeks) matrix of the rosters' work days.
+        off_days (np.ndarray): A (workers, 7 * weeks) matrix of the rosters' off days.
+        reserve_days (np.ndarray): A (workers, 7 * weeks) matrix of the rosters' reserve days.
+    """
+    week_numbers: List[int]
+    workers: List[str]
+    next_week_schedules: np.ndarray
+    next_week_work_days: np.ndarray
+    next_week_off_days: np.ndarray
+    next_week_reserve_days: np.ndarray
+    next_week_published: np.ndarray
+    applications: np.ndarray
+    vacation: np.ndarray
+    sickness: np.ndarray
+    published: np.ndarray
+    schedules: np.ndarray
+    work_days: np.ndarray
+    off_days: np.ndarray
+    reserve_days: np.ndarray
+
+
+def get_horizon_inputs(
+    number_of_weeks: int,
+    number_of_users_to_solve: Optional[int] = None,
+    a: int = 0,
+    b: int = 0
+) -> HorizonInputs:
+    """
+    Loads the rosters of the fixed week and of the optimized weeks starting at the application
+    week. Workers without a roster in every week are left out.
+
+    Args:
+        number_of_weeks (int): The number of optimized weeks.
+        number_of_users_to_solve (Optional[int], optional): The maximum number of users to include
+                                                            in the optimization. Defaults to None,
+                                                            meaning every worker.
+        a (int, optional): Week offset of the fixed week. Defaults to 0.
+        b (int, optional): Week offset of the application week. Defaults to 0.
+
+    Returns:
+        HorizonInputs: The rosters as matrices.
+    """
+    next_week_number = get_current_week_number(1 - a)
+    week_numbers = [get_current_week_number(2 - b + week) for week in range(number_of_weeks)]
+    week = get_week_matrices([next_week_number, *week_numbers], number_of_users_to_solve)
+    if week.missing:
+        print('Workers missing a week:', week.missing)
+
+    optimized_weeks = slice(1, None)
+    return HorizonInputs(
+        week_numbers,
+        week.workers,
+        week.schedule[:, 0],
+        week.work_days[:, 0],
+        week.off_days[:, 0],
+        week.reserve_days[:, 0],
+        week.published[:, 0],
+        week.join('application', optimized_weeks),
+        week.join('vacation', optimized_weeks),
+        week.join('sickness', optimized_weeks),
+        week.published[:, optimized_weeks],
+        week.join('schedule', optimized_weeks),
+        week.join('work_days', optimized_weeks),
+        week.join('off_days', optimized_weeks),
+        week.join('reserve_days', optimized_weeks)
+    )
+
+
+def get_horizon_hint(
+    inputs: HorizonInputs,
+    incumbent: HorizonIncumbent,
+    min_workers: np.ndarray,
+    multiplier: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Builds a warm start for the optimized weeks of a rolling horizon, week by week: published
+    weeks keep their rosters, weeks solved by the previous run reuse that solution, other weeks
+    are built by `get_schedule_hint` from the week before.
+
+    Args:
+        inputs (HorizonInputs): The rosters of the horizon.
+        incumbent (HorizonIncumbent): The solution of the previous run by week number.
+        min_workers (np.ndarray): The minimum number of workers for each shift (21 * weeks
+                                  values).
+        multiplier (float): A scaling factor of the number of reserve workers per day.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The (workers, 21 * weeks) schedule
+        and the (workers, 7 * weeks) work, off and reserve day matrices of the hint.
+    """
+    previous = (inputs.next_week_schedules, inputs.next_week_work_days,
+                inputs.next_week_reserve_days, inputs.next_week_published)
+    weeks = []
+    for week, week_number in enumerate(inputs.week_numbers):
+        shifts = slice(week * NUMBER_OF_SHIFTS, (week + 1) * NUMBER_OF_SHIFTS)
+        days = slice(week * DAYS_IN_WEEK, (week + 1) * DAYS_IN_WEEK)
+        hint = incumbent.get(week_number)
+        if hint is None:
+            hint = get_schedule_hint(inputs.applications[:, shifts], *previous,
+                                     inputs.vacation[:, days], inputs.sickness[:, days],
+                                     min_workers[shifts], multiplier)
+        published = inputs.published[:, week, None]
+        hint = tuple(np.where(published, rosters[:, columns], values) for rosters, columns, values
+                     in zip((inputs.schedules, inputs.work_days, inputs.off_days,
+                             inputs.reserve_days), (shifts, days, days, days), hint))
+        weeks.append(hint)
+        previous = (hint[0], hint[1], hint[3], np.ones(len(inputs.workers), dtype=bool))
+
+    return tuple(np.concatenate(matrices, axis=1) for matrices in zip(*weeks))
+
+
+def optimize_rolling_horizon(
+    number_of_weeks: Optional[int] = None,
+    number_of_users_to_solve: Optional[int] = None,
+    multiplier: float = 1,
+    a: int = 0,
+    b: int = 0,
+    backend: Optional[str] = None,
+    num_search_workers: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    relative_gap_limit: Optional[float] = None,
+    use_hints: Optional[bool] = None,
+    progress: Optional[Callable[[int], None]] = None
+) -> Tuple[int, int, int, Optional[float]]:
+    """
+    Optimizes the application week together with the following weeks, so the rules across the
+    week boundaries (e.g. the rest after night shifts) and the applications of the later weeks
+    shape the application week. Only the application week is published, the later weeks are
+    planned again by the next runs as the horizon slides forward.
+
+    Weeks already published are kept (see `freeze_schedule_weeks`). The model of a horizon is
+    kept loaded between runs like the `optimize_schedule` model, and the solution of the weeks
+    that overlap the next run's horizon warm-starts it.
+
+    Args:
+        number_of_weeks (Optional[int], optional): The number of optimized weeks. Defaults to
+                                                   `settings.SOLVER_HORIZON_WEEKS`.
+        number_of_users_to_solve (Optional[int], optional): The maximum number of users to include
+                                                            in the optimization. Defaults to None,
+                                                            meaning every worker.
+        multiplier (float, optional): A scaling factor affecting certain constraints (e.g.,
+                                      reserve workers). Defaults to 1.
+        a (int, optional): Week offset of the fixed week. Defaults to 0.
+        b (int, optional): Week offset of the application week. Defaults to 0.
+        backend (Optional[str], optional): The solver backend, 'scip' or 'cp-sat'. Defaults to
+                                           `settings.SOLVER_BACKEND`.
+        num_search_workers (Optional[int], optional): The number of parallel CP-SAT search
+                                                      workers. Defaults to
+                                                      `settings.SOLVER_NUM_SEARCH_WORKERS`.
+        time_limit (Optional[float], optional): The time limit of the solve in seconds. Defaults
+                                                to `settings.SOLVER_TIME_LIMIT`.
+        relative_gap_limit (Optional[float], optional): The relative gap at which the search
+                                                        stops early. Defaults to
+                                                        `settings.SOLVER_RELATIVE_GAP_LIMIT`.
+        use_hints (Optional[bool], optional): Whether to warm-start the solver. Defaults to
+                                              `settings.SOLVER_USE_HINTS`.
+        progress (Optional[Callable[[int], None]], optional): Called with the progress in percent.
+                                                              Defaults to None.
+
+    Returns:
+        Tuple[int, int, int, Optional[float]]: The solver status, the runtime in milliseconds, the
+        number of constraints and the relative gap of the solution (None if no schedule was
+        found), like `optimize_schedule`.
+
+    Raises:
+        CapacityShortageError: If the present workers can't cover a week without published
+                               rosters, checked unless `settings.SOLVER_CAPACITY_CHECK` is False.
+    """
+    number_of_weeks = number_of_weeks or settings.SOLVER_HORIZON_WEEKS
+    backend = backend or settings.SOLVER_BACKEND
+    num_search_workers = num_search_workers or settings.SOLVER_NUM_SEARCH_WORKERS
+    time_limit = time_limit if time_limit is not None else settings.SOLVER_TIME_LIMIT
+    relative_gap_limit = relative_gap_limit if relative_gap_limit is not None \
+        else settings.SOLVER_RELATIVE_GAP_LIMIT
+    use_hints = use_hints if use_hints is not None else settings.SOLVER_USE_HINTS
+    progress = progress or (lambda _: None)
+
+    inputs = get_horizon_inputs(number_of_weeks, number_of_users_to_solve, a, b)
+    workers = inputs.workers
+    frozen = inputs.published
+    print('Horizon weeks:', inputs.week_numbers)
+    print('Published worker weeks kept:', int(frozen.sum()), '/', frozen.size)
+
+    min_workers = np.concatenate([get_min_workers(week_number, multiplier)
+                                  for week_number in inputs.week_numbers])
+    solver_run = SolverRun(kind=SOLVER_RUN_HORIZON, week_number=inputs.week_numbers[0],
+                           engine=SOLVER_ENGINE_COMPACT, backend=backend,
+                           num_workers=len(workers), multiplier=multiplier)
+
+    if settings.SOLVER_CAPACITY_CHECK:
+        # Published weeks don't follow the weekly quotas of the check
+        shortages = [
+            shortage
+            for week in np.flatnonzero(~frozen.any(axis=0)).tolist()
+            for shortage in check_schedule_capacity(
+                workers,
+                inputs.vacation[:, week * DAYS_IN_WEEK:(week + 1) * DAYS_IN_WEEK],
+                inputs.sickness[:, week * DAYS_IN_WEEK:(week + 1) * DAYS_IN_WEEK],
+                min_workers[week * NUMBER_OF_SHIFTS:(week + 1) * NUMBER_OF_SHIFTS],
+                multiplier
+            )
+        ]
+        if shortages:
+            print('Capacity shortages:', len(shortages))
+            solver_run.status = pywraplp.Solver.INFEASIBLE
+            solver_run.save()
+            raise CapacityShortageError(shortages)
+
+    progress(10)
+    build_start = time.perf_counter()
+    template_key = (number_of_weeks, get_template_key(
+        backend, num_search_workers, time_limit, relative_gap_limit, workers, multiplier))
+    template = checkout_model_template(template_key)
+    if template is None:
+        model = build_schedule_model_template(workers, multiplier, number_of_weeks)
+    else:
+        model, cached_presolved, solver_backend = template
+
+    # The checked out template goes back to the cache on every exit path, with the presolved
+    # model that is loaded into its solver
+    try:
+        update_schedule_model(
+            model,
+            inputs.next_week_schedules,
+            inputs.next_week_work_days,
+            inputs.next_week_off_days,
+            inputs.next_week_reserve_days,
+            inputs.applications,
+            inputs.vacation,
+            inputs.sickness,
+            min_workers
         )
-        application_week_vacation[username] = get_day_mapping(
-            application_week_roster.vacation,
-            SECOND_WEEK_DAY_INDEX_START,
-            SECOND_WEEK_DAY_INDEX_END
+        solved_model = model
+        if frozen.any():
+            solved_model = freeze_schedule_weeks(model, frozen, inputs.schedules, inputs.work_days,
+                                                 inputs.off_days, inputs.reserve_days)
+
+        presolved = presolve_model(solved_model, get_optimized_week_variables(model))
+        print('Variables (presolved):', model.num_variables, '->', presolved.model.num_variables)
+        print('Constraints (presolved):', model.num_constraints, '->',
+              presolved.model.num_constraints)
+        solver_run.num_variables = presolved.model.num_variables
+        solver_run.num_constraints = presolved.model.num_constraints
+        if presolved.infeasible:
+            solver_run.status = pywraplp.Solver.INFEASIBLE
+            solver_run.build_time = round((time.perf_counter() - build_start) * 1000)
+            solver_run.save()
+            return pywraplp.Solver.INFEASIBLE, 0, presolved.model.num_constraints, None
+
+        if template is None or cached_presolved.structure != presolved.structure:
+            solver_backend = get_solver_backend(
+                backend, num_search_workers, time_limit, relative_gap_limit)
+            solver_backend.load(presolved.model)
+        else:
+            solver_backend.update(presolved.model)
+        template = (model, presolved, solver_backend)
+
+        incumbent_key = (tuple(workers), multiplier)
+        if use_hints:
+            incumbent = get_horizon_incumbent(incumbent_key)
+            print('Weeks warm-started from the previous horizon:',
+                  sorted(set(incumbent) & set(inputs.week_numbers)))
+            hint = get_horizon_hint(inputs, incumbent, min_workers, multiplier)
+            set_schedule_hint(solver_backend, presolved, model, *get_application_week_hint_values(
+                model, *hint, inputs.vacation, inputs.sickness))
+
+        build_time = (time.perf_counter() - build_start) * 1000
+        status = solver_backend.solve()
+    finally:
+        if template is not None:
+            checkin_model_template(template_key, template)
+    progress(90)
+
+    wall_time = solver_backend.wall_time()
+    num_constraints = solver_backend.num_constraints()
+    solver_run.status = status
+    solver_run.build_time = round(build_time)
+    solver_run.solve_time = wall_time
+    if status not in FEASIBLE_STATUSES:
+        solver_run.save()
+        return status, wall_time, num_constraints, None
+
+    gap = solver_backend.relative_gap()
+    values = presolved.restore(solver_backend.values())
+    schedules, work_days, off_days, reserve_days = get_application_week_solution(model, values)
+    print('Model build time (ms):', round(build_time))
+    print('Solver runtime (ms):', wall_time)
+    print('Number of constraints:', num_constraints)
+
+    set_horizon_incumbent(incumbent_key, {
+        week_number: (
+            schedules[:, week * NUMBER_OF_SHIFTS:(week + 1) * NUMBER_OF_SHIFTS],
+            work_days[:, week * DAYS_IN_WEEK:(week + 1) * DAYS_IN_WEEK],
+            off_days[:, week * DAYS_IN_WEEK:(week + 1) * DAYS_IN_WEEK],
+            reserve_days[:, week * DAYS_IN_WEEK:(week + 1) * DAYS_IN_WEEK],
         )
-        application_week_sickness[username] = get_day_mapping(
-            application_week_roster.sickness,
-            SECOND_WEEK_DAY_INDEX_START,
-            SECOND_WEEK_DAY_INDEX_END
+        for week, week_number in enumerate(inputs.week_numbers)
+    })
+
+    # Publish the application week of the workers whose roster isn't published yet
+    write_back_start = time.perf_counter()
+    rows = np.flatnonzero(~frozen[:, 0])
+    if rows.size:
+        save_application_week_rosters(
+            inputs.week_numbers[0],
+            [workers[row] for row in rows],
+            schedules[rows, :NUMBER_OF_SHIFTS],
+            work_days[rows, :DAYS_IN_WEEK],
+            off_days[rows, :DAYS_IN_WEEK],
+            reserve_days[rows, :DAYS_IN_WEEK],
+            np.full(rows.size, not is_proven_optimal(status, gap))
         )
 
-    min_workers = get_min_workers_second_week(multiplier)
-
-    # Init variables
-    for worker in workers:
-        for shift in ROSTER_INDEX_1_42:
-            var_schedule[worker, shift] = solver.BoolVar(
-                f'var_schedule[{worker},{shift}]')
-
-        for day in DAYS_INDEX_1_14:
-            var_work_days[worker, day] = solver.BoolVar(
-                f'var_work_days[{worker},{day}]')
-            var_off_days[worker, day] = solver.BoolVar(
-                f'var_off_days[{worker},{day}]')
-            var_reserve_days[worker, day] = solver.BoolVar(
-                f'var_reserve_days[{worker},{day}]')
-            var_vacation[worker, day] = solver.BoolVar(
-                f'var_vacation[{worker},{day}]')
-            var_sickness[worker, day] = solver.BoolVar(
-                f'var_sickness[{worker},{day}]')
-
-    for worker in workers:
-        # Fix variables for the first week
-        for shift in ROSTER_INDEX_1_21:
-            var_schedule[worker, shift].SetBounds(
-                int(next_week_schedules[worker][shift]), int(next_week_schedules[worker][shift]))
-
-        for day in DAYS_INDEX_1_7:
-            var_work_days[worker, day].SetBounds(
-                int(next_week_work_days[worker][day]), int(next_week_work_days[worker][day]))
-            var_off_days[worker, day].SetBounds(
-                int(next_week_off_days[worker][day]), int(next_week_off_days[worker][day]))
-            var_reserve_days[worker, day].SetBounds(
-                int(next_week_reserve_days[worker][day]), int(next_week_reserve_days[worker][day]))
-
-        # Fix variables for the second week
-        for day in DAYS_INDEX_8_14:
-            if (
-                int(application_week_vacation[worker][day]) == 1 or
-                int(application_week_sickness[worker][day]) == 1
-            ):
-                var_work_days[worker, day].SetBounds(0, 0)
-                var_off_days[worker, day].SetBounds(0, 0)
-                var_reserve_days[worker, day].SetBounds(0, 0)
-                if int(application_week_vacation[worker][day]) == 1:
-                    var_vacation[worker, day].SetBounds(1, 1)
-                else:
-                    var_sickness[worker, day].SetBounds(1, 1)
-            else:
-                var_vacation[worker, day].SetBounds(0, 0)
-                var_sickness[worker, day].SetBounds(0, 0)
-
-    # Objective function: maximize the applications for the second week
-    objective = solver.Objective()
-    for worker in workers:
-        for shift in ROSTER_INDEX_22_42:
-            coefficient = float(application_week_applications[worker][shift])
-            objective.SetCoefficient(var_schedule[worker, shift], coefficient)
-
-    objective.SetMaximization()
-
-    # Constraints
-    for worker in workers:
-        vacation_for_week = sum(
-            int(vac) for vac in application_week_vacation[worker].values())
-        sickness_for_week = sum(
-            int(sick) for sick in application_week_sickness[worker].values())
-        vacation_binary = ''.join(application_week_vacation[worker].values())
-        sickness_binary = ''.join(application_week_sickness[worker].values())
-        max_consecutive_number_of_vac_days = max_consecutive_days_in_roster(
-            vacation_binary, CHAR_ZERO)
-        max_consecutive_number_of_sick_days = max_consecutive_days_in_roster(
-            sickness_binary, CHAR_ZERO)
-        max_cnsc_num_vac_sick_days = max(
-            max_consecutive_number_of_vac_days, max_consecutive_number_of_sick_days)
-        vac_sick_sum = vacation_for_week + sickness_for_week
-        number_of_work_days = min(4, 7 - vac_sick_sum)
-        number_of_off_days = max(2 - vac_sick_sum, 0)
-        number_of_reserve_days = 1 if vac_sick_sum < 3 else 0
-
-        # Define work days
-        solver.Add(sum(var_work_days[worker, day]
-                   for day in DAYS_INDEX_8_14) == number_of_work_days)
-
-        # Define off days
-        solver.Add(sum(var_off_days[worker, day]
-                   for day in DAYS_INDEX_8_14) == number_of_off_days)
-
-        # Define reserve days
-        solver.Add(sum(var_reserve_days[worker, day]
-                   for day in DAYS_INDEX_8_14) == number_of_reserve_days)
-
-        # Each day will be a working, off, reserve or a vacation day
-        for day in DAYS_INDEX_8_14:
-            solver.Add(var_work_days[worker, day] +
-                       var_off_days[worker, day] +
-                       var_reserve_days[worker, day] +
-                       var_vacation[worker, day] +
-                       var_sickness[worker, day] == 1)
-
-        # Each worker can only have shifts on workdays in the second week
-        for day in DAYS_INDEX_8_14:
-            solver.Add(sum(var_schedule[worker, (day - 1) * 3 + k]
-                       for k in range(1, 4)) == var_work_days[worker, day])
-
-        # Each worker can work at most one shift per day in the second week
-        for day in DAYS_INDEX_8_14:
-            solver.Add(sum(var_schedule[worker, (day - 1) * 3 + k]
-                       for k in range(1, 4)) <= 1)
-
-        # Each worker can work at most 2 night shifts in the second week
-        solver.Add(sum(var_schedule[worker, (day - 1) * 3 + 3]
-                   for day in DAYS_INDEX_8_14) <= 2)
-
-        if number_of_off_days > 0 and max_cnsc_num_vac_sick_days > 1:
-            # Ensure a reserve day follows a day off
-            for day in DAYS_INDEX_8_13:
-                solver.Add(var_off_days[worker, day + 1]
-                           >= var_reserve_days[worker, day])
-
-            # Ensure a reserve day cannot be preceded by an off day
-            for day in DAYS_INDEX_9_14:
-                solver.Add(var_off_days[worker, day - 1]
-                           <= 1 - var_reserve_days[worker, day])
-
-        # After night shifts, workers can't have morning or afternoon shift in both weeks
-        for day in DAYS_INDEX_8_13:  # 1..13
-            solver.Add(sum(var_schedule[worker, 3 + (day - 1) * 3 + k]
-                       for k in range(3)) <= 1)
-
-    # Minimum required workers for each shift in the second week
-    for shift in ROSTER_INDEX_22_42:
-        solver.Add(sum(var_schedule[worker, shift]
-                   for worker in workers) >= min_workers[shift])
-
-    # Each day must have at least 2 reserve workers in the second week
-    for day in DAYS_INDEX_8_14:
-        solver.Add(sum(var_reserve_days[worker, day]
-                   for worker in workers) >= 2 * multiplier)
-
-    # Solve the model
-    status = solver.Solve()
-
-    if status == pywraplp.Solver.OPTIMAL:
-        for worker in workers:
-            res_schedule = ""
-            res_work_days = ""
-            res_off_days = ""
-            res_reserve_days = ""
-
-            user = User.objects.get(username=worker)
-            roster = Roster.objects.get(
-                week_number=application_week_number, owner=user)
-
-            for shift in ROSTER_INDEX_22_42:
-                res_schedule += str(int(var_schedule[worker,
-                                    shift].solution_value()))
-            roster.schedule = res_schedule
-
-            for day in DAYS_INDEX_8_14:
-                res_work_days += str(
-                    int(var_work_days[worker, day].solution_value()))
-                res_off_days += str(int(var_off_days[worker,
-                                    day].solution_value()))
-                res_reserve_days += str(
-                    int(var_reserve_days[worker, day].solution_value()))
-
-            roster.work_days = res_work_days
-            roster.off_days = res_off_days
-            roster.reserve_days = res_reserve_days
-            roster.published = True
-            roster.save()
-
-        # Retrieve and print statistics
-        print('Solver runtime (ms):', solver.WallTime())
-        print('Number of constraints:', solver.NumConstraints())
+    solver_run.objective = solver_backend.objective_value()
+    solver_run.best_bound = solver_backend.best_bound()
+    solver_run.gap = gap
+    solver_run.write_back_time = round((time.perf_counter() - write_back_start) * 1000)
+    solver_run.save()
 
-    return status, solver.WallTime(), solver.NumConstraints()
+    return status, wall_time, num_constraints, gap
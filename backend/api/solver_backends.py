@@ -0,0 +1,740 @@
+import time
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+from ortools.sat.python import cp_model
+
+from .model_builder import RowGroup, ScheduleModel
+from .utils.solver_constants import (
+    DEFAULT_NUM_SEARCH_WORKERS,
+    OPTIMALITY_GAP_TOLERANCE,
+    SOLVER_BACKEND_CP_SAT,
+    SOLVER_BACKEND_SCIP,
+)
+
+
+FEASIBLE_STATUSES = (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE)
+
+CP_SAT_STATUS_TO_LINEAR_SOLVER_STATUS = {
+    cp_model.OPTIMAL: pywraplp.Solver.OPTIMAL,
+    cp_model.FEASIBLE: pywraplp.Solver.FEASIBLE,
+    cp_model.INFEASIBLE: pywraplp.Solver.INFEASIBLE,
+    cp_model.MODEL_INVALID: pywraplp.Solver.ABNORMAL,
+    cp_model.UNKNOWN: pywraplp.Solver.NOT_SOLVED,
+}
+
+
+def get_relative_gap(objective_value: float, best_bound: float) -> float:
+    """
+    Calculates the relative gap between the objective value of a solution and the best bound.
+
+    Args:
+        objective_value (float): The objective value of the best solution found.
+        best_bound (float): The best proven bound of the objective.
+
+    Returns:
+        float: The relative gap, 0 if the solution is proven optimal.
+    """
+    if objective_value == best_bound:
+        return 0.0
+    return abs(best_bound - objective_value) / max(abs(objective_value), 1e-9)
+
+
+def is_proven_optimal(status: int, gap: Optional[float]) -> bool:
+    """
+    Checks whether a schedule is proven optimal. The solvers also report OPTIMAL when they stop at
+    the relative gap limit, so the gap must be within `OPTIMALITY_GAP_TOLERANCE` as well.
+
+    Args:
+        status (int): The `pywraplp.Solver` status code of the solve.
+        gap (Optional[float]): The relative gap of the schedule, None if unknown.
+
+    Returns:
+        bool: True if the schedule is proven optimal.
+    """
+    return status == pywraplp.Solver.OPTIMAL and (gap or 0) <= OPTIMALITY_GAP_TOLERANCE
+
+
+def get_no_good_cut(values: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Builds the row excluding a boolean solution: at least one of its variables must flip.
+
+    Args:
+        values (np.ndarray): The 0/1 values of the solution.
+
+    Returns:
+        Tuple[np.ndarray, int]: The coefficient of each variable and the lower bound of the row.
+    """
+    ones = values > 0
+    return np.where(ones, -1, 1), 1 - int(ones.sum())
+
+
+def get_time_share(deadline: Optional[float], parts: int) -> Optional[float]:
+    """
+    Splits the time left until a deadline into equal parts.
+
+    Args:
+        deadline (Optional[float]): The `time.perf_counter` value of the deadline, None if there
+                                    is none.
+        parts (int): The number of parts.
+
+    Returns:
+        Optional[float]: The seconds of one part, 0 if the deadline passed, None without deadline.
+    """
+    if deadline is None:
+        return None
+    return max(deadline - time.perf_counter(), 0) / parts
+
+
+def get_model_data(model: ScheduleModel) -> Tuple[np.ndarray, ...]:
+    """
+    Copies the data dependent parts of a model, used by the backends to detect what changed
+    between two runs on the same model.
+
+    Args:
+        model (ScheduleModel): The model.
+
+    Returns:
+        Tuple[np.ndarray, ...]: The variable bounds, the objective, the bounds of each row group
+        and the objective offset.
+    """
+    return (
+        model.lower_bounds.copy(),
+        model.upper_bounds.copy(),
+        model.objective.copy(),
+        [(group.lower.copy(), group.upper.copy()) for group in model.row_groups],
+        model.objective_offset
+    )
+
+
+def get_integer_bounds(model: ScheduleModel) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rounds the variable bounds of a model inwards to integers.
+
+    Args:
+        model (ScheduleModel): The model.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The lower and upper bounds of the variables.
+    """
+    return (
+        np.ceil(model.lower_bounds).astype(np.int64),
+        np.floor(model.upper_bounds).astype(np.int64)
+    )
+
+
+def get_integer_row_bounds(model: ScheduleModel, group: RowGroup) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rounds the bounds of a row group inwards to integers. Infinite bounds are replaced by the
+    smallest and largest possible row activity, as CP-SAT domains must be finite.
+
+    Args:
+        model (ScheduleModel): The model the group belongs to.
+        group (RowGroup): The row group.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The lower and upper bounds of the rows.
+    """
+    lower_terms = group.coefficients * model.lower_bounds[group.indices]
+    upper_terms = group.coefficients * model.upper_bounds[group.indices]
+    min_activity = np.minimum(lower_terms, upper_terms).sum(axis=1)
+    max_activity = np.maximum(lower_terms, upper_terms).sum(axis=1)
+    lower = np.ceil(np.where(np.isinf(group.lower), min_activity, group.lower))
+    upper = np.floor(np.where(np.isinf(group.upper), max_activity, group.upper))
+    return lower.astype(np.int64), upper.astype(np.int64)
+
+
+class LinearSolverBackend:
+    """
+    Loads a `ScheduleModel` into an OR-Tools linear solver (SCIP by default) and solves it.
+
+    SCIP searches single-threaded, use `CpSatBackend` to make use of several cores.
+
+    Attributes:
+        solver (pywraplp.Solver): The underlying OR-Tools solver.
+        variables (list): The solver variables, ordered by model variable index.
+        constraints (list): The solver constraints of each row group.
+        time_limit (Optional[float]): The time limit of a solve in seconds, None if unlimited.
+        solution_pool_size (int): The maximum number of solutions returned by `solution_pool`.
+
+    Methods:
+        load(model, debug_names) -> None:
+            Creates the variables, the objective and the constraints of the model.
+        update(model) -> None:
+            Applies the changed bounds and objective coefficients of the loaded model.
+        set_hint(indices, values) -> None:
+            Passes a (partial) solution to the solver as a starting point.
+        solve() -> int:
+            Solves the model and returns a `pywraplp.Solver` status code.
+        values() -> np.ndarray:
+            Returns the solution value of every variable.
+        solution_pool(indices, time_limit) -> List[np.ndarray]:
+            Re-solves the model excluding the solutions found so far, best first.
+        objective_value() -> float:
+            Returns the objective value of the best solution.
+        best_bound() -> float:
+            Returns the best proven bound of the objective.
+        relative_gap() -> float:
+            Returns the relative gap between the best solution and the best bound.
+        wall_time() -> int:
+            Returns the solver runtime in milliseconds.
+        num_constraints() -> int:
+            Returns the number of constraints loaded into the solver.
+    """
+
+    def __init__(
+        self,
+        solver_id: str = 'SCIP',
+        time_limit: Optional[float] = None,
+        relative_gap_limit: Optional[float] = None,
+        solution_pool_size: int = 1
+    ) -> None:
+        self.solver = pywraplp.Solver.CreateSolver(solver_id)
+        self.solver.SetSolverSpecificParametersAsString("display/verblevel = 4")
+        self.solver.EnableOutput()
+        self.time_limit = time_limit
+        if time_limit is not None:
+            self.solver.SetTimeLimit(int(time_limit * 1000))
+        self.parameters = pywraplp.MPSolverParameters()
+        if relative_gap_limit is not None:
+            self.parameters.SetDoubleParam(
+                pywraplp.MPSolverParameters.RELATIVE_MIP_GAP, relative_gap_limit)
+        self.variables = []
+        self.constraints = []
+        self.solution_pool_size = solution_pool_size
+        self._loaded = None
+
+    def load(self, model: ScheduleModel, debug_names: bool = False) -> None:
+        """
+        Creates the variables, the objective and the constraints of the model.
+
+        Args:
+            model (ScheduleModel): The model to load.
+            debug_names (bool, optional): If True, variables and constraints get readable names.
+                                          Defaults to False, as the names are only needed for
+                                          debugging and are expensive to build.
+        """
+        solver = self.solver
+        infinity = solver.infinity()
+        names = model.variable_names() if debug_names else [''] * model.num_variables
+        lower_bounds = np.clip(model.lower_bounds, -infinity, infinity).tolist()
+        upper_bounds = np.clip(model.upper_bounds, -infinity, infinity).tolist()
+
+        self.variables = [
+            solver.Var(lower_bound, upper_bound, True, name)
+            for lower_bound, upper_bound, name in zip(lower_bounds, upper_bounds, names)
+        ]
+        variables = self.variables
+
+        objective = solver.Objective()
+        nonzero = np.flatnonzero(model.objective)
+        for index, coefficient in zip(nonzero.tolist(), model.objective[nonzero].tolist()):
+            objective.SetCoefficient(variables[index], coefficient)
+        objective.SetOffset(model.objective_offset)
+        if model.maximize:
+            objective.SetMaximization()
+        else:
+            objective.SetMinimization()
+
+        self.constraints = []
+        for group in model.row_groups:
+            lower = np.clip(group.lower, -infinity, infinity).tolist()
+            upper = np.clip(group.upper, -infinity, infinity).tolist()
+            group_constraints = []
+            for row, (indices, coefficients) in enumerate(
+                zip(group.indices.tolist(), group.coefficients.tolist())
+            ):
+                name = f'{group.name}[{row}]' if debug_names else ''
+                constraint = solver.Constraint(lower[row], upper[row], name)
+                for index, coefficient in zip(indices, coefficients):
+                    if coefficient:
+                        constraint.SetCoefficient(variables[index], coefficient)
+                group_constraints.append(constraint)
+            self.constraints.append(group_constraints)
+
+        self._loaded = get_model_data(model)
+
+    def update(self, model: ScheduleModel) -> None:
+        """
+        Applies the changed variable bounds, objective coefficients and row bounds of a model that
+        was loaded before, and clears the hint. The structure of the model must not change.
+
+        Args:
+            model (ScheduleModel): The loaded model, filled with new data.
+        """
+        infinity = self.solver.infinity()
+        loaded = self._loaded
+        current = get_model_data(model)
+
+        changed = np.flatnonzero(
+            (loaded[0] != current[0]) | (loaded[1] != current[1])).tolist()
+        lower_bounds = np.clip(model.lower_bounds, -infinity, infinity)
+        upper_bounds = np.clip(model.upper_bounds, -infinity, infinity)
+        for index in changed:
+            self.variables[index].SetBounds(lower_bounds[index], upper_bounds[index])
+
+        objective = self.solver.Objective()
+        for index in np.flatnonzero(loaded[2] != current[2]).tolist():
+            objective.SetCoefficient(self.variables[index], model.objective[index])
+        objective.SetOffset(model.objective_offset)
+
+        for group, constraints, loaded_bounds, bounds in zip(
+            model.row_groups, self.constraints, loaded[3], current[3]
+        ):
+            lower = np.clip(group.lower, -infinity, infinity)
+            upper = np.clip(group.upper, -infinity, infinity)
+            for row in np.flatnonzero(
+                (loaded_bounds[0] != bounds[0]) | (loaded_bounds[1] != bounds[1])
+            ).tolist():
+                constraints[row].SetBounds(lower[row], upper[row])
+
+        self.solver.SetHint([], [])
+        self._loaded = current
+
+    def set_hint(self, indices: np.ndarray, values: np.ndarray) -> None:
+        """
+        Passes a (partial) solution to the solver as a starting point.
+
+        Args:
+            indices (np.ndarray): The indices of the hinted variables.
+            values (np.ndarray): The hinted values.
+        """
+        self.solver.SetHint(
+            [self.variables[index] for index in np.ravel(indices).tolist()],
+            np.ravel(values).astype(float).tolist()
+        )
+
+    def solve(self) -> int:
+        """
+        Solves the loaded model.
+
+        Returns:
+            int: The `pywraplp.Solver` status code.
+        """
+        return self.solver.Solve(self.parameters)
+
+    def values(self) -> np.ndarray:
+        """
+        Returns the solution value of every variable, rounded to integers.
+
+        Returns:
+            np.ndarray: The solution values, ordered by model variable index.
+        """
+        return np.rint([variable.solution_value() for variable in self.variables]).astype(int)
+
+    def solution_pool(
+        self,
+        indices: Optional[np.ndarray] = None,
+        time_limit: Optional[float] = None
+    ) -> List[np.ndarray]:
+        """
+        Returns the solution of the last solve followed by up to `solution_pool_size` - 1
+        alternatives. Each alternative is found by re-solving the model with a no-good cut that
+        excludes the solutions found so far, so they come best first. The re-solves share
+        `time_limit`, each gets an equal part of the time left and starts from the previous
+        solution. The cuts are lifted again before returning, but the solver is left at the last
+        alternative, so read the statistics of the best solution first.
+
+        Args:
+            indices (Optional[np.ndarray], optional): The boolean variables two solutions must
+                                                      differ in. Defaults to None, meaning every
+                                                      variable.
+            time_limit (Optional[float], optional): The time limit of all re-solves in seconds.
+                                                    Defaults to None, meaning each re-solve has
+                                                    the time limit of the backend.
+
+        Returns:
+            List[np.ndarray]: The solution values of each solution, ordered by model variable
+            index.
+        """
+        infinity = self.solver.infinity()
+        indices = np.arange(len(self.variables)) if indices is None else np.ravel(indices)
+        variables = [self.variables[index] for index in indices.tolist()]
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        solutions = [self.values()]
+        cuts = []
+        while len(solutions) < self.solution_pool_size:
+            share = get_time_share(deadline, self.solution_pool_size - len(solutions))
+            if share is not None:
+                if share <= 0:
+                    break
+                self.solver.SetTimeLimit(max(int(share * 1000), 1))
+            coefficients, lower = get_no_good_cut(solutions[-1][indices])
+            cut = self.solver.Constraint(lower, infinity)
+            for variable, coefficient in zip(variables, coefficients.tolist()):
+                cut.SetCoefficient(variable, coefficient)
+            cuts.append(cut)
+            # The previous solution only violates the new cut, a close starting point
+            self.set_hint(np.arange(len(self.variables)), solutions[-1])
+            if self.solve() not in FEASIBLE_STATUSES:
+                break
+            solutions.append(self.values())
+
+        for cut in cuts:
+            cut.SetBounds(-infinity, infinity)
+        # A time limit of 0 means no limit
+        self.solver.SetTimeLimit(int((self.time_limit or 0) * 1000))
+        return solutions
+
+    def objective_value(self) -> float:
+        """
+        Returns the objective value of the best solution, only meaningful if a solution was found.
+        """
+        return self.solver.Objective().Value()
+
+    def best_bound(self) -> float:
+        """
+        Returns the best proven bound of the objective.
+        """
+        return self.solver.Objective().BestBound()
+
+    def relative_gap(self) -> float:
+        """
+        Returns the relative gap between the objective value of the best solution and the best
+        bound, only meaningful if a solution was found.
+        """
+        return get_relative_gap(self.objective_value(), self.best_bound())
+
+    def wall_time(self) -> int:
+        """
+        Returns the solver runtime in milliseconds.
+        """
+        return self.solver.WallTime()
+
+    def num_constraints(self) -> int:
+        """
+        Returns the number of constraints loaded into the solver.
+        """
+        return self.solver.NumConstraints()
+
+
+class CpSatBackend:
+    """
+    Loads a `ScheduleModel` into the OR-Tools CP-SAT solver and solves it with parallel search
+    workers.
+
+    The scheduling models are purely boolean with integer coefficients, so they are written
+    directly into the CP-SAT model proto. Fractional row bounds (e.g. a scaled reserve
+    requirement) are rounded inwards, which is exact for integer rows.
+
+    Attributes:
+        model (cp_model.CpModel): The CP-SAT model.
+        solver (cp_model.CpSolver): The CP-SAT solver.
+        solution_pool_size (int): The maximum number of solutions returned by `solution_pool`.
+
+    Methods:
+        load(model, debug_names) -> None:
+            Creates the variables, the objective and the constraints of the model.
+        update(model) -> None:
+            Applies the changed bounds and objective coefficients of the loaded model.
+        set_hint(indices, values) -> None:
+            Passes a (partial) solution to the solver as a starting point.
+        solve() -> int:
+            Solves the model and returns a `pywraplp.Solver` status code.
+        values() -> np.ndarray:
+            Returns the solution value of every variable.
+        solution_pool(indices, time_limit) -> List[np.ndarray]:
+            Re-solves the model excluding the solutions found so far, best first.
+        objective_value() -> float:
+            Returns the objective value of the best solution.
+        best_bound() -> float:
+            Returns the best proven bound of the objective.
+        relative_gap() -> float:
+            Returns the relative gap between the best solution and the best bound.
+        wall_time() -> int:
+            Returns the solver runtime in milliseconds.
+        num_constraints() -> int:
+            Returns the number of constraints loaded into the solver.
+    """
+
+    def __init__(
+        self,
+        num_search_workers: int = DEFAULT_NUM_SEARCH_WORKERS,
+        time_limit: Optional[float] = None,
+        relative_gap_limit: Optional[float] = None,
+        solution_pool_size: int = 1
+    ) -> None:
+        self.model = cp_model.CpModel()
+        self.solver = cp_model.CpSolver()
+        self.solver.parameters.num_workers = num_search_workers
+        self.solver.parameters.log_search_progress = True
+        if time_limit is not None:
+            self.solver.parameters.max_time_in_seconds = time_limit
+        if relative_gap_limit is not None:
+            self.solver.parameters.relative_gap_limit = relative_gap_limit
+        self.solution_pool_size = solution_pool_size
+        self._status = cp_model.UNKNOWN
+        self._loaded = None
+        self._row_bounds = []
+
+    def load(self, model: ScheduleModel, debug_names: bool = False) -> None:
+        """
+        Creates the variables, the objective and the constraints of the model.
+
+        Args:
+            model (ScheduleModel): The model to load.
+            debug_names (bool, optional): If True, variables and constraints get readable names.
+                                          Defaults to False.
+        """
+        proto = self.model.Proto()
+        names = model.variable_names() if debug_names else None
+        lower_bounds, upper_bounds = get_integer_bounds(model)
+
+        for index, (lower_bound, upper_bound) in enumerate(
+            zip(lower_bounds.tolist(), upper_bounds.tolist())
+        ):
+            variable = proto.variables.add()
+            variable.domain.extend((lower_bound, upper_bound))
+            if names:
+                variable.name = names[index]
+
+        self._write_objective(model)
+
+        self._row_bounds = []
+        for group in model.row_groups:
+            lower, upper = get_integer_row_bounds(model, group)
+            self._row_bounds.append((lower, upper))
+            lower = lower.tolist()
+            upper = upper.tolist()
+            for row, (indices, coefficients) in enumerate(
+                zip(group.indices.tolist(), group.coefficients.astype(np.int64).tolist())
+            ):
+                constraint = proto.constraints.add()
+                if debug_names:
+                    constraint.name = f'{group.name}[{row}]'
+                constraint.linear.vars.extend(indices)
+                constraint.linear.coeffs.extend(coefficients)
+                constraint.linear.domain.extend((lower[row], upper[row]))
+
+        self._loaded = get_model_data(model)
+
+    def update(self, model: ScheduleModel) -> None:
+        """
+        Applies the changed variable bounds, objective coefficients and row bounds of a model that
+        was loaded before, and clears the hint. The structure of the model must not change.
+
+        Args:
+            model (ScheduleModel): The loaded model, filled with new data.
+        """
+        proto = self.model.Proto()
+        loaded = self._loaded
+        current = get_model_data(model)
+
+        lower_bounds, upper_bounds = get_integer_bounds(model)
+        for index in np.flatnonzero(
+            (loaded[0] != current[0]) | (loaded[1] != current[1])
+        ).tolist():
+            proto.variables[index].domain[:] = [
+                int(lower_bounds[index]), int(upper_bounds[index])]
+
+        if (loaded[2] != current[2]).any() or loaded[4] != current[4]:
+            proto.ClearField('objective')
+            proto.ClearField('floating_point_objective')
+            self._write_objective(model)
+
+        # Infinite row bounds depend on the variable bounds, so every group is recomputed
+        offset = 0
+        for position, group in enumerate(model.row_groups):
+            lower, upper = get_integer_row_bounds(model, group)
+            loaded_lower, loaded_upper = self._row_bounds[position]
+            for row in np.flatnonzero((loaded_lower != lower) | (loaded_upper != upper)).tolist():
+                proto.constraints[offset + row].linear.domain[:] = [
+                    int(lower[row]), int(upper[row])]
+            self._row_bounds[position] = (lower, upper)
+            offset += len(lower)
+
+        self.model.ClearHints()
+        self._loaded = current
+
+    def _write_objective(self, model: ScheduleModel) -> None:
+        """
+        Writes the objective of the model into the proto, as an integer objective if possible.
+
+        Args:
+            model (ScheduleModel): The model whose objective is written.
+        """
+        proto = self.model.Proto()
+        nonzero = np.flatnonzero(model.objective)
+        coefficients = model.objective[nonzero]
+        if np.array_equal(coefficients, np.round(coefficients)):
+            sign = -1 if model.maximize else 1
+            proto.objective.vars.extend(nonzero.tolist())
+            proto.objective.coeffs.extend((sign * coefficients).astype(np.int64).tolist())
+            proto.objective.offset = sign * model.objective_offset
+            proto.objective.scaling_factor = sign
+        else:
+            proto.floating_point_objective.vars.extend(nonzero.tolist())
+            proto.floating_point_objective.coeffs.extend(coefficients.tolist())
+            proto.floating_point_objective.offset = model.objective_offset
+            proto.floating_point_objective.maximize = model.maximize
+
+    def set_hint(self, indices: np.ndarray, values: np.ndarray) -> None:
+        """
+        Passes a (partial) solution to the solver as a starting point.
+
+        Args:
+            indices (np.ndarray): The indices of the hinted variables.
+            values (np.ndarray): The hinted values.
+        """
+        hint = self.model.Proto().solution_hint
+        hint.vars.extend(np.ravel(indices).tolist())
+        hint.values.extend(np.ravel(values).astype(np.int64).tolist())
+
+    def solve(self) -> int:
+        """
+        Solves the loaded model.
+
+        Returns:
+            int: The `pywraplp.Solver` status code matching the CP-SAT status.
+        """
+        self._status = self.solver.Solve(self.model)
+        return CP_SAT_STATUS_TO_LINEAR_SOLVER_STATUS[self._status]
+
+    def values(self) -> np.ndarray:
+        """
+        Returns the solution value of every variable.
+
+        Returns:
+            np.ndarray: The solution values, ordered by model variable index.
+        """
+        return np.array(self.solver.ResponseProto().solution, dtype=int)
+
+    def solution_pool(
+        self,
+        indices: Optional[np.ndarray] = None,
+        time_limit: Optional[float] = None
+    ) -> List[np.ndarray]:
+        """
+        Returns the solution of the last solve followed by up to `solution_pool_size` - 1
+        alternatives. Each alternative is found by re-solving the model with a no-good cut that
+        excludes the solutions found so far, so they come best first. The re-solves share
+        `time_limit`, each gets an equal part of the time left and starts from the previous
+        solution. The cuts are removed again before returning, but the solver is left at the last
+        alternative, so read the statistics of the best solution first.
+
+        Args:
+            indices (Optional[np.ndarray], optional): The boolean variables two solutions must
+                                                      differ in. Defaults to None, meaning every
+                                                      variable.
+            time_limit (Optional[float], optional): The time limit of all re-solves in seconds.
+                                                    Defaults to None, meaning each re-solve has
+                                                    the time limit of the backend.
+
+        Returns:
+            List[np.ndarray]: The solution values of each solution, ordered by model variable
+            index.
+        """
+        proto = self.model.Proto()
+        parameters = self.solver.parameters
+        max_time_in_seconds = parameters.max_time_in_seconds
+        num_constraints = len(proto.constraints)
+        indices = np.arange(len(proto.variables)) if indices is None else np.ravel(indices)
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        solutions = [self.values()]
+        while len(solutions) < self.solution_pool_size:
+            share = get_time_share(deadline, self.solution_pool_size - len(solutions))
+            if share is not None:
+                if share <= 0:
+                    break
+                parameters.max_time_in_seconds = share
+            coefficients, lower = get_no_good_cut(solutions[-1][indices])
+            cut = proto.constraints.add()
+            cut.linear.vars.extend(indices.tolist())
+            cut.linear.coeffs.extend(coefficients.tolist())
+            cut.linear.domain.extend((lower, len(indices)))
+            # The previous solution only violates the new cut, a close starting point
+            self.model.ClearHints()
+            self.set_hint(np.arange(len(proto.variables)), solutions[-1])
+            if self.solve() not in FEASIBLE_STATUSES:
+                break
+            solutions.append(self.values())
+
+        del proto.constraints[num_constraints:]
+        parameters.max_time_in_seconds = max_time_in_seconds
+        return solutions
+
+    def objective_value(self) -> float:
+        """
+        Returns the objective value of the best solution, only meaningful if a solution was found.
+        """
+        return self.solver.ObjectiveValue()
+
+    def best_bound(self) -> float:
+        """
+        Returns the best proven bound of the objective.
+        """
+        return self.solver.BestObjectiveBound()
+
+    def relative_gap(self) -> float:
+        """
+        Returns the relative gap between the objective value of the best solution and the best
+        bound, only meaningful if a solution was found.
+        """
+        return get_relative_gap(self.objective_value(), self.best_bound())
+
+    def wall_time(self) -> int:
+        """
+        Returns the solver runtime in milliseconds.
+        """
+        return int(self.solver.WallTime() * 1000)
+
+    def num_constraints(self) -> int:
+        """
+        Returns the number of constraints loaded into the solver.
+        """
+        return len(self.model.Proto().constraints)
+
+
+def export_model_as_mps(model: ScheduleModel) -> str:
+    """
+    Exports a model in the free MPS format with readable variable and constraint names, so it
+    can be solved by other tools.
+
+    Args:
+        model (ScheduleModel): The model to export.
+
+    Returns:
+        str: The model in MPS format.
+    """
+    backend = LinearSolverBackend()
+    backend.load(model, debug_names=True)
+    return backend.solver.ExportModelAsMpsFormat(False, False)
+
+
+def get_solver_backend(
+    backend: str = SOLVER_BACKEND_SCIP,
+    num_search_workers: int = DEFAULT_NUM_SEARCH_WORKERS,
+    time_limit: Optional[float] = None,
+    relative_gap_limit: Optional[float] = None,
+    solution_pool_size: int = 1
+) -> Union[LinearSolverBackend, CpSatBackend]:
+    """
+    Creates the solver backend with the given name.
+
+    Args:
+        backend (str, optional): Either 'scip' or 'cp-sat'. Defaults to 'scip'.
+        num_search_workers (int, optional): The number of parallel search workers, only used by
+                                            CP-SAT. Defaults to 8.
+        time_limit (Optional[float], optional): The time limit of the solve in seconds. Defaults
+                                                to None, meaning no limit.
+        relative_gap_limit (Optional[float], optional): The relative gap at which the search
+                                                        stops early. Defaults to None, meaning the
+                                                        solver default.
+        solution_pool_size (int, optional): The maximum number of distinct solutions returned by
+                                            `solution_pool`. Defaults to 1, only the best
+                                            solution.
+
+    Returns:
+        Union[LinearSolverBackend, CpSatBackend]: The solver backend.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if backend == SOLVER_BACKEND_SCIP:
+        return LinearSolverBackend(time_limit=time_limit, relative_gap_limit=relative_gap_limit,
+                                   solution_pool_size=solution_pool_size)
+    if backend == SOLVER_BACKEND_CP_SAT:
+        return CpSatBackend(num_search_workers, time_limit, relative_gap_limit,
+                            solution_pool_size)
+    raise ValueError(f"Unknown solver backend: {backend}")
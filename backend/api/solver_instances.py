@@ -0,0 +1,112 @@
+import json
+import os
+import uuid
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .model_builder import ScheduleModel
+from .solver_backends import export_model_as_mps
+
+INPUTS_FILE = 'inputs.npz'
+METADATA_FILE = 'metadata.json'
+
+
+class SolverInstance(NamedTuple):
+    """
+    A recorded solve, enough to rebuild and solve its model again without the database.
+
+    Attributes:
+        path (str): The directory of the instance.
+        kind (str): The solved problem: 'optimize' or 'reoptimize'.
+        metadata (Dict): The parameters of the solve (multiplier, week numbers, solver settings)
+                         and its recorded statistics.
+        arrays (Dict[str, np.ndarray]): The input matrices, e.g. the rosters and the coverage.
+    """
+    path: str
+    kind: str
+    metadata: Dict
+    arrays: Dict[str, np.ndarray]
+
+
+def record_solver_instance(
+    kind: str,
+    week_number: int,
+    arrays: Dict[str, np.ndarray],
+    metadata: Dict,
+    models: Dict[str, ScheduleModel]
+) -> Optional[str]:
+    """
+    Saves the inputs and the models of a solve to a new directory in
+    `settings.SOLVER_INSTANCE_DIR`: the matrices in `inputs.npz`, the parameters in
+    `metadata.json` and every model as `<name>.mps`. A failure to write is printed and doesn't
+    stop the solve.
+
+    Args:
+        kind (str): The solved problem: 'optimize' or 'reoptimize'.
+        week_number (int): The week the solve was for.
+        arrays (Dict[str, np.ndarray]): The input matrices.
+        metadata (Dict): The JSON serializable parameters and statistics of the solve.
+        models (Dict[str, ScheduleModel]): The models loaded into the solver, by name.
+
+    Returns:
+        Optional[str]: The directory of the instance, None if it could not be written.
+    """
+    name = f"{timezone.now():%Y%m%dT%H%M%S}-{kind}-week{week_number}-{uuid.uuid4().hex[:8]}"
+    path = os.path.join(settings.SOLVER_INSTANCE_DIR, name)
+    try:
+        os.makedirs(path)
+        np.savez_compressed(os.path.join(path, INPUTS_FILE), **arrays)
+        with open(os.path.join(path, METADATA_FILE), 'w') as file:
+            json.dump({'kind': kind, 'week_number': week_number, **metadata}, file, indent=2)
+        for model_name, model in models.items():
+            with open(os.path.join(path, f'{model_name}.mps'), 'w') as file:
+                file.write(export_model_as_mps(model))
+    except OSError as error:
+        print('Could not record the solver instance:', error)
+        return None
+
+    print('Solver instance recorded:', path)
+    return path
+
+
+def load_solver_instance(path: str) -> SolverInstance:
+    """
+    Loads a recorded solve.
+
+    Args:
+        path (str): The directory of the instance.
+
+    Returns:
+        SolverInstance: The recorded solve.
+    """
+    with open(os.path.join(path, METADATA_FILE)) as file:
+        metadata = json.load(file)
+    with np.load(os.path.join(path, INPUTS_FILE)) as inputs:
+        arrays = {name: inputs[name] for name in inputs.files}
+    return SolverInstance(path, metadata['kind'], metadata, arrays)
+
+
+def find_solver_instances(paths: List[str]) -> List[str]:
+    """
+    Expands instance directories and corpus directories (directories of instances) into the
+    list of instance directories, in name order within a corpus, i.e. by recording time.
+
+    Args:
+        paths (List[str]): Instance or corpus directories.
+
+    Returns:
+        List[str]: The instance directories.
+    """
+    instances = []
+    for path in paths:
+        if os.path.isfile(os.path.join(path, METADATA_FILE)):
+            instances.append(path)
+            continue
+        instances.extend(
+            os.path.join(path, name) for name in sorted(os.listdir(path))
+            if os.path.isfile(os.path.join(path, name, METADATA_FILE))
+        )
+    return instances
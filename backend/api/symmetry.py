@@ -0,0 +1,84 @@
+from typing import Hashable, List, NamedTuple, Tuple
+
+import numpy as np
+
+
+class WorkerClasses(NamedTuple):
+    """
+    Workers grouped into classes of interchangeable workers.
+
+    Attributes:
+        representatives (np.ndarray): The index of the first worker of each class.
+        sizes (np.ndarray): The number of workers in each class.
+        members (List[np.ndarray]): The worker indices of each class, in ascending order.
+    """
+    representatives: np.ndarray
+    sizes: np.ndarray
+    members: List[np.ndarray]
+
+
+def get_worker_classes(
+    applications: np.ndarray,
+    vacation: np.ndarray,
+    sickness: np.ndarray,
+    aggregate: bool = True
+) -> WorkerClasses:
+    """
+    Groups the workers with identical applications, vacation and sickness into classes. Such
+    workers have the same feasible weeks and the same objective coefficients, so any schedule
+    stays optimal when two of them swap their weeks; the model only needs the number of workers of
+    each class on each week.
+
+    Classes are ordered by their first worker, so the grouping is deterministic.
+
+    Args:
+        applications (np.ndarray): A (workers, 21) matrix of the applications.
+        vacation (np.ndarray): A (workers, 7) matrix of the vacation days.
+        sickness (np.ndarray): A (workers, 7) matrix of the sick days.
+        aggregate (bool, optional): Whether to group the workers, if False every worker is a class
+                                    of its own. Defaults to True.
+
+    Returns:
+        WorkerClasses: The classes of the workers.
+    """
+    number_of_workers = applications.shape[0]
+    if not aggregate or number_of_workers == 0:
+        return WorkerClasses(np.arange(number_of_workers), np.ones(number_of_workers, dtype=int),
+                             [np.array([worker]) for worker in range(number_of_workers)])
+
+    profiles = np.hstack((applications, vacation, sickness)).astype(np.uint8)
+    _, representatives, inverse, sizes = np.unique(
+        profiles, axis=0, return_index=True, return_inverse=True, return_counts=True)
+    order = np.argsort(representatives)
+    inverse = inverse.reshape(-1)
+
+    return WorkerClasses(
+        representatives[order],
+        sizes[order],
+        [np.flatnonzero(inverse == label) for label in order]
+    )
+
+
+def disaggregate_counts(
+    classes: WorkerClasses,
+    counts: List[List[Tuple[Hashable, int]]]
+) -> List[Hashable]:
+    """
+    Assigns the weeks chosen for each class to its workers. The weeks of a class are handed out in
+    the given order to the workers in ascending index order, so the same solution always yields
+    the same rosters.
+
+    Args:
+        classes (WorkerClasses): The classes of the workers.
+        counts (List[List[Tuple[Hashable, int]]]): The (week, number of workers) pairs of each
+                                                   class, the numbers add up to the class size.
+
+    Returns:
+        List[Hashable]: The week of each worker.
+    """
+    weeks: List[Hashable] = [None] * int(classes.sizes.sum())
+    for members, class_counts in zip(classes.members, counts):
+        chosen = [week for week, count in class_counts for _ in range(count)]
+        for worker, week in zip(members.tolist(), chosen):
+            weeks[worker] = week
+    return weeks
@@ -1,3 +1,669 @@
-from django.test import TestCase
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from ortools.linear_solver import pywraplp
+
+from .capacity_check import CapacityShortageError
+from .coverage import clear_coverage_profiles, get_coverage_demand, get_min_workers
+from .heuristic import RowActivity
+from .model_builder import (
+    build_schedule_model_template,
+    get_optimized_week_variables,
+    get_reoptimization_neighborhood,
+    update_schedule_model,
+)
+from .model_cache import clear_model_templates
+from .models import CoverageProfile, Roster, Scenario, SolverJob, SolverRun
+from .presolve import presolve_model
+from .scenarios import commit_scenario, get_scenario_input_hash, run_solution_pool
+from .serializers import SolverRunFilterSerializer
+from .solver import (
+    get_local_search_schedule,
+    get_reoptimization_inputs,
+    get_schedule_inputs,
+    optimize_schedule,
+    reoptimize_schedule_after_sickness,
+    save_application_week_rosters,
+    solve_schedule_shard,
+)
+from .solver_backends import LinearSolverBackend, get_solver_backend
+from .utils.benchmark_fn import apply_synthetic_sickness, create_synthetic_crew
+from .utils.date_time_fn import (
+    current_year,
+    get_current_week_number,
+    get_first_and_last_day_of_week,
+)
+from .utils.solver_constants import (
+    CAPACITY_SHIFT,
+    DEFAULT_COVERAGE,
+    PUBLISHED_ROSTER_FIELDS,
+    SOLVER_BACKEND_CP_SAT,
+    SOLVER_BACKEND_SCIP,
+    SOLVER_ENGINE_COMPACT,
+    SOLVER_ENGINE_HEURISTIC,
+    SOLVER_ENGINE_RESULT_CACHE,
+    SOLVER_JOB_FAILED,
+    SOLVER_JOB_RUNNING,
+)
+from .utils.solver_job_fn import claim_next_solver_job, enqueue_solver_job
+
+# The objective of the baseline (dict-addressed) optimize_schedule model on the synthetic crew of
+# 15 workers with seed 0, solved on top of the rotating previous week
+BASELINE_OBJECTIVE = 49
+
+
+def get_granted_applications(week_number: int) -> int:
+    """
+    Counts the applied shifts that are scheduled in the rosters of a week.
+    """
+    return sum(
+        application == schedule == '1'
+        for roster in Roster.objects.filter(week_number=week_number)
+        for application, schedule in zip(roster.application, roster.schedule)
+    )
+
+
+class ScheduleModelTests(TestCase):
+    """
+    Tests the index-addressed `optimize_schedule` model against the baseline model.
+    """
+
+    def setUp(self) -> None:
+        clear_model_templates()
+        create_synthetic_crew(15, seed=0)
+
+    def test_objective_matches_baseline(self) -> None:
+        status = optimize_schedule(multiplier=1, a=2, b=2, use_result_cache=False)[0]
+
+        self.assertEqual(status, pywraplp.Solver.OPTIMAL)
+        self.assertAlmostEqual(SolverRun.objects.get().objective, BASELINE_OBJECTIVE)
+        self.assertEqual(get_granted_applications(get_current_week_number(0)),
+                         BASELINE_OBJECTIVE)
+
+    def test_cp_sat_objective_matches_baseline(self) -> None:
+        status = optimize_schedule(multiplier=1, a=2, b=2, backend=SOLVER_BACKEND_CP_SAT,
+                                   use_result_cache=False)[0]
+
+        self.assertEqual(status, pywraplp.Solver.OPTIMAL)
+        solver_run = SolverRun.objects.get()
+        self.assertEqual(solver_run.backend, SOLVER_BACKEND_CP_SAT)
+        self.assertAlmostEqual(solver_run.objective, BASELINE_OBJECTIVE)
+        self.assertEqual(get_granted_applications(get_current_week_number(0)),
+                         BASELINE_OBJECTIVE)
+
+    def test_gap_limit_schedule_is_suboptimal(self) -> None:
+        # The solvers report OPTIMAL when they stop at the relative gap limit
+        with mock.patch.object(LinearSolverBackend, 'relative_gap', return_value=0.02):
+            status = optimize_schedule(multiplier=1, a=2, b=2, use_result_cache=False)[0]
+
+        self.assertEqual(status, pywraplp.Solver.OPTIMAL)
+        rosters = Roster.objects.filter(week_number=get_current_week_number(0))
+        self.assertTrue(rosters.exists())
+        self.assertFalse(rosters.filter(suboptimal=False).exists())
+
+    def test_horizon_rejects_unsupported_options(self) -> None:
+        for option, message in (({'engine': 'heuristic'}, 'heuristic engine'),
+                                ({'shard_by_group': True}, 'sharding'),
+                                ({'use_result_cache': True}, 'result cache')):
+            with self.subTest(option=option), self.assertRaisesMessage(ValueError, message):
+                optimize_schedule(multiplier=1, horizon_weeks=2, **option)
+        self.assertFalse(SolverRun.objects.exists())
+
+
+class ResultCacheTests(TestCase):
+    """
+    Tests that a run of already optimized inputs republishes the cached schedule without solving.
+    """
+
+    def setUp(self) -> None:
+        clear_model_templates()
+        create_synthetic_crew(15, seed=0)
+        optimize_schedule(multiplier=1, a=2, b=2, use_result_cache=True)
+        self.week_number = get_current_week_number(0)
+        self.rosters = self.get_rosters()
+
+    def get_rosters(self) -> dict:
+        return {
+            roster[0]: roster[1:]
+            for roster in Roster.objects.filter(week_number=self.week_number)
+            .values_list('owner__username', *PUBLISHED_ROSTER_FIELDS)
+        }
+
+    def test_cache_hit_republishes_changed_rosters(self) -> None:
+        unpublished, edited = sorted(self.rosters)[:2]
+        Roster.objects.filter(week_number=self.week_number, owner__username=unpublished) \
+            .update(published=False)
+        Roster.objects.filter(week_number=self.week_number, owner__username=edited) \
+            .update(schedule='0' * 21)
+
+        with mock.patch('api.solver.solve_schedule_shard') as solve, \
+                mock.patch('api.solver.save_application_week_rosters',
+                           wraps=save_application_week_rosters) as save:
+            status = optimize_schedule(multiplier=1, a=2, b=2, use_result_cache=True)[0]
+
+        self.assertEqual(status, pywraplp.Solver.OPTIMAL)
+        solve.assert_not_called()
+        save.assert_called_once()
+        self.assertEqual(sorted(save.call_args.args[1]), [unpublished, edited])
+        self.assertEqual(self.get_rosters(), self.rosters)
+        self.assertEqual(SolverRun.objects.latest('id').engine, SOLVER_ENGINE_RESULT_CACHE)
+
+    def test_gap_limit_result_is_not_reused(self) -> None:
+        SolverRun.objects.update(gap=0.02)
+
+        status = optimize_schedule(multiplier=1, a=2, b=2, use_result_cache=True)[0]
+
+        self.assertEqual(status, pywraplp.Solver.OPTIMAL)
+        self.assertEqual(SolverRun.objects.latest('id').engine, SOLVER_ENGINE_COMPACT)
+
+
+class HeuristicEngineTests(TestCase):
+    """
+    Tests that the local search finds a schedule satisfying every row of the model and that the
+    heuristic engine publishes it through the shared write-back.
+    """
+
+    def setUp(self) -> None:
+        create_synthetic_crew(15, seed=0)
+        self.inputs = get_schedule_inputs(a=2, b=2)
+
+    def test_local_search_satisfies_every_row(self) -> None:
+        min_workers = get_min_workers(self.inputs.application_week_number, 1)
+        model = build_schedule_model_template(self.inputs.workers, 1)
+        update_schedule_model(
+            model,
+            self.inputs.next_week_schedules,
+            self.inputs.next_week_work_days,
+            self.inputs.next_week_off_days,
+            self.inputs.next_week_reserve_days,
+            self.inputs.applications,
+            self.inputs.vacation,
+            self.inputs.sickness,
+            min_workers
+        )
+
+        result = get_local_search_schedule(model, self.inputs, min_workers, 1, 10)
+
+        self.assertEqual(result.violation, 0)
+        # Recomputed from scratch, not from the activities updated move by move
+        activity = RowActivity(model, result.values)
+        self.assertEqual(activity.violation, 0)
+        self.assertEqual(activity.get_violated_rows().size, 0)
+        self.assertTrue((result.values >= model.lower_bounds).all())
+        self.assertTrue((result.values <= model.upper_bounds).all())
+
+    def test_heuristic_schedule_is_published(self) -> None:
+        results = []
+
+        def solve(*args, **kwargs):
+            results.append(solve_schedule_shard(*args, **kwargs))
+            return results[-1]
+
+        with mock.patch('api.solver.solve_schedule_shard', side_effect=solve), \
+                mock.patch('api.solver.save_application_week_rosters',
+                           wraps=save_application_week_rosters) as save:
+            status = optimize_schedule(multiplier=1, a=2, b=2, engine=SOLVER_ENGINE_HEURISTIC,
+                                       use_result_cache=False)[0]
+
+        self.assertEqual(status, pywraplp.Solver.FEASIBLE)
+        save.assert_called_once()
+        result = results[0]
+        rosters = Roster.objects.filter(week_number=self.inputs.application_week_number) \
+            .select_related('owner')
+        rows = {worker: row for row, worker in enumerate(self.inputs.workers)}
+        self.assertEqual(len(rosters), len(rows))
+        for roster in rosters:
+            row = rows[roster.owner.username]
+            for field, matrix in (('schedule', result.schedules), ('work_days', result.work_days),
+                                  ('off_days', result.off_days),
+                                  ('reserve_days', result.reserve_days)):
+                self.assertEqual(getattr(roster, field),
+                                 ''.join(str(round(value)) for value in matrix[row]))
+            # Without a bound the schedule is not proven optimal
+            self.assertTrue(roster.published)
+            self.assertTrue(roster.suboptimal)
+        self.assertEqual(SolverRun.objects.get().engine, SOLVER_ENGINE_HEURISTIC)
+
+
+class PresolveTests(TestCase):
+    """
+    Tests that the solution of a presolved model restores to a solution of the unpresolved model.
+    """
+
+    def setUp(self) -> None:
+        create_synthetic_crew(15, seed=0)
+        self.inputs = get_schedule_inputs(a=2, b=2)
+        self.model = build_schedule_model_template(self.inputs.workers, 1)
+        self.update_model(self.inputs.vacation)
+
+    def update_model(self, vacation: np.ndarray) -> None:
+        inputs = self.inputs
+        update_schedule_model(
+            self.model,
+            inputs.next_week_schedules,
+            inputs.next_week_work_days,
+            inputs.next_week_off_days,
+            inputs.next_week_reserve_days,
+            inputs.applications,
+            vacation,
+            inputs.sickness,
+            get_min_workers(inputs.application_week_number, 1)
+        )
+
+    def test_presolved_solution_restores(self) -> None:
+        presolved = presolve_model(self.model)
+        self.assertFalse(presolved.infeasible)
+        self.assertLess(presolved.model.num_variables, self.model.num_variables)
+
+        solver_backend = get_solver_backend()
+        solver_backend.load(self.model)
+        presolved_backend = get_solver_backend()
+        presolved_backend.load(presolved.model)
+
+        self.assertEqual(solver_backend.solve(), pywraplp.Solver.OPTIMAL)
+        self.assertEqual(presolved_backend.solve(), pywraplp.Solver.OPTIMAL)
+        self.assertAlmostEqual(presolved_backend.objective_value(),
+                               solver_backend.objective_value())
+
+        # The restored solution is a solution of the unpresolved model with the same objective
+        restored = np.round(presolved.restore(presolved_backend.values()))
+        self.assertEqual(RowActivity(self.model, restored).violation, 0)
+        self.assertTrue((restored >= self.model.lower_bounds).all())
+        self.assertTrue((restored <= self.model.upper_bounds).all())
+        self.assertAlmostEqual(self.model.objective @ restored + self.model.objective_offset,
+                               solver_backend.objective_value())
+
+        # The unpresolved solution restores to itself from its free variables
+        values = np.round(solver_backend.values())
+        np.testing.assert_array_equal(presolved.restore(values[presolved.variables]), values)
+
+    def test_absences_keep_the_structure(self) -> None:
+        kept = get_optimized_week_variables(self.model)
+        presolved = presolve_model(self.model, kept)
+        solver_backend = get_solver_backend()
+        solver_backend.load(presolved.model)
+        self.assertEqual(solver_backend.solve(), pywraplp.Solver.OPTIMAL)
+
+        vacation = self.inputs.vacation.copy()
+        vacation[:2, 2:4] = 1
+        self.update_model(vacation)
+        changed = presolve_model(self.model, kept)
+        self.assertEqual(changed.structure, presolved.structure)
+
+        # The updated solver solves the new week like a solver loaded with it
+        solver_backend.update(changed.model)
+        loaded_backend = get_solver_backend()
+        loaded_backend.load(presolve_model(self.model).model)
+        self.assertEqual(solver_backend.solve(), pywraplp.Solver.OPTIMAL)
+        self.assertEqual(loaded_backend.solve(), pywraplp.Solver.OPTIMAL)
+        self.assertAlmostEqual(solver_backend.objective_value(), loaded_backend.objective_value())
+        restored = np.round(changed.restore(solver_backend.values()))
+        self.assertEqual(RowActivity(self.model, restored).violation, 0)
+
+
+class SolutionPoolTests(TestCase):
+    """
+    Tests that a solution pool returns distinct alternatives of the best schedule on a crew with
+    several optimal schedules.
+    """
+
+    def setUp(self) -> None:
+        create_synthetic_crew(15, seed=0)
+
+    def test_pool_has_alternatives(self) -> None:
+        inputs = get_schedule_inputs()
+        for backend in (SOLVER_BACKEND_SCIP, SOLVER_BACKEND_CP_SAT):
+            with self.subTest(backend=backend):
+                result = solve_schedule_shard(inputs, 1, SOLVER_ENGINE_COMPACT, backend, 8, 10,
+                                              None, True, False, solution_pool_size=3)
+
+                self.assertEqual(result.status, pywraplp.Solver.OPTIMAL)
+                self.assertGreater(len(result.pool), 1)
+                np.testing.assert_array_equal(result.pool[0].schedules, result.schedules)
+                self.assertEqual(len({
+                    b''.join(matrix.tobytes() for matrix in solution[1:])
+                    for solution in result.pool
+                }), len(result.pool))
+                objectives = [solution.objective for solution in result.pool]
+                self.assertEqual(objectives, sorted(objectives, reverse=True))
+
+    def test_pool_stops_at_its_time_limit(self) -> None:
+        result = solve_schedule_shard(get_schedule_inputs(), 1, SOLVER_ENGINE_COMPACT,
+                                      SOLVER_BACKEND_SCIP, 8, 10, None, True, False,
+                                      solution_pool_size=3, solution_pool_time_limit=0)
+
+        self.assertEqual(result.status, pywraplp.Solver.OPTIMAL)
+        self.assertEqual(len(result.pool), 1)
+
+    def test_drafts_are_stored_in_one_sweep(self) -> None:
+        sweep = uuid.uuid4()
+        scenarios = run_solution_pool(1, size=3, sweep=str(sweep))
+
+        self.assertGreater(len(scenarios), 1)
+        self.assertTrue(all(scenario.sweep == sweep and scenario.rosters is not None
+                            for scenario in scenarios))
+
+
+class RosterWriteBackTests(TestCase):
+    """
+    Tests that the bulk write-back publishes the rosters of the given workers in the application
+    week, and nothing else, in one transaction.
+    """
+
+    def setUp(self) -> None:
+        create_synthetic_crew(15, seed=0)
+        inputs = get_schedule_inputs()
+        self.week_number = inputs.application_week_number
+        self.workers = inputs.workers[:5]
+        self.rosters = self.get_rosters()
+
+    @staticmethod
+    def get_rosters() -> dict:
+        return {
+            (roster[0], roster[1]): roster[2:]
+            for roster in Roster.objects.values_list('week_number', 'owner__username',
+                                                     *PUBLISHED_ROSTER_FIELDS)
+        }
+
+    def save(self, workers: list) -> None:
+        number_of_workers = len(workers)
+        save_application_week_rosters(
+            self.week_number,
+            workers,
+            np.zeros((number_of_workers, 21)),
+            np.ones((number_of_workers, 7)),
+            np.zeros((number_of_workers, 7)),
+            np.zeros((number_of_workers, 7)),
+            np.ones(number_of_workers, dtype=bool)
+        )
+
+    def test_only_the_given_rosters_are_written(self) -> None:
+        self.save(self.workers)
+
+        written = ('0' * 21, '1' * 7, '0' * 7, '0' * 7, True, True)
+        for key, roster in self.get_rosters().items():
+            if key[0] == self.week_number and key[1] in self.workers:
+                self.assertEqual(roster, written)
+            else:
+                self.assertEqual(roster, self.rosters[key])
+
+    def test_missing_roster_writes_nothing(self) -> None:
+        with self.assertRaises(Roster.DoesNotExist):
+            self.save(self.workers + ['nobody'])
+        self.assertEqual(self.get_rosters(), self.rosters)
+
+    def test_failed_write_is_rolled_back(self) -> None:
+        bulk_update = QuerySet.bulk_update
+
+        def fail_after_first_roster(queryset, rosters, fields, batch_size=None):
+            bulk_update(queryset, rosters[:1], fields)
+            raise DatabaseError("Connection lost.")
+
+        with mock.patch.object(QuerySet, 'bulk_update', fail_after_first_roster):
+            with self.assertRaises(DatabaseError):
+                self.save(self.workers)
+        self.assertEqual(self.get_rosters(), self.rosters)
+
+
+@override_settings(SOLVER_COVERAGE_CACHE_TTL=3600)
+class CoverageProfileTests(TestCase):
+    """
+    Tests that the cached coverage profiles follow their saves, versions and date overrides, and
+    reach the solver.
+    """
+
+    def setUp(self) -> None:
+        # The cache outlives the rolled back profiles of a test
+        clear_coverage_profiles()
+        self.addCleanup(clear_coverage_profiles)
+        self.week_number = get_current_week_number(0)
+        self.monday, _ = get_first_and_last_day_of_week(current_year(), self.week_number)
+        self.demand = [[1, 2, 1]] * 7
+
+    def test_save_clears_the_cache(self) -> None:
+        default = np.array(DEFAULT_COVERAGE).ravel()
+        np.testing.assert_array_equal(get_coverage_demand(self.week_number), default)
+
+        profile = CoverageProfile.objects.create(weekday_demand=self.demand)
+        np.testing.assert_array_equal(get_coverage_demand(self.week_number),
+                                      np.ravel(self.demand))
+
+        # Updates without a save signal are only seen after the cache expires
+        CoverageProfile.objects.filter(pk=profile.pk).update(weekday_demand=DEFAULT_COVERAGE)
+        np.testing.assert_array_equal(get_coverage_demand(self.week_number),
+                                      np.ravel(self.demand))
+        profile.delete()
+        np.testing.assert_array_equal(get_coverage_demand(self.week_number), default)
+
+    def test_date_demand_replaces_its_weekday(self) -> None:
+        wednesday = self.monday + timedelta(days=2)
+        CoverageProfile.objects.create(weekday_demand=self.demand,
+                                       date_demand={wednesday.isoformat(): [0, 5, 0]})
+
+        expected = np.array(self.demand)
+        expected[2] = [0, 5, 0]
+        np.testing.assert_array_equal(get_coverage_demand(self.week_number), expected.ravel())
+
+    def test_version_valid_in_the_week_is_used(self) -> None:
+        CoverageProfile.objects.create(weekday_demand=self.demand)
+        CoverageProfile.objects.create(weekday_demand=[[2, 3, 2]] * 7,
+                                       valid_from=self.monday + timedelta(days=1))
+
+        np.testing.assert_array_equal(get_coverage_demand(self.week_number),
+                                      np.ravel(self.demand))
+        np.testing.assert_array_equal(get_coverage_demand(get_current_week_number(1)),
+                                      np.ravel([[2, 3, 2]] * 7))
+
+    def test_saved_profile_reaches_the_solver(self) -> None:
+        create_synthetic_crew(15, seed=0)
+        demand = [list(shifts) for shifts in DEFAULT_COVERAGE]
+        demand[0][0] = 3
+        CoverageProfile.objects.create(weekday_demand=demand)
+
+        with mock.patch('api.solver.solve_schedule_shard', wraps=solve_schedule_shard) as solve:
+            status = optimize_schedule(multiplier=1, a=2, b=2, use_result_cache=False)[0]
+
+        self.assertEqual(status, pywraplp.Solver.OPTIMAL)
+        np.testing.assert_array_equal(solve.call_args.kwargs['min_workers'], np.ravel(demand))
+        self.assertGreaterEqual(
+            sum(roster.schedule[0] == '1'
+                for roster in Roster.objects.filter(week_number=self.week_number)), 3)
+
+
+class CapacityCheckTests(TestCase):
+    """
+    Tests that an application week emptied by vacations is reported with its missing shifts
+    before the solver is started.
+    """
+
+    def setUp(self) -> None:
+        create_synthetic_crew(15, seed=0)
+        self.week_number = get_current_week_number(0)
+
+    def test_vacations_emptying_a_shift_skip_the_solver(self) -> None:
+        # Three workers are left on Monday for the 4 workers of the afternoon shift
+        rosters = list(Roster.objects.filter(week_number=self.week_number)
+                       .select_related('owner').order_by('owner_id'))
+        for roster in rosters[3:]:
+            roster.vacation = '1' + roster.vacation[1:]
+        Roster.objects.bulk_update(rosters, ['vacation'])
+        vacations = {roster.owner.username: [1] for roster in rosters
+                     if roster.vacation[0] == '1'}
+
+        with mock.patch('api.solver.solve_schedule_shard') as solve, \
+                self.assertRaises(CapacityShortageError) as error:
+            optimize_schedule(multiplier=1, a=2, b=2, use_result_cache=False)
+
+        solve.assert_not_called()
+        shortages = [shortage for shortage in error.exception.shortages
+                     if shortage.requirement == CAPACITY_SHIFT]
+        self.assertEqual([(shortage.day, shortage.shift, shortage.required, shortage.available)
+                          for shortage in shortages], [(0, 1, 4, 3)])
+        self.assertEqual(shortages[0].blocking_vacations, vacations)
+        self.assertEqual(SolverRun.objects.get().status, pywraplp.Solver.INFEASIBLE)
+
+
+class ReoptimizationTests(TestCase):
+    """
+    Tests that a sick leave is covered by reoptimizing the neighborhood of the sick worker and
+    that only the changed rosters are written.
+    """
+
+    def setUp(self) -> None:
+        clear_model_templates()
+        create_synthetic_crew(15, seed=0)
+        # Publish the current week, then the next week, on top of the rotating previous week
+        for offset in (2, 1):
+            optimize_schedule(multiplier=1, a=offset, b=offset, use_result_cache=False)
+        self.week_numbers = (get_current_week_number(0), get_current_week_number(1))
+        self.day_index = 3
+        self.assertEqual(apply_synthetic_sickness(self.week_numbers[0], self.day_index, 0.1,
+                                                  seed=1), 1)
+        self.rosters = self.get_rosters()
+
+    def get_rosters(self) -> dict:
+        return {
+            (roster.week_number, roster.owner.username): roster
+            for roster in Roster.objects.filter(week_number__in=self.week_numbers)
+            .select_related('owner')
+        }
+
+    def test_sickness_is_covered_by_the_neighborhood(self) -> None:
+        inputs = get_reoptimization_inputs()
+        neighborhood = get_reoptimization_neighborhood(
+            inputs.work_days, inputs.off_days, inputs.reserve_days, inputs.vacation,
+            inputs.sickness, self.day_index, 3)
+        written = []
+        bulk_update = QuerySet.bulk_update
+
+        def record_rosters(queryset, rosters, fields, batch_size=None):
+            written.extend(rosters)
+            return bulk_update(queryset, rosters, fields, batch_size)
+
+        with mock.patch.object(QuerySet, 'bulk_update', record_rosters):
+            status = reoptimize_schedule_after_sickness(None, 1, self.day_index,
+                                                        neighborhood_size=3)[0]
+
+        self.assertEqual(status, pywraplp.Solver.OPTIMAL)
+        rosters = self.get_rosters()
+        for week_number in self.week_numbers:
+            scheduled = np.array([[int(shift) for shift in rosters[week_number, worker].schedule]
+                                  for worker in inputs.workers]).sum(axis=0)
+            self.assertTrue((scheduled >= get_min_workers(week_number, 1)).all())
+
+        changed = {key for key, roster in rosters.items()
+                   if any(getattr(roster, field) != getattr(self.rosters[key], field)
+                          for field in PUBLISHED_ROSTER_FIELDS)}
+        self.assertTrue(changed)
+        self.assertEqual({(roster.week_number, roster.owner.username) for roster in written},
+                         changed)
+        outside = {worker for worker, selected in zip(inputs.workers, neighborhood)
+                   if not selected}
+        self.assertTrue(outside)
+        self.assertFalse({worker for _, worker in changed} & outside)
+
+
+@override_settings(SOLVER_JOB_STALE_TIMEOUT=60, SOLVER_JOB_MAX_ATTEMPTS=2)
+class SolverJobTests(TestCase):
+    """
+    Tests that the jobs of crashed solver workers are requeued.
+    """
+
+    def test_stale_job_is_requeued(self) -> None:
+        job = enqueue_solver_job(None, multiplier=1)
+        self.assertEqual(claim_next_solver_job().id, job.id)
+        self.assertIsNone(claim_next_solver_job())
+
+        SolverJob.objects.filter(id=job.id).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=61))
+        claimed = claim_next_solver_job()
+        self.assertEqual(claimed.id, job.id)
+        self.assertEqual(claimed.state, SOLVER_JOB_RUNNING)
+        self.assertEqual(claimed.attempts, 2)
+
+    def test_job_fails_after_max_attempts(self) -> None:
+        job = enqueue_solver_job(None, multiplier=1)
+        SolverJob.objects.filter(id=job.id).update(
+            state=SOLVER_JOB_RUNNING, attempts=2,
+            heartbeat_at=timezone.now() - timedelta(seconds=61))
+        recent = enqueue_solver_job(None, multiplier=1)
+        SolverJob.objects.filter(id=recent.id).update(
+            state=SOLVER_JOB_RUNNING, attempts=1, heartbeat_at=timezone.now())
+
+        self.assertIsNone(claim_next_solver_job())
+        job.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual(job.state, SOLVER_JOB_FAILED)
+        self.assertEqual(recent.state, SOLVER_JOB_RUNNING)
+
+
+class ScenarioCommitTests(TestCase):
+    """
+    Tests that only an unchanged, unsuperseded scenario of a sweep can be committed.
+    """
+
+    def setUp(self) -> None:
+        create_synthetic_crew(15, seed=0)
+        inputs = get_schedule_inputs()
+        rosters = Roster.objects.filter(week_number=inputs.application_week_number) \
+            .order_by('owner_id')
+        schedule = {
+            'workers': inputs.workers,
+            **{key: [getattr(roster, field) for roster in rosters]
+               for key, field in (('schedules', 'schedule'), ('work_days', 'work_days'),
+                                  ('off_days', 'off_days'), ('reserve_days', 'reserve_days'))}
+        }
+        sweep = uuid.uuid4()
+        self.week_number = inputs.application_week_number
+        self.scenarios = [
+            Scenario.objects.create(sweep=sweep, name=name, week_number=self.week_number,
+                                    status=pywraplp.Solver.OPTIMAL, rosters=schedule,
+                                    input_hash=get_scenario_input_hash(inputs))
+            for name in ('first', 'second')
+        ]
+
+    def test_commit_supersedes_the_sweep(self) -> None:
+        commit_scenario(self.scenarios[0])
+
+        self.assertEqual(Roster.objects.filter(week_number=self.week_number, published=True)
+                         .count(), 15)
+        with self.assertRaisesMessage(ValueError, 'already committed'):
+            commit_scenario(self.scenarios[1])
+        self.assertEqual(
+            list(Scenario.objects.order_by('id').values_list('committed', 'superseded')),
+            [(True, False), (False, True)]
+        )
+
+    def test_stale_scenario_is_rejected(self) -> None:
+        Roster.objects.filter(week_number=self.week_number).update(application='1' * 21)
+
+        with self.assertRaisesMessage(ValueError, 'rosters changed'):
+            commit_scenario(self.scenarios[0])
+        self.assertFalse(Scenario.objects.filter(committed=True).exists())
+
+
+class SolverRunFilterTests(TestCase):
+    """
+    Tests that the query parameters of the solver run list are validated before filtering.
+    """
+
+    def test_invalid_filters_are_rejected(self) -> None:
+        serializer = SolverRunFilterSerializer(data={'status': 'abc', 'created_after': 'bad'})
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(set(serializer.errors), {'status', 'created_after'})
+
+    def test_valid_filters_are_converted(self) -> None:
+        serializer = SolverRunFilterSerializer(data={'status': '0', 'backend': 'cp-sat',
+                                                     'created_after': '2024-01-01'})
+
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data['status'], 0)
+        self.assertEqual(serializer.validated_data['created_after'].isoformat(), '2024-01-01')
+        self.assertEqual(serializer.validated_data['backend'], 'cp-sat')
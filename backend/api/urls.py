@@ -16,5 +16,11 @@ urlpatterns = [
          views.RosterGivenWeekQueryAdmin.as_view(), name="get-rosters-admin"),
     path('user/', views.get_user_details, name="user"),
     path('agent/', views.AgentView.as_view(), name="success"),
+    path('solver-jobs/<int:pk>', views.SolverJobDetail.as_view(), name="solver-job"),
+    path('solver-runs/', views.SolverRunList.as_view(), name="solver-runs"),
+    path('scenarios/', views.ScenarioSweepView.as_view(), name="scenarios"),
+    path('solution-pool/', views.SolutionPoolView.as_view(), name="solution-pool"),
+    path('scenarios/<int:pk>/commit', views.ScenarioCommitView.as_view(),
+         name="commit-scenario"),
 
 ]
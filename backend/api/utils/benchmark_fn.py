@@ -0,0 +1,223 @@
+from typing import List, NamedTuple
+
+import numpy as np
+from django.contrib.auth.models import Group, User
+
+from ..models import Roster
+from .common_fn import array_to_roster_strings
+from .constants import CHAR_ONE, CHAR_ZERO, DAYS_IN_WEEK, NUMBER_OF_SHIFTS
+from .date_time_fn import current_year, get_current_week_number
+from .solver_constants import DEFAULT_COVERAGE
+
+WORKERS_PER_MULTIPLIER = 15
+
+
+class SyntheticWeek(NamedTuple):
+    """
+    A randomly generated application week, used to benchmark the solver engines without a
+    database.
+
+    Attributes:
+        workers (list): The generated usernames.
+        applications (np.ndarray): A (workers, 21) matrix of the applications.
+        vacation (np.ndarray): A (workers, 7) matrix of the vacation days.
+        sickness (np.ndarray): A (workers, 7) matrix of the sick days.
+        min_workers (np.ndarray): The minimum number of workers for each shift (21 values).
+        multiplier (int): The scaling factor of the coverage.
+    """
+    workers: list
+    applications: np.ndarray
+    vacation: np.ndarray
+    sickness: np.ndarray
+    min_workers: np.ndarray
+    multiplier: int
+
+
+def generate_synthetic_week(
+    number_of_workers: int,
+    seed: int = 0,
+    application_rate: float = 0.3,
+    vacation_rate: float = 0.1,
+    sickness_rate: float = 0.02
+) -> SyntheticWeek:
+    """
+    Generates an application week with random applications, vacation and sickness. The coverage
+    of the current crew (sized for 15 workers) is scaled with the number of workers.
+
+    Args:
+        number_of_workers (int): The number of workers.
+        seed (int, optional): The random seed. Defaults to 0.
+        application_rate (float, optional): The probability of applying for a shift. Defaults to
+                                            0.3.
+        vacation_rate (float, optional): The probability of a vacation day. Defaults to 0.1.
+        sickness_rate (float, optional): The probability of a sick day. Defaults to 0.02.
+
+    Returns:
+        SyntheticWeek: The generated week.
+    """
+    rng = np.random.default_rng(seed)
+    multiplier = max(1, number_of_workers // WORKERS_PER_MULTIPLIER)
+
+    applications = (rng.random((number_of_workers, NUMBER_OF_SHIFTS)) < application_rate)
+    vacation = rng.random((number_of_workers, DAYS_IN_WEEK)) < vacation_rate
+    sickness = (rng.random((number_of_workers, DAYS_IN_WEEK)) < sickness_rate) & ~vacation
+
+    return SyntheticWeek(
+        [f'worker{index:05d}' for index in range(number_of_workers)],
+        applications.astype(np.uint8),
+        vacation.astype(np.uint8),
+        sickness.astype(np.uint8),
+        np.array(DEFAULT_COVERAGE).ravel() * multiplier,
+        multiplier
+    )
+
+
+def get_rotating_week(number_of_workers: int, week_number: int) -> List[np.ndarray]:
+    """
+    Builds a published week where every worker works 4 days, has 1 reserve day and 2 days off,
+    rotated by worker so the days are spread evenly, with the shifts assigned round-robin.
+
+    Args:
+        number_of_workers (int): The number of workers.
+        week_number (int): The week number, shifts the rotation from week to week.
+
+    Returns:
+        List[np.ndarray]: The (workers, 21) schedules and the (workers, 7) work, off and reserve
+        days.
+    """
+    workers = np.arange(number_of_workers)[:, None]
+    days = np.arange(DAYS_IN_WEEK)[None, :]
+    kind = (days - workers - week_number) % DAYS_IN_WEEK
+    work_days = kind < 4
+    off_days = kind > 4
+
+    shifts = (workers + days) % 3
+    schedules = np.zeros((number_of_workers, DAYS_IN_WEEK, 3), dtype=np.uint8)
+    np.put_along_axis(schedules, shifts[..., None], 1, axis=2)
+    schedules[~work_days] = 0
+
+    return [schedules.reshape(number_of_workers, NUMBER_OF_SHIFTS), work_days, off_days,
+            kind == 4]
+
+
+def create_synthetic_crew(
+    number_of_workers: int,
+    seed: int = 0,
+    application_rate: float = 0.3,
+    vacation_rate: float = 0.1
+) -> List[str]:
+    """
+    Creates workers and their rosters from the previous week to the application week (current
+    week + 2) in the database. The previous week is published with a rotating schedule, the
+    other weeks get random applications and vacation and have to be optimized.
+
+    Args:
+        number_of_workers (int): The number of workers.
+        seed (int, optional): The random seed. Defaults to 0.
+        application_rate (float, optional): The probability of applying for a shift. Defaults to
+                                            0.3.
+        vacation_rate (float, optional): The probability of a vacation day. Defaults to 0.1.
+
+    Returns:
+        List[str]: The usernames of the created workers.
+    """
+    rng = np.random.default_rng(seed)
+    Group.objects.get_or_create(name='Supervisor')
+
+    usernames = [f'worker{index:05d}' for index in range(number_of_workers)]
+    users = [User(username=username) for username in usernames]
+    for user in users:
+        user.set_unusable_password()
+    users = User.objects.bulk_create(users)
+
+    year = current_year()
+    empty_schedules = array_to_roster_strings(
+        np.zeros((number_of_workers, NUMBER_OF_SHIFTS), dtype=np.uint8))
+    empty_days = array_to_roster_strings(
+        np.zeros((number_of_workers, DAYS_IN_WEEK), dtype=np.uint8))
+
+    rosters = []
+    for offset in range(-1, 3):
+        week_number = get_current_week_number(offset)
+        applications = array_to_roster_strings(
+            rng.random((number_of_workers, NUMBER_OF_SHIFTS)) < application_rate)
+        if offset < 0:
+            vacation = empty_days
+            schedules, work_days, off_days, reserve_days = (
+                array_to_roster_strings(matrix) for matrix in
+                get_rotating_week(number_of_workers, week_number))
+        else:
+            vacation = array_to_roster_strings(
+                rng.random((number_of_workers, DAYS_IN_WEEK)) < vacation_rate)
+            schedules, work_days, off_days, reserve_days = (
+                empty_schedules, empty_days, empty_days, empty_days)
+
+        rosters.extend(
+            Roster(
+                week_number=week_number,
+                year=year,
+                application=applications[index],
+                schedule=schedules[index],
+                modification=CHAR_ZERO * NUMBER_OF_SHIFTS,
+                work_days=work_days[index],
+                off_days=off_days[index],
+                reserve_days=reserve_days[index],
+                reserve_call_in_days=empty_days[index],
+                day_off_call_in_days=empty_days[index],
+                vacation=vacation[index],
+                sickness=empty_days[index],
+                published=offset < 0,
+                owner=user
+            )
+            for index, user in enumerate(users)
+        )
+    Roster.objects.bulk_create(rosters)
+
+    return usernames
+
+
+def apply_synthetic_sickness(
+    week_number: int,
+    day_index: int,
+    sickness_rate: float,
+    seed: int = 0
+) -> int:
+    """
+    Reports random workers sick from a day until the end of the week, clearing their work, off
+    and reserve days and shifts like a sick leave claimed through the agent.
+
+    Args:
+        week_number (int): The week of the sick leaves.
+        day_index (int): The 1-based day of the week the sick leaves start on.
+        sickness_rate (float): The probability of a worker being sick.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        int: The number of sick workers.
+    """
+    rng = np.random.default_rng(seed)
+    sick_days = slice(day_index - 1, DAYS_IN_WEEK)
+    rosters = list(Roster.objects.filter(week_number=week_number).order_by('owner_id'))
+    sick = rng.random(len(rosters)) < sickness_rate
+    sick_rosters = [roster for roster, is_sick in zip(rosters, sick)
+                    if is_sick and CHAR_ZERO in roster.vacation[sick_days]]
+
+    for roster in sick_rosters:
+        for field in ('work_days', 'off_days', 'reserve_days', 'reserve_call_in_days',
+                      'day_off_call_in_days', 'sickness', 'schedule'):
+            value = list(getattr(roster, field))
+            for day in range(day_index - 1, DAYS_IN_WEEK):
+                if roster.vacation[day] == CHAR_ONE:
+                    continue
+                if field == 'schedule':
+                    value[3 * day:3 * day + 3] = CHAR_ZERO * 3
+                else:
+                    value[day] = CHAR_ONE if field == 'sickness' else CHAR_ZERO
+            setattr(roster, field, ''.join(value))
+
+    Roster.objects.bulk_update(sick_rosters, [
+        'work_days', 'off_days', 'reserve_days', 'reserve_call_in_days', 'day_off_call_in_days',
+        'sickness', 'schedule'
+    ])
+    return len(sick_rosters)
+
@@ -1,5 +1,7 @@
 import json
-from typing import Dict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
 
 from .constants import CHAR_ONE, CHAR_ZERO, CHAR_X
 
@@ -343,3 +345,92 @@ def merge_roster_strings(s1: str, s2: str, s3: str) -> str:
                      for char1, char2, char3 in zip(s1, s2, s3)
                     )
     return merged
+
+
+def roster_strings_to_array(roster_strs: List[str], length: int) -> np.ndarray:
+    """
+    Converts a list of binary roster strings into a matrix with one row per string.
+
+    Parameters:
+        roster_strs (List[str]): The binary strings, each of them `length` characters long.
+        length (int): The length of the strings, e.g. 21 for shifts or 7 for days.
+
+    Returns:
+        np.ndarray: A (len(roster_strs), length) uint8 matrix, 1 where the string has a '1'.
+    """
+    raw = np.frombuffer(''.join(roster_strs).encode(), dtype=np.uint8)
+    return (raw == ord(CHAR_ONE)).astype(np.uint8).reshape(len(roster_strs), length)
+
+
+def merge_roster_matrices(*matrices: np.ndarray) -> np.ndarray:
+    """
+    Merges binary roster matrices such that the result has 1 wherever any of them has a 1, e.g.
+    the work days with the reserve and day off call-in days.
+
+    Parameters:
+        *matrices (np.ndarray): Binary matrices of the same shape.
+
+    Returns:
+        np.ndarray: The merged uint8 matrix.
+    """
+    return np.bitwise_or.reduce([np.asarray(matrix, dtype=np.uint8) for matrix in matrices])
+
+
+def get_max_consecutive_runs(matrix: np.ndarray, value: int = 1) -> np.ndarray:
+    """
+    Calculates the longest run of consecutive days (or shifts) with the given value in each row of
+    a roster matrix, the vectorized `max_consecutive_days_in_roster`.
+
+    Parameters:
+        matrix (np.ndarray): A (rows, length) binary matrix.
+        value (int, optional): The value to count, e.g. 0 for days without vacation. Defaults
+                               to 1.
+
+    Returns:
+        np.ndarray: The length of the longest run of each row.
+    """
+    matches = np.asarray(matrix) == value
+    current = np.zeros(matches.shape[0], dtype=int)
+    longest = np.zeros(matches.shape[0], dtype=int)
+    for column in matches.T:
+        current = (current + 1) * column
+        np.maximum(longest, current, out=longest)
+    return longest
+
+
+def array_to_roster_strings(matrix: np.ndarray) -> List[str]:
+    """
+    Converts a binary matrix into roster strings, one string per row.
+
+    Parameters:
+        matrix (np.ndarray): A (rows, length) matrix of 0/1 values.
+
+    Returns:
+        List[str]: The binary strings of the rows.
+    """
+    characters = (np.asarray(matrix, dtype=np.uint8) + ord(CHAR_ZERO)).tobytes().decode()
+    length = matrix.shape[1]
+    return [characters[i:i + length] for i in range(0, len(characters), length)]
+
+
+def compare_roster_matrices(
+    published: Sequence[np.ndarray],
+    results: Sequence[np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compares result matrices with the published ones, e.g. the schedule, work, off and reserve
+    days of each worker.
+
+    Parameters:
+        published (Sequence[np.ndarray]): The published (rows, length) matrices.
+        results (Sequence[np.ndarray]): The result matrices, in the same order and shapes.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: A boolean mask of the rows where any matrix changed, and
+        the share of equal values of each matrix.
+    """
+    equal = [np.asarray(old) == np.asarray(new) for old, new in zip(published, results)]
+    changed = ~np.logical_and.reduce([matrix.all(axis=1) for matrix in equal])
+    agreement = np.array([matrix.mean() if matrix.size else 1.0 for matrix in equal])
+    return changed, agreement
+
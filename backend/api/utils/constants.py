@@ -48,3 +48,8 @@ SOLVER_STATUS_FEASIBLE = """Feasible solution found but not optimal."""
 SOLVER_STATUS_INFEASIBLE = """The problem is infeasible. Please remove vacations if necessary"""
 SOLVER_STATUS_UNBOUNDED = """The problem is unbounded!"""
 SOLVER_STATUS_NOT_SOLVED = """The problem was not solved!"""
+SOLVER_GAP = """The schedule is within {gap:.2%} of the optimum."""
+SOLVER_JOB_QUEUED_MSG = """The schedule optimization was queued as job {job_id}, its progress can be followed at /api/solver-jobs/{job_id}."""
+SCENARIO_SWEEP_FINISHED_MSG = """{solved} of {total} scenarios have a schedule, they can be compared at /api/scenarios/?sweep={sweep}."""
+SOLUTION_POOL_FINISHED_MSG = """{drafts} draft schedules were found, they can be compared at /api/scenarios/?sweep={sweep}."""
+SOLVER_JOB_STALE_MSG = """The solver worker stopped responding {attempts} times while running the job."""
@@ -1,6 +1,17 @@
 from typing import Dict, Optional
 from datetime import datetime
 
+from ortools.linear_solver import pywraplp
+
+from .constants import (
+    SOLVER_GAP,
+    SOLVER_STATUS_FEASIBLE,
+    SOLVER_STATUS_INFEASIBLE,
+    SOLVER_STATUS_NOT_SOLVED,
+    SOLVER_STATUS_OPTIMAL,
+    SOLVER_STATUS_UNBOUNDED,
+)
+
 
 def get_summary(
     roster_json: Dict,
@@ -330,4 +341,34 @@ def get_sickness_claim_msg(
         f"You have applied sickness from {start_date.strftime('%d %b')}"
         f" to {end_date.strftime('%d %b')}"
     )
-    
\ No newline at end of file
+    
+
+def get_solver_status_msg(status: int, gap: Optional[float], warning_msg: str = "") -> str:
+    """
+    Generates the message of a schedule optimization result.
+
+    Args:
+        status (int): The `pywraplp.Solver` status code of the optimization.
+        gap (Optional[float]): The relative gap of the saved schedule, None if no schedule was
+                               found.
+        warning_msg (str, optional): A warning appended to successful optimizations, e.g. the
+                                     users without applications. Defaults to "".
+
+    Returns:
+        str: The status message.
+    """
+    if status == pywraplp.Solver.OPTIMAL:
+        if gap:
+            return SOLVER_STATUS_OPTIMAL + " " + SOLVER_GAP.format(gap=gap) + " " + warning_msg
+        return SOLVER_STATUS_OPTIMAL + " " + warning_msg
+
+    if status == pywraplp.Solver.FEASIBLE:
+        return SOLVER_STATUS_FEASIBLE + " " + SOLVER_GAP.format(gap=gap) + " " + warning_msg
+
+    if status == pywraplp.Solver.INFEASIBLE:
+        return SOLVER_STATUS_INFEASIBLE
+
+    if status == pywraplp.Solver.UNBOUNDED:
+        return SOLVER_STATUS_UNBOUNDED
+
+    return SOLVER_STATUS_NOT_SOLVED
@@ -1,12 +1,14 @@
-from typing import Optional, Tuple, Union
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
+import numpy as np
 from django.contrib.auth.models import Group, User
 from django.db.models.query import QuerySet
 
 from ..models import Message, Roster
-from .constants import CHAR_ZERO
-from .common_fn import is_uniform_with_char
+from .constants import CHAR_ZERO, DAYS_IN_WEEK, NUMBER_OF_SHIFTS
+from .common_fn import is_uniform_with_char, roster_strings_to_array
 from .date_time_fn import get_current_week_number
+from .solver_constants import ROSTER_DAY_FIELDS, ROSTER_FLAG_FIELDS, ROSTER_SHIFT_FIELDS
 
 
 
@@ -48,23 +50,188 @@ def is_user_in_group(user: User, group_name: str) -> bool:
     return user.groups.filter(name=group_name).exists()
 
 
-def get_rosters_by_week(week_number: int, first_n: int = 15) -> QuerySet['Roster']:
+def get_rosters_by_week(week_number: int, first_n: Optional[int] = None) -> QuerySet['Roster']:
     """
-    Retrieve a limited number of rosters for a specified week, excluding those owned by admin users.
+    Retrieve the rosters for a specified week, excluding those owned by admin users.
 
     Args:
         week_number (int): The ISO week number to filter the rosters by.
-        first_n (int, optional): The maximum number of rosters to return. Defaults to 15.
+        first_n (Optional[int], optional): The maximum number of rosters to return. Defaults to
+                                           None, meaning every roster.
 
     Returns:
         QuerySet[Roster]: A queryset of Roster objects filtered by the specified week number,
-                          excluding those owned by admin users, limited to 'first_n' results.
+                          excluding those owned by admin users, ordered by owner and limited to
+                          'first_n' results.
     """
     admin_users = get_admin_users()
-    rosters = Roster.objects.exclude(owner__in=admin_users).filter(week_number=week_number)
-    return rosters[:first_n]
+    rosters = Roster.objects.exclude(owner__in=admin_users).filter(
+        week_number=week_number).order_by('owner_id')
+    if first_n is not None:
+        rosters = rosters[:first_n]
+    return rosters
 
 
+class WeekMatrices(NamedTuple):
+    """
+    The rosters of several weeks as matrices, one row per owner and one slice per week, so counts,
+    merges and runs are computed on whole crews at once.
+
+    Attributes:
+        week_numbers (List[int]): The week numbers, in the order of the week axis.
+        workers (List[str]): The usernames of the owners with a roster in every week, ordered by
+                             owner id.
+        owner_ids (np.ndarray): The user id of each owner.
+        missing (List[str]): The usernames of the owners without a roster in some of the weeks,
+                             they are left out of the matrices.
+        application (np.ndarray): A (workers, weeks, 21) uint8 matrix of the applications.
+        schedule (np.ndarray): A (workers, weeks, 21) uint8 matrix of the schedules.
+        work_days (np.ndarray): A (workers, weeks, 7) uint8 matrix of the work days.
+        off_days (np.ndarray): A (workers, weeks, 7) uint8 matrix of the off days.
+        reserve_days (np.ndarray): A (workers, weeks, 7) uint8 matrix of the reserve days.
+        reserve_call_in_days (np.ndarray): A (workers, weeks, 7) uint8 matrix of the days called
+                                           in from reserve.
+        day_off_call_in_days (np.ndarray): A (workers, weeks, 7) uint8 matrix of the days called
+                                           in on a day off.
+        vacation (np.ndarray): A (workers, weeks, 7) uint8 matrix of the vacation days.
+        sickness (np.ndarray): A (workers, weeks, 7) uint8 matrix of the sick days.
+        published (np.ndarray): A (workers, weeks) boolean matrix of the published rosters.
+        reserve_call_in (np.ndarray): A (workers, weeks) boolean matrix, True if the owner was
+                                      called in from reserve in the week.
+        day_off_call_in (np.ndarray): A (workers, weeks) boolean matrix, True if the owner was
+                                      called in on a day off in the week.
+
+    Methods:
+        join(field, weeks) -> np.ndarray:
+            Returns a field of the selected weeks side by side, one row per owner.
+    """
+    week_numbers: List[int]
+    workers: List[str]
+    owner_ids: np.ndarray
+    missing: List[str]
+    application: np.ndarray
+    schedule: np.ndarray
+    work_days: np.ndarray
+    off_days: np.ndarray
+    reserve_days: np.ndarray
+    reserve_call_in_days: np.ndarray
+    day_off_call_in_days: np.ndarray
+    vacation: np.ndarray
+    sickness: np.ndarray
+    published: np.ndarray
+    reserve_call_in: np.ndarray
+    day_off_call_in: np.ndarray
+
+    def join(self, field: str, weeks: slice = slice(None)) -> np.ndarray:
+        """
+        Returns a field of the selected weeks side by side, one row per owner, e.g. the
+        (workers, 14) work days of two weeks.
+        """
+        matrix = getattr(self, field)[:, weeks]
+        return matrix.reshape(matrix.shape[0], -1)
+
+
+def get_week_matrices(
+    week_numbers: List[int],
+    first_n: Optional[int] = None,
+    usernames: Optional[List[str]] = None
+) -> WeekMatrices:
+    """
+    Retrieve the rosters of several weeks in one query, excluding those owned by admin users,
+    and convert every field to a matrix in one pass.
+
+    Args:
+        week_numbers (List[int]): The ISO week numbers, e.g. the fixed and the application week.
+        first_n (Optional[int], optional): The maximum number of owners to return. Defaults to
+                                           None, meaning every owner.
+        usernames (Optional[List[str]], optional): The owners to load. Defaults to None, meaning
+                                                   every owner.
+
+    Returns:
+        WeekMatrices: The rosters of each owner, and the owners who miss a week.
+    """
+    fields = [*ROSTER_SHIFT_FIELDS, *ROSTER_DAY_FIELDS, *ROSTER_FLAG_FIELDS]
+    rosters = (
+        Roster.objects
+        .exclude(owner__groups__name='Supervisor')
+        .filter(week_number__in=week_numbers)
+        .order_by('owner_id')
+    )
+    if usernames is not None:
+        rosters = rosters.filter(owner__username__in=usernames)
+
+    owners: Dict[int, Tuple[str, Dict[int, tuple]]] = {}
+    for owner_id, username, week_number, *values in rosters.values_list(
+            'owner_id', 'owner__username', 'week_number', *fields):
+        owners.setdefault(owner_id, (username, {}))[1][week_number] = values
+
+    workers, owner_ids, missing, rows = [], [], [], []
+    for owner_id, (username, weeks) in owners.items():
+        if len(weeks) < len(set(week_numbers)):
+            missing.append(username)
+        elif first_n is None or len(workers) < first_n:
+            workers.append(username)
+            owner_ids.append(owner_id)
+            rows.extend(weeks[week_number] for week_number in week_numbers)
+
+    shape = (len(workers), len(week_numbers))
+    columns = dict(zip(fields, zip(*rows))) if rows else dict.fromkeys(fields, ())
+    matrices = {
+        field: roster_strings_to_array(list(columns[field]), length).reshape(*shape, length)
+        for field, length in [*((field, NUMBER_OF_SHIFTS) for field in ROSTER_SHIFT_FIELDS),
+                              *((field, DAYS_IN_WEEK) for field in ROSTER_DAY_FIELDS)]
+    }
+    matrices.update({
+        field: np.array(columns[field], dtype=bool).reshape(shape)
+        for field in ROSTER_FLAG_FIELDS
+    })
+    return WeekMatrices(list(week_numbers), workers, np.array(owner_ids, dtype=int), missing,
+                        **matrices)
+
+
+def get_crew_group_names(usernames: List[str]) -> List[Optional[str]]:
+    """
+    Retrieve the crew group of each user, i.e. the first of their groups other than 'Supervisor'
+    by name.
+
+    Args:
+        usernames (List[str]): The usernames of the users.
+
+    Returns:
+        List[Optional[str]]: The crew group name of each user, None if they are not in a crew
+                             group.
+    """
+    memberships = (
+        User.groups.through.objects
+        .filter(user__username__in=usernames)
+        .exclude(group__name='Supervisor')
+        .order_by('group__name')
+        .values_list('user__username', 'group__name')
+    )
+    crew_groups = {}
+    for username, group_name in memberships:
+        crew_groups.setdefault(username, group_name)
+    return [crew_groups.get(username) for username in usernames]
+
+
+def get_rosters_by_owner(
+    week_numbers: List[int],
+    usernames: List[str]
+) -> Dict[Tuple[int, str], Roster]:
+    """
+    Retrieve the rosters of the given users for the given weeks in one query.
+
+    Args:
+        week_numbers (List[int]): The week numbers.
+        usernames (List[str]): The usernames of the owners.
+
+    Returns:
+        Dict[Tuple[int, str], Roster]: The rosters keyed by week number and owner username.
+    """
+    rosters = Roster.objects.filter(
+        week_number__in=week_numbers, owner__username__in=usernames).select_related('owner')
+    return {(roster.week_number, roster.owner.username): roster for roster in rosters}
+
 
 def get_past_messages_by_user(user: User) -> QuerySet['Message']:
     """
@@ -13,3 +13,55 @@ DAYS_INDEX_9_14 = range(9, 15)  # 9-14
 FIRST_WEEK_DAY_INDEX_START, FIRST_WEEK_DAY_INDEX_END = 1, 8
 SECOND_WEEK_DAY_INDEX_START, SECOND_WEEK_DAY_INDEX_END = 8, 15
 ROSTER_INDEX_START, ROSTER_INDEX_END = 22, 43
+SHIFTS_PER_DAY = 3
+NIGHT_SHIFT = 2
+SHIFTS_IN_TWO_WEEKS = 42
+DAYS_IN_TWO_WEEKS = 14
+SOLVER_BACKEND_SCIP = 'scip'
+SOLVER_BACKEND_CP_SAT = 'cp-sat'
+DEFAULT_NUM_SEARCH_WORKERS = 8
+SOLVER_ENGINE_COMPACT = 'compact'
+SOLVER_ENGINE_COLUMN_GENERATION = 'column-generation'
+SOLVER_ENGINE_HEURISTIC = 'heuristic'
+SOLVER_ENGINE_RESULT_CACHE = 'result-cache'
+# The largest relative gap of a schedule that still counts as proven optimal, both solvers report
+# OPTIMAL when they stop at `SOLVER_RELATIVE_GAP_LIMIT`
+OPTIMALITY_GAP_TOLERANCE = 1e-6
+# Part of the input hash of cached results, bump it when the schedule model changes
+RESULT_CACHE_VERSION = 1
+SOLVER_JOB_QUEUED = 'queued'
+SOLVER_JOB_RUNNING = 'running'
+SOLVER_JOB_FINISHED = 'finished'
+SOLVER_JOB_FAILED = 'failed'
+# The kinds of solver jobs, each runs a different entry point (see `run_solver_job`)
+SOLVER_JOB_OPTIMIZE = 'optimize'
+SOLVER_JOB_SCENARIO_SWEEP = 'scenario-sweep'
+SOLVER_JOB_SOLUTION_POOL = 'solution-pool'
+SOLVER_RUN_OPTIMIZE = 'optimize'
+SOLVER_RUN_REOPTIMIZE = 'reoptimize'
+SOLVER_RUN_HORIZON = 'horizon'
+MAX_SOLUTION_POOL_SIZE = 20
+PUBLISHED_ROSTER_FIELDS = [
+    'schedule', 'work_days', 'off_days', 'reserve_days', 'published', 'suboptimal'
+]
+# The roster fields loaded into week matrices (see `get_week_matrices`)
+ROSTER_SHIFT_FIELDS = ['application', 'schedule']
+ROSTER_DAY_FIELDS = [
+    'work_days', 'off_days', 'reserve_days', 'reserve_call_in_days', 'day_off_call_in_days',
+    'vacation', 'sickness'
+]
+ROSTER_FLAG_FIELDS = ['published', 'reserve_call_in', 'day_off_call_in']
+MAX_NIGHT_SHIFTS = 2
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+SHIFT_NAMES = ['morning', 'afternoon', 'night']
+CAPACITY_SHIFT = 'shift'
+CAPACITY_DAY = 'day'
+CAPACITY_WORK_DAYS = 'work_days'
+CAPACITY_RESERVE_DAYS = 'reserve_days'
+CAPACITY_NIGHT_SHIFTS = 'night_shifts'
+COVERAGE_DEFAULT_PROFILE = 'default'
+# The minimum number of workers of the morning, afternoon and night shifts, Monday first, used
+# when no coverage profile is saved
+DEFAULT_COVERAGE = [
+    [2, 4, 2], [2, 4, 2], [2, 4, 2], [2, 4, 2], [2, 4, 2], [1, 2, 1], [1, 2, 1]
+]
@@ -0,0 +1,198 @@
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from ortools.linear_solver import pywraplp
+
+from ..capacity_check import CapacityShortageError
+from ..models import SolverJob
+from ..scenarios import run_scenario_sweep, run_solution_pool
+from ..solver import optimize_schedule
+from ..solver_backends import FEASIBLE_STATUSES
+from .constants import (
+    MESSAGE_MAX_LENGTH,
+    SCENARIO_SWEEP_FINISHED_MSG,
+    SOLUTION_POOL_FINISHED_MSG,
+    SOLVER_JOB_STALE_MSG,
+    SOLVER_STATUS_INFEASIBLE,
+)
+from .message_fn import get_solver_status_msg
+from .model_fn import get_users_without_application
+from .solver_constants import (
+    SOLVER_JOB_FAILED,
+    SOLVER_JOB_FINISHED,
+    SOLVER_JOB_OPTIMIZE,
+    SOLVER_JOB_QUEUED,
+    SOLVER_JOB_RUNNING,
+    SOLVER_JOB_SCENARIO_SWEEP,
+    SOLVER_JOB_SOLUTION_POOL,
+)
+
+
+def enqueue_solver_job(
+    owner: Optional[User],
+    kind: str = SOLVER_JOB_OPTIMIZE,
+    **parameters
+) -> SolverJob:
+    """
+    Queues a schedule optimization for the solver worker.
+
+    Args:
+        owner (Optional[User]): The user who requested the optimization.
+        kind (str, optional): 'optimize' for `optimize_schedule`, 'scenario-sweep' for
+                              `run_scenario_sweep` or 'solution-pool' for `run_solution_pool`.
+                              Defaults to 'optimize'.
+        **parameters: The keyword arguments of the function, they must be JSON serializable.
+
+    Returns:
+        SolverJob: The queued job.
+    """
+    return SolverJob.objects.create(owner=owner, kind=kind, parameters=parameters)
+
+
+def requeue_stale_solver_jobs() -> int:
+    """
+    Requeues the running jobs without a heartbeat for `SOLVER_JOB_STALE_TIMEOUT` seconds, their
+    worker crashed or was stopped. Jobs already claimed `SOLVER_JOB_MAX_ATTEMPTS` times are marked
+    as failed instead, so a job that crashes its worker isn't retried forever.
+
+    Returns:
+        int: The number of requeued jobs.
+    """
+    now = timezone.now()
+    stale = SolverJob.objects.filter(
+        state=SOLVER_JOB_RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=settings.SOLVER_JOB_STALE_TIMEOUT)
+    )
+    stale.filter(attempts__gte=settings.SOLVER_JOB_MAX_ATTEMPTS).update(
+        state=SOLVER_JOB_FAILED,
+        message=SOLVER_JOB_STALE_MSG.format(attempts=settings.SOLVER_JOB_MAX_ATTEMPTS),
+        finished_at=now
+    )
+    return stale.update(state=SOLVER_JOB_QUEUED, progress=0, started_at=None, heartbeat_at=None)
+
+
+def claim_next_solver_job() -> Optional[SolverJob]:
+    """
+    Requeues the stale jobs (see `requeue_stale_solver_jobs`), then takes the oldest queued job
+    and marks it as running.
+
+    The state is switched with a conditional update, so when several workers poll the same queue
+    only one of them claims a job.
+
+    Returns:
+        Optional[SolverJob]: The claimed job, or None if the queue is empty.
+    """
+    requeue_stale_solver_jobs()
+
+    for job_id in SolverJob.objects.filter(state=SOLVER_JOB_QUEUED).order_by('id') \
+            .values_list('id', flat=True)[:10]:
+        now = timezone.now()
+        claimed = SolverJob.objects.filter(id=job_id, state=SOLVER_JOB_QUEUED).update(
+            state=SOLVER_JOB_RUNNING, started_at=now, heartbeat_at=now,
+            attempts=F('attempts') + 1)
+        if claimed:
+            return SolverJob.objects.get(id=job_id)
+    return None
+
+
+def set_solver_job_progress(job: SolverJob, progress: int) -> None:
+    """
+    Stores the progress of a running job, which is also a heartbeat.
+
+    Args:
+        job (SolverJob): The job.
+        progress (int): The progress in percent.
+    """
+    job.progress = progress
+    SolverJob.objects.filter(id=job.id).update(progress=progress, heartbeat_at=timezone.now())
+
+
+@contextmanager
+def solver_job_heartbeat(job: SolverJob) -> Iterator[None]:
+    """
+    Refreshes the heartbeat of a running job every `SOLVER_JOB_HEARTBEAT_INTERVAL` seconds from a
+    background thread, as a single solve can run longer than `SOLVER_JOB_STALE_TIMEOUT` without
+    reporting progress.
+
+    Args:
+        job (SolverJob): The running job.
+    """
+    stopped = threading.Event()
+
+    def beat() -> None:
+        try:
+            while not stopped.wait(settings.SOLVER_JOB_HEARTBEAT_INTERVAL):
+                SolverJob.objects.filter(id=job.id, state=SOLVER_JOB_RUNNING).update(
+                    heartbeat_at=timezone.now())
+        finally:
+            # The thread has its own database connection
+            connection.close()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def run_solver_job(job: SolverJob) -> None:
+    """
+    Runs the optimization of a claimed job and stores its result. Errors are stored in the job
+    instead of stopping the worker.
+
+    Args:
+        job (SolverJob): The job claimed by `claim_next_solver_job`.
+    """
+    def progress(percent: int) -> None:
+        set_solver_job_progress(job, percent)
+
+    with solver_job_heartbeat(job):
+        try:
+            if job.kind == SOLVER_JOB_SCENARIO_SWEEP:
+                # The scenarios are stored with the sweep id handed out when the job was queued
+                scenarios = run_scenario_sweep(**job.parameters, owner=job.owner,
+                                               progress=progress)
+                job.message = SCENARIO_SWEEP_FINISHED_MSG.format(
+                    solved=sum(scenario.status in FEASIBLE_STATUSES for scenario in scenarios),
+                    total=len(scenarios), sweep=job.parameters['sweep'])
+            elif job.kind == SOLVER_JOB_SOLUTION_POOL:
+                scenarios = run_solution_pool(**job.parameters, owner=job.owner)
+                job.status = scenarios[0].status
+                job.message = SOLUTION_POOL_FINISHED_MSG.format(
+                    drafts=sum(scenario.rosters is not None for scenario in scenarios),
+                    sweep=job.parameters['sweep'])
+            elif job.kind == SOLVER_JOB_OPTIMIZE:
+                ret_val = get_users_without_application()
+                warning_msg = ret_val[1] if len(ret_val) == 2 else ""
+
+                status, _, _, gap = optimize_schedule(**job.parameters, progress=progress)
+
+                job.status = status
+                job.message = get_solver_status_msg(status, gap, warning_msg)
+            else:
+                raise ValueError(f"Unknown solver job kind: {job.kind}")
+
+            job.message = job.message[:MESSAGE_MAX_LENGTH]
+            job.state = SOLVER_JOB_FINISHED
+            job.progress = 100
+        except CapacityShortageError as error:
+            # Reported like a solver result, with the shifts that can't be covered
+            job.status = pywraplp.Solver.INFEASIBLE
+            job.message = f"{SOLVER_STATUS_INFEASIBLE}. {error}"[:MESSAGE_MAX_LENGTH]
+            job.state = SOLVER_JOB_FINISHED
+            job.progress = 100
+        except Exception as error:
+            job.message = f"{type(error).__name__}: {error}"[:MESSAGE_MAX_LENGTH]
+            job.state = SOLVER_JOB_FAILED
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'message', 'state', 'progress', 'finished_at'])
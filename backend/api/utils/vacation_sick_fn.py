@@ -1,5 +1,6 @@
 import json
 import random
+from collections import Counter
 from datetime import date, datetime
 from typing import Optional, Tuple
 
@@ -20,13 +21,15 @@ from .message_fn import (
 )
 from .model_fn import (
     get_roster_by_user_and_week_number,
-    get_rosters_by_week
+    get_week_matrices
 )
 from .common_fn import (
     replace_string_from_to_with_char,
+    roster_strings_to_array,
     get_default_days_str,
     contains_character_from_index
 )
+from .solver_constants import NIGHT_SHIFT, SHIFTS_PER_DAY
 from ..solver import reoptimize_schedule_after_sickness
 
 
@@ -76,9 +79,8 @@ def get_claimed_vacation_by_user_in_year(user: User, year: int) -> int:
     """
     Calculate the total number of vacation days claimed by a user in a given year.
 
-    This function iterates over all the rosters for a specific user in the given year,
-    counts the number of '1' characters (representing claimed vacation days) in the 
-    'vacation' field of each roster, and returns the total number of claimed vacation days.
+    This function loads the 'vacation' field of every roster of the user in the given year as
+    a matrix and sums it, each 1 is a claimed vacation day.
 
     Args:
         user (Type[User]): The user whose vacation claims are being calculated.
@@ -87,8 +89,8 @@ def get_claimed_vacation_by_user_in_year(user: User, year: int) -> int:
     Returns:
         int: The total number of vacation days claimed by the user in the given year.
     """
-    rosters = Roster.objects.filter(owner=user, year=year)
-    return sum(str(roster.vacation).count(CHAR_ONE) for roster in rosters)
+    vacation = Roster.objects.filter(owner=user, year=year).values_list('vacation', flat=True)
+    return int(roster_strings_to_array(list(vacation), DAYS_IN_WEEK).sum())
 
 
 def vacation_claim(
@@ -191,11 +193,9 @@ def get_user_for_reserve(
     Returns:
         User: The selected user for the reserve shift.
     """
-    call_ins = {
-        user: sum(1 for roster in Roster.objects.filter(
-            owner=user, year=year) if roster.reserve_call_in)
-        for user in users
-    }
+    reserve_call_ins = Counter(Roster.objects.filter(
+        owner__in=users, year=year, reserve_call_in=True).values_list('owner_id', flat=True))
+    call_ins = {user: reserve_call_ins[user.id] for user in users}
 
     min_call_in = min(call_ins.values())
 
@@ -205,30 +205,25 @@ def get_user_for_reserve(
         if reserve_call_ins == min_call_in
     ]
 
-    users_to_exclude = []
+    users_to_exclude = set()
 
     if shift_index == 0:  # Morning shift
-        if day_index == 0:  # Monday
-            prev_week_rosters = Roster.objects.filter(
-                owner__in=users, week_number=week_number - 1)
-            for prev_week_roster in prev_week_rosters:
-                if prev_week_roster.work_days[6] == CHAR_ONE and prev_week_roster.schedule[20] == CHAR_ONE:
-                    users_to_exclude.append(prev_week_roster.owner)
-
+        # The night shift of the day before, on Monday the last day of the previous week
+        if day_index == 0:
+            week_before, day_before = week_number - 1, DAYS_IN_WEEK - 1
         else:
-            current_week_rosters = Roster.objects.filter(
-                owner__in=users, week_number=week_number)
-            for current_week_roster in current_week_rosters:
-                if (
-                    current_week_roster.work_days[day_index - 1] == CHAR_ONE and
-                    current_week_roster.schedule[(day_index - 1) * 3 + 2] == CHAR_ONE
-                ):
-                    users_to_exclude.append(current_week_roster.owner)
+            week_before, day_before = week_number, day_index - 1
+        week = get_week_matrices([week_before], usernames=[user.username for user in users])
+        night_before = (week.work_days[:, 0, day_before] &
+                        week.schedule[:, 0, day_before * SHIFTS_PER_DAY + NIGHT_SHIFT])
+        users_to_exclude = {
+            username for username, night in zip(week.workers, night_before) if night
+        }
 
     eligible_users = [
         user
         for user in users_with_lowest_call_ins
-        if user not in users_to_exclude
+        if user.username not in users_to_exclude
     ]
 
     return random.choice(eligible_users) if eligible_users else None
@@ -284,11 +279,14 @@ def sickness_claim(
         start_date < first_day_for_application_week
     ):
         user_roster = Roster.objects.get(owner=user, week_number=week_number)
-        rosters = get_rosters_by_week(week_number)
+        week = get_week_matrices([week_number])
+        owners = User.objects.in_bulk(week.owner_ids.tolist())
 
         for day_index in range(first_pos, last_pos):
-            users_for_reserve = [roster.owner for roster in [
-                roster for roster in rosters if roster.reserve_days[day_index] == CHAR_ONE]]
+            users_for_reserve = [
+                owners[owner_id]
+                for owner_id in week.owner_ids[week.reserve_days[:, 0, day_index] == 1].tolist()
+            ]
 
             if users_for_reserve:
                 if (
@@ -391,17 +389,10 @@ def sickness_claim(
         shift_index = user_roster.schedule[day_index * 3:day_index * 3 + 3].index(CHAR_ONE)
         user_roster = Roster.objects.get(owner=user, week_number=week_number)
 
-        rosters = get_rosters_by_week(week_number)
-        rosters_with_day_off = [
-            roster
-            for roster in rosters
-            if roster.off_days[day_index] == CHAR_ONE
-        ]
-
-        users_for_day_off_call_in = [
-            roster.owner
-            for roster in rosters_with_day_off
-        ]
+        week = get_week_matrices([week_number])
+        users_for_day_off_call_in = list(User.objects.filter(
+            id__in=week.owner_ids[week.off_days[:, 0, day_index] == 1].tolist()
+        ).order_by('id'))
 
         day_off_user = random.choice(users_for_day_off_call_in)
         day_off_user_roster = Roster.objects.get(owner=day_off_user, week_number=week_number)
@@ -555,7 +546,7 @@ def sickness_claim(
         user_roster.save()
         day_index_opt = 7 * (week_number - get_current_week_number(0)) + day_index_opt
 
-        reoptimize_schedule_after_sickness(15, 1, day_index_opt + 1)
+        reoptimize_schedule_after_sickness(None, 1, day_index_opt + 1)
 
     # sickness for application week and onwards
     if end_date > first_day_for_application_week:
@@ -1,6 +1,8 @@
+import uuid
 from typing import Dict, Optional
 
 from django.contrib.auth.models import Group, User
+from django.core.exceptions import ValidationError
 from django.http import JsonResponse
 
 from rest_framework import generics
@@ -8,8 +10,23 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 
 from .agent import call_agent
-from .models import Message, Roster
-from .serializers import MessageSerializer, RosterSerializer, UserSerializer
+from .models import Message, Roster, Scenario, SolverJob, SolverRun
+from .permissions import IsOwnerOrSupervisor, IsSupervisor
+from .scenarios import check_scenario_variants, check_solution_pool, commit_scenario
+from .serializers import (
+    MessageSerializer,
+    RosterSerializer,
+    ScenarioSerializer,
+    ScenarioVariantSerializer,
+    SolverJobSerializer,
+    SolutionPoolSerializer,
+    SolverRunFilterSerializer,
+    SolverRunSerializer,
+    UserSerializer,
+)
+from .utils.model_fn import is_user_in_group
+from .utils.solver_constants import SOLVER_JOB_SCENARIO_SWEEP, SOLVER_JOB_SOLUTION_POOL
+from .utils.solver_job_fn import enqueue_solver_job
 
 
 class RosterGivenWeekQuery(generics.ListAPIView):
@@ -350,6 +367,236 @@ def get_user_details(request) -> JsonResponse:
     return JsonResponse(users_dict)
 
 
+class SolverJobDetail(generics.RetrieveAPIView):
+    """
+    This view reports the state, the progress and the final status message of a queued schedule
+    optimization. The user must be authenticated, and only supervisors can see the jobs of other
+    users.
+
+    Attributes:
+        serializer_class (Type[SolverJobSerializer]): The serializer used to convert the job data.
+        permission_classes (list): A list of permissions required to access the view.
+
+    Methods:
+        get_queryset(self) -> QuerySet:
+            Returns the jobs the authenticated user can see.
+    """
+
+    serializer_class = SolverJobSerializer
+
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Retrieves every job for supervisors, and the jobs queued by the user otherwise.
+
+        Returns:
+            QuerySet: A queryset of the SolverJob objects the user can see.
+        """
+        user = self.request.user
+        if is_user_in_group(user, 'Supervisor'):
+            return SolverJob.objects.all()
+        return SolverJob.objects.filter(owner=user)
+
+
+class SolverRunList(generics.ListAPIView):
+    """
+    This view lists the statistics of the solver runs, newest first, to track the solver
+    performance over the weeks. The user must be authenticated.
+
+    The runs can be filtered with the query parameters `kind`, `engine`, `backend`, `status`,
+    `week_number`, `created_after` and `created_before` (ISO dates), e.g.
+    `solver-runs/?kind=optimize&backend=cp-sat&created_after=2024-01-01`. Invalid filters are
+    answered with a 400 response.
+
+    Attributes:
+        serializer_class (Type[SolverRunSerializer]): The serializer used to convert the run data.
+        permission_classes (list): A list of permissions required to access the view.
+
+    Methods:
+        list(self, request, *args, **kwargs) -> Response:
+            Validates the query parameters and lists the matching runs.
+        get_queryset(self) -> QuerySet:
+            Returns the runs matching the query parameters.
+    """
+
+    serializer_class = SolverRunSerializer
+
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request, *args, **kwargs):
+        """
+        Handle GET requests, validating the filters of the query parameters first.
+
+        Args:
+            request (HttpRequest): The request, with the filters as query parameters.
+
+        Returns:
+            Response: The matching runs, or the validation errors of the filters.
+        """
+        serializer = SolverRunFilterSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return JsonResponse({'errors': serializer.errors}, status=400)
+
+        self.filters = serializer.validated_data
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        """
+        Retrieves the solver runs matching the validated filters of the query parameters.
+
+        Returns:
+            QuerySet: A queryset of the matching runs, ordered by creation date descending.
+        """
+        filters = {
+            field: self.filters[name]
+            for name, field in (
+                ('kind', 'kind'),
+                ('engine', 'engine'),
+                ('backend', 'backend'),
+                ('status', 'status'),
+                ('week_number', 'week_number'),
+                ('created_after', 'created_at__date__gte'),
+                ('created_before', 'created_at__date__lte'),
+            )
+            if name in self.filters
+        }
+        return SolverRun.objects.filter(**filters).order_by('-created_at')
+
+
+class ScenarioSweepView(APIView):
+    """
+    Queues the solve of several variants of the application week (e.g. reserve multipliers,
+    rejected vacations, coverage tables) for the solver worker, and returns the comparison table
+    of a solved sweep. No roster is changed until a scenario is committed with
+    `ScenarioCommitView`. Only supervisors can run sweeps.
+
+    Methods:
+        get: Returns the scenarios of a sweep.
+        post: Validates the variants and queues the sweep as a solver job.
+    """
+
+    permission_classes = [IsSupervisor]
+
+    def get(self, request) -> JsonResponse:
+        """
+        Handle GET requests for the comparison table of a sweep.
+
+        Args:
+            request (HttpRequest): The request, with the `sweep` id as query parameter.
+
+        Returns:
+            JsonResponse: The scenarios of the sweep, or an error if the sweep id is invalid.
+        """
+        try:
+            scenarios = list(Scenario.objects.filter(sweep=request.GET.get('sweep'))
+                             .order_by('id'))
+        except ValidationError:
+            return JsonResponse({'error': 'Invalid sweep id'}, status=400)
+
+        return JsonResponse(ScenarioSerializer(scenarios, many=True).data, safe=False)
+
+    def post(self, request) -> JsonResponse:
+        """
+        Handle POST requests with a `scenarios` list of variants.
+
+        Args:
+            request (HttpRequest): The request, e.g. `{"scenarios": [{"name": "x2",
+                                   "multiplier": 2}, {"name": "no vacation",
+                                   "rejected_vacations": {"john": [3, 4]}}]}`.
+
+        Returns:
+            JsonResponse: The id of the queued job and of the sweep, or the validation errors.
+        """
+        serializer = ScenarioVariantSerializer(data=request.data.get('scenarios', []), many=True)
+        if not serializer.is_valid():
+            return JsonResponse({'errors': serializer.errors}, status=400)
+
+        try:
+            check_scenario_variants(serializer.validated_data)
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+
+        sweep = str(uuid.uuid4())
+        job = enqueue_solver_job(request.user, SOLVER_JOB_SCENARIO_SWEEP,
+                                 variants=serializer.validated_data, sweep=sweep)
+        return JsonResponse({'job': job.id, 'sweep': sweep}, status=202)
+
+
+class SolutionPoolView(APIView):
+    """
+    Queues the solve of up to K distinct schedules of the application week for the solver
+    worker, stored as draft scenarios of one sweep, best first. The drafts are compared with
+    `ScenarioSweepView` and no roster is changed until a draft is committed with
+    `ScenarioCommitView`. Only supervisors can run solution pools.
+
+    Methods:
+        post: Validates the request and queues the solution pool as a solver job.
+    """
+
+    permission_classes = [IsSupervisor]
+
+    def post(self, request) -> JsonResponse:
+        """
+        Handle POST requests for a solution pool.
+
+        Args:
+            request (HttpRequest): The request, e.g. `{"multiplier": 1, "size": 5}`.
+
+        Returns:
+            JsonResponse: The id of the queued job and of the sweep, or the validation errors.
+        """
+        serializer = SolutionPoolSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse({'errors': serializer.errors}, status=400)
+
+        multiplier = serializer.validated_data['multiplier']
+        try:
+            # Also a CapacityShortageError, listing the shifts that can't be covered
+            check_solution_pool(multiplier)
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+
+        sweep = str(uuid.uuid4())
+        job = enqueue_solver_job(request.user, SOLVER_JOB_SOLUTION_POOL, multiplier=multiplier,
+                                 size=serializer.validated_data.get('size'), sweep=sweep)
+        return JsonResponse({'job': job.id, 'sweep': sweep}, status=202)
+
+
+class ScenarioCommitView(APIView):
+    """
+    Writes the schedule of a solved scenario to the rosters and publishes them. Only the user who
+    ran the sweep and supervisors can commit its scenarios.
+
+    Methods:
+        post: Commits the scenario with the given primary key.
+    """
+
+    permission_classes = [IsAuthenticated, IsOwnerOrSupervisor]
+
+    def post(self, request, pk: int) -> JsonResponse:
+        """
+        Handle POST requests to commit a scenario.
+
+        Args:
+            request (HttpRequest): The request.
+            pk (int): The primary key of the scenario.
+
+        Returns:
+            JsonResponse: The committed scenario, or an error if it can't be committed.
+        """
+        try:
+            scenario = Scenario.objects.get(pk=pk)
+            self.check_object_permissions(request, scenario)
+            scenario = commit_scenario(scenario)
+        except Scenario.DoesNotExist:
+            return JsonResponse({'error': 'Scenario not found'}, status=404)
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+
+        return JsonResponse(ScenarioSerializer(scenario).data)
+
+
 class AgentView(APIView):
     """
     Handles POST requests to trigger the agent logic.
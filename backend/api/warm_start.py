@@ -0,0 +1,515 @@
+from functools import lru_cache
+from itertools import combinations
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .heuristic import RESERVE, WORK
+from .model_builder import ScheduleModel, get_weekly_quotas
+from .utils.constants import DAYS_IN_WEEK, NUMBER_OF_SHIFTS
+from .utils.solver_constants import MAX_NIGHT_SHIFTS, NIGHT_SHIFT, SHIFTS_PER_DAY
+
+# The longest chain of workers moving their reserve days to cover a day
+MAX_RESERVE_CHAIN = 3
+
+
+def follows_reserve_rules(off: np.ndarray, reserve: np.ndarray) -> bool:
+    """
+    Checks the reserve-after-off rules of a week: every reserve day (except on the last day) is
+    followed by an off day and no reserve day is preceded by an off day.
+
+    Args:
+        off (np.ndarray): The off days of the worker.
+        reserve (np.ndarray): The reserve days of the worker.
+
+    Returns:
+        bool: True if the rules are satisfied.
+    """
+    return not (
+        (reserve[:-1] & ~off[1:]).any() or
+        (off[:-1] & reserve[1:]).any()
+    )
+
+
+@lru_cache(maxsize=None)
+def get_day_splits(
+    absent: Tuple[bool, ...],
+    number_of_work_days: int,
+    number_of_reserve_days: int,
+    reserve_rule: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Enumerates every split of a week into work, off and reserve days (respecting the
+    reserve-after-off rules if they apply), in the order of `combinations`.
+
+    Args:
+        absent (Tuple[bool, ...]): The vacation or sick days of the worker.
+        number_of_work_days (int): The number of work days of the week.
+        number_of_reserve_days (int): The number of reserve days of the week.
+        reserve_rule (bool): Whether the reserve-after-off rules apply to the worker.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The work, off and reserve days of the splits as
+        read-only (splits, 7) boolean matrices.
+    """
+    absent = np.array(absent, dtype=bool)
+    present_days = np.flatnonzero(~absent)
+    day_masks = np.eye(DAYS_IN_WEEK, dtype=bool)
+
+    work, reserve = [], []
+    for work_days in combinations(present_days, number_of_work_days):
+        work_mask = day_masks[list(work_days)].any(axis=0)
+        for reserve_days in combinations(present_days[~work_mask[present_days]],
+                                         number_of_reserve_days):
+            work.append(work_mask)
+            reserve.append(day_masks[list(reserve_days)].any(axis=0))
+
+    work = np.array(work, dtype=bool).reshape(-1, DAYS_IN_WEEK)
+    reserve = np.array(reserve, dtype=bool).reshape(-1, DAYS_IN_WEEK)
+    off = ~work & ~reserve & ~absent
+    valid = ~(
+        (reserve[:, :-1] & ~off[:, 1:]).any(axis=1) |
+        (off[:, :-1] & reserve[:, 1:]).any(axis=1)
+    ) | (not reserve_rule)
+
+    splits = work[valid], off[valid], reserve[valid]
+    for split in splits:
+        split.setflags(write=False)
+    return splits
+
+
+def get_day_types(
+    work_preference: np.ndarray,
+    previous_reserve_days: np.ndarray,
+    absent: np.ndarray,
+    number_of_work_days: int,
+    number_of_reserve_days: int,
+    reserve_rule: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Splits the days of a worker into work, off and reserve days matching the weekly quotas.
+
+    The days with the highest work preference become work days and the reserve day is placed on a
+    previous reserve day if possible. If this breaks the reserve-after-off rules, the best split
+    satisfying them is picked among all splits of the week (see `get_day_splits`).
+
+    Args:
+        work_preference (np.ndarray): A score for each day, the higher the more preferred as
+                                      work day.
+        previous_reserve_days (np.ndarray): The reserve days of the previous week.
+        absent (np.ndarray): The vacation or sick days of the worker.
+        number_of_work_days (int): The number of work days of the week.
+        number_of_reserve_days (int): The number of reserve days of the week.
+        reserve_rule (bool): Whether the reserve-after-off rules apply to the worker.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The work, off and reserve days as boolean
+        vectors.
+    """
+    score = np.where(absent, -np.inf, work_preference)
+    order = np.argsort(-score, kind='stable')
+    work = np.zeros(DAYS_IN_WEEK, dtype=bool)
+    work[order[:number_of_work_days]] = True
+
+    remaining = ~work & ~absent
+    reserve = np.zeros(DAYS_IN_WEEK, dtype=bool)
+    candidates = sorted(np.flatnonzero(remaining), key=lambda day: not previous_reserve_days[day])
+    reserve[candidates[:number_of_reserve_days]] = True
+
+    off = remaining & ~reserve
+    if not reserve_rule or follows_reserve_rules(off, reserve):
+        return work, off, reserve
+
+    work_splits, off_splits, reserve_splits = get_day_splits(
+        tuple(bool(day) for day in absent), int(number_of_work_days), int(number_of_reserve_days),
+        True)
+    if not len(work_splits):
+        return work, off, reserve
+
+    # The first of the best splits, like a search over `combinations` keeping strict improvements
+    values = work_splits @ work_preference + reserve_splits @ previous_reserve_days
+    best = int(np.argmax(values))
+    return work_splits[best].copy(), off_splits[best].copy(), reserve_splits[best].copy()
+
+
+def can_take_shift(
+    day_shifts: np.ndarray,
+    day: int,
+    shift: int,
+    work: Optional[np.ndarray] = None
+) -> bool:
+    """
+    Checks whether a worker can take a shift on a day without breaking the night shift limit or
+    the rest after night shifts.
+
+    Args:
+        day_shifts (np.ndarray): The (7, 3) shift matrix of the worker.
+        day (int): The 0-based day index.
+        shift (int): The 0-based shift index (0 = morning, 1 = afternoon, 2 = night).
+        work (Optional[np.ndarray], optional): The work days of the worker, if the following days
+                                               are not assigned yet. A night shift forces night
+                                               shifts on the following consecutive work days.
+                                               Defaults to None.
+
+    Returns:
+        bool: True if the shift can be taken.
+    """
+    other_days = np.delete(np.arange(DAYS_IN_WEEK), day)
+    nights = day_shifts[other_days, NIGHT_SHIFT].sum()
+    if shift == NIGHT_SHIFT:
+        forced_nights = 1
+        if work is not None:
+            while day + forced_nights < DAYS_IN_WEEK and work[day + forced_nights]:
+                forced_nights += 1
+        if nights + forced_nights > MAX_NIGHT_SHIFTS:
+            return False
+    if shift != NIGHT_SHIFT and day > 0 and day_shifts[day - 1, NIGHT_SHIFT]:
+        return False
+    if (
+        shift == NIGHT_SHIFT and
+        day < DAYS_IN_WEEK - 1 and
+        day_shifts[day + 1, :NIGHT_SHIFT].any()
+    ):
+        return False
+    return True
+
+
+def assign_shifts(
+    work: np.ndarray,
+    applied_shifts: np.ndarray,
+    previous_shifts: np.ndarray
+) -> np.ndarray:
+    """
+    Assigns one shift to every work day of a worker, preferring the applied shifts and then the
+    shifts of the previous week.
+
+    Args:
+        work (np.ndarray): The work days of the worker.
+        applied_shifts (np.ndarray): The (7, 3) application matrix of the worker.
+        previous_shifts (np.ndarray): The (7, 3) schedule matrix of the previous week.
+
+    Returns:
+        np.ndarray: The (7, 3) shift matrix of the worker.
+    """
+    day_shifts = np.zeros((DAYS_IN_WEEK, SHIFTS_PER_DAY), dtype=np.uint8)
+
+    for day in np.flatnonzero(work):
+        preference = (
+            applied_shifts[day].astype(int) * 2 + previous_shifts[day] -
+            np.arange(SHIFTS_PER_DAY) * 0.1
+        )
+        for shift in np.argsort(-preference, kind='stable'):
+            if can_take_shift(day_shifts, day, shift, work):
+                day_shifts[day, shift] = 1
+                break
+        else:
+            day_shifts[day, int(np.argmax(preference))] = 1
+
+    return day_shifts
+
+
+class CoverageRepair:
+    """
+    Repairs the shift and reserve coverage of a hint by moving workers between the shifts of a
+    day and between the splits of their week (see `get_day_splits`). A worker only leaves a shift
+    or a reserve day that stays covered, and the matrices are modified in place.
+
+    Attributes:
+        day_shifts (np.ndarray): The (workers, 7, 3) shift matrix of all workers.
+        work_days (np.ndarray): The (workers, 7) boolean matrix of the work days.
+        off_days (np.ndarray): The (workers, 7) boolean matrix of the off days.
+        reserve_days (np.ndarray): The (workers, 7) boolean matrix of the reserve days.
+        reserve_rule (np.ndarray): A boolean mask of the workers the reserve-after-off rules apply
+                                   to.
+        required (np.ndarray): The (7, 3) minimum number of workers of each shift.
+        min_reserves (float): The minimum number of reserve workers per day.
+        coverage (np.ndarray): The (7, 3) number of workers of each shift.
+        reserves (np.ndarray): The number of reserve workers of each day.
+
+    Methods:
+        get_splits(worker, kind, day) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+            Returns the splits of a worker's week with a kind of day on the day.
+        move_worker(worker, work, off, reserve, target, allow_shortage) -> bool:
+            Moves a worker to another split of their week if the days they leave stay covered.
+        move_reserve_day(day, chain) -> bool:
+            Moves the reserve day of a worker onto the day.
+        repair_coverage() -> None:
+            Covers the shifts below the minimum.
+        repair_reserve_coverage() -> None:
+            Covers the days with too few reserves.
+    """
+
+    def __init__(
+        self,
+        day_shifts: np.ndarray,
+        work_days: np.ndarray,
+        off_days: np.ndarray,
+        reserve_days: np.ndarray,
+        reserve_rule: np.ndarray,
+        min_workers: np.ndarray,
+        min_reserves: float
+    ) -> None:
+        self.day_shifts = day_shifts
+        self.work_days = work_days
+        self.off_days = off_days
+        self.reserve_days = reserve_days
+        self.reserve_rule = reserve_rule
+        self.required = min_workers.reshape(DAYS_IN_WEEK, SHIFTS_PER_DAY)
+        self.min_reserves = min_reserves
+        self.coverage = day_shifts.sum(axis=0).astype(int)
+        self.reserves = reserve_days.sum(axis=0)
+
+    def get_splits(
+        self,
+        worker: int,
+        kind: int,
+        day: int
+    ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Returns the splits of a worker's week with a kind of day (`WORK`, `OFF` or `RESERVE`) on
+        the day, the fewest changed days first.
+        """
+        work, reserve = self.work_days[worker], self.reserve_days[worker]
+        absent = ~(work | self.off_days[worker] | reserve)
+        splits = get_day_splits(tuple(absent.tolist()), int(work.sum()), int(reserve.sum()),
+                                bool(self.reserve_rule[worker]))
+        matches = np.flatnonzero(splits[kind][:, day])
+        changes = ((splits[WORK][matches] != work).sum(axis=1) +
+                   (splits[RESERVE][matches] != reserve).sum(axis=1))
+        return [tuple(split[index] for split in splits)
+                for index in matches[np.argsort(changes, kind='stable')]]
+
+    def move_worker(
+        self,
+        worker: int,
+        work: np.ndarray,
+        off: np.ndarray,
+        reserve: np.ndarray,
+        target: Optional[Tuple[int, int]] = None,
+        allow_shortage: bool = False
+    ) -> bool:
+        """
+        Moves a worker to another split of their week if the shifts and reserve days they leave
+        stay covered and they can take a shift on each new work day, the most needed one, or the
+        shift of `target` (day, shift) on its day. With `allow_shortage`, the reserve days they
+        leave may fall below the minimum.
+        """
+        shifts = self.day_shifts[worker].copy()
+        left_days = np.flatnonzero(self.work_days[worker] & ~work)
+        left_shifts = shifts[left_days].argmax(axis=1)
+        left_reserves = self.reserve_days[worker] & ~reserve
+        if (
+            (self.coverage[left_days, left_shifts] <= self.required[left_days, left_shifts]).any()
+            or (not allow_shortage and
+                (self.reserves[left_reserves] - 1 < self.min_reserves).any())
+        ):
+            return False
+
+        shifts[left_days] = 0
+        for day in np.flatnonzero(work & ~self.work_days[worker]):
+            if target is not None and day == target[0]:
+                choices = [target[1]]
+            else:
+                choices = np.argsort(self.coverage[day] - self.required[day], kind='stable')
+            for shift in choices:
+                if can_take_shift(shifts, day, shift):
+                    shifts[day, shift] = 1
+                    break
+            else:
+                return False
+
+        self.coverage += shifts.astype(int) - self.day_shifts[worker]
+        self.reserves += reserve.astype(int) - self.reserve_days[worker]
+        self.day_shifts[worker] = shifts
+        self.work_days[worker], self.off_days[worker], self.reserve_days[worker] = \
+            work, off, reserve
+        return True
+
+    def repair_coverage(self) -> None:
+        """
+        Covers the shifts below the minimum by moving workers between the shifts of the same day
+        first, and onto the day from an off or reserve day second.
+        """
+        for day, shift in zip(*np.nonzero(self.coverage < self.required)):
+            for worker in np.flatnonzero(self.work_days[:, day]):
+                if self.coverage[day, shift] >= self.required[day, shift]:
+                    break
+                current = int(np.argmax(self.day_shifts[worker, day]))
+                if current == shift or self.coverage[day, current] <= self.required[day, current]:
+                    continue
+
+                self.day_shifts[worker, day, current] = 0
+                if can_take_shift(self.day_shifts[worker], day, shift):
+                    self.day_shifts[worker, day, shift] = 1
+                    self.coverage[day, current] -= 1
+                    self.coverage[day, shift] += 1
+                else:
+                    self.day_shifts[worker, day, current] = 1
+
+            for worker in np.flatnonzero(self.off_days[:, day] | self.reserve_days[:, day]):
+                if self.coverage[day, shift] >= self.required[day, shift]:
+                    break
+                for split in self.get_splits(worker, WORK, day):
+                    if self.move_worker(worker, *split, (day, shift)):
+                        break
+
+    def move_reserve_day(self, day: int, chain: int) -> bool:
+        """
+        Moves the reserve day of a worker onto the day, workers off on the day first. If `chain`
+        is above 0, the worker may leave a day without enough reserves if another worker's
+        reserve day is moved onto it the same way, with a chain one shorter.
+        """
+        has_reserve_day = self.reserve_days.any(axis=1)
+        workers = np.concatenate([
+            np.flatnonzero(self.off_days[:, day] & has_reserve_day),
+            np.flatnonzero(self.work_days[:, day] & has_reserve_day)
+        ])
+        for allow_shortage in (False, True)[:1 + (chain > 0)]:
+            for worker in workers:
+                for split in self.get_splits(worker, RESERVE, day):
+                    state = (self.coverage.copy(), self.reserves.copy(),
+                             self.day_shifts[worker].copy(), self.work_days[worker].copy(),
+                             self.off_days[worker].copy(), self.reserve_days[worker].copy())
+                    left_reserves = np.flatnonzero(self.reserve_days[worker] & ~split[RESERVE])
+                    if not self.move_worker(worker, *split, allow_shortage=allow_shortage):
+                        continue
+                    if all(self.reserves[left] >= self.min_reserves or
+                           self.move_reserve_day(left, chain - 1) for left in left_reserves):
+                        return True
+
+                    (self.coverage, self.reserves, self.day_shifts[worker], self.work_days[worker],
+                     self.off_days[worker], self.reserve_days[worker]) = state
+        return False
+
+    def repair_reserve_coverage(self) -> None:
+        """
+        Covers the days with too few reserves by moving reserve days onto them, in chains of at
+        most `MAX_RESERVE_CHAIN` workers.
+        """
+        for day in np.flatnonzero(self.reserves < self.min_reserves):
+            while (self.reserves[day] < self.min_reserves and
+                   self.move_reserve_day(day, MAX_RESERVE_CHAIN - 1)):
+                pass
+
+
+def get_schedule_hint(
+    applications: np.ndarray,
+    previous_schedules: np.ndarray,
+    previous_work_days: np.ndarray,
+    previous_reserve_days: np.ndarray,
+    previous_published: np.ndarray,
+    vacation: np.ndarray,
+    sickness: np.ndarray,
+    min_workers: np.ndarray,
+    multiplier: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Builds a warm-start assignment for the application week from the applications and the last
+    published schedule of the workers.
+
+    Work days are taken from the applied days first and from the previous week's work days
+    second, then the seed is repaired so that every worker satisfies the weekly quotas, the
+    reserve-after-off rules, the night shift limit and the rest after night shifts. Uncovered
+    shifts are filled by moving workers between the shifts of a day or moving their work days,
+    and missing reserves by moving reserve days (see `CoverageRepair`); any remaining shortage is
+    left for the solver.
+
+    Args:
+        applications (np.ndarray): A (workers, 21) matrix of the applications.
+        previous_schedules (np.ndarray): A (workers, 21) matrix of the previous week's schedule.
+        previous_work_days (np.ndarray): A (workers, 7) matrix of the previous week's work days.
+        previous_reserve_days (np.ndarray): A (workers, 7) matrix of the previous week's reserve
+                                            days.
+        previous_published (np.ndarray): A boolean vector, True if the previous week of the worker
+                                         is published and can be used as a pattern.
+        vacation (np.ndarray): A (workers, 7) matrix of the vacation days.
+        sickness (np.ndarray): A (workers, 7) matrix of the sick days.
+        min_workers (np.ndarray): The minimum number of workers for each shift (21 values).
+        multiplier (float): A scaling factor of the number of reserve workers per day.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The (workers, 21) schedule and the
+        (workers, 7) work, off and reserve day matrices of the hint.
+    """
+    number_of_workers = applications.shape[0]
+    applied_shifts = applications.reshape(number_of_workers, DAYS_IN_WEEK, SHIFTS_PER_DAY)
+    pattern = previous_published[:, None]
+    previous_shifts = np.where(
+        pattern[:, :, None],
+        previous_schedules.reshape(number_of_workers, DAYS_IN_WEEK, SHIFTS_PER_DAY),
+        0
+    )
+    previous_work_days = np.where(pattern, previous_work_days, 0)
+    previous_reserve_days = np.where(pattern, previous_reserve_days, 0)
+    work_preference = applied_shifts.any(axis=2) * 2 + previous_work_days
+    absent = (vacation == 1) | (sickness == 1)
+
+    number_of_work_days, _, number_of_reserve_days, reserve_rule = \
+        get_weekly_quotas(vacation, sickness)
+
+    day_shifts = np.zeros((number_of_workers, DAYS_IN_WEEK, SHIFTS_PER_DAY), dtype=np.uint8)
+    work_days, off_days, reserve_days = (
+        np.zeros((number_of_workers, DAYS_IN_WEEK), dtype=bool) for _ in range(3))
+
+    for worker in range(number_of_workers):
+        work_days[worker], off_days[worker], reserve_days[worker] = get_day_types(
+            work_preference[worker],
+            previous_reserve_days[worker],
+            absent[worker],
+            number_of_work_days[worker],
+            number_of_reserve_days[worker],
+            reserve_rule[worker]
+        )
+        day_shifts[worker] = assign_shifts(
+            work_days[worker], applied_shifts[worker], previous_shifts[worker])
+
+    repair = CoverageRepair(day_shifts, work_days, off_days, reserve_days, reserve_rule,
+                            min_workers, 2 * multiplier)
+    repair.repair_coverage()
+    repair.repair_reserve_coverage()
+
+    return (
+        day_shifts.reshape(number_of_workers, -1),
+        work_days.astype(np.uint8),
+        off_days.astype(np.uint8),
+        reserve_days.astype(np.uint8)
+    )
+
+
+def get_application_week_hint_values(
+    model: ScheduleModel,
+    schedules: np.ndarray,
+    work_days: np.ndarray,
+    off_days: np.ndarray,
+    reserve_days: np.ndarray,
+    vacation: np.ndarray,
+    sickness: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Maps a hint of the application week onto the variables of a `build_schedule_model` model.
+    With several optimized weeks, the matrices hold the weeks side by side.
+
+    Args:
+        model (ScheduleModel): The model built by `build_schedule_model`.
+        schedules (np.ndarray): The (workers, 21) hinted schedule.
+        work_days (np.ndarray): The (workers, 7) hinted work days.
+        off_days (np.ndarray): The (workers, 7) hinted off days.
+        reserve_days (np.ndarray): The (workers, 7) hinted reserve days.
+        vacation (np.ndarray): The (workers, 7) vacation days.
+        sickness (np.ndarray): The (workers, 7) sick days.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The indices of the hinted variables and their values.
+    """
+    second_week_days = slice(DAYS_IN_WEEK, None)
+    blocks_and_values = (
+        (model.blocks['var_schedule'][:, NUMBER_OF_SHIFTS:], schedules),
+        (model.blocks['var_work_days'][:, second_week_days], work_days),
+        (model.blocks['var_off_days'][:, second_week_days], off_days),
+        (model.blocks['var_reserve_days'][:, second_week_days], reserve_days),
+        (model.blocks['var_vacation'][:, second_week_days], vacation),
+        (model.blocks['var_sickness'][:, second_week_days], sickness & (1 - vacation)),
+    )
+    indices = np.concatenate([block.ravel() for block, _ in blocks_and_values])
+    values = np.concatenate([np.ravel(values) for _, values in blocks_and_values])
+    return indices, values
@@ -2,6 +2,7 @@ from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
+import json
 
 load_dotenv()
 
@@ -134,3 +135,61 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
+
+# Schedule optimization
+# 'scip' (single-threaded MIP) or 'cp-sat' (parallel search workers)
+# On timeout the best feasible schedule is saved and flagged as suboptimal
+
+SOLVER_BACKEND = os.getenv("SOLVER_BACKEND", "scip")
+# 'compact' (one model over all workers), 'column-generation' (weekly patterns, large crews) or
+# 'heuristic' (greedy construction and local search, sub-second, feasible but not proven optimal)
+SOLVER_ENGINE = os.getenv("SOLVER_ENGINE", "compact")
+SOLVER_NUM_SEARCH_WORKERS = int(os.getenv("SOLVER_NUM_SEARCH_WORKERS", "8"))
+SOLVER_TIME_LIMIT = float(os.getenv("SOLVER_TIME_LIMIT", "60"))
+SOLVER_RELATIVE_GAP_LIMIT = float(os.getenv("SOLVER_RELATIVE_GAP_LIMIT", "0"))
+SOLVER_USE_HINTS = os.getenv("SOLVER_USE_HINTS", "True") == "True"
+# Improve the hint of the compact engine by local search first, so the solver starts from a
+# feasible incumbent; the local search stops after SOLVER_HEURISTIC_TIME_LIMIT seconds
+SOLVER_HEURISTIC_HINT = os.getenv("SOLVER_HEURISTIC_HINT", "False") == "True"
+SOLVER_HEURISTIC_TIME_LIMIT = float(os.getenv("SOLVER_HEURISTIC_TIME_LIMIT", "0.5"))
+# Solve for the number of interchangeable workers (same applications and absences) per week
+# pattern in the column generation engine instead of for each worker
+SOLVER_AGGREGATE_WORKERS = os.getenv("SOLVER_AGGREGATE_WORKERS", "True") == "True"
+# Solve each crew group (non-supervisor Group) as an independent shard in parallel processes
+SOLVER_SHARD_BY_GROUP = os.getenv("SOLVER_SHARD_BY_GROUP", "False") == "True"
+SOLVER_PROCESSES = int(os.getenv("SOLVER_PROCESSES", str(os.cpu_count() or 1)))
+# Coverage multiplier per crew group, e.g. '{"Crew A": 2}', other groups use the caller's value
+SOLVER_GROUP_MULTIPLIERS = json.loads(os.getenv("SOLVER_GROUP_MULTIPLIERS", "{}"))
+# Number of optimize_schedule models kept loaded in memory between runs, 0 disables reuse
+SOLVER_MODEL_CACHE_SIZE = int(os.getenv("SOLVER_MODEL_CACHE_SIZE", "4"))
+# Number of candidate workers (reserves, off days, then most work days) reoptimized besides the
+# sick workers after a sick leave, everyone else keeps their schedule; 0 reoptimizes every worker
+SOLVER_REOPTIMIZATION_NEIGHBORHOOD = int(os.getenv("SOLVER_REOPTIMIZATION_NEIGHBORHOOD", "10"))
+# Check the coverage against the available workers before solving, an uncoverable application
+# week is reported with its missing shifts and blocking vacations instead of a solver search
+SOLVER_CAPACITY_CHECK = os.getenv("SOLVER_CAPACITY_CHECK", "True") == "True"
+# Number of weeks optimized together from the application week on (rolling horizon), only the
+# application week is published; 1 optimizes the application week alone
+SOLVER_HORIZON_WEEKS = int(os.getenv("SOLVER_HORIZON_WEEKS", "1"))
+# Seconds the coverage profiles are kept in memory, saves in the same process clear them at once
+SOLVER_COVERAGE_CACHE_TTL = float(os.getenv("SOLVER_COVERAGE_CACHE_TTL", "300"))
+# Reuse the optimal schedule of an earlier optimize run with the same inputs instead of solving
+SOLVER_RESULT_CACHE = os.getenv("SOLVER_RESULT_CACHE", "True") == "True"
+# Maximum number of draft schedules kept from one solution pool solve, and their maximum
+# relative objective gap to the best draft
+SOLVER_SOLUTION_POOL_SIZE = int(os.getenv("SOLVER_SOLUTION_POOL_SIZE", "5"))
+SOLVER_SOLUTION_POOL_GAP = float(os.getenv("SOLVER_SOLUTION_POOL_GAP", "0.05"))
+# Seconds shared by the re-solves that find the alternative drafts of a solution pool, on top of
+# the solve of the best draft
+SOLVER_SOLUTION_POOL_TIME_LIMIT = float(os.getenv("SOLVER_SOLUTION_POOL_TIME_LIMIT", "60"))
+# Seconds the solver worker (manage.py run_solver_worker) waits between polls of an empty queue
+SOLVER_WORKER_POLL_INTERVAL = float(os.getenv("SOLVER_WORKER_POLL_INTERVAL", "2"))
+# Seconds between the heartbeats of a running solver job
+SOLVER_JOB_HEARTBEAT_INTERVAL = float(os.getenv("SOLVER_JOB_HEARTBEAT_INTERVAL", "30"))
+# Seconds without a heartbeat after which a running solver job is considered crashed and requeued
+SOLVER_JOB_STALE_TIMEOUT = float(os.getenv("SOLVER_JOB_STALE_TIMEOUT", "300"))
+# The number of times a solver job is claimed before a crashed job is marked as failed
+SOLVER_JOB_MAX_ATTEMPTS = int(os.getenv("SOLVER_JOB_MAX_ATTEMPTS", "3"))
+# Save the inputs and the MPS model of every solve (replay with manage.py replay_solver_instance)
+SOLVER_RECORD_INSTANCES = os.getenv("SOLVER_RECORD_INSTANCES", "False") == "True"
+SOLVER_INSTANCE_DIR = os.getenv("SOLVER_INSTANCE_DIR", str(BASE_DIR / "solver_instances"))